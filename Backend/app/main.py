@@ -1,7 +1,11 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import psse_route, pscad_route, etap_route, license_route
+from app.routers import psse_route, pscad_route, etap_route, license_route, job_route
 from app.version import __version__, API_VERSION
+from app.services.psse_worker_service.psse_worker_pool import shutdown_psse_pool
+from app.services.metrics_service.metrics import REGISTRY, MetricsMiddleware
+from app.services.warmup_service.warmup import start_warmup, warmup_report
 import uvicorn
 
 app = FastAPI(title="INS Automation Platform Backend", version=__version__)
@@ -14,11 +18,22 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(psse_route.router, prefix="/api/psse", tags=["psse"])
 app.include_router(pscad_route.router, prefix="/api/pscad", tags=["pscad"])
 app.include_router(etap_route.router, prefix="/api/etap", tags=["etap"])
 app.include_router(license_route.router, prefix="/api/license", tags=["license"])
+app.include_router(job_route.router, prefix="/api/jobs", tags=["jobs"])
+
+@app.on_event("startup")
+def warm_up_services():
+    # Runs in the background: the port binds without waiting for the imports
+    start_warmup()
+
+@app.on_event("shutdown")
+def stop_psse_workers():
+    shutdown_psse_pool()
 
 @app.get("/")
 async def root():
@@ -32,5 +47,15 @@ async def get_version():
         "api_version": API_VERSION
     }
 
+@app.get("/api/warmup")
+async def get_warmup():
+    """Warm-up progress and per-module import times"""
+    return warmup_report()
+
+@app.get("/api/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Request latency and service stage timings in Prometheus text format"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
@@ -1,30 +1,51 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
 import os
+from typing import Literal
 from app.schemas.etap_schema import EtapSldRequest
+from app.schemas.job_schema import JobSubmitResponse
+from app.services.job_service.job_manager import job_manager
+from app.services.job_service.coalescing import coalescer, request_key
 
 router = APIRouter()
 
-@router.post("/create-bess-sld")
-async def create_bess_sld(request: EtapSldRequest):
+def _load_service_class(sld_type: str):
+    """Import the SLD service on first use (pandas/openpyxl are slow to import)"""
+    if sld_type == "bess":
+        from app.services.build_model_etap_services.etap_bess_sld_service import EtapBessSldService
+        return EtapBessSldService
+    if sld_type == "pv":
+        from app.services.build_model_etap_services.etap_pv_sld_service import EtapPvSldService
+        return EtapPvSldService
+    if sld_type == "wt":
+        from app.services.build_model_etap_services.etap_wt_sld_service import EtapWtSldService
+        return EtapWtSldService
+    raise ValueError(f"Unknown SLD type: {sld_type}")
+
+def _validate_sld_request(request: EtapSldRequest):
     if not os.path.exists(request.cls_file_path):
         raise HTTPException(status_code=400, detail=f"CLS file not found: {request.cls_file_path}")
     if not os.path.exists(request.pcs_file_path):
         raise HTTPException(status_code=400, detail=f"PCS file not found: {request.pcs_file_path}")
-    
+
+def _sld_key(sld_type: str, request: EtapSldRequest):
+    return request_key(f"etap.create-{sld_type}-sld", request, [request.cls_file_path, request.pcs_file_path])
+
+def _run_generate_sld(sld_type: str, request: EtapSldRequest, job=None):
     try:
-        from app.services.build_model_etap_services.etap_bess_sld_service import EtapBessSldService
-        service = EtapBessSldService(
+        service_cls = _load_service_class(sld_type)
+        service = service_cls(
             cls_file_path=request.cls_file_path,
             pcs_file_path=request.pcs_file_path,
             mpt_type=request.mpt_type
         )
-        
+
         results = service.generate_sld(
             create_sld_elements=request.create_sld_elements,
             create_poi_to_mpt=request.create_poi_to_mpt_elements,
             connect_elements=request.connect_elements
         )
-        
+
         failures = [k for k, v in results.items() if not v.get("success")]
         if failures:
              return {
@@ -32,7 +53,7 @@ async def create_bess_sld(request: EtapSldRequest):
                  "message": "Some steps failed.",
                  "details": results
              }
-        
+
         return {
             "status": "success",
             "message": "SLD generation commands sent to ETAP successfully.",
@@ -41,77 +62,26 @@ async def create_bess_sld(request: EtapSldRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/create-bess-sld")
+async def create_bess_sld(request: EtapSldRequest):
+    _validate_sld_request(request)
+    return await run_in_threadpool(coalescer.run, _sld_key("bess", request), _run_generate_sld, "bess", request)
+
 @router.post("/create-pv-sld")
 async def create_pv_sld(request: EtapSldRequest):
-    if not os.path.exists(request.cls_file_path):
-        raise HTTPException(status_code=400, detail=f"CLS file not found: {request.cls_file_path}")
-    if not os.path.exists(request.pcs_file_path):
-        raise HTTPException(status_code=400, detail=f"PCS file not found: {request.pcs_file_path}")
-    
-    try:
-        from app.services.build_model_etap_services.etap_pv_sld_service import EtapPvSldService
-        service = EtapPvSldService(
-            cls_file_path=request.cls_file_path,
-            pcs_file_path=request.pcs_file_path,
-            mpt_type=request.mpt_type
-        )
-        
-        results = service.generate_sld(
-            create_sld_elements=request.create_sld_elements,
-            create_poi_to_mpt=request.create_poi_to_mpt_elements,
-            connect_elements=request.connect_elements
-        )
-        
-        failures = [k for k, v in results.items() if not v.get("success")]
-        if failures:
-             return {
-                 "status": "partial_success",
-                 "message": "Some steps failed.",
-                 "details": results
-             }
-        
-        return {
-            "status": "success",
-            "message": "SLD generation commands sent to ETAP successfully.",
-            "details": results
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    _validate_sld_request(request)
+    return await run_in_threadpool(coalescer.run, _sld_key("pv", request), _run_generate_sld, "pv", request)
 
 @router.post("/create-wt-sld")
 async def create_wt_sld(request: EtapSldRequest):
-    if not os.path.exists(request.cls_file_path):
-        raise HTTPException(status_code=400, detail=f"CLS file not found: {request.cls_file_path}")
-    if not os.path.exists(request.pcs_file_path):
-        raise HTTPException(status_code=400, detail=f"PCS file not found: {request.pcs_file_path}")
-    
-    try:
-        from app.services.build_model_etap_services.etap_wt_sld_service import EtapWtSldService
-        service = EtapWtSldService(
-            cls_file_path=request.cls_file_path,
-            pcs_file_path=request.pcs_file_path,
-            mpt_type=request.mpt_type
-        )
-        
-        results = service.generate_sld(
-            create_sld_elements=request.create_sld_elements,
-            create_poi_to_mpt=request.create_poi_to_mpt_elements,
-            connect_elements=request.connect_elements
-        )
-        
-        failures = [k for k, v in results.items() if not v.get("success")]
-        if failures:
-             return {
-                 "status": "partial_success",
-                 "message": "Some steps failed.",
-                 "details": results
-             }
-        
-        return {
-            "status": "success",
-            "message": "SLD generation commands sent to ETAP successfully.",
-            "details": results
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    _validate_sld_request(request)
+    return await run_in_threadpool(coalescer.run, _sld_key("wt", request), _run_generate_sld, "wt", request)
+
+# --- Background job endpoints (poll /api/jobs/{job_id}) ---
+
+@router.post("/jobs/create-{sld_type}-sld", response_model=JobSubmitResponse)
+async def submit_create_sld(sld_type: Literal["bess", "pv", "wt"], request: EtapSldRequest):
+    _validate_sld_request(request)
+    job = job_manager.submit(f"etap.create-{sld_type}-sld", lambda job: _run_generate_sld(sld_type, request, job), request.dict(),
+                             dedupe_key=_sld_key(sld_type, request))
+    return job.summary()
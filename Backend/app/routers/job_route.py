@@ -0,0 +1,95 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+import asyncio
+import json
+from typing import List
+from app.schemas.job_schema import JobStatusResponse, JobEventsResponse
+from app.services.job_service.job_manager import job_manager, SUCCEEDED, FAILED, CANCELLED
+
+router = APIRouter()
+
+# How often the SSE stream polls the job ring buffer
+STREAM_POLL_INTERVAL = 0.25
+
+def _get_job_or_404(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job
+
+def _format_sse(event: dict) -> str:
+    return f"id: {event['seq']}\nevent: {event['type']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+
+@router.get("", response_model=List[JobStatusResponse])
+async def list_jobs():
+    return [job.summary() for job in job_manager.list()]
+
+@router.get("/{job_id}", response_model=JobStatusResponse)
+async def get_job(job_id: str):
+    return _get_job_or_404(job_id).summary()
+
+@router.get("/{job_id}/result")
+async def get_job_result(job_id: str):
+    """
+    Result of a finished job. Returns 409 while the job is still queued or running.
+    A cancelled job returns its partial result.
+    """
+    job = _get_job_or_404(job_id)
+    if job.status == CANCELLED:
+        return {"cancelled": True, "error": job.error, "partial": job.result}
+    if job.status == FAILED:
+        raise HTTPException(status_code=500, detail=job.error)
+    if job.status != SUCCEEDED:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is {job.status}")
+    return job.result
+
+@router.post("/{job_id}/cancel", response_model=JobStatusResponse)
+async def cancel_job(job_id: str):
+    """
+    Ask a job to stop. Solver loops check between solves, so a running job
+    releases its PSSE/PSCAD worker within one iteration and keeps partial results.
+    """
+    _get_job_or_404(job_id)
+    return job_manager.cancel(job_id).summary()
+
+@router.get("/{job_id}/logs", response_model=JobEventsResponse)
+async def get_job_logs(job_id: str, since: int = 0):
+    """
+    Buffered events after sequence number `since` (polling alternative to /events).
+    """
+    job = _get_job_or_404(job_id)
+    events, dropped, _ = job.events_since(since)
+    return {"job_id": job.id, "status": job.status, "dropped": dropped, "events": events}
+
+@router.get("/{job_id}/events")
+async def stream_job_events(job_id: str, request: Request, since: int = 0):
+    """
+    Server-Sent Events stream of job logs, per-iteration numbers and status changes.
+    Replays the buffered tail first; reconnecting clients resume from Last-Event-ID.
+    """
+    job = _get_job_or_404(job_id)
+    last_event_id = request.headers.get("last-event-id", "")
+    if last_event_id.isdigit():
+        since = max(since, int(last_event_id))
+
+    async def event_stream():
+        seq = since
+        while True:
+            events, dropped, done = job.events_since(seq)
+            if dropped:
+                yield _format_sse({"seq": seq, "type": "gap", "data": "Older events were dropped from the buffer"})
+            for event in events:
+                yield _format_sse(event)
+                seq = event["seq"]
+            if done:
+                yield _format_sse({"seq": seq, "type": "end", "data": job.summary()})
+                break
+            if await request.is_disconnected():
+                break
+            await asyncio.sleep(STREAM_POLL_INTERVAL)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,20 +1,28 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
 import os
 import traceback
 from app.schemas.pscad_schema import BuildPSCADModelRequest, PSCADCreateCaseRequest
+from app.schemas.job_schema import JobSubmitResponse
+from app.services.job_service.job_manager import job_manager
+from app.services.job_service.coalescing import coalescer, request_key
+from app.services.job_service.cancellation import JobCancelled
 
 router = APIRouter()
 
-@router.post("/build-equivalent-model")
-async def build_equivalent_model(request: BuildPSCADModelRequest):
+def _validate_build_request(request: BuildPSCADModelRequest):
     if not os.path.exists(request.file_path):
         raise HTTPException(status_code=400, detail=f"File not found: {request.file_path}")
-    
+
+def _case_source(request: PSCADCreateCaseRequest):
+    return os.path.join(request.project_path, request.original_filename)
+
+def _run_build_equivalent(request: BuildPSCADModelRequest, job=None):
     try:
         from app.services.pscad_build_service import PscadBuildService
         service = PscadBuildService()
-        result = service.build_equivalent_model(request.file_path)
-        
+        result = service.build_equivalent_model(request.file_path, force_rebuild=request.force_rebuild)
+
         if not result["success"]:
             error_detail = {
                 "error": result["message"],
@@ -22,11 +30,15 @@ async def build_equivalent_model(request: BuildPSCADModelRequest):
                 "file_path": request.file_path
             }
             raise HTTPException(status_code=500, detail=error_detail)
-             
+
         return result
-        
+
     except HTTPException:
         raise
+    except JobCancelled as e:
+        if job:
+            raise
+        raise HTTPException(status_code=409, detail={"error": str(e), "partial": e.partial})
     except Exception as e:
         error_detail = {
             "error": str(e),
@@ -35,19 +47,43 @@ async def build_equivalent_model(request: BuildPSCADModelRequest):
         }
         raise HTTPException(status_code=500, detail=error_detail)
 
-
-@router.post("/create-cases")
-async def create_pscad_cases(request: PSCADCreateCaseRequest):
-    """
-    Setup automation for multiple PSCAD cases (Copy & Parameter Update).
-    """
+def _run_create_cases(request: PSCADCreateCaseRequest, job=None):
     try:
         from app.services.pscad_setup_case_service import PSCADCreateCaseService
         service = PSCADCreateCaseService()
         results = service.create_cases(request.project_path, request.original_filename, request.cases)
         return {"message": "Batch creation completed", "results": results}
-        
+
     except Exception as e:
-        import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/build-equivalent-model")
+async def build_equivalent_model(request: BuildPSCADModelRequest):
+    _validate_build_request(request)
+    key = request_key("pscad.build-equivalent-model", request, [request.file_path])
+    return await run_in_threadpool(coalescer.run, key, _run_build_equivalent, request)
+
+
+@router.post("/create-cases")
+async def create_pscad_cases(request: PSCADCreateCaseRequest):
+    """
+    Setup automation for multiple PSCAD cases (Copy & Parameter Update).
+    """
+    key = request_key("pscad.create-cases", request, [_case_source(request)])
+    return await run_in_threadpool(coalescer.run, key, _run_create_cases, request)
+
+# --- Background job endpoints (poll /api/jobs/{job_id}) ---
+
+@router.post("/jobs/build-equivalent-model", response_model=JobSubmitResponse)
+async def submit_build_equivalent_model(request: BuildPSCADModelRequest):
+    _validate_build_request(request)
+    job = job_manager.submit("pscad.build-equivalent-model", lambda job: _run_build_equivalent(request, job), request.dict(),
+                             dedupe_key=request_key("pscad.build-equivalent-model", request, [request.file_path]))
+    return job.summary()
+
+@router.post("/jobs/create-cases", response_model=JobSubmitResponse)
+async def submit_create_pscad_cases(request: PSCADCreateCaseRequest):
+    job = job_manager.submit("pscad.create-cases", lambda job: _run_create_cases(request, job), request.dict(),
+                             dedupe_key=request_key("pscad.create-cases", request, [_case_source(request)]))
+    return job.summary()
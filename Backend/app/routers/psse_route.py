@@ -1,21 +1,87 @@
 from fastapi import APIRouter, HTTPException
+from pydantic import ValidationError
+from fastapi.concurrency import run_in_threadpool
 import os
 import traceback
 from typing import Literal
-from app.schemas.psse_schema import BuildModelRequest, TuningRequest, ReactiveCheckConfig, RunCheckResponse, BasicModelRequest
+from app.schemas.psse_schema import (
+    BuildModelRequest, TuningRequest, ReactiveCheckConfig, RunCheckResponse, BasicModelRequest,
+    BatchTuningRequest, BatchReactiveCheckRequest, BatchResponse, CapabilitySweepRequest
+)
+from app.schemas.job_schema import JobSubmitResponse
+from app.services.job_service.job_manager import job_manager
+from app.services.job_service.coalescing import coalescer, request_key
+from app.services.job_service.cancellation import CancellationToken, JobCancelled
+from app.services.psse_worker_service.psse_worker_pool import get_psse_pool
 
 router = APIRouter()
 
-@router.post("/build-equivalent-model")
-async def build_model(request: BuildModelRequest):
+# --- Validation ---
+
+def _validate_build_request(request: BuildModelRequest):
     if not os.path.exists(request.file_path):
         raise HTTPException(status_code=400, detail=f"File not found: {request.file_path}")
-    
+
+def _validate_tuning_request(request: TuningRequest):
+    if not os.path.exists(request.sav_path):
+        raise HTTPException(status_code=400, detail=f"SAV file not found: {request.sav_path}")
+
+    if len(request.gen_buses) != len(request.gen_ids):
+        raise HTTPException(status_code=400, detail="gen_buses and gen_ids must have the same length")
+
+    if len(request.gen_buses) != len(request.reg_bus):
+        raise HTTPException(status_code=400, detail="gen_buses and reg_bus must have the same length")
+
+def _sweep_points(request: CapabilitySweepRequest):
+    """Validated P set-points of a sweep request"""
+    from app.services.tuning_psse_service import MAX_SWEEP_POINTS
+    if request.p_points:
+        points = list(request.p_points)
+    elif request.p_start is not None and request.p_stop is not None:
+        if request.p_steps < 2:
+            raise HTTPException(status_code=400, detail="p_steps must be at least 2")
+        step = (request.p_stop - request.p_start) / (request.p_steps - 1)
+        points = [request.p_start + i * step for i in range(request.p_steps)]
+    else:
+        raise HTTPException(status_code=400, detail="Give p_points or p_start and p_stop")
+    total = len(points) * (len(request.q_targets) if request.q_targets else 2)
+    if total > MAX_SWEEP_POINTS:
+        raise HTTPException(status_code=400, detail=f"Sweep has {total} points; the limit is {MAX_SWEEP_POINTS}")
+    if not request.v_low < request.v_high:
+        raise HTTPException(status_code=400, detail="v_low must be below v_high")
+    return points
+
+def _expand_batch(model, path_field: str, sav_paths, shared, overrides):
+    """Per-file requests built from the shared parameters plus per-file overrides"""
+    if not sav_paths:
+        raise HTTPException(status_code=400, detail="sav_paths must not be empty")
+    if len(set(sav_paths)) != len(sav_paths):
+        raise HTTPException(status_code=400, detail="sav_paths must not contain duplicates")
+    requests = []
+    for path in sav_paths:
+        try:
+            requests.append(model(**{**shared, **overrides.get(path, {}), path_field: path}))
+        except ValidationError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid parameters for {path}: {e}")
+    return requests
+
+def _cancel_token_for(job, stage_timeouts):
+    token = job.cancel_token if job else CancellationToken()
+    token.set_budgets(stage_timeouts)
+    return token
+
+def _cancelled_error(e: JobCancelled):
+    """Synchronous callers get the partial result in a 409"""
+    return HTTPException(status_code=409, detail={"error": str(e), "partial": e.partial})
+
+# --- Blocking work (runs on the threadpool or as a background job) ---
+
+def _run_build_equivalent(request: BuildModelRequest, job=None):
     try:
         from app.services.psse_build_service import PsseBuildService
         service = PsseBuildService()
-        result = service.build_equivalent_model(request.file_path)
-        
+        result = service.build_equivalent_model(request.file_path, force_rebuild=request.force_rebuild)
+
         if not result["success"]:
             error_detail = {
                 "error": result["message"],
@@ -26,17 +92,22 @@ async def build_model(request: BuildModelRequest):
 
         # Determine output folder (assumed to be same as input file dir for now)
         output_folder = os.path.dirname(request.file_path)
-        
+
         return {
             "message": result["message"],
             "file_path": request.file_path,
             "output_folder": output_folder,
             "sld_file": os.path.join(output_folder, "project.sld"),
-            "sav_file": os.path.join(output_folder, "project.sav")
+            "sav_file": os.path.join(output_folder, "project.sav"),
+            "cached": result.get("cached", False)
         }
-        
+
     except HTTPException:
         raise
+    except JobCancelled as e:
+        if job:
+            raise
+        raise _cancelled_error(e)
     except Exception as e:
         error_detail = {
             "error": str(e),
@@ -45,17 +116,12 @@ async def build_model(request: BuildModelRequest):
         }
         raise HTTPException(status_code=500, detail=error_detail)
 
-
-@router.post("/build-detailed-model")
-async def build_detailed_model(request: BuildModelRequest):
-    if not os.path.exists(request.file_path):
-        raise HTTPException(status_code=400, detail=f"File not found: {request.file_path}")
-    
+def _run_build_detailed(request: BuildModelRequest, job=None):
     try:
         from app.services.psse_build_service import PsseBuildService
         service = PsseBuildService()
-        result = service.build_detailed_model(request.file_path)
-        
+        result = service.build_detailed_model(request.file_path, force_rebuild=request.force_rebuild)
+
         if not result["success"]:
             error_detail = {
                 "error": result["message"],
@@ -63,15 +129,20 @@ async def build_detailed_model(request: BuildModelRequest):
                 "file_path": request.file_path
             }
             raise HTTPException(status_code=500, detail=error_detail)
-        
+
         return {
             "message": result["message"],
             "input_file_path": request.file_path,
-            "output_folder": os.path.dirname(request.file_path)
+            "output_folder": os.path.dirname(request.file_path),
+            "cached": result.get("cached", False)
         }
-        
+
     except HTTPException:
         raise
+    except JobCancelled as e:
+        if job:
+            raise
+        raise _cancelled_error(e)
     except Exception as e:
         error_detail = {
             "error": str(e),
@@ -80,95 +151,329 @@ async def build_detailed_model(request: BuildModelRequest):
         }
         raise HTTPException(status_code=500, detail=error_detail)
 
-@router.post("/tune/{mode}")
-async def tune_psse(mode: Literal["P", "Q", "PQ"], request: TuningRequest):
-    """
-    Tune PSSE model for P, Q, or PQ.
-    
-    - **mode**: 'P' for active power, 'Q' for reactive power, 'PQ' for both
-    - **request**: TuningRequest with required parameters
-    """
-    if not os.path.exists(request.sav_path):
-        raise HTTPException(status_code=400, detail=f"SAV file not found: {request.sav_path}")
-    
-    if len(request.gen_buses) != len(request.gen_ids):
-        raise HTTPException(status_code=400, detail="gen_buses and gen_ids must have the same length")
-    
-    if len(request.gen_buses) != len(request.reg_bus):
-        raise HTTPException(status_code=400, detail="gen_buses and reg_bus must have the same length")
-    
+def _tuning_kwargs(mode: str, request: TuningRequest):
+    return dict(
+        sav_path=request.sav_path,
+        log_path=request.log_path,
+        mode=mode,
+        bus_from=request.bus_from,
+        bus_to=request.bus_to,
+        gen_buses=request.gen_buses,
+        gen_ids=request.gen_ids,
+        reg_bus=request.reg_bus,
+        p_target=request.p_target,
+        q_target=request.q_target,
+        warm_start=request.warm_start
+    )
+
+def _run_tuning(mode: str, request: TuningRequest, job=None):
     try:
-        from app.services.tuning_psse_service import PSSETuningService
-        service = PSSETuningService(request.sav_path, request.log_path)
-        result = service.run_tuning(
-            mode=mode,
-            bus_from=request.bus_from,
-            bus_to=request.bus_to,
-            gen_buses=request.gen_buses,
-            gen_ids=request.gen_ids,
-            reg_bus=request.reg_bus,
-            p_target=request.p_target,
-            q_target=request.q_target
+        result = get_psse_pool().run(
+            "app.services.tuning_psse_service:run_tuning_task",
+            kwargs=_tuning_kwargs(mode, request),
+            cancel_token=_cancel_token_for(job, request.stage_timeouts)
         )
-        
+
         if not result["success"]:
             raise HTTPException(status_code=500, detail=result.get("error", "Unknown error"))
-        
+
         return result
-    
+
     except HTTPException:
         raise
+    except JobCancelled as e:
+        if job:
+            raise
+        raise _cancelled_error(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/basic-model")
-async def create_basic_model(request: BasicModelRequest):
-    """
-    Generate Basic Model SAV files (Charge/Discharge etc.)
-    """
-    def log_cb(msg):
-        print(f"[BasicModel] {msg}")
-    
-    from app.services.basic_model_psse_service import BasicModelService
-    service = BasicModelService(log_cb=log_cb)
-    
-    cfg = request.dict()
-    
-    # Check project type
-    if request.project_type == "BESS":
-        success = service.run_bess_alone(cfg)
-    elif request.project_type == "PV":
-        success = service.run_pv_alone(cfg)
-    elif request.project_type == "HYBRID":
-        success = service.run_hybrid(cfg)
-    else:
+def _run_sweep(request: CapabilitySweepRequest, p_points, job=None):
+    try:
+        result = get_psse_pool().run(
+            "app.services.tuning_psse_service:run_sweep_task",
+            kwargs=dict(
+                sav_path=request.sav_path,
+                log_path=request.log_path,
+                bus_from=request.bus_from,
+                bus_to=request.bus_to,
+                gen_buses=request.gen_buses,
+                gen_ids=request.gen_ids,
+                reg_bus=request.reg_bus,
+                p_points=p_points,
+                q_targets=request.q_targets,
+                epsilon=request.tolerance,
+                v_low=request.v_low,
+                v_high=request.v_high
+            ),
+            cancel_token=_cancel_token_for(job, request.stage_timeouts)
+        )
+
+        if not result["success"]:
+            raise HTTPException(status_code=500, detail=result.get("error", "Unknown error"))
+
+        return result
+
+    except HTTPException:
+        raise
+    except JobCancelled as e:
+        if job:
+            raise
+        raise _cancelled_error(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _run_basic_model(request: BasicModelRequest, job=None):
+    if request.project_type not in ("BESS", "PV", "HYBRID"):
         return {"success": False, "message": f"Project type {request.project_type} not supported. Use BESS, PV, or HYBRID."}
-        
+
+    def log_cb(msg):
+        if job:
+            job.log(msg)
+        else:
+            print(f"[BasicModel] {msg}")
+
+    try:
+        cancel_token = _cancel_token_for(job, request.stage_timeouts)
+        if request.project_type == "HYBRID":
+            from app.services import basic_model_psse_service
+            # HYBRID hands the independent branches of its scenario DAG to the worker pool itself
+            success = basic_model_psse_service.run_hybrid_parallel(request.dict(), log_cb, cancel_token)
+        else:
+            success = get_psse_pool().run(
+                "app.services.basic_model_psse_service:run_basic_model_task",
+                args=(request.dict(),),
+                log_cb=log_cb,
+                cancel_token=cancel_token
+            )
+    except JobCancelled as e:
+        if job:
+            raise
+        raise _cancelled_error(e)
+
     if success:
          return {"success": True, "message": "Basic Model generation completed."}
     else:
          return {"success": False, "message": "Failed to generate Basic Model. Check logs."}
 
-@router.post("/check-reactive", response_model=RunCheckResponse)
-async def check_reactive(config: ReactiveCheckConfig):
-    from app.services import check_reactive_psse_service
+def _run_check_reactive(config: ReactiveCheckConfig, job=None):
+    # Background jobs stream their log through the job ring buffer instead of
+    # accumulating it in the response.
     logs = []
     def log_callback(msg: str):
-        logs.append(msg)
-        print(msg) 
+        if job:
+            job.log(msg)
+        else:
+            logs.append(msg)
+            print(msg)
 
     try:
-        cfg_dict = config.dict()
-        check_reactive_psse_service.run_check_logic(cfg_dict, "RUN_ALL", log_callback)
-        
+        from app.services import check_reactive_psse_service
+        # RUN_ALL hands its four scenarios to the worker pool itself
+        result = check_reactive_psse_service.run_check_logic(
+            config.dict(), "RUN_ALL", log_callback,
+            cancel_token=_cancel_token_for(job, config.STAGE_TIMEOUTS)
+        )
+        if isinstance(result, dict) and result.get("success") is False:
+            return RunCheckResponse(
+                status="error",
+                message=result.get("error") or "Check reactive sequence failed. Check logs.",
+                log=logs
+            )
+
         return RunCheckResponse(
             status="success",
             message="Completed check reactive sequence.",
             log=logs
         )
+    except JobCancelled as e:
+        if job:
+            raise
+        return RunCheckResponse(
+            status="cancelled",
+            message=str(e),
+            log=logs
+        )
     except Exception as e:
         return RunCheckResponse(
             status="error",
             message=str(e),
             log=logs
-        )
\ No newline at end of file
+        )
+
+def _run_batch_tuning(mode: str, requests, batch: BatchTuningRequest, job=None):
+    from app.services import batch_psse_service
+    items = [(r.sav_path, (), _tuning_kwargs(mode, r), r.stage_timeouts) for r in requests]
+    try:
+        outcomes = batch_psse_service.run_batch(
+            "app.services.tuning_psse_service:run_tuning_task", items,
+            cancel_token=_cancel_token_for(job, None), max_parallel=batch.max_parallel
+        )
+    except JobCancelled as e:
+        if job:
+            raise
+        raise _cancelled_error(e)
+
+    if batch.excel_path:
+        batch_psse_service.export_tuning_summary(batch.excel_path, mode, outcomes)
+    return {"summary": batch_psse_service.summarize(outcomes), "items": outcomes, "excel_path": batch.excel_path}
+
+def _run_batch_check_reactive(configs, batch: BatchReactiveCheckRequest, job=None):
+    from app.services import batch_psse_service
+    items = []
+    for cfg in configs:
+        cfg_dict = cfg.dict()
+        # Reports of files sharing a folder must not overwrite each other
+        if not cfg_dict.get("REPORT_PATH"):
+            cfg_dict["REPORT_PATH"] = os.path.splitext(cfg.SAV_PATH)[0] + "_Reactive_Report.xlsx"
+        items.append((cfg.SAV_PATH, (cfg_dict, "RUN_ALL"), {}, cfg.STAGE_TIMEOUTS))
+    try:
+        outcomes = batch_psse_service.run_batch(
+            "app.services.check_reactive_psse_service:run_check_task", items,
+            cancel_token=_cancel_token_for(job, None), max_parallel=batch.max_parallel
+        )
+    except JobCancelled as e:
+        if job:
+            raise
+        raise _cancelled_error(e)
+
+    if batch.excel_path or batch.csv_path or batch.parquet_path:
+        batch_psse_service.export_reactive_summary(batch.excel_path, outcomes, batch.csv_path, batch.parquet_path)
+    return {"summary": batch_psse_service.summarize(outcomes), "items": outcomes, "excel_path": batch.excel_path,
+            "csv_path": batch.csv_path, "parquet_path": batch.parquet_path}
+
+# --- Synchronous endpoints ---
+
+@router.post("/build-equivalent-model")
+async def build_model(request: BuildModelRequest):
+    _validate_build_request(request)
+    key = request_key("psse.build-equivalent-model", request, [request.file_path])
+    return await run_in_threadpool(coalescer.run, key, _run_build_equivalent, request)
+
+
+@router.post("/build-detailed-model")
+async def build_detailed_model(request: BuildModelRequest):
+    _validate_build_request(request)
+    key = request_key("psse.build-detailed-model", request, [request.file_path])
+    return await run_in_threadpool(coalescer.run, key, _run_build_detailed, request)
+
+@router.post("/tune/{mode}")
+async def tune_psse(mode: Literal["P", "Q", "PQ", "PQ-coupled"], request: TuningRequest):
+    """
+    Tune PSSE model for P, Q, or PQ.
+
+    - **mode**: 'P' for active power, 'Q' for reactive power, 'PQ' for both in turn,
+      'PQ-coupled' for both at once (2-D Newton/Broyden)
+    - **request**: TuningRequest with required parameters
+    """
+    _validate_tuning_request(request)
+    key = request_key(f"psse.tune.{mode}", request, [request.sav_path])
+    return await run_in_threadpool(coalescer.run, key, _run_tuning, mode, request)
+
+@router.post("/tune-sweep")
+async def tune_sweep_psse(request: CapabilitySweepRequest):
+    """
+    P-Q capability sweep in one PSSE session: Q_max / Q_min at each P set-point,
+    or every (P, Q target) pair, each point starting from the previous one.
+    The SAV is not modified.
+    """
+    _validate_tuning_request(request)
+    p_points = _sweep_points(request)
+    key = request_key("psse.tune-sweep", request, [request.sav_path])
+    return await run_in_threadpool(coalescer.run, key, _run_sweep, request, p_points)
+
+@router.post("/basic-model")
+async def create_basic_model(request: BasicModelRequest):
+    """
+    Generate Basic Model SAV files (Charge/Discharge etc.)
+    """
+    key = request_key("psse.basic-model", request, [request.sav_path])
+    return await run_in_threadpool(coalescer.run, key, _run_basic_model, request)
+
+@router.post("/check-reactive", response_model=RunCheckResponse)
+async def check_reactive(config: ReactiveCheckConfig):
+    key = request_key("psse.check-reactive", config, [config.SAV_PATH])
+    return await run_in_threadpool(coalescer.run, key, _run_check_reactive, config)
+
+@router.post("/batch/tune/{mode}", response_model=BatchResponse)
+async def batch_tune_psse(mode: Literal["P", "Q", "PQ", "PQ-coupled"], request: BatchTuningRequest):
+    """
+    Run the same tuning over many SAV files in parallel on the PSSE workers.
+    `params` holds the TuningRequest fields shared by all files, `overrides` per-file changes.
+    """
+    requests = _expand_batch(TuningRequest, "sav_path", request.sav_paths, request.params, request.overrides)
+    for r in requests:
+        _validate_tuning_request(r)
+    key = request_key(f"psse.batch.tune.{mode}", request, request.sav_paths)
+    return await run_in_threadpool(coalescer.run, key, _run_batch_tuning, mode, requests, request)
+
+@router.post("/batch/check-reactive", response_model=BatchResponse)
+async def batch_check_reactive(request: BatchReactiveCheckRequest):
+    """Run the full reactive capability check over many SAV files in parallel"""
+    configs = _expand_batch(ReactiveCheckConfig, "SAV_PATH", request.sav_paths, request.config, request.overrides)
+    key = request_key("psse.batch.check-reactive", request, request.sav_paths)
+    return await run_in_threadpool(coalescer.run, key, _run_batch_check_reactive, configs, request)
+
+@router.get("/workers")
+async def psse_worker_status():
+    """State of the warm PSSE worker pool"""
+    return get_psse_pool().stats()
+
+# --- Background job endpoints (poll /api/jobs/{job_id}) ---
+
+@router.post("/jobs/build-equivalent-model", response_model=JobSubmitResponse)
+async def submit_build_model(request: BuildModelRequest):
+    _validate_build_request(request)
+    job = job_manager.submit("psse.build-equivalent-model", lambda job: _run_build_equivalent(request, job), request.dict(),
+                             dedupe_key=request_key("psse.build-equivalent-model", request, [request.file_path]))
+    return job.summary()
+
+@router.post("/jobs/build-detailed-model", response_model=JobSubmitResponse)
+async def submit_build_detailed_model(request: BuildModelRequest):
+    _validate_build_request(request)
+    job = job_manager.submit("psse.build-detailed-model", lambda job: _run_build_detailed(request, job), request.dict(),
+                             dedupe_key=request_key("psse.build-detailed-model", request, [request.file_path]))
+    return job.summary()
+
+@router.post("/jobs/tune/{mode}", response_model=JobSubmitResponse)
+async def submit_tune_psse(mode: Literal["P", "Q", "PQ", "PQ-coupled"], request: TuningRequest):
+    _validate_tuning_request(request)
+    job = job_manager.submit(f"psse.tune.{mode}", lambda job: _run_tuning(mode, request, job), request.dict(),
+                             dedupe_key=request_key(f"psse.tune.{mode}", request, [request.sav_path]))
+    return job.summary()
+
+@router.post("/jobs/tune-sweep", response_model=JobSubmitResponse)
+async def submit_tune_sweep_psse(request: CapabilitySweepRequest):
+    _validate_tuning_request(request)
+    p_points = _sweep_points(request)
+    job = job_manager.submit("psse.tune-sweep", lambda job: _run_sweep(request, p_points, job), request.dict(),
+                             dedupe_key=request_key("psse.tune-sweep", request, [request.sav_path]))
+    return job.summary()
+
+@router.post("/jobs/basic-model", response_model=JobSubmitResponse)
+async def submit_basic_model(request: BasicModelRequest):
+    job = job_manager.submit("psse.basic-model", lambda job: _run_basic_model(request, job), request.dict(),
+                             dedupe_key=request_key("psse.basic-model", request, [request.sav_path]))
+    return job.summary()
+
+@router.post("/jobs/check-reactive", response_model=JobSubmitResponse)
+async def submit_check_reactive(config: ReactiveCheckConfig):
+    job = job_manager.submit("psse.check-reactive", lambda job: _run_check_reactive(config, job).dict(), config.dict(),
+                             dedupe_key=request_key("psse.check-reactive", config, [config.SAV_PATH]))
+    return job.summary()
+
+@router.post("/jobs/batch/tune/{mode}", response_model=JobSubmitResponse)
+async def submit_batch_tune_psse(mode: Literal["P", "Q", "PQ", "PQ-coupled"], request: BatchTuningRequest):
+    requests = _expand_batch(TuningRequest, "sav_path", request.sav_paths, request.params, request.overrides)
+    for r in requests:
+        _validate_tuning_request(r)
+    job = job_manager.submit(f"psse.batch.tune.{mode}", lambda job: _run_batch_tuning(mode, requests, request, job), request.dict(),
+                             dedupe_key=request_key(f"psse.batch.tune.{mode}", request, request.sav_paths))
+    return job.summary()
+
+@router.post("/jobs/batch/check-reactive", response_model=JobSubmitResponse)
+async def submit_batch_check_reactive(request: BatchReactiveCheckRequest):
+    configs = _expand_batch(ReactiveCheckConfig, "SAV_PATH", request.sav_paths, request.config, request.overrides)
+    job = job_manager.submit("psse.batch.check-reactive", lambda job: _run_batch_check_reactive(configs, request, job), request.dict(),
+                             dedupe_key=request_key("psse.batch.check-reactive", request, request.sav_paths))
+    return job.summary()
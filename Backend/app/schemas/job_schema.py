@@ -0,0 +1,35 @@
+from pydantic import BaseModel
+from typing import Optional, Any, List
+
+class JobSubmitResponse(BaseModel):
+    job_id: str
+    kind: str
+    status: str
+    # > 0 when identical submissions were attached to this already-running job
+    attached: int = 0
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    kind: str
+    status: str
+    progress: float = 0.0
+    message: str = ""
+    error: Optional[Any] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    last_seq: int = 0
+    cancel_requested: bool = False
+    attached: int = 0
+
+class JobEvent(BaseModel):
+    seq: int
+    time: float
+    type: str
+    data: Any = None
+
+class JobEventsResponse(BaseModel):
+    job_id: str
+    status: str
+    dropped: bool = False
+    events: List[JobEvent]
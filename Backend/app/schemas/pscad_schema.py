@@ -3,6 +3,7 @@ from typing import Optional, List, Dict, Any
 
 class BuildPSCADModelRequest(BaseModel):
     file_path: str
+    force_rebuild: bool = False  # ignore cached outputs for identical inputs
 
 class PSCADComponent(BaseModel):
     id: int
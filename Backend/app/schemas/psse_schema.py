@@ -1,8 +1,9 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 
 class BuildModelRequest(BaseModel):
     file_path: str
+    force_rebuild: bool = False  # ignore cached outputs for identical inputs
 
 class TuningRequest(BaseModel):
     sav_path: str
@@ -14,6 +15,31 @@ class TuningRequest(BaseModel):
     reg_bus: List[int]
     p_target: float
     q_target: float
+    # Wall-clock budgets in seconds per stage ("tune_p", "tune_q", "tune_pq") or "total"
+    stage_timeouts: Optional[Dict[str, float]] = None
+    # Start from the stored solution of an earlier run on the same SAV and generators
+    warm_start: bool = True
+
+class CapabilitySweepRequest(BaseModel):
+    sav_path: str
+    log_path: Optional[str] = None  # CSV of the curve
+    bus_from: int
+    bus_to: int
+    gen_buses: List[int]
+    gen_ids: List[str]
+    reg_bus: List[int]
+    # P set-points at the POI (MW): an explicit list, or p_steps points from p_start to p_stop
+    p_points: Optional[List[float]] = None
+    p_start: Optional[float] = None
+    p_stop: Optional[float] = None
+    p_steps: int = 11
+    # Q targets (Mvar) to reach at every P; omitted finds Q_max / Q_min at v_high / v_low
+    q_targets: Optional[List[float]] = None
+    tolerance: float = 0.001
+    v_low: float = 0.9
+    v_high: float = 1.1
+    # Wall-clock budgets in seconds per stage ("tune_p", "tune_pq") or "total"
+    stage_timeouts: Optional[Dict[str, float]] = None
 
 class MptItem(BaseModel):
     mpt_type: str = "2-WINDING"
@@ -43,6 +69,13 @@ class ReactiveCheckConfig(BaseModel):
     P_NET: float = 0.0
     LOG_PATH: Optional[str] = None
     REPORT_POINTS: List[ReportPointItem]
+    # Excel report path for RUN_ALL (default: Reactive_Report.xlsx next to the SAV)
+    REPORT_PATH: Optional[str] = None
+    # Optional long-table copies of the report (Parquet needs pyarrow)
+    REPORT_CSV_PATH: Optional[str] = None
+    REPORT_PARQUET_PATH: Optional[str] = None
+    # Wall-clock budgets in seconds per scenario ("max_lag", "095_lagging", "max_lead", "095_leading") or "total"
+    STAGE_TIMEOUTS: Optional[Dict[str, float]] = None
 
 class RunCheckResponse(BaseModel):
     status: str
@@ -64,3 +97,37 @@ class BasicModelRequest(BaseModel):
     bess_generators: Optional[GeneratorGroup] = None
     pv_generators: Optional[GeneratorGroup] = None
     log_path: Optional[str] = None
+    stage_timeouts: Optional[Dict[str, float]] = None
+
+class BatchTuningRequest(BaseModel):
+    sav_paths: List[str]
+    # TuningRequest fields shared by every file (everything except sav_path)
+    params: Dict[str, Any] = {}
+    # Per-file overrides of `params`, keyed by SAV path
+    overrides: Dict[str, Dict[str, Any]] = {}
+    # Optional combined summary workbook
+    excel_path: Optional[str] = None
+    # Max files in flight at once (default: number of PSSE workers)
+    max_parallel: Optional[int] = None
+
+class BatchReactiveCheckRequest(BaseModel):
+    sav_paths: List[str]
+    # ReactiveCheckConfig fields shared by every file (everything except SAV_PATH)
+    config: Dict[str, Any] = {}
+    overrides: Dict[str, Dict[str, Any]] = {}
+    excel_path: Optional[str] = None
+    csv_path: Optional[str] = None
+    parquet_path: Optional[str] = None
+    max_parallel: Optional[int] = None
+
+class BatchItemResult(BaseModel):
+    item: str
+    status: str
+    result: Optional[Any] = None
+    error: Optional[Any] = None
+    elapsed: float = 0.0
+
+class BatchResponse(BaseModel):
+    summary: Dict[str, int]
+    items: List[BatchItemResult]
+    excel_path: Optional[str] = None
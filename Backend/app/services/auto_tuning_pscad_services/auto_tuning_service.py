@@ -5,6 +5,7 @@ from langgraph.graph import StateGraph, END
 
 from app.services.auto_tuning_pscad_services.pscad_runner_service import PscadRunnerService
 from app.services.auto_tuning_pscad_services.pscad_result_service import PscadResultService
+from app.services.job_service.cancellation import JobCancelled
 
 # LangChain Imports
 from langchain_google_genai import ChatGoogleGenerativeAI
@@ -121,6 +122,8 @@ class AutoTuningService:
         try:
             self.runner.run_simulation(state['case_name'])
             return {"status": "simulated"}
+        except JobCancelled:
+            raise
         except Exception as e:
             return {"status": "failed", "error": str(e)}
 
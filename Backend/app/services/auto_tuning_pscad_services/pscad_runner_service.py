@@ -2,7 +2,11 @@ import os
 import sys
 import logging
 import time
-from typing import Dict, Any
+import threading
+from typing import Dict, Any, List
+
+from app.services.job_service.cancellation import current_cancel_token
+from app.services.metrics_service.metrics import instrument_rmi
 
 # Ensure we can import from TOOLs
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
@@ -48,25 +52,46 @@ class PscadRunnerService:
         if vers:
             fortran = sorted(vers)[-1]
             settings = {'fortran_version': fortran}
-            self.pscad_app = mhi.pscad.launch(minimize=True, version=version, x64=x64, settings=settings)
+            self.pscad_app = instrument_rmi(mhi.pscad.launch(minimize=True, version=version, x64=x64, settings=settings))
         else:
-            self.pscad_app = mhi.pscad.launch(minimize=True, version=version, x64=x64)
+            self.pscad_app = instrument_rmi(mhi.pscad.launch(minimize=True, version=version, x64=x64))
             
         return self.pscad_app
 
-    def run_simulation(self, project_name: str):
+    def run_simulation(self, project_name: str, cancel_token=None, poll_interval: float = 1.0):
         """
         Runs the specified PSCAD project (Serial Mode).
+        A watchdog stops the run if the cancellation token fires or the
+        "simulation" stage budget runs out; JobCancelled is then raised.
         """
+        cancel_token = cancel_token or current_cancel_token()
         pscad = self._launch_pscad()
         project = pscad.project(project_name)
         
         if not project:
             raise Exception(f"Project '{project_name}' not found loaded in PSCAD.")
             
-        print(f"Starting simulation for {project_name}...")
-        project.run()
-        print(f"Simulation {project_name} finished.")
+        with cancel_token.stage("simulation"):
+            finished = threading.Event()
+
+            def watchdog():
+                while not finished.wait(poll_interval):
+                    if cancel_token.reason() is not None:
+                        self.logger.warning(f"Stopping simulation {project_name}: {cancel_token.reason()}")
+                        try:
+                            project.stop()
+                        except Exception as e:
+                            self.logger.error(f"Failed to stop simulation {project_name}: {e}")
+                        return
+
+            threading.Thread(target=watchdog, name=f"pscad-watchdog-{project_name}", daemon=True).start()
+            print(f"Starting simulation for {project_name}...")
+            try:
+                project.run()
+            finally:
+                finished.set()
+            cancel_token.check()
+            print(f"Simulation {project_name} finished.")
 
     def run_simulation_batch(self, project_names: List[str], set_name: str = "AutoTuningSet"):
         """
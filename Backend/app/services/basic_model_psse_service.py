@@ -1,7 +1,14 @@
 import os
 import math
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional
 from app.services.tuning_psse_service import PSSETuningService
+from app.services.job_service.job_manager import get_current_job
+from app.services.job_service.cancellation import JobCancelled, StageTimeout, current_cancel_token
+from app.services.psse_worker_service import psse_session
+from app.services.psse_worker_service.load_flow import get_load_flow
+from app.services.psse_worker_service.case_snapshot import CaseSnapshot
+from app.services.psse_worker_service.scenario_dag import ScenarioDag, ScenarioStep, ScenarioStepFailed
+from app.services.metrics_service.psspy_profiler import profile_stage
 
 class BasicModelService:
     def __init__(self, log_cb=None):
@@ -9,17 +16,24 @@ class BasicModelService:
         self.psspy = None
         self._i = None
         self._f = None
+        self.saved_files = []
+        self._snapshot = None
 
     def _log(self, msg: str):
         self.log_cb(msg)
 
+    def _solve(self):
+        """Solve before saving; a diverged case is still saved, with a warning in the log"""
+        return get_load_flow(self.psspy, self._log).solve()
+
+    def _save_case(self, path: str):
+        self.psspy.save(path)
+        self.saved_files.append(path)
+        self._log(f"Saved: {path}")
+
     def _init_psse(self):
         try:
-            import psse35
-            import psspy
-            import redirect
-            redirect.psse2py()
-            psspy.psseinit(10000)
+            psspy = psse_session.init_psse()
             self.psspy = psspy
             self._i = psspy.getdefaultint()
             self._f = psspy.getdefaultreal()
@@ -28,6 +42,21 @@ class BasicModelService:
             self._log(f"Error initializing PSSE: {e}")
             return False
 
+    def _capture_base_case(self, sav_path: str):
+        """
+        Load the base case once. Scenario steps start from it (or from a
+        shared prefix) by undoing only the fields changed since, instead of
+        re-reading the SAV.
+        """
+        self._snapshot = CaseSnapshot(self.psspy, sav_path, self._log).capture()
+        self.psspy = self._snapshot.api
+
+    def _release_snapshot(self):
+        if self._snapshot is not None:
+            self._snapshot.close()
+            self.psspy = self._snapshot.psspy
+            self._snapshot = None
+
     def disable_generators(self, buses: List[int], ids: List[str]):
         """Disable generators by setting status to 0"""
         for i, bus in enumerate(buses):
@@ -183,10 +212,9 @@ class BasicModelService:
             set_gen(bus, gid, pmin, pmax, pmin, qmax, qmin)  # Pgen = Pmin
             set_vsched(bus, vsched_charge[bus])  # Use Charge Vsched
         
-        self.psspy.fnsl([1,1,0,0,1,1,0,0])
+        self._solve()
         charge_path = f"{base_name}_BESS_Charge.sav"
-        self.psspy.save(charge_path)
-        self._log(f"Saved: {charge_path}")
+        self._save_case(charge_path)
 
         # ========== Create Discharge File ==========
         self._log("--- Creating _BESS_Discharge.sav ---")
@@ -199,10 +227,9 @@ class BasicModelService:
             set_gen(bus, gid, pmax, pmax, pmin, qmax, qmin)  # Pgen = Pmax
             set_vsched(bus, vsched_discharge[bus])  # Use Discharge Vsched
             
-        self.psspy.fnsl([1,1,0,0,1,1,0,0])
+        self._solve()
         discharge_path = f"{base_name}_BESS_Discharge.sav"
-        self.psspy.save(discharge_path)
-        self._log(f"Saved: {discharge_path}")
+        self._save_case(discharge_path)
 
         return True
 
@@ -328,14 +355,13 @@ class BasicModelService:
             set_gen(bus, gid, pmax, pmax, pmin, qmax, qmin)  # Pgen = Pmax
             set_vsched(bus, vsched_map[bus])
         
-        self.psspy.fnsl([1,1,0,0,1,1,0,0])
+        self._solve()
         pv_path = f"{base_name}_PV.sav"
-        self.psspy.save(pv_path)
-        self._log(f"Saved: {pv_path}")
+        self._save_case(pv_path)
 
         return True
 
-    def run_hybrid(self, cfg: Dict):
+    def run_hybrid(self, cfg: Dict, steps: Optional[List[str]] = None):
         """
         Run HYBRID (PV + BESS) tuning - generates 5 SAV files:
         1. PV + BESS Discharge
@@ -343,6 +369,33 @@ class BasicModelService:
         3. PV Only (BESS disabled)
         4. BESS Discharge Only (PV disabled)
         5. BESS Charge Only (PV disabled)
+
+        The cases are the steps of hybrid_dag(); `steps` runs only some of
+        them (a pool task runs one branch, see run_hybrid_parallel).
+        """
+        dag = self.hybrid_dag(cfg)
+        if dag is None: return False
+        if not self._init_psse(): return False
+        try:
+            self._capture_base_case(cfg['sav_path'])
+            dag.run(self._snapshot, steps, self._log)
+        except ScenarioStepFailed:
+            return False
+        finally:
+            self._release_snapshot()
+
+        if steps is None:
+            self._log("=" * 60)
+            self._log("HYBRID completed - 5 files generated!")
+            self._log("=" * 60)
+        return True
+
+    def hybrid_dag(self, cfg: Dict) -> Optional[ScenarioDag]:
+        """
+        The HYBRID cases as a scenario DAG, or None if cfg lacks generators.
+        Three branches share only the base case: PV + BESS (one tuning, two
+        saved cases), PV Only (BESS disabled) and BESS Only (PV disabled,
+        one tuning, two saved cases).
         """
         sav_path = cfg['sav_path']
         bus_from = cfg['bus_from']
@@ -355,10 +408,10 @@ class BasicModelService:
 
         if not pv_gens:
             self._log("Error: No PV generators provided for HYBRID.")
-            return False
+            return None
         if not bess_gens:
             self._log("Error: No BESS generators provided for HYBRID.")
-            return False
+            return None
 
         pv_buses = pv_gens['buses']
         pv_ids = pv_gens['ids']
@@ -373,8 +426,6 @@ class BasicModelService:
         all_ids = pv_ids + bess_ids
         all_reg_buses = pv_reg_buses + bess_reg_buses
 
-        if not self._init_psse(): return False
-
         def get_p_gen(bus, gid):
             ierr, p = self.psspy.macdat(bus, gid, 'P')
             return p if ierr == 0 else 0.0
@@ -414,288 +465,341 @@ class BasicModelService:
         base_name = os.path.splitext(sav_path)[0]
         tuner = PSSETuningService(sav_path)
 
+        def start_tuning():
+            tuner.psspy = self.psspy
+            tuner._i = self._i
+            tuner._f = self._f
+            tuner.logs = []
+
+        def header(title):
+            self._log("=" * 60)
+            self._log(title)
+            self._log("=" * 60)
+
         # ========================================================================
         # CASE 1 & 2: PV + BESS (Discharge / Charge)
         # ========================================================================
-        self._log("=" * 60)
-        self._log("CASE 1 & 2: PV + BESS Combined")
-        self._log("=" * 60)
-        
-        self.psspy.case(sav_path)
-        tuner.psspy = self.psspy
-        tuner._i = self._i
-        tuner._f = self._f
-        tuner.logs = []
-
-        # --- Tune for DISCHARGE (P = +P_net) ---
-        self._log("--- Tuning for PV + BESS Discharge ---")
-        self._log(f"Target P: {p_net} MW, Q: {q_target} Mvar")
-        
-        ok = tuner.tune_p(bus_from, bus_to, all_buses, all_ids, p_net)
-        if not ok: 
-            self._log("Error tuning P for PV+BESS Discharge.")
-            return False
-        ok = tuner.tune_q(bus_from, bus_to, all_buses, all_reg_buses, q_target)
-        if not ok:
-            self._log("Error tuning Q for PV+BESS Discharge.")
-            return False
-        self._log("--- Re-tuning P for PV + BESS Discharge ---")
-        ok = tuner.tune_p(bus_from, bus_to, all_buses, all_ids, p_net)
-        if not ok:
-            self._log("Error re-tuning P for PV+BESS Discharge.")
-            return False
-
-        # Store discharge values
-        pmax_all = {}
-        vsched_discharge = {}
-        for i, bus in enumerate(all_buses):
-            gid = all_ids[i]
-            pmax_all[(bus, gid)] = get_p_gen(bus, gid)
-            vsched_discharge[bus] = get_vsched(bus)
-            self._log(f"Gen {bus}-{gid}: Pmax = {pmax_all[(bus, gid)]:.4f}, Vsched = {vsched_discharge[bus]:.4f}")
-
-        # --- Tune for CHARGE (P = -P_net), only BESS changes sign ---
-        self._log("--- Tuning for PV + BESS Charge ---")
-        # For charge: PV still at P_net, BESS at -P_net (charging)
-        # Total flow = PV_P - BESS_P (BESS absorbing)
-        # We tune BESS to charge while PV still generates
-        p_charge_bess = -1.0 * p_net
-        self._log(f"Target BESS P: {p_charge_bess} MW")
-
-        ok = tuner.tune_p(bus_from, bus_to, bess_buses, bess_ids, p_charge_bess)
-        if not ok:
-            self._log("Error tuning P for BESS Charge.")
-            return False
-        ok = tuner.tune_q(bus_from, bus_to, all_buses, all_reg_buses, q_target)
-        if not ok:
-            self._log("Error tuning Q for PV+BESS Charge.")
-            return False
-        self._log("--- Re-tuning P for BESS Charge ---")
-        ok = tuner.tune_p(bus_from, bus_to, bess_buses, bess_ids, p_charge_bess)
-        if not ok:
-            self._log("Error re-tuning P for BESS Charge.")
-            return False
-
-        # Store charge values (for BESS Pmin)
-        pmin_bess = {}
-        vsched_charge = {}
-        for i, bus in enumerate(bess_buses):
-            gid = bess_ids[i]
-            pmin_bess[(bus, gid)] = get_p_gen(bus, gid)
-            vsched_charge[bus] = get_vsched(bus)
-            self._log(f"BESS Gen {bus}-{gid}: Pmin = {pmin_bess[(bus, gid)]:.4f}, Vsched = {vsched_charge[bus]:.4f}")
-
-        # Calculate Qmax/Qmin for all generators
-        qmax_all = {}
-        qmin_all = {}
-        for i, bus in enumerate(all_buses):
-            gid = all_ids[i]
-            qmax_all[(bus, gid)] = calc_qmax(bus, gid, pmax_all[(bus, gid)])
-            qmin_all[(bus, gid)] = -qmax_all[(bus, gid)]
-            self._log(f"Gen {bus}-{gid}: Qmax = {qmax_all[(bus, gid)]:.4f}, Qmin = {qmin_all[(bus, gid)]:.4f}")
-
-        # --- Save CASE 1: PV + BESS Discharge ---
-        self._log("--- Creating _HYBRID_PV_BESS_Discharge.sav ---")
-        self.psspy.case(sav_path)
-        # Set PV generators
-        for i, bus in enumerate(pv_buses):
-            gid = pv_ids[i]
-            pmax = pmax_all[(bus, gid)]
-            set_gen(bus, gid, pmax, pmax, 0.0, qmax_all[(bus, gid)], qmin_all[(bus, gid)])
-            set_vsched(bus, vsched_discharge[bus])
-        # Set BESS generators (Discharge: Pgen = Pmax)
-        for i, bus in enumerate(bess_buses):
-            gid = bess_ids[i]
-            pmax = pmax_all[(bus, gid)]
-            pmin = pmin_bess[(bus, gid)]
-            set_gen(bus, gid, pmax, pmax, pmin, qmax_all[(bus, gid)], qmin_all[(bus, gid)])
-            set_vsched(bus, vsched_discharge[bus])
-        
-        self.psspy.fnsl([1,1,0,0,1,1,0,0])
-        self.psspy.save(f"{base_name}_HYBRID_PV_BESS_Discharge.sav")
-        self._log(f"Saved: {base_name}_HYBRID_PV_BESS_Discharge.sav")
-
-        # --- Save CASE 2: PV + BESS Charge ---
-        self._log("--- Creating _HYBRID_PV_BESS_Charge.sav ---")
-        self.psspy.case(sav_path)
-        # Set PV generators (same as discharge)
-        for i, bus in enumerate(pv_buses):
-            gid = pv_ids[i]
-            pmax = pmax_all[(bus, gid)]
-            set_gen(bus, gid, pmax, pmax, 0.0, qmax_all[(bus, gid)], qmin_all[(bus, gid)])
-            set_vsched(bus, vsched_discharge[bus])
-        # Set BESS generators (Charge: Pgen = Pmin)
-        for i, bus in enumerate(bess_buses):
-            gid = bess_ids[i]
-            pmax = pmax_all[(bus, gid)]
-            pmin = pmin_bess[(bus, gid)]
-            set_gen(bus, gid, pmin, pmax, pmin, qmax_all[(bus, gid)], qmin_all[(bus, gid)])
-            set_vsched(bus, vsched_charge[bus])
-        
-        self.psspy.fnsl([1,1,0,0,1,1,0,0])
-        self.psspy.save(f"{base_name}_HYBRID_PV_BESS_Charge.sav")
-        self._log(f"Saved: {base_name}_HYBRID_PV_BESS_Charge.sav")
+        def pv_bess_tuning(_):
+            header("CASE 1 & 2: PV + BESS Combined")
+            start_tuning()
+
+            # --- Tune for DISCHARGE (P = +P_net) ---
+            self._log("--- Tuning for PV + BESS Discharge ---")
+            self._log(f"Target P: {p_net} MW, Q: {q_target} Mvar")
+
+            ok = tuner.tune_p(bus_from, bus_to, all_buses, all_ids, p_net)
+            if not ok:
+                self._log("Error tuning P for PV+BESS Discharge.")
+                return False
+            ok = tuner.tune_q(bus_from, bus_to, all_buses, all_reg_buses, q_target)
+            if not ok:
+                self._log("Error tuning Q for PV+BESS Discharge.")
+                return False
+            self._log("--- Re-tuning P for PV + BESS Discharge ---")
+            ok = tuner.tune_p(bus_from, bus_to, all_buses, all_ids, p_net)
+            if not ok:
+                self._log("Error re-tuning P for PV+BESS Discharge.")
+                return False
+
+            # Store discharge values
+            pmax_all = {}
+            vsched_discharge = {}
+            for i, bus in enumerate(all_buses):
+                gid = all_ids[i]
+                pmax_all[(bus, gid)] = get_p_gen(bus, gid)
+                vsched_discharge[bus] = get_vsched(bus)
+                self._log(f"Gen {bus}-{gid}: Pmax = {pmax_all[(bus, gid)]:.4f}, Vsched = {vsched_discharge[bus]:.4f}")
+
+            # --- Tune for CHARGE (P = -P_net), only BESS changes sign ---
+            self._log("--- Tuning for PV + BESS Charge ---")
+            # For charge: PV still at P_net, BESS at -P_net (charging)
+            # Total flow = PV_P - BESS_P (BESS absorbing)
+            # We tune BESS to charge while PV still generates
+            p_charge_bess = -1.0 * p_net
+            self._log(f"Target BESS P: {p_charge_bess} MW")
+
+            ok = tuner.tune_p(bus_from, bus_to, bess_buses, bess_ids, p_charge_bess)
+            if not ok:
+                self._log("Error tuning P for BESS Charge.")
+                return False
+            ok = tuner.tune_q(bus_from, bus_to, all_buses, all_reg_buses, q_target)
+            if not ok:
+                self._log("Error tuning Q for PV+BESS Charge.")
+                return False
+            self._log("--- Re-tuning P for BESS Charge ---")
+            ok = tuner.tune_p(bus_from, bus_to, bess_buses, bess_ids, p_charge_bess)
+            if not ok:
+                self._log("Error re-tuning P for BESS Charge.")
+                return False
+
+            # Store charge values (for BESS Pmin)
+            pmin_bess = {}
+            vsched_charge = {}
+            for i, bus in enumerate(bess_buses):
+                gid = bess_ids[i]
+                pmin_bess[(bus, gid)] = get_p_gen(bus, gid)
+                vsched_charge[bus] = get_vsched(bus)
+                self._log(f"BESS Gen {bus}-{gid}: Pmin = {pmin_bess[(bus, gid)]:.4f}, Vsched = {vsched_charge[bus]:.4f}")
+
+            # Calculate Qmax/Qmin for all generators
+            qmax_all = {}
+            qmin_all = {}
+            for i, bus in enumerate(all_buses):
+                gid = all_ids[i]
+                qmax_all[(bus, gid)] = calc_qmax(bus, gid, pmax_all[(bus, gid)])
+                qmin_all[(bus, gid)] = -qmax_all[(bus, gid)]
+                self._log(f"Gen {bus}-{gid}: Qmax = {qmax_all[(bus, gid)]:.4f}, Qmin = {qmin_all[(bus, gid)]:.4f}")
+
+            return {"pmax": pmax_all, "pmin": pmin_bess, "qmax": qmax_all, "qmin": qmin_all,
+                    "vsched_discharge": vsched_discharge, "vsched_charge": vsched_charge}
+
+        def pv_bess_case(suffix, charge):
+            def run(inputs):
+                tuned = inputs["pv_bess_tuning"]
+                self._log(f"--- Creating _HYBRID_PV_BESS_{suffix}.sav ---")
+                # Set PV generators (same for discharge and charge)
+                for i, bus in enumerate(pv_buses):
+                    gid = pv_ids[i]
+                    pmax = tuned["pmax"][(bus, gid)]
+                    set_gen(bus, gid, pmax, pmax, 0.0, tuned["qmax"][(bus, gid)], tuned["qmin"][(bus, gid)])
+                    set_vsched(bus, tuned["vsched_discharge"][bus])
+                # Set BESS generators (Discharge: Pgen = Pmax, Charge: Pgen = Pmin)
+                for i, bus in enumerate(bess_buses):
+                    gid = bess_ids[i]
+                    pmax = tuned["pmax"][(bus, gid)]
+                    pmin = tuned["pmin"][(bus, gid)]
+                    set_gen(bus, gid, pmin if charge else pmax, pmax, pmin,
+                            tuned["qmax"][(bus, gid)], tuned["qmin"][(bus, gid)])
+                    set_vsched(bus, tuned["vsched_charge" if charge else "vsched_discharge"][bus])
+
+                self._solve()
+                self._save_case(f"{base_name}_HYBRID_PV_BESS_{suffix}.sav")
+                return True
+            return run
 
         # ========================================================================
         # CASE 3: PV Only (BESS disabled)
         # ========================================================================
-        self._log("=" * 60)
-        self._log("CASE 3: PV Only (BESS Disabled)")
-        self._log("=" * 60)
-        
-        self.psspy.case(sav_path)
-        tuner.psspy = self.psspy
-        tuner.logs = []
-
-        # Disable BESS generators
-        self._log("Disabling BESS generators...")
-        self.disable_generators(bess_buses, bess_ids)
-
-        # Tune PV
-        self._log(f"--- Tuning PV to P_net = {p_net} MW ---")
-        ok = tuner.tune_p(bus_from, bus_to, pv_buses, pv_ids, p_net)
-        if not ok:
-            self._log("Error tuning P for PV Only.")
-            return False
-        ok = tuner.tune_q(bus_from, bus_to, pv_buses, pv_reg_buses, q_target)
-        if not ok:
-            self._log("Error tuning Q for PV Only.")
-            return False
-        self._log("--- Re-tuning P for PV Only ---")
-        ok = tuner.tune_p(bus_from, bus_to, pv_buses, pv_ids, p_net)
-        if not ok:
-            self._log("Error re-tuning P for PV Only.")
-            return False
+        def bess_disabled(_):
+            header("CASE 3: PV Only (BESS Disabled)")
+            self._log("Disabling BESS generators...")
+            self.disable_generators(bess_buses, bess_ids)
+            return True
 
-        # Store PV values
-        pmax_pv = {}
-        vsched_pv = {}
-        for i, bus in enumerate(pv_buses):
-            gid = pv_ids[i]
-            pmax_pv[(bus, gid)] = get_p_gen(bus, gid)
-            vsched_pv[bus] = get_vsched(bus)
-        
-        # Set PV generators
-        for i, bus in enumerate(pv_buses):
-            gid = pv_ids[i]
-            pmax = pmax_pv[(bus, gid)]
-            qmax = calc_qmax(bus, gid, pmax)
-            set_gen(bus, gid, pmax, pmax, 0.0, qmax, -qmax)
-            set_vsched(bus, vsched_pv[bus])
-            self._log(f"PV Gen {bus}-{gid}: Pmax = {pmax:.4f}, Qmax = {qmax:.4f}")
-
-        self.psspy.fnsl([1,1,0,0,1,1,0,0])
-        self.psspy.save(f"{base_name}_HYBRID_PV_Only.sav")
-        self._log(f"Saved: {base_name}_HYBRID_PV_Only.sav")
+        def pv_only(_):
+            start_tuning()
+
+            # Tune PV
+            self._log(f"--- Tuning PV to P_net = {p_net} MW ---")
+            ok = tuner.tune_p(bus_from, bus_to, pv_buses, pv_ids, p_net)
+            if not ok:
+                self._log("Error tuning P for PV Only.")
+                return False
+            ok = tuner.tune_q(bus_from, bus_to, pv_buses, pv_reg_buses, q_target)
+            if not ok:
+                self._log("Error tuning Q for PV Only.")
+                return False
+            self._log("--- Re-tuning P for PV Only ---")
+            ok = tuner.tune_p(bus_from, bus_to, pv_buses, pv_ids, p_net)
+            if not ok:
+                self._log("Error re-tuning P for PV Only.")
+                return False
+
+            # Store PV values
+            pmax_pv = {}
+            vsched_pv = {}
+            for i, bus in enumerate(pv_buses):
+                gid = pv_ids[i]
+                pmax_pv[(bus, gid)] = get_p_gen(bus, gid)
+                vsched_pv[bus] = get_vsched(bus)
+
+            # Set PV generators
+            for i, bus in enumerate(pv_buses):
+                gid = pv_ids[i]
+                pmax = pmax_pv[(bus, gid)]
+                qmax = calc_qmax(bus, gid, pmax)
+                set_gen(bus, gid, pmax, pmax, 0.0, qmax, -qmax)
+                set_vsched(bus, vsched_pv[bus])
+                self._log(f"PV Gen {bus}-{gid}: Pmax = {pmax:.4f}, Qmax = {qmax:.4f}")
+
+            self._solve()
+            self._save_case(f"{base_name}_HYBRID_PV_Only.sav")
+            return True
 
         # ========================================================================
         # CASE 4 & 5: BESS Only (PV disabled) - Discharge / Charge
         # ========================================================================
-        self._log("=" * 60)
-        self._log("CASE 4 & 5: BESS Only (PV Disabled)")
-        self._log("=" * 60)
-        
-        self.psspy.case(sav_path)
-        tuner.psspy = self.psspy
-        tuner.logs = []
-
-        # Disable PV generators
-        self._log("Disabling PV generators...")
-        self.disable_generators(pv_buses, pv_ids)
-
-        # --- Tune BESS Discharge ---
-        self._log(f"--- Tuning BESS Discharge to P_net = {p_net} MW ---")
-        ok = tuner.tune_p(bus_from, bus_to, bess_buses, bess_ids, p_net)
-        if not ok:
-            self._log("Error tuning P for BESS Discharge Only.")
-            return False
-        ok = tuner.tune_q(bus_from, bus_to, bess_buses, bess_reg_buses, q_target)
-        if not ok:
-            self._log("Error tuning Q for BESS Discharge Only.")
-            return False
-        self._log("--- Re-tuning P for BESS Discharge Only ---")
-        ok = tuner.tune_p(bus_from, bus_to, bess_buses, bess_ids, p_net)
-        if not ok:
-            self._log("Error re-tuning P for BESS Discharge Only.")
-            return False
-
-        # Store BESS Discharge values
-        pmax_bess_only = {}
-        vsched_bess_disch = {}
-        for i, bus in enumerate(bess_buses):
-            gid = bess_ids[i]
-            pmax_bess_only[(bus, gid)] = get_p_gen(bus, gid)
-            vsched_bess_disch[bus] = get_vsched(bus)
-            self._log(f"BESS Gen {bus}-{gid}: Pmax = {pmax_bess_only[(bus, gid)]:.4f}")
-
-        # --- Tune BESS Charge ---
-        self._log(f"--- Tuning BESS Charge to P = {-p_net} MW ---")
-        ok = tuner.tune_p(bus_from, bus_to, bess_buses, bess_ids, -p_net)
-        if not ok:
-            self._log("Error tuning P for BESS Charge Only.")
-            return False
-        ok = tuner.tune_q(bus_from, bus_to, bess_buses, bess_reg_buses, q_target)
-        if not ok:
-            self._log("Error tuning Q for BESS Charge Only.")
-            return False
-        self._log("--- Re-tuning P for BESS Charge Only ---")
-        ok = tuner.tune_p(bus_from, bus_to, bess_buses, bess_ids, -p_net)
-        if not ok:
-            self._log("Error re-tuning P for BESS Charge Only.")
-            return False
-
-        # Store BESS Charge values
-        pmin_bess_only = {}
-        vsched_bess_chg = {}
-        for i, bus in enumerate(bess_buses):
-            gid = bess_ids[i]
-            pmin_bess_only[(bus, gid)] = get_p_gen(bus, gid)
-            vsched_bess_chg[bus] = get_vsched(bus)
-            self._log(f"BESS Gen {bus}-{gid}: Pmin = {pmin_bess_only[(bus, gid)]:.4f}")
-
-        # Calculate Qmax/Qmin for BESS only
-        qmax_bess_only = {}
-        for i, bus in enumerate(bess_buses):
-            gid = bess_ids[i]
-            qmax_bess_only[(bus, gid)] = calc_qmax(bus, gid, pmax_bess_only[(bus, gid)])
-            self._log(f"BESS Gen {bus}-{gid}: Qmax = {qmax_bess_only[(bus, gid)]:.4f}")
-
-        # --- Save CASE 4: BESS Discharge Only ---
-        self._log("--- Creating _HYBRID_BESS_Discharge.sav ---")
-        self.psspy.case(sav_path)
-        self.disable_generators(pv_buses, pv_ids)
-        
-        for i, bus in enumerate(bess_buses):
-            gid = bess_ids[i]
-            pmax = pmax_bess_only[(bus, gid)]
-            pmin = pmin_bess_only[(bus, gid)]
-            qmax = qmax_bess_only[(bus, gid)]
-            set_gen(bus, gid, pmax, pmax, pmin, qmax, -qmax)
-            set_vsched(bus, vsched_bess_disch[bus])
-
-        self.psspy.fnsl([1,1,0,0,1,1,0,0])
-        self.psspy.save(f"{base_name}_HYBRID_BESS_Discharge.sav")
-        self._log(f"Saved: {base_name}_HYBRID_BESS_Discharge.sav")
-
-        # --- Save CASE 5: BESS Charge Only ---
-        self._log("--- Creating _HYBRID_BESS_Charge.sav ---")
-        self.psspy.case(sav_path)
-        self.disable_generators(pv_buses, pv_ids)
-        
-        for i, bus in enumerate(bess_buses):
-            gid = bess_ids[i]
-            pmax = pmax_bess_only[(bus, gid)]
-            pmin = pmin_bess_only[(bus, gid)]
-            qmax = qmax_bess_only[(bus, gid)]
-            set_gen(bus, gid, pmin, pmax, pmin, qmax, -qmax)
-            set_vsched(bus, vsched_bess_chg[bus])
-
-        self.psspy.fnsl([1,1,0,0,1,1,0,0])
-        self.psspy.save(f"{base_name}_HYBRID_BESS_Charge.sav")
-        self._log(f"Saved: {base_name}_HYBRID_BESS_Charge.sav")
-
-        self._log("=" * 60)
-        self._log("HYBRID completed - 5 files generated!")
-        self._log("=" * 60)
+        def pv_disabled(_):
+            header("CASE 4 & 5: BESS Only (PV Disabled)")
+            self._log("Disabling PV generators...")
+            self.disable_generators(pv_buses, pv_ids)
+            return True
 
-        return True
+        def bess_only_tuning(_):
+            start_tuning()
+
+            # --- Tune BESS Discharge ---
+            self._log(f"--- Tuning BESS Discharge to P_net = {p_net} MW ---")
+            ok = tuner.tune_p(bus_from, bus_to, bess_buses, bess_ids, p_net)
+            if not ok:
+                self._log("Error tuning P for BESS Discharge Only.")
+                return False
+            ok = tuner.tune_q(bus_from, bus_to, bess_buses, bess_reg_buses, q_target)
+            if not ok:
+                self._log("Error tuning Q for BESS Discharge Only.")
+                return False
+            self._log("--- Re-tuning P for BESS Discharge Only ---")
+            ok = tuner.tune_p(bus_from, bus_to, bess_buses, bess_ids, p_net)
+            if not ok:
+                self._log("Error re-tuning P for BESS Discharge Only.")
+                return False
+
+            # Store BESS Discharge values
+            pmax_bess_only = {}
+            vsched_bess_disch = {}
+            for i, bus in enumerate(bess_buses):
+                gid = bess_ids[i]
+                pmax_bess_only[(bus, gid)] = get_p_gen(bus, gid)
+                vsched_bess_disch[bus] = get_vsched(bus)
+                self._log(f"BESS Gen {bus}-{gid}: Pmax = {pmax_bess_only[(bus, gid)]:.4f}")
+
+            # --- Tune BESS Charge ---
+            self._log(f"--- Tuning BESS Charge to P = {-p_net} MW ---")
+            ok = tuner.tune_p(bus_from, bus_to, bess_buses, bess_ids, -p_net)
+            if not ok:
+                self._log("Error tuning P for BESS Charge Only.")
+                return False
+            ok = tuner.tune_q(bus_from, bus_to, bess_buses, bess_reg_buses, q_target)
+            if not ok:
+                self._log("Error tuning Q for BESS Charge Only.")
+                return False
+            self._log("--- Re-tuning P for BESS Charge Only ---")
+            ok = tuner.tune_p(bus_from, bus_to, bess_buses, bess_ids, -p_net)
+            if not ok:
+                self._log("Error re-tuning P for BESS Charge Only.")
+                return False
+
+            # Store BESS Charge values
+            pmin_bess_only = {}
+            vsched_bess_chg = {}
+            for i, bus in enumerate(bess_buses):
+                gid = bess_ids[i]
+                pmin_bess_only[(bus, gid)] = get_p_gen(bus, gid)
+                vsched_bess_chg[bus] = get_vsched(bus)
+                self._log(f"BESS Gen {bus}-{gid}: Pmin = {pmin_bess_only[(bus, gid)]:.4f}")
+
+            # Calculate Qmax/Qmin for BESS only
+            qmax_bess_only = {}
+            for i, bus in enumerate(bess_buses):
+                gid = bess_ids[i]
+                qmax_bess_only[(bus, gid)] = calc_qmax(bus, gid, pmax_bess_only[(bus, gid)])
+                self._log(f"BESS Gen {bus}-{gid}: Qmax = {qmax_bess_only[(bus, gid)]:.4f}")
+
+            return {"pmax": pmax_bess_only, "pmin": pmin_bess_only, "qmax": qmax_bess_only,
+                    "vsched_discharge": vsched_bess_disch, "vsched_charge": vsched_bess_chg}
+
+        def bess_only_case(suffix, charge):
+            def run(inputs):
+                tuned = inputs["bess_only_tuning"]
+                self._log(f"--- Creating _HYBRID_BESS_{suffix}.sav ---")
+                for i, bus in enumerate(bess_buses):
+                    gid = bess_ids[i]
+                    pmax = tuned["pmax"][(bus, gid)]
+                    pmin = tuned["pmin"][(bus, gid)]
+                    qmax = tuned["qmax"][(bus, gid)]
+                    set_gen(bus, gid, pmin if charge else pmax, pmax, pmin, qmax, -qmax)
+                    set_vsched(bus, tuned["vsched_charge" if charge else "vsched_discharge"][bus])
+
+                self._solve()
+                self._save_case(f"{base_name}_HYBRID_BESS_{suffix}.sav")
+                return True
+            return run
+
+        return ScenarioDag([
+            ScenarioStep("pv_bess_tuning", pv_bess_tuning),
+            ScenarioStep("pv_bess_discharge", pv_bess_case("Discharge", False), needs=["pv_bess_tuning"]),
+            ScenarioStep("pv_bess_charge", pv_bess_case("Charge", True), needs=["pv_bess_tuning"]),
+            ScenarioStep("bess_disabled", bess_disabled),
+            ScenarioStep("pv_only", pv_only, parent="bess_disabled"),
+            ScenarioStep("pv_disabled", pv_disabled),
+            ScenarioStep("bess_only_tuning", bess_only_tuning, parent="pv_disabled"),
+            ScenarioStep("bess_only_discharge", bess_only_case("Discharge", False), parent="pv_disabled",
+                         needs=["bess_only_tuning"]),
+            ScenarioStep("bess_only_charge", bess_only_case("Charge", True), parent="pv_disabled",
+                         needs=["bess_only_tuning"]),
+        ])
+
+
+def run_basic_model_task(cfg: Dict):
+    """Entry point for the PSSE worker pool. Returns True on success."""
+    job = get_current_job()
+    service = BasicModelService(log_cb=job.log if job else None)
+    project_type = cfg.get("project_type")
+    try:
+        with profile_stage(str(project_type).lower()):
+            if project_type == "BESS":
+                return service.run_bess_alone(cfg)
+            if project_type == "PV":
+                return service.run_pv_alone(cfg)
+            if project_type == "HYBRID":
+                return service.run_hybrid(cfg)
+    except JobCancelled as e:
+        e.partial = {"success": False, "cancelled": True, "error": str(e), "saved_files": service.saved_files}
+        raise
+    raise ValueError(f"Project type {project_type} not supported. Use BESS, PV, or HYBRID.")
+
+
+def run_hybrid_branch_task(cfg: Dict, steps: List[str]):
+    """Pool entry point for one branch of the HYBRID scenario DAG"""
+    job = get_current_job()
+    service = BasicModelService(log_cb=job.log if job else None)
+    try:
+        ok = service.run_hybrid(cfg, steps)
+    except JobCancelled as e:
+        e.partial = {"success": False, "cancelled": True, "error": str(e), "saved_files": service.saved_files}
+        raise
+    return {"success": ok, "saved_files": service.saved_files,
+            "error": None if ok else f"HYBRID branch '{steps[0]}' failed, see the log"}
+
+
+def run_hybrid_parallel(cfg: Dict, log_cb: Callable[[str], None], cancel_token=None):
+    """
+    HYBRID with the independent branches of its scenario DAG (PV + BESS,
+    PV Only, BESS Only) as separate PSSE worker tasks, run side by side.
+    A failing branch does not stop the others. Returns True on success.
+    """
+    from app.services import batch_psse_service
+    cancel_token = cancel_token or current_cancel_token()
+    dag = BasicModelService(log_cb).hybrid_dag(cfg)
+    if dag is None:
+        return False
+    items = [(branch[0], (cfg, branch), {}, cancel_token.budgets) for branch in dag.branches()]
+    try:
+        outcomes = batch_psse_service.run_batch(
+            "app.services.basic_model_psse_service:run_hybrid_branch_task", items,
+            log_cb=log_cb, cancel_token=cancel_token
+        )
+    except JobCancelled as e:
+        outcomes = e.partial["items"]
+
+    saved_files, failed, stopped = [], [], []
+    for outcome in outcomes:
+        if isinstance(outcome["result"], dict):
+            saved_files += outcome["result"].get("saved_files") or []
+        if outcome["status"] == "cancelled":
+            stopped.append(f"{outcome['item']}: {outcome['error']}")
+        elif outcome["status"] != "success":
+            failed.append(f"{outcome['item']}: {outcome['error']}")
+    partial = {"success": False, "cancelled": True, "saved_files": saved_files}
+
+    if cancel_token.cancelled:
+        raise JobCancelled("Job cancelled", partial)
+    if stopped:
+        raise StageTimeout("; ".join(stopped), partial)
+    if failed:
+        log_cb(f"Error: {'; '.join(failed)}")
+        return False
+    log_cb("=" * 60)
+    log_cb(f"HYBRID completed - {len(saved_files)} files generated!")
+    log_cb("=" * 60)
+    return True
@@ -0,0 +1,151 @@
+import os
+import time
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import xlsxwriter
+from app.services.job_service.job_manager import get_current_job
+from app.services.job_service.cancellation import CancellationToken, JobCancelled
+from app.services.metrics_service.metrics import timed
+from app.services.psse_worker_service.psse_worker_pool import get_psse_pool
+from app.services.report_service.reactive_report import TableWriter, streaming_workbook
+
+# (label, args, kwargs, stage budgets) for one pool task
+BatchItem = Tuple[str, tuple, dict, Optional[Dict[str, float]]]
+
+
+def run_batch(target: str, items: List[BatchItem], log_cb: Optional[Callable[[str], None]] = None,
+              cancel_token: Optional[CancellationToken] = None, max_parallel: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Run `target` once per item on the PSSE worker pool, as many at a time as
+    there are workers. A failing item does not stop the others; cancelling
+    the token stops all of them; stage budgets apply per item. Returns one
+    outcome per item, in input order.
+    """
+    pool = get_psse_pool()
+    job = get_current_job()
+    cancel_token = cancel_token or getattr(job, "cancel_token", None) or CancellationToken()
+    parallel = max_parallel or max(pool.size, 1)
+    total = len(items)
+    finished = [0]
+
+    def log(msg: str):
+        if log_cb:
+            log_cb(msg)
+        elif job is not None:
+            job.log(msg)
+        else:
+            print(msg)
+
+    def run_one(label: str, args: tuple, kwargs: dict, budgets: Optional[Dict[str, float]]) -> Dict[str, Any]:
+        start = time.perf_counter()
+        outcome = {"item": label, "status": "success", "result": None, "error": None}
+        try:
+            outcome["result"] = pool.run(target, args=args, kwargs=kwargs,
+                                         log_cb=lambda msg: log(f"[{os.path.basename(label)}] {msg}"),
+                                         cancel_token=cancel_token.child(budgets))
+            if isinstance(outcome["result"], dict) and outcome["result"].get("success") is False:
+                outcome["status"] = "failed"
+                outcome["error"] = outcome["result"].get("error")
+        except JobCancelled as e:
+            outcome.update(status="cancelled", error=str(e), result=e.partial)
+        except Exception as e:
+            outcome.update(status="failed", error=str(e))
+        outcome["elapsed"] = round(time.perf_counter() - start, 3)
+
+        finished[0] += 1
+        log(f"[{os.path.basename(label)}] {outcome['status']} in {outcome['elapsed']}s ({finished[0]}/{total})")
+        if job is not None:
+            job.emit("batch_item", {k: outcome[k] for k in ("item", "status", "error", "elapsed")})
+            job.set_progress(finished[0] / total)
+        return outcome
+
+    # Each thread needs its own copy of the context so the pool sees the calling job
+    with ThreadPoolExecutor(max_workers=min(parallel, total) or 1, thread_name_prefix="ins-batch") as executor:
+        futures = [
+            executor.submit(contextvars.copy_context().run, run_one, label, args, kwargs, budgets)
+            for label, args, kwargs, budgets in items
+        ]
+        outcomes = [f.result() for f in futures]
+
+    if cancel_token.cancelled:
+        raise JobCancelled("Batch cancelled", {"items": outcomes})
+    return outcomes
+
+
+def summarize(outcomes: List[Dict[str, Any]]) -> Dict[str, int]:
+    counts = {"total": len(outcomes), "success": 0, "failed": 0, "cancelled": 0}
+    for o in outcomes:
+        counts[o["status"]] += 1
+    return counts
+
+
+@timed("excel.write")
+def export_tuning_summary(path: str, mode: str, outcomes: List[Dict[str, Any]]):
+    """One row per SAV file with the final tuning state"""
+    workbook = xlsxwriter.Workbook(path)
+    header_fmt = workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'bg_color': '#FFD700'})
+    cell_fmt = workbook.add_format({'border': 1})
+    num_fmt = workbook.add_format({'border': 1, 'num_format': '0.0000'})
+
+    ws = workbook.add_worksheet(f"Tuning {mode}")
+    headers = ["SAV", "Status", "K factor", "P POI (MW)", "P error", "VSched", "Q POI (Mvar)", "Q error", "Time (s)", "Error"]
+    keys = ["k_factor", "p_poi", "p_error", "vsched", "q_poi", "q_error"]
+    for c, h in enumerate(headers):
+        ws.write(0, c, h, header_fmt)
+    for r, o in enumerate(outcomes, start=1):
+        result = o["result"] if isinstance(o["result"], dict) else {}
+        state = result.get("final_state") or result.get("last_state") or {}
+        ws.write(r, 0, o["item"], cell_fmt)
+        ws.write(r, 1, o["status"], cell_fmt)
+        for c, key in enumerate(keys, start=2):
+            if key in state:
+                ws.write_number(r, c, state[key], num_fmt)
+            else:
+                ws.write_blank(r, c, None, cell_fmt)
+        ws.write_number(r, 8, o.get("elapsed", 0.0), num_fmt)
+        ws.write(r, 9, o["error"] or "", cell_fmt)
+    ws.set_column(0, 0, 60)
+    ws.set_column(9, 9, 60)
+    workbook.close()
+
+
+# Columns of the batch reactive summary (CSV / Parquet use the keys, the sheet the titles)
+REACTIVE_SUMMARY_FIELDS = ["sav", "status", "scenario", "bess_id", "name", "S", "P", "Q", "pf"]
+REACTIVE_SUMMARY_HEADERS = ["SAV", "Status", "Scenario", "BESS", "Point", "S (MVA)", "P (MW)", "Q (Mvar)", "pf"]
+
+
+@timed("excel.write")
+def export_reactive_summary(path: Optional[str], outcomes: List[Dict[str, Any]],
+                            csv_path: Optional[str] = None, parquet_path: Optional[str] = None):
+    """
+    Report-point measurements of every SAV file and scenario in one long
+    table, streamed row by row to the workbook and any CSV / Parquet copy.
+    """
+    workbook = streaming_workbook(path) if path else None
+    ws = formats = None
+    if workbook is not None:
+        formats = {
+            "header": workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'bg_color': '#FFD700'}),
+            "cell": workbook.add_format({'border': 1}),
+            "num": workbook.add_format({'border': 1, 'num_format': '0.0000'}),
+        }
+        ws = workbook.add_worksheet("Reactive Summary")
+        ws.set_column(0, 0, 60)
+    table = TableWriter(REACTIVE_SUMMARY_FIELDS, numeric=("S", "P", "Q", "pf"), csv_path=csv_path,
+                        parquet_path=parquet_path, worksheet=ws, formats=formats, headers=REACTIVE_SUMMARY_HEADERS)
+    try:
+        for o in outcomes:
+            result = o["result"] if isinstance(o["result"], dict) else {}
+            measurements = result.get("measurements") or {}
+            if not measurements:
+                table.append([o["item"], o["status"], o["error"] or ""] + [None] * 6)
+                continue
+            for scenario, points in measurements.items():
+                for p in points:
+                    table.append([o["item"], o["status"], scenario, p["bess_id"], p["name"],
+                                  p["S"], p["P"], p["Q"], p["pf"]])
+    finally:
+        table.close()
+        if workbook is not None:
+            workbook.close()
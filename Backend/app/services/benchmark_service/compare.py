@@ -0,0 +1,117 @@
+import json
+from typing import Any, Dict, List, Optional
+
+# Counts are deterministic on the fake backend, so any growth beyond the
+# threshold is real. Wall time is noisy: per-run changes are only listed
+# under "timing", and only the suite total (with a looser threshold) can regress.
+COUNT_METRICS = ("fnsl", "psspy_calls")
+WALL_THRESHOLD_FACTOR = 2.5
+# Per-run wall time changes smaller than this (seconds) are not listed at all
+WALL_FLOOR_SECONDS = 0.005
+# Final errors below this are all "converged"; differences there are noise
+ERROR_FLOOR = 1e-6
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    from app.services.benchmark_service.suite import RESULTS_VERSION
+    if data.get("version") != RESULTS_VERSION:
+        raise ValueError(f"{path}: unsupported results version {data.get('version')!r}")
+    return data
+
+
+def _ratio(old: Optional[float], new: Optional[float]) -> Optional[float]:
+    if old is None or new is None:
+        return None
+    if old == 0:
+        return 1.0 if new == 0 else float("inf")
+    return new / old
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.1) -> Dict[str, Any]:
+    """
+    Match results by (case, algorithm) and classify each change. A metric
+    regresses when it grows by more than `threshold`; a run that stops
+    succeeding or converging always regresses.
+    """
+    old_rows = {(r["case"], r["algorithm"]): r for r in baseline["results"]}
+    new_rows = {(r["case"], r["algorithm"]): r for r in current["results"]}
+    rows, regressions, improvements, timing = [], [], [], []
+
+    for key in sorted(set(old_rows) | set(new_rows)):
+        old, new = old_rows.get(key), new_rows.get(key)
+        row = {"case": key[0], "algorithm": key[1]}
+        if old is None or new is None:
+            row["status"] = "added" if old is None else "removed"
+            rows.append(row)
+            continue
+
+        if old["ok"] and not new["ok"]:
+            regressions.append(dict(row, metric="ok", detail=new.get("error")))
+        elif new["ok"] and not old["ok"]:
+            improvements.append(dict(row, metric="ok", detail=old.get("error")))
+        if old.get("converged") and new.get("converged") is False:
+            regressions.append(dict(row, metric="converged"))
+        elif new.get("converged") and old.get("converged") is False:
+            improvements.append(dict(row, metric="converged"))
+
+        for metric in COUNT_METRICS + ("wall_seconds",):
+            ratio = _ratio(old.get(metric), new.get(metric))
+            row[metric] = {"baseline": old.get(metric), "current": new.get(metric), "ratio": ratio}
+            if ratio is None or not (old["ok"] and new["ok"]):
+                continue
+            change = dict(row, metric=metric, baseline=old.get(metric), current=new.get(metric), ratio=ratio)
+            if metric == "wall_seconds":
+                if abs(new[metric] - old[metric]) >= WALL_FLOOR_SECONDS and abs(ratio - 1) > threshold:
+                    timing.append(change)
+            elif ratio > 1 + threshold:
+                regressions.append(change)
+            elif ratio < 1 - threshold:
+                improvements.append(change)
+
+        old_err, new_err = old.get("final_error"), new.get("final_error")
+        row["final_error"] = {"baseline": old_err, "current": new_err}
+        if old_err is not None and new_err is not None and max(old_err, new_err) > ERROR_FLOOR:
+            change = dict(row, metric="final_error", baseline=old_err, current=new_err)
+            if new_err > max(old_err * (1 + threshold), ERROR_FLOOR):
+                regressions.append(change)
+            elif new_err < old_err * (1 - threshold) and old_err > ERROR_FLOOR:
+                improvements.append(change)
+        rows.append(row)
+
+    def total(data, metric):
+        return sum(r.get(metric) or 0 for r in data["results"] if (r["case"], r["algorithm"]) in old_rows
+                   and (r["case"], r["algorithm"]) in new_rows)
+
+    totals = {metric: {"baseline": total(baseline, metric), "current": total(current, metric),
+                       "ratio": _ratio(total(baseline, metric), total(current, metric))}
+              for metric in COUNT_METRICS + ("wall_seconds",)}
+    wall = totals["wall_seconds"]
+    if wall["ratio"] is not None and wall["ratio"] > 1 + threshold * WALL_THRESHOLD_FACTOR:
+        regressions.append({"case": "(all)", "algorithm": "(all)", "metric": "wall_seconds",
+                            "baseline": wall["baseline"], "current": wall["current"], "ratio": wall["ratio"]})
+    return {"threshold": threshold, "totals": totals, "rows": rows,
+            "regressions": regressions, "improvements": improvements, "timing": timing}
+
+
+def compare_files(baseline_path: str, current_path: str, threshold: float = 0.1) -> Dict[str, Any]:
+    return compare(load_results(baseline_path), load_results(current_path), threshold)
+
+
+def format_comparison(comparison: Dict[str, Any]) -> str:
+    lines: List[str] = ["Totals (matched runs):"]
+    for metric, t in comparison["totals"].items():
+        ratio = t["ratio"]
+        lines.append(f"  {metric:<13} {t['baseline']:>12.4f} -> {t['current']:>12.4f}"
+                     + (f"  ({(ratio - 1) * 100:+.1f}%)" if ratio not in (None, float("inf")) else ""))
+    for title, items in (("Regressions", comparison["regressions"]), ("Improvements", comparison["improvements"]),
+                         ("Timing changes (informational)", comparison["timing"])):
+        lines.append(f"{title}: {len(items)}")
+        for c in items:
+            if "baseline" in c:
+                lines.append(f"  {c['case']:<18} {c['algorithm']:<18} {c['metric']:<12} "
+                             f"{c['baseline']} -> {c['current']}")
+            else:
+                lines.append(f"  {c['case']:<18} {c['algorithm']:<18} {c['metric']:<12} {c.get('detail') or ''}")
+    return "\n".join(lines)
@@ -0,0 +1,260 @@
+import os
+import sys
+import json
+import math
+import time
+import shutil
+import platform
+import tempfile
+import argparse
+import traceback
+from typing import Any, Callable, Dict, List, Optional
+import numpy as np
+from app.services.psse_worker_service import psse_session
+from app.services.psse_worker_service import load_flow
+from app.services.psse_worker_service.fake_network import build_plant_case
+from app.services.metrics_service.psspy_profiler import profile
+
+# Results format version; compare() refuses files it does not understand
+RESULTS_VERSION = 1
+
+# Parametric plant family: generators x MPTs x shunts x MPT type
+PRESETS = {
+    "quick": {"units": [1, 4, 12], "mpts": [1, 2], "shunts": [True, False], "mpt_types": ["2-WINDING"]},
+    "full": {"units": [1, 4, 12, 25, 50], "mpts": [1, 2, 4], "shunts": [True, False],
+             "mpt_types": ["2-WINDING", "3-WINDING"]},
+}
+
+# Targets as fractions of the plant rating
+P_TARGET_FRACTION = 0.9
+Q_TARGET_FRACTION = 0.1
+# Q at the POI within this of the 0.95 pf target counts as met (the checks use 1e-2)
+PF_Q_TOL = 1e-2
+# A generator within this of its Q limit counts as at the limit (the checks use 1e-6)
+Q_LIMIT_TOL = 1e-6
+
+
+def plant_cases(preset: str = "quick") -> List[Dict[str, Any]]:
+    """Case specs for a preset; plants with fewer generators than MPTs are skipped"""
+    grid = PRESETS[preset]
+    cases = []
+    for mpt_type in grid["mpt_types"]:
+        for units in grid["units"]:
+            for mpts in grid["mpts"]:
+                if units < mpts:
+                    continue
+                for shunts in grid["shunts"]:
+                    name = f"u{units}_m{mpts}_{'3w' if mpt_type == '3-WINDING' else '2w'}_{'sh' if shunts else 'nosh'}"
+                    cases.append({"name": name, "units": units, "mpts": mpts, "shunts": shunts, "mpt_type": mpt_type})
+    return cases
+
+
+def _poi_flow(api, meta) -> complex:
+    ierr, flow = api.brnflo(meta["bus_from"], meta["bus_to"], "1")
+    return flow if ierr == 0 and flow is not None else complex("nan")
+
+
+def _q_limit_shortfall(api, meta, limit: str) -> float:
+    """Largest distance of a generator's Q from QMAX / QMIN (0 when all are at the limit)"""
+    worst = 0.0
+    for bus, gid in zip(meta["gen_buses"], meta["gen_ids"]):
+        _, q = api.macdat(bus, gid, "Q")
+        _, q_limit = api.macdat(bus, gid, limit)
+        gap = (q_limit - q) if limit == "QMAX" else (q - q_limit)
+        worst = max(worst, gap)
+    return worst
+
+
+def _tuning(mode: str):
+    def run(api, meta, cfg, path, log_cb, warm_start):
+        from app.services.tuning_psse_service import PSSETuningService
+        p_target, q_target = cfg["P_TARGET"], cfg["Q_TARGET"]
+        result = PSSETuningService(path, log_cb=log_cb, warm_start=warm_start).run_tuning(
+            mode, meta["bus_from"], meta["bus_to"], meta["gen_buses"], meta["gen_ids"], meta["reg_bus"],
+            p_target, q_target)
+        if not result.get("success"):
+            raise RuntimeError(result.get("error") or "tuning failed")
+        flow = _poi_flow(api, meta)
+        errors = []
+        if mode != "Q":
+            errors.append(abs(flow.real - p_target))
+        if mode != "P":
+            errors.append(abs(flow.imag - q_target))
+        telemetry = result.get("solver") or {}
+        converged = all(t.get("converged", True) for t in telemetry.values()) if telemetry else None
+        return max(errors), converged
+    return run
+
+
+def _tune_vsched(api, meta, cfg, path, log_cb, warm_start):
+    from app.services.check_reactive_psse_service import tune_vsched_for_target_q
+    api.case(path)
+    q_now, _ = tune_vsched_for_target_q(api, log_cb, cfg, cfg["Q_TARGET"])
+    error = abs(_poi_flow(api, meta).imag - cfg["Q_TARGET"])
+    return error, error < 1e-4
+
+
+def _check(name: str):
+    def run(api, meta, cfg, path, log_cb, warm_start):
+        from app.services import check_reactive_psse_service as checks
+        api.case(path)
+        getattr(checks, name)(api, log_cb, cfg, api.getdefaultint(), api.getdefaultreal())
+        if name == "check_max_lag":
+            error = _q_limit_shortfall(api, meta, "QMAX")
+            return error, error < Q_LIMIT_TOL
+        if name == "check_max_lead":
+            error = _q_limit_shortfall(api, meta, "QMIN")
+            return error, error < Q_LIMIT_TOL
+        sign = 1.0 if name == "check_095_lagging" else -1.0
+        q_target = sign * round(cfg["P_NET"], 1) * math.tan(math.acos(0.95))
+        error = abs(_poi_flow(api, meta).imag - q_target)
+        return error, error < PF_Q_TOL
+    return run
+
+
+# name -> fn(api, meta, cfg, sav_path, log_cb, warm_start) -> (final_error, converged)
+ALGORITHMS: Dict[str, Callable] = {
+    "tuning.P": _tuning("P"),
+    "tuning.Q": _tuning("Q"),
+    "tuning.PQ": _tuning("PQ"),
+    "tuning.PQ-coupled": _tuning("PQ-coupled"),
+    "tune_vsched": _tune_vsched,
+    "check_max_lag": _check("check_max_lag"),
+    "check_max_lead": _check("check_max_lead"),
+    "check_095_lagging": _check("check_095_lagging"),
+    "check_095_leading": _check("check_095_leading"),
+}
+
+
+def _check_cfg(meta: Dict[str, Any], path: str) -> Dict[str, Any]:
+    p_rated = meta["p_rated"]
+    return {
+        "SAV_PATH": path, "BUS_FROM": meta["bus_from"], "BUS_TO": meta["bus_to"],
+        "GEN_BUSES": meta["gen_buses"], "GEN_IDS": meta["gen_ids"], "REG_BUS": meta["reg_bus"],
+        "MPT_LIST": meta["mpt_list"], "SHUNT_LIST": meta["shunt_list"], "REPORT_POINTS": meta["report_points"],
+        "P_NET": P_TARGET_FRACTION * p_rated,
+        "P_TARGET": P_TARGET_FRACTION * p_rated, "Q_TARGET": Q_TARGET_FRACTION * p_rated,
+    }
+
+
+def run_case(case: Dict[str, Any], algorithm: str, workdir: str, repeat: int = 1,
+             warm_start: bool = False) -> Dict[str, Any]:
+    """
+    One algorithm on one plant: a fresh case is built for every repeat.
+    Counts come from the last repeat, wall time is the fastest.
+    """
+    api = psse_session.init_psse()
+    record = {"case": case["name"], "algorithm": algorithm, "ok": False, "converged": None,
+              "fnsl": None, "psspy_calls": None, "wall_seconds": None, "final_error": None, "error": None}
+    walls = []
+    for _ in range(max(1, repeat)):
+        path = os.path.join(workdir, f"{case['name']}.sav")
+        meta = build_plant_case(path, units=case["units"], mpts=case["mpts"], shunts=case["shunts"],
+                                mpt_type=case["mpt_type"])
+        cfg = _check_cfg(meta, path)
+        logs: List[str] = []
+        solver = load_flow.get_load_flow(api)
+        solver.reset()
+        mark = solver.mark()
+        start = time.perf_counter()
+        with profile(f"{case['name']}:{algorithm}", enabled=True) as profiler:
+            try:
+                final_error, converged = ALGORITHMS[algorithm](api, meta, cfg, path, logs.append, warm_start)
+                record.update(ok=True, error=None,
+                              final_error=None if final_error is None or math.isnan(final_error) else final_error,
+                              converged=converged)
+            except Exception as e:
+                record.update(ok=False, converged=False, final_error=None,
+                              error=f"{type(e).__name__}: {e}", traceback=traceback.format_exc(limit=3))
+        walls.append(time.perf_counter() - start)
+        summary = profiler.summary(top=1000)
+        by_api = {row["name"]: row["calls"] for row in summary["by_api"]}
+        record["fnsl"] = by_api.get("fnsl", 0) + by_api.get("fdns", 0)
+        record["psspy_calls"] = summary["calls"]
+        record["loadflow"] = solver.summary(mark)
+    record["wall_seconds"] = round(min(walls), 6)
+    return record
+
+
+def run_suite(preset: str = "quick", algorithms: Optional[List[str]] = None, repeat: int = 1,
+              warm_start: bool = False, log_cb: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+    """Every algorithm on every plant of the preset, on the fake psspy backend"""
+    psse_session.use_fake_backend()
+    algorithms = algorithms or list(ALGORITHMS)
+    unknown = [a for a in algorithms if a not in ALGORITHMS]
+    if unknown:
+        raise ValueError(f"Unknown algorithms: {unknown}")
+    cases = plant_cases(preset)
+    results = []
+    workdir = tempfile.mkdtemp(prefix="ins_bench_")
+    started = time.time()
+    try:
+        for case in cases:
+            for algorithm in algorithms:
+                record = run_case(case, algorithm, workdir, repeat=repeat, warm_start=warm_start)
+                results.append(record)
+                if log_cb:
+                    status = "ok" if record["ok"] else f"FAILED ({record['error']})"
+                    log_cb(f"{case['name']:<18} {algorithm:<18} fnsl={record['fnsl']:<4} "
+                           f"calls={record['psspy_calls']:<6} {record['wall_seconds'] * 1000:8.1f} ms "
+                           f"err={record['final_error']!s:<24} {status}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        "version": RESULTS_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(started)),
+        "duration_seconds": round(time.time() - started, 3),
+        "environment": {
+            "python": platform.python_version(), "numpy": np.__version__, "platform": platform.platform(),
+            "backend": psse_session.BACKEND, "loadflow_warm": load_flow.WARM_ENABLED,
+            "loadflow_mismatch_tol": load_flow.MISMATCH_TOL,
+        },
+        "settings": {"preset": preset, "algorithms": algorithms, "repeat": repeat, "warm_start": warm_start},
+        "cases": cases,
+        "results": results,
+    }
+
+
+def write_results(results: Dict[str, Any], path: str):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from app.services.benchmark_service.compare import compare_files, format_comparison
+
+    parser = argparse.ArgumentParser(description="Benchmark the PSSE tuning and reactive-check algorithms")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("run", help="Run the suite and write a results file")
+    run.add_argument("--preset", choices=sorted(PRESETS), default="quick")
+    run.add_argument("--algorithm", action="append", choices=sorted(ALGORITHMS), dest="algorithms")
+    run.add_argument("--repeat", type=int, default=1)
+    run.add_argument("--warm-start", action="store_true")
+    run.add_argument("--out", default="benchmark_results.json")
+    run.add_argument("--baseline", help="Results file to compare against after the run")
+    run.add_argument("--threshold", type=float, default=0.1)
+    cmp = sub.add_parser("compare", help="Compare two results files")
+    cmp.add_argument("baseline")
+    cmp.add_argument("current")
+    cmp.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        results = run_suite(args.preset, args.algorithms, args.repeat, args.warm_start, log_cb=print)
+        write_results(results, args.out)
+        failed = sum(1 for r in results["results"] if not r["ok"])
+        print(f"Wrote {len(results['results'])} results ({failed} failed) to {args.out}")
+        if not args.baseline:
+            return 0
+        baseline, current = args.baseline, args.out
+    else:
+        baseline, current = args.baseline, args.current
+
+    comparison = compare_files(baseline, current, args.threshold)
+    print(format_comparison(comparison))
+    return 1 if comparison["regressions"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
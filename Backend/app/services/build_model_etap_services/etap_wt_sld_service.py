@@ -10,6 +10,7 @@ import xml.etree.ElementTree as ET
 import base64
 from openpyxl import load_workbook
 from openpyxl.utils import get_column_letter
+from app.services.metrics_service.metrics import stage_timer, timed
 
 class EtapWtSldService:
     def __init__(self, cls_file_path: str, pcs_file_path: str, mpt_type: str = "XFORM3W"):
@@ -19,6 +20,7 @@ class EtapWtSldService:
         # ETAP API Configuration
         self.etap_api_url = "http://localhost:60000/etap/api/v1"
         
+    @timed("excel.read")
     def _get_cls_1general_subset(self):
         with warnings.catch_warnings():
             warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
@@ -35,6 +37,7 @@ class EtapWtSldService:
         )
         return df
 
+    @timed("excel.read")
     def _get_cls_2xfmr_subset(self):
         import re
         with warnings.catch_warnings():
@@ -66,6 +69,7 @@ class EtapWtSldService:
         dfs = [_clean_columns(dfs_dict[name]) for name in matched_sheets]
         return dfs
 
+    @timed("excel.read")
     def _get_cls_3ohl_subset(self):
         with warnings.catch_warnings():
             warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
@@ -82,6 +86,7 @@ class EtapWtSldService:
         )
         return df
 
+    @timed("excel.read")
     def _get_cls_4ug_subset(self):
         with warnings.catch_warnings():
             warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
@@ -154,6 +159,7 @@ class EtapWtSldService:
         df = self._add_mainfeeder_index_col(df)
         return df
 
+    @timed("excel.read")
     def _get_param_colsysmap_subset(self):
         with warnings.catch_warnings():
             warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
@@ -179,6 +185,7 @@ class EtapWtSldService:
         df = df.drop(columns=['Order']).reset_index(drop=True)
         return df
 
+    @timed("excel.read")
     def _get_param_pcs_subset(self):
         with warnings.catch_warnings():
             warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
@@ -554,7 +561,8 @@ class EtapWtSldService:
         # Or better, return a dataframe directly without saving to file
         api_url = f"{self.etap_api_url}/projectdata/xml"
         try:
-            response = requests.get(api_url, timeout=30)
+            with stage_timer("etap.http"):
+                response = requests.get(api_url, timeout=30)
             response.raise_for_status()
             root = ET.fromstring(response.text)
             layout = root.find(".//LAYOUT")
@@ -689,7 +697,8 @@ class EtapWtSldService:
          headers = {"Content-Type": "application/json", "Accept": "application/json"}
          payload = f'"{encoded_xml}"'
          try:
-             response = requests.post(url, headers=headers, data=payload.encode('utf-8'))
+             with stage_timer("etap.http"):
+                 response = requests.post(url, headers=headers, data=payload.encode('utf-8'))
              return response.status_code == 200, response.text
          except Exception as e:
              return False, str(e)
@@ -0,0 +1,194 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import hashlib
+import contextlib
+import threading
+from typing import Callable, Dict, Iterable, List, Optional
+from app.version import __version__
+
+# Where cached build outputs live; one folder per content key
+CACHE_DIR = os.getenv("INS_BUILD_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".ins_automation", "build_cache"))
+# Least recently used entries beyond this count are evicted
+MAX_ENTRIES = int(os.getenv("INS_BUILD_CACHE_MAX_ENTRIES", "50"))
+
+MANIFEST_NAME = "manifest.json"
+FILES_DIR = "files"
+
+_locks: Dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def build_key(kind: str, excel_path: str, extra_inputs: Iterable[str] = ()) -> str:
+    """
+    Content key of a build: the builder kind, backend version, the workbook
+    (bytes and file name, since outputs may be named after it) and any
+    extra inputs such as the PSCAD template.
+    """
+    h = hashlib.sha256()
+    h.update(f"{kind}\0{__version__}\0{os.path.basename(excel_path)}\0".encode("utf-8"))
+    h.update(file_digest(excel_path).encode("ascii"))
+    for path in extra_inputs:
+        h.update(b"\0")
+        h.update(file_digest(path).encode("ascii"))
+    return h.hexdigest()
+
+
+def _lock(name: str) -> threading.Lock:
+    """One lock per cache key, and one per output folder"""
+    with _locks_guard:
+        return _locks.setdefault(name, threading.Lock())
+
+
+def _list_files(folder: str) -> List[str]:
+    """Every file below `folder`, as paths relative to it"""
+    return [os.path.relpath(os.path.join(root, name), folder)
+            for root, _, files in os.walk(folder) for name in files]
+
+
+def build_in(output_dir: str, build: Callable[[str], dict], excel_path: str) -> dict:
+    """
+    Inside the build process (cwd = output_dir): run build() on a copy of the
+    workbook in `output_dir`, the directory private to this build, and add
+    the files it wrote there to its result as "outputs".
+    """
+    workbook = os.path.join(output_dir, os.path.basename(excel_path))
+    shutil.copy2(excel_path, workbook)
+    result = build(workbook)
+    if result.get("success"):
+        result["outputs"] = sorted(rel for rel in _list_files(output_dir) if rel != os.path.basename(workbook))
+    return result
+
+
+class BuildCache:
+    """
+    Content-addressed store of build artifacts.
+
+    A build is run once per key, in a directory of its own (see build_in);
+    the outputs it reports are copied into the cache, moved into the
+    workbook's folder and restored there on later requests with the same
+    inputs. Concurrent builds in one folder never see each other's files.
+    """
+    def __init__(self, cache_dir: str = CACHE_DIR, max_entries: int = MAX_ENTRIES):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def lookup(self, key: str) -> Optional[dict]:
+        manifest_path = os.path.join(self._entry_dir(key), MANIFEST_NAME)
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        files_dir = os.path.join(self._entry_dir(key), FILES_DIR)
+        if not all(os.path.exists(os.path.join(files_dir, rel)) for rel in manifest.get("files", [])):
+            return None
+        return manifest
+
+    def restore(self, key: str, manifest: dict, output_folder: str):
+        files_dir = os.path.join(self._entry_dir(key), FILES_DIR)
+        for rel in manifest["files"]:
+            dst = os.path.join(output_folder, rel)
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            shutil.copy2(os.path.join(files_dir, rel), dst)
+        # Touch the manifest so eviction treats the entry as recently used
+        os.utime(os.path.join(self._entry_dir(key), MANIFEST_NAME))
+
+    def store(self, key: str, output_folder: str, files, result: dict):
+        entry_dir = self._entry_dir(key)
+        tmp_dir = f"{entry_dir}.tmp{os.getpid()}_{threading.get_ident()}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        files_dir = os.path.join(tmp_dir, FILES_DIR)
+        for rel in files:
+            dst = os.path.join(files_dir, rel)
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            shutil.copy2(os.path.join(output_folder, rel), dst)
+        manifest = {"key": key, "files": sorted(files), "result": result, "created_at": time.time()}
+        with open(os.path.join(tmp_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        os.replace(tmp_dir, entry_dir)
+        self._evict()
+
+    def _evict(self):
+        try:
+            entries = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)]
+        except OSError:
+            return
+        entries = [p for p in entries if os.path.isfile(os.path.join(p, MANIFEST_NAME))]
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=lambda p: os.path.getmtime(os.path.join(p, MANIFEST_NAME)))
+        for path in entries[:len(entries) - self.max_entries]:
+            shutil.rmtree(path, ignore_errors=True)
+
+    def _move_outputs(self, output_dir: str, files, output_folder: str):
+        with _lock(output_folder):
+            for rel in files:
+                dst = os.path.join(output_folder, rel)
+                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                os.replace(os.path.join(output_dir, rel), dst)
+
+    def run(self, kind: str, excel_path: str, build_fn: Callable[[str], dict],
+            extra_inputs: Iterable[str] = (), force_rebuild: bool = False) -> dict:
+        """
+        Return the cached result for these inputs, or run build_fn(output_dir)
+        and cache its outputs if it succeeds. build_fn builds into output_dir,
+        a fresh directory in the workbook's folder, and reports the files it
+        wrote as result["outputs"] (build_in does both inside the build
+        process); only those are cached and moved into the folder.
+        Cache problems never fail the build itself.
+        """
+        output_folder = os.path.dirname(os.path.abspath(excel_path))
+        extra_inputs = list(extra_inputs)
+        try:
+            key = build_key(kind, excel_path, extra_inputs)
+        except OSError as e:
+            print(f"[BuildCache] Cannot hash inputs, building without cache: {e}")
+            key = None
+
+        with _lock(key) if key else contextlib.nullcontext():
+            if key and not force_rebuild:
+                manifest = self.lookup(key)
+                if manifest is not None:
+                    try:
+                        with _lock(output_folder):
+                            self.restore(key, manifest, output_folder)
+                        print(f"[BuildCache] Hit {kind} {key[:12]} ({len(manifest['files'])} files)")
+                        return dict(manifest["result"], cached=True, cache_key=key)
+                    except OSError as e:
+                        print(f"[BuildCache] Restore failed, rebuilding: {e}")
+
+            output_dir = os.path.join(output_folder, f".build-{uuid.uuid4().hex[:12]}")
+            os.makedirs(output_dir)
+            try:
+                result = build_fn(output_dir)
+                if not result.get("success"):
+                    return result
+                produced = [rel for rel in result.get("outputs", [])
+                            if os.path.isfile(os.path.join(output_dir, rel))]
+                if key:
+                    try:
+                        self.store(key, output_dir, produced, result)
+                    except OSError as e:
+                        print(f"[BuildCache] Could not store outputs: {e}")
+                self._move_outputs(output_dir, produced, output_folder)
+            finally:
+                shutil.rmtree(output_dir, ignore_errors=True)
+            return dict(result, cached=False, cache_key=key)
+
+
+build_cache = BuildCache()
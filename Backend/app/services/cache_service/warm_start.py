@@ -0,0 +1,111 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Any, Dict, Optional, Tuple
+from app.services.cache_service.build_cache import file_digest
+
+# One JSON file shared by the server and the PSSE worker processes
+STORE_PATH = os.getenv("INS_WARM_START_PATH",
+                       os.path.join(os.path.expanduser("~"), ".ins_automation", "warm_start.json"))
+# Least recently updated entries beyond this count are dropped
+MAX_ENTRIES = int(os.getenv("INS_WARM_START_MAX_ENTRIES", "500"))
+# Half-width of a warm bracket: at least this fraction of the full range...
+MIN_BRACKET_FRACTION = 0.02
+# ...and at least this multiple of the predicted move from the stored solution
+BRACKET_MARGIN = 2.0
+
+
+def selection_key(sav_digest: str, bus_from: int, bus_to: int, gen_buses: list, gen_ids: list, reg_bus: list) -> str:
+    """SAV content plus the POI branch and generators being tuned"""
+    selection = json.dumps([bus_from, bus_to, list(gen_buses), [str(g).strip() for g in gen_ids], list(reg_bus)],
+                           separators=(",", ":"))
+    return hashlib.sha256(f"{sav_digest}\0{selection}".encode("utf-8")).hexdigest()
+
+
+def predict(entry: Dict[str, Any], target: float, lo: float, hi: float) -> Optional[Tuple[float, float, float, Optional[float]]]:
+    """
+    (x0, lo, hi, slope) for a 1-D search from a stored {x, target, slope}
+    entry: a first-order step to the new target and a tight bracket around
+    it, clipped to the full range. None if the entry is unusable.
+    """
+    x, slope = entry.get("x"), entry.get("slope")
+    if x is None or not lo < x < hi:
+        return None
+    move = 0.0
+    if slope:
+        move = (target - entry.get("target", target)) / slope
+    x0 = min(max(x + move, lo), hi)
+    half = max(MIN_BRACKET_FRACTION * (hi - lo), BRACKET_MARGIN * abs(move))
+    return x0, max(lo, x0 - half), min(hi, x0 + half), slope
+
+
+class WarmStartStore:
+    """
+    Converged tuning states per (SAV content, generator selection): the
+    k factor / VSched found, the target it was found for and the local
+    slope (or Jacobian for the coupled mode), so the next run on the same
+    model can start next to the answer.
+
+    Writes are atomic (temp file + replace); concurrent writers from
+    different processes can lose an update, which only costs a cold start.
+    """
+    def __init__(self, path: str = STORE_PATH, max_entries: int = MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, data: Dict[str, Any]):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        if len(data) > self.max_entries:
+            newest = sorted(data, key=lambda k: data[k].get("updated", 0), reverse=True)[:self.max_entries]
+            data = {k: data[k] for k in newest}
+        tmp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, self.path)
+
+    def lookup(self, key: str) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._load().get(key) or {})
+
+    def update(self, keys, stages: Dict[str, Dict[str, Any]], sav_name: str = ""):
+        """Merge converged stage states into every key (e.g. the SAV before and after saving)"""
+        with self._lock:
+            data = self._load()
+            for key in keys:
+                entry = data.get(key) or {}
+                entry.update(stages)
+                entry["sav"] = sav_name
+                entry["updated"] = time.time()
+                data[key] = entry
+            try:
+                self._save(data)
+            except OSError as e:
+                print(f"[WarmStart] Could not write {self.path}: {e}")
+
+    def clear(self):
+        with self._lock:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+
+warm_start_store = WarmStartStore()
+
+
+def sav_digest(path: str) -> Optional[str]:
+    try:
+        return file_digest(path)
+    except OSError:
+        return None
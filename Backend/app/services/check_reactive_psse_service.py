@@ -3,9 +3,23 @@ import sys
 import math
 import time
 import shutil
+import uuid
 import traceback
 from typing import List, Callable, Dict, Any, Optional
-import xlsxwriter
+from app.services.job_service.job_manager import emit_event, get_current_job
+from app.services.job_service.cancellation import JobCancelled, StageTimeout, current_cancel_token
+from app.services.psse_worker_service import psse_session
+from app.services.psse_worker_service.psse_worker_pool import in_worker_process
+from app.services.psse_worker_service.load_flow import LoadFlowError, get_load_flow
+from app.services.psse_worker_service.plant_subsystem import check_plant_voltages
+from app.services.psse_worker_service.case_snapshot import CaseSnapshot
+from app.services.psse_worker_service.solve_memo import (
+    SolveMemo, current_solve_memo, ensure_solved, shared_solve_memo, solve_case, solved_case, use_solve_memo
+)
+from app.services.report_service.reactive_report import ReactiveReport
+from app.services.metrics_service.metrics import timed, count
+from app.services.metrics_service.psspy_profiler import profile_stage
+from app.services.solver_service.root_finder import NoUsablePoint, find_root
 
 try:
     from TOOLs.PSSPY39 import psse35
@@ -26,6 +40,7 @@ except ImportError:
 NODE = 0
 # --- HELPER FUNCTIONS ---
 
+@timed("psse.export_image")
 def export_diagram_image(psspy, sav_path, log_cb, image_type=3, quality=100):
     """Export diagram image with same name as .sav file but .png extension"""
     try:
@@ -104,6 +119,93 @@ def set_mpt_ratio(psspy, mpt, ratio, _i, _f):
     
     return ierr
 
+def format_ratios(ratios):
+    return ", ".join(f"MPT{i+1}={r:.5f}" for i, r in enumerate(ratios))
+
+def _tap_ratios(mpt_data_list, direction, n):
+    """Ratios with every MPT moved n steps towards RMAX (direction=+1) or RMIN (-1), clamped"""
+    ratios = []
+    for d in mpt_data_list:
+        r = d["ratio"] + direction * n * d["step"]
+        ratios.append(min(r, d["rmax"]) if direction > 0 else max(r, d["rmin"]))
+    return ratios
+
+def search_tap_position(psspy, log_cb, mpt_list, mpt_data_list, direction, passes, _i, _f, cancel_token):
+    """
+    Find the first common tap position n (all MPTs moved n steps together,
+    see _tap_ratios) at which passes(ratios) holds, i.e. what stepping one
+    tap at a time would stop at, in O(log n_taps) solves: gallop from n=0
+    (1, 3, 7, ... steps) until a position passes, then bisect. Relies on the
+    pass condition being monotone in n; a final verification at the answer
+    falls back to one-step stepping if it is not.
+
+    passes(ratios) solves the case and returns True/False, or None when the
+    load flow did not converge (positions from there on are not used).
+    The case is left solved at the returned position. Returns a dict with
+    position, ratios, passed and solves, or None if a tap change failed.
+    """
+    n_max = max((math.ceil((abs((d["rmax"] if direction > 0 else d["rmin"]) - d["ratio"]) - 1e-9) / d["step"])
+                 for d in mpt_data_list if d["step"] > 0), default=0)
+    state = {"last": 0, "solves": 0}
+
+    def evaluate(n):
+        cancel_token.check()
+        ratios = _tap_ratios(mpt_data_list, direction, n)
+        for idx, (mpt, ratio) in enumerate(zip(mpt_list, ratios)):
+            ierr = set_mpt_ratio(psspy, mpt, ratio, _i, _f)
+            if ierr != 0:
+                log_cb(f"❌ Error changing ratio for MPT {idx+1}: {ierr}")
+                raise ValueError(ierr)
+        state["last"] = n
+        state["solves"] += 1
+        count("tap_search.solves")
+        return passes(ratios)
+
+    # lo: highest position known to fail (n=0 is the caller's initial check);
+    # hi: lowest known to pass; limit: highest position with a converged load flow
+    lo, hi, limit, probe = 0, None, n_max, 1
+    try:
+        while True:
+            if hi is None:
+                if lo >= limit:
+                    break
+                n = min(lo + probe, limit)
+                probe *= 2
+            elif hi - lo <= 1:
+                break
+            else:
+                n = (lo + hi) // 2
+            result = evaluate(n)
+            if result:
+                hi = n
+            elif result is None:
+                # n and everything past it are out, including a pass found above n: search below it again
+                log_cb(f"⚠️ Load flow did not converge at {format_ratios(_tap_ratios(mpt_data_list, direction, n))}")
+                limit, hi, probe = n - 1, None, 1
+            else:
+                lo = n
+
+        position = hi if hi is not None else limit
+        passed = hi is not None
+        if state["last"] != position:
+            # Verification: leave the case solved at the answer
+            result = evaluate(position)
+            if passed and not result:
+                log_cb("⚠️ Tap response is not monotone here; stepping one tap at a time instead.")
+                passed = False
+                for n in range(lo + 1, limit + 1):
+                    result = evaluate(n)
+                    position = n
+                    if result or result is None:
+                        passed = bool(result)
+                        break
+    except ValueError:
+        return None
+
+    log_cb(f"🔎 Tap search: position {position}/{n_max} after {state['solves']} solves")
+    return {"position": position, "ratios": _tap_ratios(mpt_data_list, direction, position),
+            "passed": passed, "solves": state["solves"], "max_position": n_max}
+
 def disconnect_shunts(psspy, shunt_list, log_cb, _i, _f):
     """Disconnect specified Switched Shunts (Cap Banks)"""
     if not shunt_list:
@@ -116,16 +218,17 @@ def disconnect_shunts(psspy, shunt_list, log_cb, _i, _f):
         
         mode = 1 # Default
         try:
-             ret = psspy.switched_shunt_data_5(bus, sid)
-             if isinstance(ret, tuple) and len(ret) == 3:
-                 ierr, iarray, rarray = ret
+             ret = psspy.swsint(bus, sid, "MODSW")
+             if isinstance(ret, tuple) and len(ret) == 2:
+                 ierr, value = ret
                  if ierr == 0:
-                     mode = iarray[8]
+                     mode = value
         except:
              pass
         
+        # INTGAR: N1..N8, MODSW (8), ADJM, STAT (10), SWREG, NREG, S1..S8
         intgar = [_i] * 21
-        intgar[11] = 0
+        intgar[10] = 0
         intgar[8] = mode
         
         realar = [_f] * 12
@@ -139,31 +242,27 @@ def disconnect_shunts(psspy, shunt_list, log_cb, _i, _f):
         else:
             log_cb(f"   ⚠️ Failed to disconnect Shunt {sid} at Bus {bus}. Error: {ierr}")
 
-def check_bus_voltages(psspy, log_cb, limit, mode="lag"):
-    ierr, [buses] = psspy.abusint(-1, 1, "NUMBER")
-    ierr, [voltages] = psspy.abusreal(-1, 1, "PU")
-    
-    if ierr != 0 or buses is None:
+def check_bus_voltages(psspy, log_cb, limit, mode="lag", cfg=None):
+    """
+    Buses above (lag) / below (lead) `limit`, worst first. With `cfg` only
+    the plant's buses (up to and including the POI) are read.
+    """
+    ierr, violating = check_plant_voltages(psspy, cfg, limit, mode, log_cb)
+    if ierr != 0:
         log_cb("⚠️ Error getting bus voltage data")
         return True, []
     
-    violating = []
-    for bus, v in zip(buses, voltages):
-        if mode == "lag" and v > limit + 1e-6:
-            violating.append((bus, round(v, 4)))
-        elif mode == "lead" and v < limit - 1e-6:
-            violating.append((bus, round(v, 4)))
-    
     if violating:
         log_cb(f"⚠️ {len(violating)} bus(es) violating voltage limit ({limit} PU):")
-        for bus, v in violating[:5]:  # Show first 5 only
+        for bus, v in violating[:5]:  # Show the worst 5 only
             log_cb(f"   - Bus {bus}: {v} PU")
         if len(violating) > 5:
             log_cb(f"   ... and {len(violating) - 5} more")
     
     return len(violating) == 0, violating
 
-def tune_vsched_for_target_q(psspy, log_cb, cfg, q_target, v_min=0.9, v_max=1.1):
+def tune_vsched_for_target_q(psspy, log_cb, cfg, q_target, v_min=0.9, v_max=1.1, cancel_token=None):
+    cancel_token = cancel_token or current_cancel_token()
     BUS_FROM, BUS_TO = cfg["BUS_FROM"], cfg["BUS_TO"]
     GEN_BUSES = cfg.get("GEN_BUSES", [])
     REG_BUS = cfg.get("REG_BUS", [])
@@ -177,8 +276,11 @@ def tune_vsched_for_target_q(psspy, log_cb, cfg, q_target, v_min=0.9, v_max=1.1)
             psspy.plant_chng_4(bus, NODE, [rb, 0], [vs, 100.0])
 
     def get_q_poi():
-        psspy.fnsl([1,1,0,0,1,1,0,0])
-        ierr, flow = psspy.brnflo(BUS_FROM, BUS_TO, '1')
+        solved = solve_case(psspy, log_cb, cfg, "tune_vsched")
+        if not solved.converged:
+            # find_root steps away from points the load flow can't solve
+            return float("nan")
+        ierr, flow = solved.brnflo(BUS_FROM, BUS_TO, '1')
         if ierr != 0 or flow is None:
             return 0.0
         if isinstance(flow, complex): return flow.imag
@@ -188,36 +290,24 @@ def tune_vsched_for_target_q(psspy, log_cb, cfg, q_target, v_min=0.9, v_max=1.1)
         return 0.0
 
     log_cb(f"🔄 Tuning Vsched to reach Q={q_target:.4f} Mvar...")
-    
-    current_high = v_max
-    current_low = v_min
-    
-    best_v = (current_low + current_high) / 2
-    best_err = 9999.0
-    
-    for i in range(1, MAX_ITER + 1):
-        v_mid = (current_low + current_high) / 2
-        set_vsched(v_mid)
-        q_now = get_q_poi()
-        err = q_now - q_target
-        
-        if abs(err) < abs(best_err):
-            best_v = v_mid
-            best_err = err
 
-        if abs(err) < EPS:
-            log_cb(f"✅ Tuned: Vsched={v_mid:.5f} -> Q={q_now:.3f} Mvar")
-            return q_now, v_mid
-        
-        if q_now > q_target:
-            current_high = v_mid
-        else:
-            current_low = v_mid
-    
-    set_vsched(best_v)
-    final_q = get_q_poi()
-    log_cb(f"⚠️ Tuning finished (limit iter) at: Vsched={best_v:.5f} (Q={final_q:.3f})")
-    return final_q, best_v
+    def evaluate(vs):
+        set_vsched(vs)
+        return get_q_poi()
+
+    def on_step(i, vs, q_now, err, method):
+        emit_event("iteration", {"stage": "tune_vsched", "iteration": i, "vsched": vs, "q_poi": q_now, "error": err, "method": method})
+
+    try:
+        result = find_root(evaluate, q_target, v_min, v_max, EPS, MAX_ITER,
+                           on_step=on_step, cancel_token=cancel_token)
+    except NoUsablePoint as e:
+        raise LoadFlowError(f"Load flow did not converge at any Vsched in [{v_min}, {v_max}] ({e.solves} solves)")
+    if result.converged:
+        log_cb(f"✅ Tuned: Vsched={result.x:.5f} -> Q={result.response:.3f} Mvar ({result.solves} solves)")
+    else:
+        log_cb(f"⚠️ Tuning finished (limit iter) at: Vsched={result.x:.5f} (Q={result.response:.3f})")
+    return result.response, result.x
 
 # --- MEASURE & REPORT ---
 
@@ -292,83 +382,19 @@ def measure_points(psspy, report_points, cfg=None):
         })
     return results
 
-def export_to_excel(cfg, data_map):
-    path = cfg.get("EXCEL_PATH", "Report.xlsx")
-    workbook = xlsxwriter.Workbook(path)
-    
-    # Formats
-    header_fmt = workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'bg_color': '#FFD700'}) 
-    sub_header_fmt = workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'bg_color': '#FCE4D6'}) 
-    cell_fmt = workbook.add_format({'border': 1, 'align': 'center'})
-    num_fmt = workbook.add_format({'border': 1, 'align': 'center', 'num_format': '0.0000'})
-    
-    def write_sheet(sheet_name, cases):
-        ws = workbook.add_worksheet(sheet_name)
-        if not cases[0] in data_map: return 
+def open_report(cfg):
+    """ReactiveReport for the paths in cfg (EXCEL_PATH, REPORT_CSV_PATH, REPORT_PARQUET_PATH)"""
+    return ReactiveReport(cfg.get("EXCEL_PATH", "Report.xlsx"), cfg.get("REPORT_CSV_PATH"),
+                          cfg.get("REPORT_PARQUET_PATH"))
 
-        case1_data = data_map[cases[0]]
-        case2_data = data_map[cases[1]]
-        
-        # Helper to group
-        def group_data(dlist):
-            groups = {}
-            for item in dlist:
-                 idx = item["bess_id"]
-                 if idx not in groups: groups[idx] = []
-                 groups[idx].append(item)
-            return groups
-
-        bess_groups_1 = group_data(case1_data)
-        bess_groups_2 = group_data(case2_data)
-        
-        start_row = 1
-        sorted_idxs = sorted(bess_groups_1.keys())
-        
-        for idx in sorted_idxs:
-            # Block 1
-            r, c = start_row, 1
-            title1 = f"{cases[0]} {idx}"
-            ws.merge_range(r, c, r, c+4, title1, header_fmt)
-            r += 1
-            
-            items1 = bess_groups_1.get(idx, [])
-            headers = [i["name"] for i in items1]
-            for hi, h in enumerate(headers):
-                ws.write(r, c+hi, h, sub_header_fmt)
-            ws.write(r, c-1, "", cell_fmt)
-            r+=1
-            
-            labels = ["S (MVA)", "P (MW)", "Q (Mvar)", "pf"]
-            keys = ["S", "P", "Q", "pf"]
-            for k_idx, key in enumerate(keys):
-                ws.write(r + k_idx, c-1, labels[k_idx], sub_header_fmt)
-                for col_idx, item in enumerate(items1):
-                    ws.write(r + k_idx, c + col_idx, item[key], num_fmt)
-            
-            # Block 2
-            c2 = 10
-            title2 = f"{cases[1]} {idx}"
-            ws.merge_range(start_row, c2, start_row, c2+4, title2, header_fmt)
-            items2 = bess_groups_2.get(idx, [])
-            headers2 = [i["name"] for i in items2]
-            r2 = start_row + 1
-            for hi, h in enumerate(headers2):
-                ws.write(r2, c2+hi, h, sub_header_fmt)
-            ws.write(r2, c2-1, "", cell_fmt)
-            r2+=1
-            for k_idx, key in enumerate(keys):
-                ws.write(r2 + k_idx, c2-1, labels[k_idx], sub_header_fmt)
-                for col_idx, item in enumerate(items2):
-                    ws.write(r2 + k_idx, c2 + col_idx, item[key], num_fmt)
-
-            start_row += 8
-
-    write_sheet("Max Reactive", ["Max Lag", "Max Lead"])
-    write_sheet("095PF Reactive", ["0.95 Lagging", "0.95 Leading"])
-    workbook.close()
+def export_to_excel(cfg, data_map):
+    with open_report(cfg) as report:
+        for name, measurements in data_map.items():
+            report.add_scenario(name, measurements)
 
 # --- CHECK LOGIC ---
-def check_max_lag(psspy, log_cb, cfg, _i, _f):
+def check_max_lag(psspy, log_cb, cfg, _i, _f, cancel_token=None):
+    cancel_token = cancel_token or current_cancel_token()
     GEN_BUSES = cfg.get("GEN_BUSES", [])
     GEN_IDS = cfg.get("GEN_IDS", [])
     MPT_LIST = cfg.get("MPT_LIST", [])
@@ -376,20 +402,20 @@ def check_max_lag(psspy, log_cb, cfg, _i, _f):
 
     for i, bus in enumerate(GEN_BUSES):
         psspy.plant_chng_4(bus, NODE, [bus, 0], [1.1, 100.0])
-    psspy.fnsl([1,1,0,0,1,1,0,0])
+    solved = solve_case(psspy, log_cb, cfg, "max_lag")
     
     q_gen_list, q_max_list = [], []
     for i, bus in enumerate(GEN_BUSES):
         gid = GEN_IDS[i] if i < len(GEN_IDS) else "1"
-        _, q_gen = psspy.macdat(bus, gid, 'Q')
-        _, q_max = psspy.macdat(bus, gid, 'QMAX')
+        _, q_gen = solved.macdat(bus, gid, 'Q')
+        _, q_max = solved.macdat(bus, gid, 'QMAX')
         q_gen_list.append(q_gen)
         q_max_list.append(q_max)
     
     log_cb(f"✅ Q gen: {q_gen_list}")
     log_cb(f"✅ Q max: {q_max_list}")
 
-    v_passed, violating = check_bus_voltages(psspy, log_cb, 1.1, "lag")
+    v_passed, violating = check_bus_voltages(solved, log_cb, 1.1, "lag", cfg)
     
     if all(abs(qg - qmax) < 1e-6 for qg, qmax in zip(q_gen_list, q_max_list)) and v_passed:
         log_cb("✅ All QGEN equal QMAX and Voltages OK; no adjustment needed.")
@@ -405,50 +431,37 @@ def check_max_lag(psspy, log_cb, cfg, _i, _f):
         mpt_data_list.append(data)
         log_cb(f"⚙️ MPT {idx+1}: ratio=1, step={data['step']}, rmax={data['rmax']}")
 
-    log_cb("🔄 Adjusting Taps to meet Q and Voltage requirements...")
-    
-    while True:
-        all_at_max = True
-        any_adjusted = False
-        
-        for idx, (mpt, data) in enumerate(zip(MPT_LIST, mpt_data_list)):
-            if data["ratio"] < data["rmax"] - 1e-9:
-                all_at_max = False
-                any_adjusted = True
-                data["ratio"] += data["step"]
-                if data["ratio"] > data["rmax"]: data["ratio"] = data["rmax"]
-                ierr = set_mpt_ratio(psspy, mpt, data["ratio"], _i, _f)
-                if ierr != 0:
-                    log_cb(f"❌ Error changing ratio for MPT {idx+1}: {ierr}")
-                    return
-        
-        if not any_adjusted and all_at_max:
-            log_cb(f"⚠️ All MPT reached RMAX. Conditions might not be met.")
-            break
-        
-        ierr = psspy.fnsl([1,1,0,0,1,1,0,0])
-        if ierr != 0:
-            log_cb("⚠️ fnsl error when increasing ratio, stopping.")
-            break
+    log_cb("🔄 Searching MPT taps to meet Q and Voltage requirements...")
 
+    def passes(ratios):
+        solved = solve_case(psspy, log_cb, cfg, "max_lag taps")
+        if not solved.converged:
+            return None
         q_gen_list = []
         for i, bus in enumerate(GEN_BUSES):
             gid = GEN_IDS[i] if i < len(GEN_IDS) else "1"
-            _, q_gen = psspy.macdat(bus, gid, 'Q')
-            _, q_max = psspy.macdat(bus, gid, 'QMAX')
+            _, q_gen = solved.macdat(bus, gid, 'Q')
+            _, q_max = solved.macdat(bus, gid, 'QMAX')
             q_gen_list.append(q_gen)
             q_max_list[i] = q_max
-            
-        ratio_str = ", ".join([f"MPT{i+1}={d['ratio']:.5f}" for i, d in enumerate(mpt_data_list)])
-        v_passed, _ = check_bus_voltages(psspy, log_cb, 1.1, "lag")
-        
-        if all(abs(qg - qmax) < 1e-6 or qg > qmax for qg, qmax in zip(q_gen_list, q_max_list)) and v_passed:
-            log_cb(f"✅ Requirements PASSED at {ratio_str}")
-            break
+        emit_event("tap_step", {"stage": "max_lag", "ratios": ratios, "q_gen": q_gen_list, "q_max": q_max_list})
+        v_passed, _ = check_bus_voltages(solved, log_cb, 1.1, "lag", cfg)
+        return all(abs(qg - qmax) < 1e-6 or qg > qmax for qg, qmax in zip(q_gen_list, q_max_list)) and v_passed
+
+    search = search_tap_position(psspy, log_cb, MPT_LIST, mpt_data_list, +1, passes, _i, _f, cancel_token)
+    if search is None:
+        return
+    if search["passed"]:
+        log_cb(f"✅ Requirements PASSED at {format_ratios(search['ratios'])}")
+    elif search["position"] == search["max_position"]:
+        log_cb(f"⚠️ All MPT reached RMAX. Conditions might not be met.")
+    else:
+        log_cb("⚠️ Load flow did not converge when increasing ratio, stopping.")
 
     log_cb("✅ Finished max lag check.")
 
-def check_max_lead(psspy, log_cb, cfg, _i, _f):
+def check_max_lead(psspy, log_cb, cfg, _i, _f, cancel_token=None):
+    cancel_token = cancel_token or current_cancel_token()
     GEN_BUSES = cfg.get("GEN_BUSES", [])
     GEN_IDS = cfg.get("GEN_IDS", [])
     MPT_LIST = cfg["MPT_LIST"]
@@ -459,20 +472,20 @@ def check_max_lead(psspy, log_cb, cfg, _i, _f):
 
     for i, bus in enumerate(GEN_BUSES):
         psspy.plant_chng_4(bus, NODE, [bus, 0], [0.9, 100.0])
-    psspy.fnsl([1,1,0,0,1,1,0,0])
+    solved = solve_case(psspy, log_cb, cfg, "max_lead")
     
     q_gen_list, q_min_list = [], []
     for i, bus in enumerate(GEN_BUSES):
         gid = GEN_IDS[i] if i < len(GEN_IDS) else "1"
-        _, q_gen = psspy.macdat(bus, gid, 'Q')
-        _, q_min = psspy.macdat(bus, gid, 'QMIN')
+        _, q_gen = solved.macdat(bus, gid, 'Q')
+        _, q_min = solved.macdat(bus, gid, 'QMIN')
         q_gen_list.append(q_gen)
         q_min_list.append(q_min)
         
     log_cb(f"✅ Q gen: {q_gen_list}")
     log_cb(f"✅ Q min: {q_min_list}")
 
-    v_passed, violating = check_bus_voltages(psspy, log_cb, 0.9, "lead")
+    v_passed, violating = check_bus_voltages(solved, log_cb, 0.9, "lead", cfg)
 
     if all(abs(qg - qmin) < 1e-6 for qg, qmin in zip(q_gen_list, q_min_list)) and v_passed:
         log_cb("✅ All QGEN equal QMIN and Voltages OK; no adjustment needed.")
@@ -488,50 +501,37 @@ def check_max_lead(psspy, log_cb, cfg, _i, _f):
         mpt_data_list.append(data)
         log_cb(f"⚙️ MPT {idx+1}: ratio=1, step={data['step']}, rmin={data['rmin']}")
 
-    log_cb("🔄 Adjusting Taps to meet Q and Voltage requirements...")
-
-    while True:
-        all_at_min = True
-        any_adjusted = False
-        
-        for idx, (mpt, data) in enumerate(zip(MPT_LIST, mpt_data_list)):
-            if data["ratio"] > data["rmin"] + 1e-9:
-                all_at_min = False
-                any_adjusted = True
-                data["ratio"] -= data["step"]
-                if data["ratio"] < data["rmin"]: data["ratio"] = data["rmin"]
-                ierr = set_mpt_ratio(psspy, mpt, data["ratio"], _i, _f)
-                if ierr != 0:
-                    log_cb(f"❌ Error changing ratio for MPT {idx+1}: {ierr}")
-                    return
-        
-        if not any_adjusted and all_at_min:
-            log_cb(f"⚠️ All MPT reached RMIN. Conditions might not be met.")
-            break
-        
-        ierr = psspy.fnsl([1,1,0,0,1,1,0,0])
-        if ierr != 0:
-            log_cb("⚠️ fnsl error when decreasing ratio, stopping.")
-            break
+    log_cb("🔄 Searching MPT taps to meet Q and Voltage requirements...")
 
+    def passes(ratios):
+        solved = solve_case(psspy, log_cb, cfg, "max_lead taps")
+        if not solved.converged:
+            return None
         q_gen_list = []
         for i, bus in enumerate(GEN_BUSES):
             gid = GEN_IDS[i] if i < len(GEN_IDS) else "1"
-            _, q_gen = psspy.macdat(bus, gid, 'Q')
-            _, q_min = psspy.macdat(bus, gid, 'QMIN')
+            _, q_gen = solved.macdat(bus, gid, 'Q')
+            _, q_min = solved.macdat(bus, gid, 'QMIN')
             q_gen_list.append(q_gen)
-            q_min_list.append(q_min) # Refresher
+            q_min_list[i] = q_min
+        emit_event("tap_step", {"stage": "max_lead", "ratios": ratios, "q_gen": q_gen_list, "q_min": q_min_list})
+        v_passed, _ = check_bus_voltages(solved, log_cb, 0.9, "lead", cfg)
+        return all(abs(qg - qmin) < 1e-6 or qg < qmin for qg, qmin in zip(q_gen_list, q_min_list)) and v_passed
 
-        ratio_str = ", ".join([f"MPT{i+1}={d['ratio']:.5f}" for i, d in enumerate(mpt_data_list)])
-        v_passed, _ = check_bus_voltages(psspy, log_cb, 0.9, "lead")
-        
-        if all(abs(qg - qmin) < 1e-6 or qg < qmin for qg, qmin in zip(q_gen_list, q_min_list)) and v_passed:
-            log_cb(f"✅ Requirements PASSED at {ratio_str}")
-            break
+    search = search_tap_position(psspy, log_cb, MPT_LIST, mpt_data_list, -1, passes, _i, _f, cancel_token)
+    if search is None:
+        return
+    if search["passed"]:
+        log_cb(f"✅ Requirements PASSED at {format_ratios(search['ratios'])}")
+    elif search["position"] == search["max_position"]:
+        log_cb(f"⚠️ All MPT reached RMIN. Conditions might not be met.")
+    else:
+        log_cb("⚠️ Load flow did not converge when decreasing ratio, stopping.")
 
     log_cb("✅ Finished max lead check.")
 
-def check_095_lagging(psspy, log_cb, cfg, _i, _f):
+def check_095_lagging(psspy, log_cb, cfg, _i, _f, cancel_token=None):
+    cancel_token = cancel_token or current_cancel_token()
     GEN_BUSES = cfg.get("GEN_BUSES", [])
     MPT_LIST = cfg["MPT_LIST"]
     BUS_FROM, BUS_TO = cfg["BUS_FROM"], cfg["BUS_TO"]
@@ -550,9 +550,9 @@ def check_095_lagging(psspy, log_cb, cfg, _i, _f):
     q_095_lagging = p_net * math.tan(math.acos(0.95))
     log_cb(f"P_net={p_net} MW, Q_095_lagging={q_095_lagging:.2f} Mvar")
     
-    q_now, vsched_final = tune_vsched_for_target_q(psspy, log_cb, cfg, q_095_lagging, v_min=0.9, v_max=1.1)
+    q_now, vsched_final = tune_vsched_for_target_q(psspy, log_cb, cfg, q_095_lagging, v_min=0.9, v_max=1.1, cancel_token=cancel_token)
 
-    v_passed, violating = check_bus_voltages(psspy, log_cb, 1.1, "lag")
+    v_passed, violating = check_bus_voltages(solved_case(psspy, log_cb, cfg), log_cb, 1.1, "lag", cfg)
     
     if abs(q_now - q_095_lagging) < 1e-2 and v_passed:
         log_cb(f"✅ Achieved immediately: Q={q_now:.2f} >= {q_095_lagging:.2f} and Voltages OK.")
@@ -571,6 +571,7 @@ def check_095_lagging(psspy, log_cb, cfg, _i, _f):
     log_cb("🔄 Adjusting Taps to meet Q and Voltage requirements...")
     
     while True:
+        cancel_token.check()
         all_at_max = True
         any_adjusted = False
         
@@ -590,17 +591,18 @@ def check_095_lagging(psspy, log_cb, cfg, _i, _f):
              break
         
         # Tune V_sched again with new tap
-        q_now, vsched_final = tune_vsched_for_target_q(psspy, log_cb, cfg, q_095_lagging, v_min=0.9, v_max=1.1)
+        q_now, vsched_final = tune_vsched_for_target_q(psspy, log_cb, cfg, q_095_lagging, v_min=0.9, v_max=1.1, cancel_token=cancel_token)
         
-        v_passed, _ = check_bus_voltages(psspy, log_cb, 1.1, "lag")
+        v_passed, _ = check_bus_voltages(solved_case(psspy, log_cb, cfg), log_cb, 1.1, "lag", cfg)
         
         if abs(q_now - q_095_lagging) < 1e-2 and v_passed:
-            log_cb(f"✅ Requirements PASSED at {ratio_str}")
+            log_cb(f"✅ Requirements PASSED at {format_ratios([d['ratio'] for d in mpt_data_list])}")
             break
 
     log_cb("✅ Finished 0.95 lagging check.")
 
-def check_095_leading(psspy, log_cb, cfg, _i, _f):
+def check_095_leading(psspy, log_cb, cfg, _i, _f, cancel_token=None):
+    cancel_token = cancel_token or current_cancel_token()
     GEN_BUSES = cfg.get("GEN_BUSES", [])
     MPT_LIST = cfg["MPT_LIST"]
     BUS_FROM, BUS_TO = cfg["BUS_FROM"], cfg["BUS_TO"]
@@ -621,9 +623,9 @@ def check_095_leading(psspy, log_cb, cfg, _i, _f):
     log_cb(f"P_net={p_net} MW, Q_095_leading={q_095_leading:.2f} Mvar")
     
     disconnect_shunts(psspy, SHUNT_LIST, log_cb, _i, _f)
-    q_now, vsched_final = tune_vsched_for_target_q(psspy, log_cb, cfg, q_095_leading, v_min=0.9, v_max=1.1)
+    q_now, vsched_final = tune_vsched_for_target_q(psspy, log_cb, cfg, q_095_leading, v_min=0.9, v_max=1.1, cancel_token=cancel_token)
 
-    v_passed, violating = check_bus_voltages(psspy, log_cb, 0.9, "lead")
+    v_passed, violating = check_bus_voltages(solved_case(psspy, log_cb, cfg), log_cb, 0.9, "lead", cfg)
     
     if abs(q_now - q_095_leading) < 1e-2 and v_passed:
         log_cb(f"✅ Achieved immediately: Q={q_now:.2f} <= {q_095_leading:.2f} and Voltages OK.")
@@ -642,6 +644,7 @@ def check_095_leading(psspy, log_cb, cfg, _i, _f):
     log_cb("🔄 Adjusting Taps to meet Q and Voltage requirements...")
     
     while True:
+        cancel_token.check()
         all_at_min = True
         any_adjusted = False
         
@@ -661,71 +664,168 @@ def check_095_leading(psspy, log_cb, cfg, _i, _f):
             break
 
         # Tune V_sched again with new tap
-        q_now, vsched_final = tune_vsched_for_target_q(psspy, log_cb, cfg, q_095_leading, v_min=0.9, v_max=1.1)
+        q_now, vsched_final = tune_vsched_for_target_q(psspy, log_cb, cfg, q_095_leading, v_min=0.9, v_max=1.1, cancel_token=cancel_token)
         
-        v_passed, _ = check_bus_voltages(psspy, log_cb, 0.9, "lead")
+        v_passed, _ = check_bus_voltages(solved_case(psspy, log_cb, cfg), log_cb, 0.9, "lead", cfg)
         
         if abs(q_now - q_095_leading) < 1e-2 and v_passed:
-            log_cb(f"✅ Requirements PASSED at {ratio_str}")
+            log_cb(f"✅ Requirements PASSED at {format_ratios([d['ratio'] for d in mpt_data_list])}")
             break
 
     log_cb("✅ Finished 0.95 leading check.")
 
-def run_all_cases(psspy, log_cb, cfg, _i, _f):
-    sav_path = cfg["SAV_PATH"]
-    base_name = os.path.splitext(sav_path)[0]
-    
-    log_cb("=== RUNNING MAX LAG ===")
-    psspy.case(sav_path)
-    check_max_lag(psspy, log_cb, cfg, _i, _f)
-    res_max_lag = measure_points(psspy, cfg.get("REPORT_POINTS", []), cfg)
-    path_max_lag = f"{base_name}_MaxLag.sav"
-    psspy.save(path_max_lag)
-    log_cb(f"💾 Saved Max Lag case: {path_max_lag}")
-    # export_diagram_image(psspy, base_name, log_cb)
-    
-    log_cb("=== RUNNING 0.95 LAGGING ===")
-    psspy.case(sav_path)
-    check_095_lagging(psspy, log_cb, cfg, _i, _f)
-    res_095_lag = measure_points(psspy, cfg.get("REPORT_POINTS", []), cfg)
-    path_095_lag = f"{base_name}_095Lag.sav"
-    psspy.save(path_095_lag)
-    log_cb(f"💾 Saved 0.95 Lag case: {path_095_lag}")
+# (report name, log title, check function, SAV suffix, stage name)
+SCENARIOS = [
+    ("Max Lag", "MAX LAG", check_max_lag, "MaxLag", "max_lag"),
+    ("0.95 Lagging", "0.95 LAGGING", check_095_lagging, "095Lag", "095_lagging"),
+    ("Max Lead", "MAX LEAD", check_max_lead, "MaxLead", "max_lead"),
+    ("0.95 Leading", "0.95 LEADING", check_095_leading, "095Lead", "095_leading"),
+]
+
+def run_scenario(psspy, log_cb, cfg, name, _i, _f, cancel_token=None):
+    """One RUN_ALL scenario on the loaded base case: check, measure, save its own SAV"""
+    cancel_token = cancel_token or current_cancel_token()
+    _, title, check_fn, suffix, stage = next(s for s in SCENARIOS if s[0] == name)
+    log_cb(f"=== RUNNING {title} ===")
+    memo = current_solve_memo()
+    if memo is not None:
+        memo.forget_solution()
+    with cancel_token.stage(stage):
+        check_fn(psspy, log_cb, cfg, _i, _f, cancel_token=cancel_token)
+        # The check may have ended on a configuration served from the memo
+        ensure_solved(psspy, log_cb, cfg, stage)
+    with profile_stage(stage), profile_stage("measure"):
+        measurements = measure_points(psspy, cfg.get("REPORT_POINTS", []), cfg)
+    out_path = f"{os.path.splitext(cfg['SAV_PATH'])[0]}_{suffix}.sav"
+    psspy.save(out_path)
+    log_cb(f"💾 Saved {name} case: {out_path}")
     # export_diagram_image(psspy, base_name, log_cb)
+    return measurements, out_path
+
+def _start_report(cfg, log_cb):
+    """Open the RUN_ALL report; scenarios are added to it as they finish"""
+    path = os.path.dirname(cfg["SAV_PATH"])
+    cfg["EXCEL_PATH"] = cfg.get("REPORT_PATH") or os.path.join(path, "Reactive_Report.xlsx")
+    log_cb(f"📊 Writing report to: {cfg['EXCEL_PATH']}")
+    return open_report(cfg)
+
+def _finish_report(report, log_cb):
+    report.close()
+    for kind, path in report.paths().items():
+        log_cb(f"✅ Report saved to: {path}" if kind == "excel" else f"✅ {kind.upper()} saved to: {path}")
+    log_cb("🏁 ALL TASKS COMPLETED")
+    return report.excel_path
 
-    log_cb("=== RUNNING MAX LEAD ===")
-    psspy.case(sav_path)
-    check_max_lead(psspy, log_cb, cfg, _i, _f)
-    res_max_lead = measure_points(psspy, cfg.get("REPORT_POINTS", []), cfg)
-    path_max_lead = f"{base_name}_MaxLead.sav"
-    psspy.save(path_max_lead)
-    log_cb(f"💾 Saved Max Lead case: {path_max_lead}")
-    # export_diagram_image(psspy, base_name, log_cb)
+def _log_memo(memo, log_cb):
+    if memo.hits:
+        log_cb(f"♻️ {memo.hits} of {memo.hits + memo.misses} load flows served from earlier solves")
 
-    log_cb("=== RUNNING 0.95 LEADING ===")
-    psspy.case(sav_path)
-    check_095_leading(psspy, log_cb, cfg, _i, _f)
-    res_095_lead = measure_points(psspy, cfg.get("REPORT_POINTS", []), cfg)
-    path_095_lead = f"{base_name}_095Lead.sav"
-    psspy.save(path_095_lead)
-    log_cb(f"💾 Saved 0.95 Lead case: {path_095_lead}")
-    # export_diagram_image(psspy, base_name, log_cb)
+def run_all_cases(psspy, log_cb, cfg, _i, _f, cancel_token=None):
+    """The four scenarios one after another in this process"""
+    cancel_token = cancel_token or current_cancel_token()
+    data_map = {}
+    saved = {}
+    load_flow = get_load_flow(psspy, log_cb)
+    mark = load_flow.mark()
 
-    log_cb("📊 Exporting Excel Report...")
-    data_map = {
-        "Max Lag": res_max_lag,
-        "Max Lead": res_max_lead,
-        "0.95 Lagging": res_095_lag,
-        "0.95 Leading": res_095_lead
-    }
-    path = os.path.dirname(sav_path)
-    excel_path = os.path.join(path, "Reactive_Report.xlsx")
-    cfg["EXCEL_PATH"] = excel_path
-    export_to_excel(cfg, data_map)
-    log_cb(f"✅ Report saved to: {excel_path}")
-    log_cb("🏁 ALL TASKS COMPLETED")
+    report = _start_report(cfg, log_cb)
+    try:
+        # Scenarios after the first start from the base case by undoing the
+        # previous scenario's changes rather than reloading the SAV
+        with CaseSnapshot(psspy, cfg["SAV_PATH"], log_cb) as snapshot, use_solve_memo(SolveMemo()) as memo:
+            for index, (name, *_) in enumerate(SCENARIOS):
+                if index:
+                    snapshot.revert()
+                data_map[name], saved[name] = run_scenario(snapshot.api, log_cb, cfg, name, _i, _f, cancel_token)
+                report.add_scenario(name, data_map[name])
+            _log_memo(memo, log_cb)
+    except JobCancelled as e:
+        # The report keeps the scenarios that finished
+        report.close()
+        e.partial = {"completed_scenarios": list(data_map), "saved_files": saved, "measurements": data_map,
+                     "report_files": report.paths()}
+        raise
+    except Exception:
+        report.close()
+        raise
+
+    excel_path = _finish_report(report, log_cb)
+    return {"success": True, "excel_path": excel_path, "saved_files": saved, "measurements": data_map,
+            "loadflow": load_flow.summary(mark)}
+
+def _merge_loadflow(summaries):
+    merged = {"solves": 0, "failed": 0, "iterations": 0, "seconds": 0.0, "escalations": 0, "rungs": {}}
+    for summary in summaries:
+        for key in ("solves", "failed", "iterations", "seconds", "escalations"):
+            merged[key] += summary.get(key, 0)
+        for rung, n in summary.get("rungs", {}).items():
+            merged["rungs"][rung] = merged["rungs"].get(rung, 0) + n
+    merged["seconds"] = round(merged["seconds"], 4)
+    return merged
+
+def run_all_parallel(cfg, log_cb, cancel_token=None):
+    """
+    The four scenarios as separate PSSE worker tasks, run side by side (as
+    many at a time as the pool has workers), merged into one report. Wall
+    time is about that of the slowest scenario.
+    """
+    from app.services import batch_psse_service
+    cancel_token = cancel_token or current_cancel_token()
+    # Scenarios that land on the same worker share its solve memo
+    memo_key = uuid.uuid4().hex
+    items = [(name, (cfg, name), {"memo_key": memo_key}, cancel_token.budgets) for name, *_ in SCENARIOS]
+    try:
+        outcomes = batch_psse_service.run_batch(
+            "app.services.check_reactive_psse_service:run_scenario_task", items,
+            log_cb=log_cb, cancel_token=cancel_token
+        )
+    except JobCancelled as e:
+        outcomes = e.partial["items"]
+
+    data_map, saved, failed, stopped = {}, {}, [], []
+    for outcome in outcomes:
+        name = outcome["item"]
+        if outcome["status"] == "success":
+            data_map[name] = outcome["result"]["measurements"]
+            saved[name] = outcome["result"]["saved_file"]
+        elif outcome["status"] == "cancelled":
+            stopped.append(f"{name}: {outcome['error']}")
+        else:
+            failed.append(f"{name}: {outcome['error']}")
+    partial = {"completed_scenarios": list(data_map), "saved_files": saved, "measurements": data_map}
+
+    if cancel_token.cancelled:
+        raise JobCancelled("Job cancelled", partial)
+    if stopped:
+        raise StageTimeout("; ".join(stopped), partial)
+    if failed:
+        log_cb(f"❌ Error: {'; '.join(failed)}")
+        return dict(partial, success=False, error="; ".join(failed))
+
+    report = _start_report(cfg, log_cb)
+    for name, *_ in SCENARIOS:
+        report.add_scenario(name, data_map[name])
+    excel_path = _finish_report(report, log_cb)
+    loadflow = _merge_loadflow(o["result"]["loadflow"] for o in outcomes)
+    return {"success": True, "excel_path": excel_path, "saved_files": saved, "measurements": data_map,
+            "loadflow": loadflow}
+
+def _psse_api():
+    """
+    Instrumented handle from the session (psspy itself if PSSE is missing);
+    with INS_PSSE_BACKEND=fake the session hands back the NumPy stand-in.
+    Returns (api, default int, default real).
+    """
+    if psspy:
+        api = psse_session.init_psse(psspy, redirect)
+    elif psse_session.BACKEND == "fake":
+        api = psse_session.init_psse()
+    else:
+        api = psspy
+    int_default, real_default = (api.getdefaultint(), api.getdefaultreal()) if api else (_i, _f)
+    return api, int_default, real_default
 
-def run_check_logic(cfg: Dict, mode: str, log_cb: Callable[[str], None]):
+def run_check_logic(cfg: Dict, mode: str, log_cb: Callable[[str], None], cancel_token=None):
     try:
         if mode == "SAVE_AS":
             src = cfg["SAV_PATH"]
@@ -734,36 +834,60 @@ def run_check_logic(cfg: Dict, mode: str, log_cb: Callable[[str], None]):
             log_cb(f"💾 Saved successfully to: {dst}")
             return
         
-        if redirect: redirect.psse2py()
-        if psspy: psspy.psseinit(10000)
-        
         if not os.path.isfile(cfg["SAV_PATH"]):
             log_cb("⚠️ Invalid or missing .sav file!")
-            return
-        
-        if psspy: psspy.case(cfg["SAV_PATH"])
+            return {"success": False, "error": f"Invalid or missing .sav file: {cfg['SAV_PATH']}"}
+
+        # Outside a worker the scenarios go to the pool side by side; inside
+        # one (e.g. a batch item) they run here one after another
+        if mode == "RUN_ALL" and not in_worker_process():
+            return run_all_parallel(cfg, log_cb, cancel_token)
+
+        api, int_default, real_default = _psse_api()
+        if api: api.case(cfg["SAV_PATH"])
         log_cb("✅ PSSE model loaded successfully")
         
         if mode == "RUN_ALL":
-            run_all_cases(psspy, log_cb, cfg, _i, _f)
+            return run_all_cases(api, log_cb, cfg, int_default, real_default, cancel_token)
         elif mode == "Max Lag":
-            check_max_lag(psspy, log_cb, cfg, _i, _f)
-            psspy.save(cfg["SAV_PATH"])
+            check_max_lag(api, log_cb, cfg, int_default, real_default)
+            api.save(cfg["SAV_PATH"])
         elif mode == "Max Lead":
-            check_max_lead(psspy, log_cb, cfg, _i, _f)
-            psspy.save(cfg["SAV_PATH"])
+            check_max_lead(api, log_cb, cfg, int_default, real_default)
+            api.save(cfg["SAV_PATH"])
         elif mode == "0.95 Lagging":
-            check_095_lagging(psspy, log_cb, cfg, _i, _f)
-            psspy.save(cfg["SAV_PATH"])
+            check_095_lagging(api, log_cb, cfg, int_default, real_default)
+            api.save(cfg["SAV_PATH"])
         elif mode == "0.95 Leading":
-            check_095_leading(psspy, log_cb, cfg, _i, _f)
-            psspy.save(cfg["SAV_PATH"])
+            check_095_leading(api, log_cb, cfg, int_default, real_default)
+            api.save(cfg["SAV_PATH"])
         else:
             log_cb(f"⚠️ Invalid mode: {mode}")
             
+    except JobCancelled as e:
+        log_cb(f"⏹️ Stopped: {e}")
+        raise
     except Exception as e:
         log_cb(f"❌ Error: {e}")
         log_cb(traceback.format_exc())
+        return {"success": False, "error": str(e)}
+
+def run_check_task(cfg: Dict, mode: str):
+    """Entry point for the PSSE worker pool"""
+    job = get_current_job()
+    return run_check_logic(cfg, mode, job.log if job else print)
+
+def run_scenario_task(cfg: Dict, name: str, memo_key: Optional[str] = None):
+    """Pool entry point for one RUN_ALL scenario"""
+    job = get_current_job()
+    log_cb = job.log if job else print
+    api, int_default, real_default = _psse_api()
+    api.case(cfg["SAV_PATH"])
+    load_flow = get_load_flow(api, log_cb)
+    mark = load_flow.mark()
+    with use_solve_memo(shared_solve_memo(memo_key) if memo_key else None):
+        measurements, out_path = run_scenario(api, log_cb, cfg, name, int_default, real_default)
+    return {"measurements": measurements, "saved_file": out_path, "loadflow": load_flow.summary(mark)}
 
 
 # ...
@@ -0,0 +1,101 @@
+import time
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+from app.services.metrics_service.psspy_profiler import profile_stage
+
+# Budget key that applies to the whole job rather than one stage
+TOTAL_BUDGET = "total"
+
+
+class JobCancelled(Exception):
+    """
+    Raised inside a running job when it has been cancelled.
+    `partial` carries whatever results the job had produced so far.
+    """
+    def __init__(self, message: str = "Job cancelled", partial: Any = None):
+        super().__init__(message)
+        self.partial = partial
+
+
+class StageTimeout(JobCancelled):
+    """Raised when a stage exceeds its wall-clock budget"""
+
+
+class CancellationToken:
+    """
+    Cooperative cancellation flag checked by long solver loops between solves.
+
+    `event` may be a threading.Event or a multiprocessing Event (for worker
+    processes). `budgets` maps stage names to wall-clock limits in seconds;
+    the "total" budget starts when the token is created.
+    """
+    def __init__(self, event=None, budgets: Optional[Dict[str, float]] = None):
+        self._event = event if event is not None else threading.Event()
+        self.budgets = {}
+        self._stages = []
+        self._total_deadline = None
+        self.set_budgets(budgets)
+
+    def set_budgets(self, budgets: Optional[Dict[str, float]]):
+        self.budgets = dict(budgets or {})
+        total = self.budgets.get(TOTAL_BUDGET)
+        self._total_deadline = time.monotonic() + total if total else None
+
+    def child(self, budgets: Optional[Dict[str, float]] = None) -> "CancellationToken":
+        """A token that is cancelled together with this one but has its own budgets"""
+        return CancellationToken(self._event, budgets)
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def reason(self) -> Optional[str]:
+        """Why the work should stop, or None if it may continue"""
+        if self._event.is_set():
+            return "Job cancelled"
+        now = time.monotonic()
+        if self._total_deadline is not None and now > self._total_deadline:
+            return f"Job exceeded its time budget of {self.budgets[TOTAL_BUDGET]}s"
+        for name, deadline in self._stages:
+            if deadline is not None and now > deadline:
+                return f"Stage '{name}' exceeded its time budget of {self.budgets[name]}s"
+        return None
+
+    def check(self):
+        """Raise JobCancelled / StageTimeout if the work should stop"""
+        reason = self.reason()
+        if reason is None:
+            return
+        if self._event.is_set():
+            raise JobCancelled(reason)
+        raise StageTimeout(reason)
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Apply the budget configured for `name` (if any) while inside the block;
+        psspy calls made inside are profiled under `name` too.
+        """
+        budget = self.budgets.get(name)
+        entry = (name, time.monotonic() + budget if budget else None)
+        self._stages.append(entry)
+        try:
+            self.check()
+            with profile_stage(name):
+                yield self
+        finally:
+            self._stages.remove(entry)
+
+
+def current_cancel_token() -> CancellationToken:
+    """
+    Cancellation token of the job (or worker task) running on this thread.
+    Outside a job this is a fresh token that never fires.
+    """
+    from app.services.job_service.job_manager import get_current_job
+    token = getattr(get_current_job(), "cancel_token", None)
+    return token if token is not None else CancellationToken()
@@ -0,0 +1,76 @@
+import os
+import json
+import hashlib
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterable, Optional
+from app.services.metrics_service.metrics import count
+
+
+def _file_fingerprint(path: str) -> str:
+    """Path, size and mtime: cheap, and changes whenever the file is rewritten"""
+    abspath = os.path.abspath(path)
+    try:
+        st = os.stat(abspath)
+    except OSError:
+        return f"{abspath}:missing"
+    return f"{abspath}:{st.st_size}:{st.st_mtime_ns}"
+
+
+def request_key(kind: str, payload: Any, input_paths: Iterable[Optional[str]] = ()) -> str:
+    """
+    Canonical hash of an operation, its request body and the current state of
+    its input files. Identical requests on unchanged inputs share a key.
+    """
+    if hasattr(payload, "dict"):
+        payload = payload.dict()
+    h = hashlib.sha256()
+    h.update(kind.encode("utf-8"))
+    h.update(b"\0")
+    h.update(json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8"))
+    for path in input_paths:
+        if path:
+            h.update(b"\0")
+            h.update(_file_fingerprint(path).encode("utf-8"))
+    return h.hexdigest()
+
+
+class Coalescer:
+    """
+    Collapses identical concurrent calls: while a call for a key is running,
+    further calls with the same key wait for it and get the same result
+    (or the same exception) instead of running the work again.
+    """
+    def __init__(self):
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def run(self, key: str, fn: Callable, *args, **kwargs):
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+
+        if not owner:
+            count("coalesced_requests")
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._inflight)
+
+
+coalescer = Coalescer()
@@ -0,0 +1,222 @@
+import os
+import threading
+import time
+import traceback
+import uuid
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+from app.services.job_service.cancellation import CancellationToken, JobCancelled
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+# Max events kept per job; late subscribers can only replay this tail
+EVENT_BUFFER_SIZE = int(os.getenv("INS_JOB_EVENT_BUFFER", "1000"))
+
+_current_job = contextvars.ContextVar("ins_current_job", default=None)
+
+
+def get_current_job():
+    """Job bound to the calling thread, or None outside the job engine"""
+    return _current_job.get()
+
+
+def emit_event(kind: str, data: Any):
+    """Publish a structured event (e.g. per-iteration numbers) to the current job, if any"""
+    job = _current_job.get()
+    if job is not None:
+        job.emit(kind, data)
+
+
+class Job:
+    """
+    A unit of background work submitted to the JobManager.
+    The callable receives the Job itself so it can report progress.
+    """
+    def __init__(self, kind: str, params: Optional[Dict[str, Any]] = None, dedupe_key: Optional[str] = None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params or {}
+        self.dedupe_key = dedupe_key
+        # Identical submissions that were attached to this job instead of running again
+        self.attached = 0
+        self.status = QUEUED
+        self.progress = 0.0
+        self.message = ""
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+        self._events = deque(maxlen=EVENT_BUFFER_SIZE)
+        self._seq = 0
+        self.cancel_token = CancellationToken()
+
+    @property
+    def done(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def emit(self, kind: str, data: Any):
+        """Append an event to the ring buffer; the oldest events fall off when full"""
+        with self._lock:
+            self._append_event(kind, data)
+
+    def _append_event(self, kind: str, data: Any):
+        self._seq += 1
+        self._events.append({"seq": self._seq, "time": time.time(), "type": kind, "data": data})
+
+    def log(self, msg: str):
+        """Record a log line as the job message and stream it to subscribers"""
+        with self._lock:
+            self.message = msg
+        self.emit("log", msg)
+        print(f"[Job {self.id[:8]}] {msg}")
+
+    def set_progress(self, fraction: float, message: str = None):
+        with self._lock:
+            self.progress = max(0.0, min(1.0, float(fraction)))
+            if message is not None:
+                self.message = message
+        self.emit("progress", {"progress": self.progress, "message": message})
+
+    def events_since(self, seq: int):
+        """
+        Events with a sequence number greater than `seq`.
+        Returns (events, dropped, done): dropped is True if some requested events
+        already fell off the ring buffer, done is True if no more events will follow.
+        """
+        with self._lock:
+            events = [e for e in self._events if e["seq"] > seq]
+            first_seq = self._events[0]["seq"] if self._events else self._seq + 1
+            done = self.done
+        return events, seq < first_seq - 1, done
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "job_id": self.id,
+                "kind": self.kind,
+                "status": self.status,
+                "progress": self.progress,
+                "message": self.message,
+                "error": self.error,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "last_seq": self._seq,
+                "cancel_requested": self.cancel_token.cancelled,
+                "attached": self.attached,
+            }
+
+
+class JobManager:
+    """
+    Runs blocking service calls on a managed thread pool so request handlers
+    return immediately with a job id.
+    """
+    def __init__(self, max_workers: int = 4, max_finished_jobs: int = 200):
+        self.max_finished_jobs = max_finished_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ins-job")
+        self._jobs: Dict[str, Job] = {}
+        # dedupe_key -> unfinished job
+        self._active_by_key: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, fn: Callable[[Job], Any], params: Optional[Dict[str, Any]] = None,
+               dedupe_key: Optional[str] = None) -> Job:
+        """
+        Queue `fn` as a new job. If `dedupe_key` matches a job that has not
+        finished yet, that job is returned instead and nothing new runs.
+        """
+        with self._lock:
+            if dedupe_key is not None:
+                existing = self._active_by_key.get(dedupe_key)
+                if existing is not None and not existing.done:
+                    with existing._lock:
+                        existing.attached += 1
+                        existing._append_event("attached", existing.attached)
+                    return existing
+            job = Job(kind, params, dedupe_key)
+            self._jobs[job.id] = job
+            if dedupe_key is not None:
+                self._active_by_key[dedupe_key] = job
+            self._prune()
+        self._executor.submit(self._run, job, fn)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Request cancellation. Running work stops at its next checkpoint;
+        a queued job is cancelled as soon as it is picked up.
+        """
+        job = self.get(job_id)
+        if job is not None and not job.done:
+            job.cancel_token.cancel()
+            job.emit("status", "cancelling")
+        return job
+
+    def list(self) -> List[Job]:
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda j: j.created_at, reverse=True)
+
+    def _run(self, job: Job, fn: Callable[[Job], Any]):
+        token = _current_job.set(job)
+        with job._lock:
+            job.status = RUNNING
+            job.started_at = time.time()
+            job._append_event("status", RUNNING)
+        try:
+            job.cancel_token.check()
+            result = fn(job)
+            self._finish(job, SUCCEEDED, result=result)
+        except JobCancelled as e:
+            # Cancelled or out of time: keep whatever partial results the work reported
+            job.log(f"Stopped: {e}")
+            self._finish(job, CANCELLED, result=e.partial, error=str(e))
+        except Exception as e:
+            traceback.print_exc()
+            # HTTPException from the shared route helpers carries a structured detail
+            detail = getattr(e, "detail", None)
+            self._finish(job, FAILED, error=detail if detail is not None else str(e))
+        finally:
+            _current_job.reset(token)
+
+    def _finish(self, job: Job, status: str, result: Any = None, error: Any = None):
+        # The terminal status event is appended under the same lock, so a
+        # subscriber that sees `done` has also seen the final event.
+        with job._lock:
+            job.result = result
+            job.error = error
+            if status == SUCCEEDED:
+                job.progress = 1.0
+            job.status = status
+            job.finished_at = time.time()
+            job._append_event("status", status)
+        if job.dedupe_key is not None:
+            with self._lock:
+                if self._active_by_key.get(job.dedupe_key) is job:
+                    del self._active_by_key[job.dedupe_key]
+
+    def _prune(self):
+        """Drop the oldest finished jobs once the history limit is exceeded"""
+        finished = [j for j in self._jobs.values() if j.done]
+        excess = len(finished) - self.max_finished_jobs
+        if excess <= 0:
+            return
+        for job in sorted(finished, key=lambda j: j.finished_at or 0)[:excess]:
+            del self._jobs[job.id]
+
+
+job_manager = JobManager(max_workers=int(os.getenv("INS_JOB_WORKERS", "4")))
@@ -0,0 +1,80 @@
+import os
+import queue
+import importlib
+import traceback
+import multiprocessing
+from typing import Any, Callable, Optional
+from app.services.job_service.cancellation import CancellationToken
+from app.services.metrics_service.metrics import REGISTRY
+
+# How often the parent checks for a result, a dead child or cancellation
+POLL_INTERVAL = 0.2
+
+
+class SubprocessError(Exception):
+    """The target raised inside the child process, or the child died"""
+    def __init__(self, message: str, traceback_text: str = ""):
+        super().__init__(message)
+        self.traceback = traceback_text
+
+
+def _resolve_target(target: str) -> Callable:
+    """'package.module:function' -> function"""
+    module_name, func_name = target.split(":")
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+def _child_main(target: str, args: tuple, kwargs: dict, cwd: Optional[str], results):
+    try:
+        # Import before changing directory: sys.path may contain relative entries
+        fn = _resolve_target(target)
+        if cwd:
+            os.chdir(cwd)
+        result = fn(*args, **kwargs)
+        reply = ("done", result)
+    except BaseException as e:
+        reply = ("error", str(e), traceback.format_exc())
+    results.put(("metrics", REGISTRY.drain()))
+    results.put(reply)
+
+
+def run_in_subprocess(target: str, args: tuple = (), kwargs: Optional[dict] = None, cwd: Optional[str] = None,
+                      cancel_token: Optional[CancellationToken] = None) -> Any:
+    """
+    Run `target` ('module:function') in a fresh process whose working
+    directory is `cwd`, and return its result. The server's own cwd is never
+    touched, so several of these can run at once. Cancelling the token
+    terminates the child and raises JobCancelled.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    process = ctx.Process(target=_child_main, args=(target, args, kwargs or {}, cwd, results), daemon=True)
+    process.start()
+    try:
+        while True:
+            try:
+                msg = results.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                if cancel_token is not None and cancel_token.reason() is not None:
+                    process.terminate()
+                    cancel_token.check()
+                if not process.is_alive():
+                    # The result may have been queued just before exit
+                    try:
+                        msg = results.get(timeout=POLL_INTERVAL)
+                    except queue.Empty:
+                        raise SubprocessError(f"Process for {target} exited with code {process.exitcode}")
+                else:
+                    continue
+
+            if msg[0] == "metrics":
+                REGISTRY.merge(msg[1])
+                continue
+            if msg[0] == "error":
+                raise SubprocessError(msg[1], msg[2])
+            return msg[1]
+    finally:
+        process.join(timeout=5)
+        if process.is_alive():
+            process.terminate()
+        results.close()
@@ -0,0 +1,330 @@
+import math
+import time
+import threading
+import functools
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.services.metrics_service.psspy_profiler import record_call
+
+# Seconds; covers sub-millisecond psspy calls up to multi-minute builds
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value))
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def drain(self) -> dict:
+        with self._lock:
+            values, self._values = self._values, {}
+        return {"|".join(k): v for k, v in values.items()}
+
+    def merge(self, data: dict):
+        with self._lock:
+            for k, v in data.items():
+                key = tuple(k.split("|")) if self.labelnames else ()
+                self._values[key] = self._values.get(key, 0.0) + v
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}_total{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels"""
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # labels -> [count per bucket (non-cumulative)..., sum]
+        self._values: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        idx = 0
+        while value > self.buckets[idx]:
+            idx += 1
+        with self._lock:
+            row = self._values.get(key)
+            if row is None:
+                row = self._values[key] = [0] * len(self.buckets) + [0.0]
+            row[idx] += 1
+            row[-1] += value
+
+    def drain(self) -> dict:
+        with self._lock:
+            values, self._values = self._values, {}
+        return {"|".join(k): v for k, v in values.items()}
+
+    def merge(self, data: dict):
+        with self._lock:
+            for k, incoming in data.items():
+                key = tuple(k.split("|")) if self.labelnames else ()
+                row = self._values.get(key)
+                if row is None:
+                    self._values[key] = list(incoming)
+                else:
+                    for i, v in enumerate(incoming):
+                        row[i] += v
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+        lines = []
+        for key, row in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, row):
+                cumulative += n
+                le = (("le", _format_value(bound) if bound != math.inf else "+Inf"),)
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(row[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for m in metrics:
+            lines.append(f"# HELP {m.name} {m.documentation}")
+            lines.append(f"# TYPE {m.name} {m.type_name}")
+            lines.extend(m.render())
+        return "\n".join(lines) + "\n"
+
+    def drain(self) -> Dict[str, dict]:
+        """Take and reset everything recorded so far (worker processes ship this to the parent)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {m.name: d for m in metrics for d in [m.drain()] if d}
+
+    def merge(self, data: Optional[Dict[str, dict]]):
+        if not data:
+            return
+        with self._lock:
+            metrics = dict(self._metrics)
+        for name, values in data.items():
+            metric = metrics.get(name)
+            if metric is not None:
+                metric.merge(values)
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_LATENCY = REGISTRY.register(Histogram(
+    "ins_http_request_duration_seconds", "HTTP request latency by route template",
+    ("method", "path", "status")))
+STAGE_LATENCY = REGISTRY.register(Histogram(
+    "ins_stage_duration_seconds", "Wall time of named service stages", ("stage",)))
+OPERATIONS = REGISTRY.register(Counter(
+    "ins_operations", "Count of named service operations", ("op",)))
+
+
+def observe_stage(stage: str, seconds: float):
+    STAGE_LATENCY.observe(seconds, stage=stage)
+    OPERATIONS.inc(op=stage)
+
+
+@contextmanager
+def stage_timer(stage: str):
+    """Time the enclosed block as `stage` (also counted, including failures)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - start)
+
+
+def timed(stage: str):
+    """Decorator form of stage_timer"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage_timer(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(op: str, amount: float = 1.0):
+    OPERATIONS.inc(amount, op=op)
+
+
+# --- psspy / PSCAD instrumentation ---
+
+# psspy APIs worth timing individually; everything else passes straight through
+PSSPY_TIMED_CALLS = {
+    "fnsl": "psse.fnsl",
+    "fdns": "psse.fdns",
+    "case": "psse.case_load",
+    "save": "psse.case_save",
+}
+
+
+class InstrumentedPsspy:
+    """
+    Delegates to psspy, timing the solve and case I/O calls for /api/metrics
+    and passing every call through the psspy profiler (a no-op unless a
+    task is being profiled).
+    """
+    def __init__(self, psspy):
+        object.__setattr__(self, "_psspy", psspy)
+        object.__setattr__(self, "_wrapped", {})
+
+    def __getattr__(self, name):
+        wrapped = self._wrapped.get(name)
+        if wrapped is not None:
+            return wrapped
+        attr = getattr(self._psspy, name)
+        if not callable(attr):
+            return attr
+        stage = PSSPY_TIMED_CALLS.get(name)
+        fn = timed(stage)(attr) if stage else attr
+
+        @functools.wraps(attr)
+        def wrapped(*args, **kwargs):
+            return record_call(name, fn, args, kwargs)
+        self._wrapped[name] = wrapped
+        return wrapped
+
+    def __setattr__(self, name, value):
+        setattr(self._psspy, name, value)
+
+
+def instrument_psspy(psspy):
+    if psspy is None or isinstance(psspy, InstrumentedPsspy):
+        return psspy
+    return InstrumentedPsspy(psspy)
+
+
+class _RmiProxy:
+    """
+    Counts and times method calls on an mhi.pscad remote object. Returned
+    mhi objects (projects, components, simulation sets) are wrapped too;
+    proxies passed back as arguments are unwrapped.
+    """
+    def __init__(self, target, label: str):
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_label", label)
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return attr
+        label = self._label
+
+        def call(*args, **kwargs):
+            args = [_unwrap(a) for a in args]
+            kwargs = {k: _unwrap(v) for k, v in kwargs.items()}
+            with stage_timer(label):
+                result = attr(*args, **kwargs)
+            return _wrap_rmi(result, label)
+        return call
+
+    def __setattr__(self, name, value):
+        setattr(self._target, name, value)
+
+    def __eq__(self, other):
+        return self._target == _unwrap(other)
+
+    def __hash__(self):
+        return hash(self._target)
+
+    def __repr__(self):
+        return repr(self._target)
+
+
+def _unwrap(value):
+    return object.__getattribute__(value, "_target") if isinstance(value, _RmiProxy) else value
+
+
+def _wrap_rmi(value, label):
+    if type(value).__module__.startswith("mhi."):
+        return _RmiProxy(value, label)
+    if isinstance(value, list):
+        return [_wrap_rmi(v, label) for v in value]
+    return value
+
+
+def instrument_rmi(app, label: str = "pscad.rmi"):
+    """Wrap a PSCAD application handle so every RMI call is counted and timed"""
+    return _RmiProxy(app, label) if app is not None else None
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request latency per route template
+    (e.g. /api/jobs/{job_id}) so path parameters don't explode cardinality.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            HTTP_LATENCY.observe(time.perf_counter() - start,
+                                 method=scope.get("method", ""), path=path, status=status["code"])
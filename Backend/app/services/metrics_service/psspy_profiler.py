@@ -0,0 +1,126 @@
+import os
+import re
+import json
+import time
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Tuple
+
+# INS_PSSPY_PROFILE=1 profiles every PSSE pool task; reports go to PROFILE_DIR
+PROFILE_ENABLED = os.getenv("INS_PSSPY_PROFILE", "0") == "1"
+PROFILE_DIR = os.getenv("INS_PSSPY_PROFILE_DIR", os.path.join(os.path.expanduser("~"), ".ins_automation", "profiles"))
+
+# Read-only psspy APIs (macdat, brnflo, busdat, abusreal, xfrint, sysmsm, ...).
+# Repeating one with the same arguments before any other call changed the case is redundant.
+GETTER_RE = re.compile(r"(dat|int|flo|real|char|cplx|count|msm)$|^(solved|iterat)$")
+
+_stages = contextvars.ContextVar("ins_psspy_stages", default=())
+_active = contextvars.ContextVar("ins_psspy_profiler", default=None)
+
+
+@contextmanager
+def profile_stage(name: str):
+    """Group psspy calls made inside the block under `name` (nested stages stack)"""
+    token = _stages.set(_stages.get() + (name,))
+    try:
+        yield
+    finally:
+        _stages.reset(token)
+
+
+class PsspyProfiler:
+    """Per-task call counts and latency by (stage path, psspy API)"""
+    def __init__(self, label: str):
+        self.label = label
+        self.started = time.perf_counter()
+        self.calls: Dict[Tuple[Tuple[str, ...], str], list] = {}
+        self.redundant: Dict[str, int] = {}
+        self._seen_getters = set()
+
+    def record(self, api: str, args: tuple, kwargs: dict, seconds: float):
+        key = (_stages.get(), api)
+        entry = self.calls.get(key)
+        if entry is None:
+            entry = self.calls[key] = [0, 0.0]
+        entry[0] += 1
+        entry[1] += seconds
+
+        if GETTER_RE.search(api):
+            call = (api, repr(args), repr(sorted(kwargs.items())) if kwargs else "")
+            if call in self._seen_getters:
+                self.redundant[api] = self.redundant.get(api, 0) + 1
+            else:
+                self._seen_getters.add(call)
+        else:
+            # Anything else may have changed the case; earlier reads are stale
+            self._seen_getters.clear()
+
+    def folded(self) -> str:
+        """Folded stacks (task;stage;...;api microseconds) for flamegraph.pl / speedscope"""
+        lines = []
+        for (stages, api), (_, seconds) in sorted(self.calls.items()):
+            frames = ";".join((self.label,) + stages + (api,))
+            lines.append(f"{frames} {max(int(seconds * 1e6), 1)}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self, top: int = 15) -> Dict[str, Any]:
+        wall = time.perf_counter() - self.started
+        by_api: Dict[str, list] = {}
+        by_stage: Dict[str, list] = {}
+        for (stages, api), (n, seconds) in self.calls.items():
+            for table, name in ((by_api, api), (by_stage, "/".join(stages) or "(none)")):
+                row = table.setdefault(name, [0, 0.0])
+                row[0] += n
+                row[1] += seconds
+        psspy_seconds = sum(s for _, s in by_api.values())
+
+        def rows(table):
+            return [{"name": name, "calls": n, "seconds": round(s, 6),
+                     "share": round(s / wall, 4) if wall else 0.0}
+                    for name, (n, s) in sorted(table.items(), key=lambda kv: kv[1][1], reverse=True)[:top]]
+
+        return {
+            "task": self.label,
+            "wall_seconds": round(wall, 4),
+            "psspy_seconds": round(psspy_seconds, 4),
+            "calls": sum(n for n, _ in by_api.values()),
+            "by_api": rows(by_api),
+            "by_stage": rows(by_stage),
+            "redundant_getter_calls": dict(sorted(self.redundant.items(), key=lambda kv: kv[1], reverse=True)),
+        }
+
+    def dump(self, folder: str = PROFILE_DIR) -> Dict[str, str]:
+        """Write <label>_<pid>_<time>.folded and .json; returns both paths"""
+        os.makedirs(folder, exist_ok=True)
+        stem = os.path.join(folder, f"{self.label}_{os.getpid()}_{time.strftime('%Y%m%d_%H%M%S')}")
+        with open(stem + ".folded", "w", encoding="utf-8") as f:
+            f.write(self.folded())
+        with open(stem + ".json", "w", encoding="utf-8") as f:
+            json.dump(self.summary(top=1000), f, indent=2)
+        return {"folded": stem + ".folded", "summary": stem + ".json"}
+
+
+def record_call(api: str, fn, args: tuple, kwargs: dict):
+    """Call fn, recording it with the active profiler (if any)"""
+    profiler = _active.get()
+    if profiler is None:
+        return fn(*args, **kwargs)
+    start = time.perf_counter()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        profiler.record(api, args, kwargs, time.perf_counter() - start)
+
+
+@contextmanager
+def profile(label: str, enabled: Optional[bool] = None):
+    """Profile psspy calls made by this task; yields the profiler, or None when disabled"""
+    if not (PROFILE_ENABLED if enabled is None else enabled):
+        yield None
+        return
+    profiler = PsspyProfiler(label)
+    token = _active.set(profiler)
+    try:
+        yield profiler
+    finally:
+        _active.reset(token)
@@ -1,6 +1,9 @@
 import sys
 import os
 import traceback
+from app.services.cache_service.build_cache import build_cache, build_in
+from app.services.job_service.cancellation import current_cancel_token
+from app.services.job_service.subprocess_runner import run_in_subprocess, SubprocessError
 
 # Add libs to path
 LIBS_PATH = os.path.join(os.path.dirname(__file__), "build_model_libs")
@@ -22,10 +25,11 @@ class PscadBuildService:
     def __init__(self):
         pass
 
-    def build_equivalent_model(self, excel_path: str, template_path: str = None):
+    def build_equivalent_model(self, excel_path: str, template_path: str = None, force_rebuild: bool = False):
         """
         Build PSCAD equivalent model.
         If template_path is not provided, uses the default template in Backend/templates/form_final.pscx
+        Outputs are cached on the workbook + template content unless force_rebuild is set.
         """
         if not os.path.exists(excel_path):
             raise FileNotFoundError(f"File not found: {excel_path}")
@@ -39,25 +43,44 @@ class PscadBuildService:
             
         if not os.path.exists(template_path):
             raise FileNotFoundError(f"Template not found: {template_path}")
-            
+
+        return build_cache.run(
+            "pscad.equivalent", excel_path,
+            lambda output_dir: self._build_equivalent_model(excel_path, template_path, output_dir),
+            extra_inputs=[template_path],
+            force_rebuild=force_rebuild
+        )
+
+    def _build_equivalent_model(self, excel_path: str, template_path: str, output_dir: str):
+        # Outputs are generated in the input file directory, so the build runs
+        # in its own process on a copy of the workbook in output_dir
         try:
-             original_cwd = os.getcwd()
-             os.chdir(os.path.dirname(excel_path))
-             
-             try:
-                 if PSCAD_Model is None:
-                     raise ImportError("PSCAD_Model could not be imported. Please check dependencies.")
-                 # PSCAD_Model.PSCAD_Model(excel_path).main(template_path)
-                 instance = PSCAD_Model.PSCAD_Model(excel_path)
-                 instance.main(template_path)
-                 result = {"success": True, "message": "PSCAD equivalent model built successfully"}
-             finally:
-                 os.chdir(original_cwd)
-                 
-             return result
-        except Exception as e:
-             return {
-                 "success": False, 
-                 "message": str(e),
-                 "traceback": traceback.format_exc()
-             }
+            return run_in_subprocess(
+                "app.services.pscad_build_service:equivalent_model_task",
+                (os.path.abspath(excel_path), os.path.abspath(template_path), output_dir),
+                cwd=output_dir,
+                cancel_token=current_cancel_token()
+            )
+        except SubprocessError as e:
+            return {"success": False, "message": str(e), "traceback": e.traceback}
+
+
+def equivalent_model_task(excel_path: str, template_path: str, output_dir: str):
+    """Entry point run inside the build process (cwd = output_dir)"""
+    return build_in(output_dir, lambda workbook: _equivalent_model(workbook, template_path), excel_path)
+
+
+def _equivalent_model(excel_path: str, template_path: str):
+    try:
+        if PSCAD_Model is None:
+            raise ImportError("PSCAD_Model could not be imported. Please check dependencies.")
+        # PSCAD_Model.PSCAD_Model(excel_path).main(template_path)
+        instance = PSCAD_Model.PSCAD_Model(excel_path)
+        instance.main(template_path)
+        return {"success": True, "message": "PSCAD equivalent model built successfully"}
+    except Exception as e:
+        return {
+            "success": False,
+            "message": str(e),
+            "traceback": traceback.format_exc()
+        }
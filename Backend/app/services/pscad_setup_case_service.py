@@ -5,6 +5,7 @@ import shutil
 import logging
 import re
 from typing import List, Dict, Any
+from app.services.metrics_service.metrics import instrument_rmi
 
 # Add Backend root
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
@@ -56,9 +57,9 @@ class PSCADCreateCaseService:
         if vers:
             fortran = sorted(vers)[-1]
             settings = {'fortran_version': fortran}
-            self.pscad_app = mhi.pscad.launch(minimize=True, version=version, x64=x64, settings=settings)
+            self.pscad_app = instrument_rmi(mhi.pscad.launch(minimize=True, version=version, x64=x64, settings=settings))
         else:
-            self.pscad_app = mhi.pscad.launch(minimize=True, version=version, x64=x64)
+            self.pscad_app = instrument_rmi(mhi.pscad.launch(minimize=True, version=version, x64=x64))
             
         return self.pscad_app
 
@@ -1,6 +1,9 @@
 import sys
 import os
 import traceback
+from app.services.cache_service.build_cache import build_cache, build_in
+from app.services.job_service.cancellation import current_cancel_token
+from app.services.job_service.subprocess_runner import run_in_subprocess, SubprocessError
 
 # Add libs to path
 LIBS_PATH = os.path.join(os.path.dirname(__file__), "build_model_libs")
@@ -17,51 +20,73 @@ class PsseBuildService:
     def __init__(self):
         pass
 
-    def build_equivalent_model(self, excel_path: str):
+    def build_equivalent_model(self, excel_path: str, force_rebuild: bool = False):
         if not os.path.exists(excel_path):
             raise FileNotFoundError(f"File not found: {excel_path}")
-        
-        try:
-            # Change CWD to the input file directory so outputs are generated there (common behavior expectation)
-            original_cwd = os.getcwd()
-            os.chdir(os.path.dirname(excel_path))
-            
-            try:
-                # PSSE_Model.PSSE_model(excel_path).main()
-                # Note: Assuming the class name inside the module is PSSE_model or similar based on user provided main.py
-                instance = PSSE_Model.PSSE_model(excel_path)
-                instance.main()
-                result = {"success": True, "message": "Equivalent model built successfully"}
-            finally:
-                os.chdir(original_cwd)
-                
-            return result
-        except Exception as e:
-            return {
-                "success": False, 
-                "message": str(e),
-                "traceback": traceback.format_exc()
-            }
-
-    def build_detailed_model(self, excel_path: str):
+
+        return build_cache.run(
+            "psse.equivalent", excel_path,
+            lambda output_dir: self._build_equivalent_model(excel_path, output_dir),
+            force_rebuild=force_rebuild
+        )
+
+    def _build_equivalent_model(self, excel_path: str, output_dir: str):
+        # Outputs are generated in the input file directory, so the build runs
+        # in its own process on a copy of the workbook in output_dir
+        return _run_build("app.services.psse_build_service:equivalent_model_task", excel_path, output_dir)
+
+    def build_detailed_model(self, excel_path: str, force_rebuild: bool = False):
         if not os.path.exists(excel_path):
             raise FileNotFoundError(f"File not found: {excel_path}")
-            
-        try:
-            original_cwd = os.getcwd()
-            os.chdir(os.path.dirname(excel_path))
-            
-            try:
-                # PSSE_Model_Detail.detail_model(excel_path)
-                PSSE_Model_Detail.detail_model(excel_path)
-                result = {"success": True, "message": "Detailed model built successfully"}
-            finally:
-                os.chdir(original_cwd)
-            
-            return result
-        except Exception as e:
-            return {
-                "success": False, 
-                "message": str(e),
-                "traceback": traceback.format_exc()
-            }
+
+        return build_cache.run(
+            "psse.detailed", excel_path,
+            lambda output_dir: self._build_detailed_model(excel_path, output_dir),
+            force_rebuild=force_rebuild
+        )
+
+    def _build_detailed_model(self, excel_path: str, output_dir: str):
+        return _run_build("app.services.psse_build_service:detailed_model_task", excel_path, output_dir)
+
+
+def _run_build(target: str, excel_path: str, output_dir: str):
+    try:
+        return run_in_subprocess(target, (os.path.abspath(excel_path), output_dir), cwd=output_dir,
+                                 cancel_token=current_cancel_token())
+    except SubprocessError as e:
+        return {"success": False, "message": str(e), "traceback": e.traceback}
+
+
+# --- Entry points run inside the build process (cwd = output_dir) ---
+
+def equivalent_model_task(excel_path: str, output_dir: str):
+    return build_in(output_dir, _equivalent_model, excel_path)
+
+def detailed_model_task(excel_path: str, output_dir: str):
+    return build_in(output_dir, _detailed_model, excel_path)
+
+def _equivalent_model(excel_path: str):
+    try:
+        # PSSE_Model.PSSE_model(excel_path).main()
+        # Note: Assuming the class name inside the module is PSSE_model or similar based on user provided main.py
+        instance = PSSE_Model.PSSE_model(excel_path)
+        instance.main()
+        return {"success": True, "message": "Equivalent model built successfully"}
+    except Exception as e:
+        return {
+            "success": False,
+            "message": str(e),
+            "traceback": traceback.format_exc()
+        }
+
+def _detailed_model(excel_path: str):
+    try:
+        # PSSE_Model_Detail.detail_model(excel_path)
+        PSSE_Model_Detail.detail_model(excel_path)
+        return {"success": True, "message": "Detailed model built successfully"}
+    except Exception as e:
+        return {
+            "success": False,
+            "message": str(e),
+            "traceback": traceback.format_exc()
+        }
@@ -0,0 +1,328 @@
+import os
+import shutil
+import tempfile
+import itertools
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from app.services.metrics_service.metrics import count
+
+# Where base-case copies are kept: RAM-backed where the OS has one, else the
+# local temp dir (still faster than the network shares SAVs usually live on)
+SNAPSHOT_DIR = os.getenv("INS_SNAPSHOT_DIR") or ("/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir())
+
+# machine_chng_4 REALAR positions the journal can read back with macdat
+MACHINE_REALS = {0: "P", 1: "Q", 2: "QMAX", 3: "QMIN", 4: "PMAX", 5: "PMIN", 6: "MBASE"}
+# switched_shunt_chng_5 INTGAR positions the journal can read back, with their swsint strings
+# (PSSE 35: N1..N8, MODSW, ADJM, STAT, SWREG, NREG, S1..S8)
+SHUNT_INTS = {8: "MODSW", 10: "STAT"}
+
+_ids = itertools.count(1)
+
+
+class _Unrevertable(Exception):
+    """A change touches a field the journal cannot read back"""
+
+
+class CaseSnapshot:
+    """
+    The base case of a multi-scenario run, captured once.
+
+    restore() reloads it from a byte copy of the SAV in SNAPSHOT_DIR: the
+    exact base network and solution. revert() instead writes back only the
+    fields changed through `api` since the last restore/revert, which is far
+    cheaper than parsing a whole case; solved voltages are not reverted, so
+    the next solve warm-starts from the last scenario's solution. Changes the
+    journal cannot undo (fields it has no getter for, or calls that bypass
+    `api`) make revert() fall back to restore().
+
+        with CaseSnapshot(psspy, sav_path, log_cb) as snapshot:
+            run_scenario(snapshot.api)
+            snapshot.revert()
+            run_scenario(snapshot.api)
+
+    checkpoint() starts a nested journal, so revert() goes back to the state
+    at the checkpoint instead of the base case; release() ends it, keeping
+    its changes in the journal below.
+    """
+    def __init__(self, psspy, sav_path: str, log_cb: Optional[Callable[[str], None]] = None):
+        self.psspy = psspy
+        self.sav_path = sav_path
+        self.log_cb = log_cb
+        self.copy_path = None
+        self.api = _JournalingPsspy(psspy, self)
+        # One (undo, unrevertable) journal per checkpoint, the base case's first.
+        # undo: field key -> (undo api, args), from the field's first change
+        self._layers: List[Tuple[Dict[Tuple, Tuple[str, tuple]], List[str]]] = [({}, [])]
+        self._plants: Optional[Dict[int, Dict[str, Any]]] = None
+        self.restores = 0
+        self.reverts = 0
+
+    def _log(self, msg: str):
+        if self.log_cb:
+            self.log_cb(msg)
+
+    @property
+    def _undo(self) -> Dict[Tuple, Tuple[str, tuple]]:
+        return self._layers[-1][0]
+
+    @property
+    def _unrevertable(self) -> List[str]:
+        return self._layers[-1][1]
+
+    def capture(self) -> "CaseSnapshot":
+        """Copy the SAV to SNAPSHOT_DIR and load it"""
+        name = f"ins_snapshot_{os.getpid()}_{next(_ids)}_{os.path.basename(self.sav_path)}"
+        try:
+            self.copy_path = os.path.join(SNAPSHOT_DIR, name)
+            shutil.copyfile(self.sav_path, self.copy_path)
+        except OSError as e:
+            self._log(f"⚠️ Could not copy the base case to {SNAPSHOT_DIR} ({e}); restores reload {self.sav_path}")
+            self.copy_path = None
+        self._load()
+        return self
+
+    def _load(self):
+        ierr = self.psspy.case(self.copy_path or self.sav_path)
+        if ierr and self.copy_path:
+            ierr = self.psspy.case(self.sav_path)
+        if ierr:
+            raise RuntimeError(f"Could not load {self.sav_path} (ierr={ierr})")
+        self._layers = [({}, [])]
+        self._plants = None
+
+    def restore(self):
+        """Reload the base case exactly"""
+        self._load()
+        self.restores += 1
+        count("snapshot.restores")
+
+    def revert(self) -> bool:
+        """
+        Undo the changes journaled since the last checkpoint (or the capture),
+        newest first. If any cannot be undone the base case is reloaded
+        instead, dropping every checkpoint; returns False then.
+        """
+        if self._unrevertable:
+            self._log(f"Snapshot: reloading the base case ({', '.join(sorted(set(self._unrevertable)))} "
+                      "cannot be reverted field by field)")
+            self.restore()
+            return False
+        for api, args in reversed(list(self._undo.values())):
+            result = getattr(self.psspy, api)(*args)
+            ierr = result[0] if isinstance(result, tuple) else result
+            if ierr:
+                self._log(f"Snapshot: {api}{args[:3]} failed while reverting (ierr={ierr}); reloading the base case")
+                self.restore()
+                return False
+        self._undo.clear()
+        self.reverts += 1
+        count("snapshot.reverts")
+        return True
+
+    def checkpoint(self):
+        """Make the current state the one revert() goes back to, until release()"""
+        self._layers.append(({}, []))
+        self._plants = None
+
+    def release(self):
+        """End the last checkpoint; a later revert() also undoes its changes"""
+        if len(self._layers) < 2:
+            return
+        undo, unrevertable = self._layers.pop()
+        # Fields also changed before the checkpoint keep their older undo
+        for key, value in undo.items():
+            self._undo.setdefault(key, value)
+        self._unrevertable.extend(unrevertable)
+        self._plants = None
+
+    def close(self):
+        if self.copy_path:
+            try:
+                os.remove(self.copy_path)
+            except OSError:
+                pass
+            self.copy_path = None
+
+    def __enter__(self) -> "CaseSnapshot":
+        return self.capture()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- journal ---
+
+    def record(self, api: str, args: tuple, kwargs: dict):
+        """Remember how to undo `api(*args)` before it runs"""
+        recorder = _RECORDERS.get(api)
+        if recorder is None:
+            return
+        try:
+            recorder(self, *args, **kwargs)
+        except Exception:
+            # _Unrevertable, or a getter that failed: only a reload undoes this
+            self._unrevertable.append(api)
+
+    def _remember(self, key: Tuple, undo: Callable[[], Tuple[str, tuple]]):
+        # Only the first change of a field holds its base value, so read it once
+        if key not in self._undo:
+            self._undo[key] = undo()
+
+    def base_plants(self) -> Dict[int, Dict[str, Any]]:
+        """IREG/NREG/VS/RMPCT of every plant, read once per checkpoint (there is no per-plant getter)"""
+        if self._plants is None:
+            ierr_i, ints = self.psspy.aplantint(-1, 4, ["NUMBER", "IREG", "NREG"])
+            ierr_r, reals = self.psspy.aplantreal(-1, 4, ["VSPU", "RMPCT"])
+            if ierr_i or ierr_r:
+                raise _Unrevertable()
+            self._plants = {bus: {"IREG": ireg, "NREG": nreg, "VSPU": vs, "RMPCT": rmpct}
+                            for bus, ireg, nreg, vs, rmpct in zip(*ints, *reals)}
+        return self._plants
+
+
+def _given(value, default) -> bool:
+    return value is not None and value != default
+
+
+def _record_machine(snapshot, ibus, id, intgar, realar, name=""):
+    psspy = snapshot.psspy
+    _i, _f = psspy.getdefaultint(), psspy.getdefaultreal()
+    gid = str(id).strip()
+    if any(_given(v, _i) for v in list(intgar)[1:]) or \
+            any(_given(v, _f) for k, v in enumerate(realar) if k not in MACHINE_REALS):
+        raise _Unrevertable()
+
+    def undo_status():
+        ierr, status = psspy.macint(ibus, id, "STATUS")
+        if ierr:
+            raise _Unrevertable()
+        return "machine_chng_4", (ibus, id, [status] + [_i] * (len(intgar) - 1), [_f] * len(realar), name)
+
+    def undo_real(index):
+        def read():
+            ierr, base = psspy.macdat(ibus, id, MACHINE_REALS[index])
+            if ierr:
+                raise _Unrevertable()
+            reals = [_f] * len(realar)
+            reals[index] = base
+            return "machine_chng_4", (ibus, id, [_i] * len(intgar), reals, name)
+        return read
+
+    # One undo per field, so later changes of other fields add their own
+    if intgar and _given(intgar[0], _i):
+        snapshot._remember(("machine", ibus, gid, "STATUS"), undo_status)
+    for index, value in enumerate(realar):
+        if _given(value, _f):
+            snapshot._remember(("machine", ibus, gid, MACHINE_REALS[index]), undo_real(index))
+
+
+def _record_plant(snapshot, ibus, inode, intgar, realar):
+    def undo():
+        base = snapshot.base_plants().get(ibus)
+        if base is None:
+            raise _Unrevertable()
+        return "plant_chng_4", (ibus, inode, [base["IREG"], base["NREG"]], [base["VSPU"], base["RMPCT"]])
+    snapshot._remember(("plant", ibus), undo)
+
+
+def _record_two_winding(snapshot, ibus, jbus, ckt, intgar, realari, ratings=(), namear="", vgrpar=""):
+    psspy = snapshot.psspy
+    _i, _f = psspy.getdefaultint(), psspy.getdefaultreal()
+    if any(_given(v, _i) for v in intgar) or \
+            any(_given(v, _f) for k, v in enumerate(realari) if k != 3) or \
+            any(_given(v, _f) for v in ratings):
+        raise _Unrevertable()
+
+    def undo():
+        ierr, ratio = psspy.xfrdat(ibus, jbus, ckt, "RATIO")
+        if ierr:
+            raise _Unrevertable()
+        reals = [_f] * len(realari)
+        reals[3] = ratio
+        return "two_winding_data_6", (ibus, jbus, ckt, [_i] * len(intgar), reals, [_f] * len(ratings),
+                                      namear, vgrpar)
+    snapshot._remember(("xfr", frozenset((ibus, jbus)), str(ckt).strip()), undo)
+
+
+def _record_three_winding(snapshot, ibus, jbus, kbus, ckt, warg, intgar, realari, ratings=()):
+    psspy = snapshot.psspy
+    _i, _f = psspy.getdefaultint(), psspy.getdefaultreal()
+    if any(_given(v, _i) for v in intgar) or \
+            any(_given(v, _f) for v in list(realari)[1:]) or \
+            any(_given(v, _f) for v in ratings):
+        raise _Unrevertable()
+    # wnddat reads the winding at its first bus; put the changed winding there
+    buses = (ibus, jbus, kbus)
+    first = buses[warg - 1]
+    others = [b for b in buses if b != first]
+
+    def undo():
+        ierr, ratio = psspy.wnddat(first, others[0], others[1], ckt, "RATIO")
+        if ierr:
+            raise _Unrevertable()
+        reals = [_f] * len(realari)
+        reals[0] = ratio
+        return "three_wnd_winding_data_5", (first, others[0], others[1], ckt, 1, [_i] * len(intgar), reals,
+                                            [_f] * len(ratings))
+    snapshot._remember(("wnd", first, frozenset(buses), str(ckt).strip()), undo)
+
+
+def _record_shunt(snapshot, ibus, id, intgar, realar, name=""):
+    psspy = snapshot.psspy
+    _i, _f = psspy.getdefaultint(), psspy.getdefaultreal()
+    if any(_given(v, _i) for k, v in enumerate(intgar) if k not in SHUNT_INTS) or \
+            any(_given(v, _f) for v in realar):
+        raise _Unrevertable()
+
+    def undo():
+        ints = [_i] * len(intgar)
+        for k, string in SHUNT_INTS.items():
+            ierr, value = psspy.swsint(ibus, id, string)
+            if ierr:
+                raise _Unrevertable()
+            ints[k] = value
+        return "switched_shunt_chng_5", (ibus, id, ints, [_f] * len(realar), name)
+    snapshot._remember(("shunt", ibus, str(id).strip()), undo)
+
+
+# Change APIs the services use -> how to record their undo
+_RECORDERS = {
+    "machine_chng_4": _record_machine,
+    "plant_chng_4": _record_plant,
+    "two_winding_data_6": _record_two_winding,
+    "three_wnd_winding_data_5": _record_three_winding,
+    "switched_shunt_chng_5": _record_shunt,
+}
+# Calls that replace the case underneath the journal
+_CASE_APIS = ("case", "read", "readrawversion", "dyre_new")
+
+
+class _JournalingPsspy:
+    """psspy as seen by the scenarios of a CaseSnapshot: change calls are journaled first"""
+    def __init__(self, psspy, snapshot: CaseSnapshot):
+        object.__setattr__(self, "_psspy", psspy)
+        object.__setattr__(self, "_snapshot", snapshot)
+
+    @property
+    def journal_target(self):
+        """The psspy handle underneath (load_flow keys its solver on it)"""
+        return self._psspy
+
+    def __getattr__(self, name):
+        attr = getattr(self._psspy, name)
+        if name in _RECORDERS:
+            snapshot = self._snapshot
+
+            def journaled(*args, **kwargs):
+                snapshot.record(name, args, kwargs)
+                return attr(*args, **kwargs)
+            return journaled
+        if name in _CASE_APIS:
+            snapshot = self._snapshot
+
+            def replacing(*args, **kwargs):
+                snapshot._unrevertable.append(name)
+                return attr(*args, **kwargs)
+            return replacing
+        return attr
+
+    def __setattr__(self, name, value):
+        setattr(self._psspy, name, value)
@@ -0,0 +1,465 @@
+import json
+import math
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+
+# Case files written by this module are JSON, whatever their extension
+CASE_FORMAT = "ins-fake-psse"
+
+# Convergence tolerance (MW / Mvar). Far tighter than PSSE's 0.1 MVA default
+# so responses are smooth enough to benchmark tuning at its own tolerances.
+TOLERANCE_MVA = 1e-9
+MAX_ITERATIONS = 20
+# Largest mismatch (pu) before a solve is declared blown up
+BLOWN_UP_PU = 1e4
+# Rounds of generator var-limit switching per solve
+MAX_VAR_LIMIT_PASSES = 10
+
+# psspy.solved() codes used here
+CONVERGED, ITERATION_LIMIT, BLOWN_UP, NON_DIVERGENT_STOP, NOT_ATTEMPTED = 0, 1, 2, 3, 8
+
+
+class FakeNetwork:
+    """
+    A small positive-sequence network held as plain dicts (the JSON case
+    format) plus the AC power flow over it. Buses are addressed by number,
+    branches by (from, to, ckt) in either direction, three-winding
+    transformers as a star of three windings around an internal bus.
+    """
+    def __init__(self, data: Dict[str, Any]):
+        self.data = data
+        self.sbase = float(data.get("sbase", 100.0))
+        self.buses = data["buses"]
+        self.branches = data.get("branches", [])
+        self.transformers = data.get("transformers", [])
+        self.transformers3 = data.get("transformers3", [])
+        self.machines = data.get("machines", [])
+        self.plants = data.get("plants", [])
+        self.shunts = data.get("shunts", [])
+        self.meta = data.get("meta", {})
+        self.status = NOT_ATTEMPTED
+        self.iterations = 0
+        self.mismatch = 0j
+        self._index()
+
+    # --- Case I/O ---
+
+    @classmethod
+    def load(cls, path: str) -> "FakeNetwork":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("format") != CASE_FORMAT:
+            raise ValueError(f"{path} is not a {CASE_FORMAT} case")
+        return cls(data)
+
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, indent=1)
+
+    def _index(self):
+        self.bus_pos = {b["number"]: i for i, b in enumerate(self.buses)}
+        self.machine_by_key = {(m["bus"], str(m["id"]).strip()): m for m in self.machines}
+        self.plant_by_bus = {p["bus"]: p for p in self.plants}
+        self.shunt_by_key = {(s["bus"], str(s["id"]).strip()): s for s in self.shunts}
+
+    # --- Lookups used by the psspy facade ---
+
+    def find_branch(self, ibus: int, jbus: int, ckt: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """(branch or 2-winding transformer, True if addressed from its 'from' end)"""
+        ckt = str(ckt).strip()
+        for item in self.branches + self.transformers:
+            if str(item["ckt"]).strip() != ckt:
+                continue
+            if item["from"] == ibus and item["to"] == jbus:
+                return item, True
+            if item["from"] == jbus and item["to"] == ibus:
+                return item, False
+        return None, False
+
+    def find_transformer3(self, ibus: int, jbus: int, kbus: int, ckt: str) -> Tuple[Optional[Dict[str, Any]], int]:
+        """(3-winding transformer, index of the winding at ibus)"""
+        ckt = str(ckt).strip()
+        for item in self.transformers3:
+            if str(item["ckt"]).strip() == ckt and sorted(item["buses"]) == sorted([ibus, jbus, kbus]):
+                return item, item["buses"].index(ibus)
+        return None, -1
+
+    # --- Admittance matrix ---
+
+    def _two_port(self, r: float, x: float, b: float, ratio: float):
+        y = 1.0 / complex(r, x)
+        return y / (ratio * ratio) + 0.5j * b, -y / ratio, -y / ratio, y + 0.5j * b
+
+    def _elements(self):
+        """(from index, to index, Yff, Yft, Ytf, Ytt) of every in-service series element"""
+        rows = []
+        for br in self.branches:
+            if br.get("status", 1):
+                rows.append((self.bus_pos[br["from"]], self.bus_pos[br["to"]])
+                            + self._two_port(br["r"], br["x"], br.get("b", 0.0), 1.0))
+        for tr in self.transformers:
+            if tr.get("status", 1):
+                rows.append((self.bus_pos[tr["from"]], self.bus_pos[tr["to"]])
+                            + self._two_port(tr["r"], tr["x"], 0.0, tr["ratio"]))
+        for t3 in self.transformers3:
+            if t3.get("status", 1):
+                star = self.bus_pos[t3["star"]]
+                for bus, w in zip(t3["buses"], t3["windings"]):
+                    rows.append((self.bus_pos[bus], star) + self._two_port(w["r"], w["x"], 0.0, w["ratio"]))
+        return rows
+
+    def ybus(self) -> np.ndarray:
+        n = len(self.buses)
+        elements = self._elements()
+        Y = np.zeros((n, n), dtype=complex)
+        if elements:
+            f, t, yff, yft, ytf, ytt = (np.array(col) for col in zip(*elements))
+            f, t = f.astype(int), t.astype(int)
+            np.add.at(Y, (f, f), yff)
+            np.add.at(Y, (f, t), yft)
+            np.add.at(Y, (t, f), ytf)
+            np.add.at(Y, (t, t), ytt)
+        # Fixed and switched shunts, given in MW / Mvar at 1 pu
+        shunt = np.array([complex(b.get("gl", 0.0), b.get("bl", 0.0)) for b in self.buses]) / self.sbase
+        for sh in self.shunts:
+            if sh.get("status", 1):
+                shunt[self.bus_pos[sh["bus"]]] += 1j * sh["binit"] / self.sbase
+        Y[np.diag_indices(n)] += shunt
+        return Y
+
+    # --- Power flow ---
+
+    def _injections(self):
+        """Scheduled P (pu) per bus and machine Q (pu) per bus"""
+        n = len(self.buses)
+        p = -np.array([b.get("pl", 0.0) for b in self.buses]) / self.sbase
+        q_load = -np.array([b.get("ql", 0.0) for b in self.buses]) / self.sbase
+        q_gen = np.zeros(n)
+        for m in self.machines:
+            if m.get("status", 1):
+                i = self.bus_pos[m["bus"]]
+                p[i] += m["pg"] / self.sbase
+                q_gen[i] += m.get("qg", 0.0) / self.sbase
+        return p, q_load, q_gen
+
+    def _plant_limits(self, bus: int) -> Tuple[float, float, bool]:
+        qt = qb = 0.0
+        online = False
+        for m in self.machines:
+            if m["bus"] == bus and m.get("status", 1):
+                qt += m["qt"]
+                qb += m["qb"]
+                online = True
+        return qt / self.sbase, qb / self.sbase, online
+
+    def solve(self, flat_start: bool = False, non_divergent: bool = False, apply_var_limits: bool = True,
+              decoupled: bool = False) -> int:
+        """
+        Newton-Raphson (or fast-decoupled) power flow with remote voltage
+        control and generator var limits. Updates bus voltages and machine
+        outputs in place and returns the psspy.solved() code.
+        """
+        n = len(self.buses)
+        Y = self.ybus()
+        p_spec, q_load, q_gen_fixed = self._injections()
+        types = np.array([b.get("type", 1) for b in self.buses])
+        in_service = types != 4
+        slack = np.where(types == 3)[0]
+
+        vm = np.array([b.get("vm", 1.0) for b in self.buses], dtype=float)
+        va = np.radians([b.get("va", 0.0) for b in self.buses])
+        if flat_start:
+            vm[in_service & (types != 3)] = 1.0
+            va[:] = va[slack[0]] if len(slack) else 0.0
+
+        # Voltage-controlling plants: machine bus -> regulated bus
+        controls = {}
+        for plant in self.plants:
+            g = self.bus_pos.get(plant["bus"])
+            if g is None or g in slack or not self._plant_limits(plant["bus"])[2]:
+                continue
+            r = self.bus_pos.get(plant.get("ireg") or plant["bus"], g)
+            if r in slack or r in controls.values():
+                continue
+            controls[g] = r
+            vm[r] = plant["vs"]
+        limited: Dict[int, float] = {}    # machine bus -> Q held at its limit (pu)
+
+        total_iterations = 0
+        status = CONVERGED
+        for _ in range(MAX_VAR_LIMIT_PASSES):
+            active = {g: r for g, r in controls.items() if g not in limited}
+            q_spec = q_load + q_gen_fixed
+            for g, q in limited.items():
+                q_spec[g] = q_load[g] + q
+            pvpq = np.array([i for i in range(n) if i not in slack and in_service[i]], dtype=int)
+            q_eq = np.array([i for i in pvpq if i not in active], dtype=int)
+            v_var = np.array([i for i in pvpq if i not in active.values()], dtype=int)
+            for g, r in active.items():
+                vm[r] = self.plant_by_bus[self.buses[g]["number"]]["vs"]
+
+            solver = self._fast_decoupled if decoupled else self._newton
+            status, iterations, vm, va = solver(Y, vm, va, p_spec, q_spec, pvpq, q_eq, v_var, non_divergent)
+            total_iterations += iterations
+            if status != CONVERGED or not apply_var_limits:
+                break
+
+            # Var limits: hold violating plants at the limit and solve again
+            s = vm * np.exp(1j * va) * np.conj(Y @ (vm * np.exp(1j * va)))
+            newly_limited = False
+            for g in active:
+                qt, qb, _ = self._plant_limits(self.buses[g]["number"])
+                q = s[g].imag - q_load[g]
+                if q > qt + 1e-9:
+                    limited[g], newly_limited = qt, True
+                elif q < qb - 1e-9:
+                    limited[g], newly_limited = qb, True
+            if not newly_limited:
+                break
+
+        self.iterations = total_iterations
+        self.status = status
+        F, V = self._mismatch(Y, vm, va, p_spec, q_spec, pvpq, q_eq)
+        npv = len(pvpq)
+        self.mismatch = complex(np.abs(F[:npv]).sum(), np.abs(F[npv:]).sum()) * self.sbase
+        if status == CONVERGED:
+            self._store_solution(vm, va, V * np.conj(Y @ V), q_load)
+        return status
+
+    def _mismatch(self, Y, vm, va, p_spec, q_spec, pvpq, q_eq):
+        V = vm * np.exp(1j * va)
+        S = V * np.conj(Y @ V)
+        return np.concatenate([S.real[pvpq] - p_spec[pvpq], S.imag[q_eq] - q_spec[q_eq]]), V
+
+    def _newton(self, Y, vm, va, p_spec, q_spec, pvpq, q_eq, v_var, non_divergent):
+        vm, va = vm.copy(), va.copy()
+        tol = TOLERANCE_MVA / self.sbase
+        F, V = self._mismatch(Y, vm, va, p_spec, q_spec, pvpq, q_eq)
+        npv = len(pvpq)
+        for it in range(MAX_ITERATIONS + 1):
+            norm = np.max(np.abs(F)) if F.size else 0.0
+            if not np.isfinite(norm) or norm > BLOWN_UP_PU:
+                return BLOWN_UP, it, vm, va
+            if norm < tol:
+                return CONVERGED, it, vm, va
+            if it == MAX_ITERATIONS:
+                break
+            # dS/dVa and dS/dVm in polar form
+            I = Y @ V
+            dS_dVa = 1j * np.diag(V) @ np.conj(np.diag(I) - Y @ np.diag(V))
+            dS_dVm = np.diag(V) @ np.conj(Y @ np.diag(V / vm)) + np.conj(np.diag(I)) @ np.diag(V / vm)
+            J = np.block([
+                [dS_dVa.real[np.ix_(pvpq, pvpq)], dS_dVm.real[np.ix_(pvpq, v_var)]],
+                [dS_dVa.imag[np.ix_(q_eq, pvpq)], dS_dVm.imag[np.ix_(q_eq, v_var)]],
+            ])
+            try:
+                dx = -np.linalg.solve(J, F)
+            except np.linalg.LinAlgError:
+                return BLOWN_UP, it + 1, vm, va
+
+            step = 1.0
+            for _ in range(6 if non_divergent else 1):
+                va_new, vm_new = va.copy(), vm.copy()
+                va_new[pvpq] += step * dx[:npv]
+                vm_new[v_var] += step * dx[npv:]
+                F_new, V_new = self._mismatch(Y, vm_new, va_new, p_spec, q_spec, pvpq, q_eq)
+                if not non_divergent or np.max(np.abs(F_new)) < norm:
+                    break
+                step /= 2
+            else:
+                return NON_DIVERGENT_STOP, it + 1, vm, va
+            va, vm, F, V = va_new, vm_new, F_new, V_new
+        return ITERATION_LIMIT, MAX_ITERATIONS, vm, va
+
+    def _fast_decoupled(self, Y, vm, va, p_spec, q_spec, pvpq, q_eq, v_var, non_divergent):
+        """XB fast-decoupled iterations with constant B' / B'' from the admittance matrix"""
+        vm, va = vm.copy(), va.copy()
+        tol = TOLERANCE_MVA / self.sbase
+        B = -Y.imag
+        Bp = B[np.ix_(pvpq, pvpq)]
+        Bpp = B[np.ix_(q_eq, v_var)]
+        npv = len(pvpq)
+        for it in range(MAX_ITERATIONS + 1):
+            F, _ = self._mismatch(Y, vm, va, p_spec, q_spec, pvpq, q_eq)
+            norm = np.max(np.abs(F)) if F.size else 0.0
+            if not np.isfinite(norm) or norm > BLOWN_UP_PU:
+                return BLOWN_UP, it, vm, va
+            if norm < tol:
+                return CONVERGED, it, vm, va
+            if it == MAX_ITERATIONS:
+                break
+            try:
+                va[pvpq] -= np.linalg.solve(Bp, F[:npv] / vm[pvpq])
+                F, _ = self._mismatch(Y, vm, va, p_spec, q_spec, pvpq, q_eq)
+                if len(q_eq):
+                    vm[v_var] -= np.linalg.solve(Bpp, F[npv:] / vm[q_eq])
+            except np.linalg.LinAlgError:
+                return BLOWN_UP, it + 1, vm, va
+        return ITERATION_LIMIT, MAX_ITERATIONS, vm, va
+
+    def _store_solution(self, vm, va, S, q_load):
+        for i, b in enumerate(self.buses):
+            b["vm"] = float(vm[i])
+            b["va"] = float(math.degrees(va[i]))
+        # Machine outputs: plant Q (and slack P) shared by MBASE among the bus's machines
+        per_bus: Dict[int, List[Dict[str, Any]]] = {}
+        for m in self.machines:
+            if m.get("status", 1):
+                per_bus.setdefault(m["bus"], []).append(m)
+        for bus, machines in per_bus.items():
+            i = self.bus_pos[bus]
+            q_total = (S[i].imag - q_load[i]) * self.sbase
+            mbase_total = sum(m["mbase"] for m in machines) or 1.0
+            for m in machines:
+                share = m["mbase"] / mbase_total
+                m["qg"] = float(q_total * share)
+                if self.buses[i].get("type") == 3:
+                    load = self.buses[i].get("pl", 0.0)
+                    m["pg"] = float((S[i].real * self.sbase + load) * share)
+
+    def branch_flow(self, item: Dict[str, Any], from_end: bool) -> complex:
+        """Complex power (MW + j Mvar) leaving the addressed end"""
+        if "ratio" in item:
+            two_port = self._two_port(item["r"], item["x"], 0.0, item["ratio"])
+        else:
+            two_port = self._two_port(item["r"], item["x"], item.get("b", 0.0), 1.0)
+        yff, yft, ytf, ytt = two_port
+        vf, vt = (self._voltage(item["from"]), self._voltage(item["to"]))
+        if from_end:
+            return vf * np.conj(yff * vf + yft * vt) * self.sbase
+        return vt * np.conj(ytf * vf + ytt * vt) * self.sbase
+
+    def _voltage(self, bus: int) -> complex:
+        b = self.buses[self.bus_pos[bus]]
+        return b["vm"] * complex(math.cos(math.radians(b["va"])), math.sin(math.radians(b["va"])))
+
+
+# --- Synthetic plant cases ----------------------------------------------------
+
+def build_plant_case(path: str, plant: str = "HYBRID", units: int = 4, unit_mw: float = 25.0,
+                     mpt_type: str = "2-WINDING", grid_scc_mva: float = 2000.0, mpts: int = 1,
+                     shunts: bool = True) -> Dict[str, Any]:
+    """
+    Write a synthetic PV / BESS / hybrid plant case and return its `meta`
+    block (POI branch, generator buses and ids, MPTs, shunts, report
+    points), which has the same shape as the services' request fields.
+
+    Layout: grid (slack) -- 220 kV line -- POI -- `mpts` parallel MPTs --
+    33 kV collectors -- feeders -- unit transformers -- 0.69 kV generator
+    terminals, with a cap bank on each MPT's collector when `shunts`.
+    HYBRID splits the units between PV and BESS.
+
+    Bus numbers: 1 grid, 2 POI, 3.. collectors, 100+i terminals,
+    200+i feeders, 9001.. three-winding star points.
+    """
+    plant = plant.upper()
+    sbase = 100.0
+    grid, poi = 1, 2
+    buses = [
+        {"number": grid, "name": "GRID", "base_kv": 220.0, "type": 3, "vm": 1.0, "va": 0.0},
+        {"number": poi, "name": "POI", "base_kv": 220.0, "type": 1, "vm": 1.0, "va": 0.0},
+    ]
+    plant_mva = units * unit_mw * 1.1
+    # Grid Thevenin impedance from its short-circuit level
+    x_grid = sbase / grid_scc_mva
+    branches = [{"from": poi, "to": grid, "ckt": "1", "r": x_grid / 10, "x": x_grid, "b": 0.01, "status": 1}]
+    transformers = []
+    transformers3 = []
+    x_mpt = 0.12 * sbase / (plant_mva / mpts)
+    mpt_taps = {"rmax": 1.1, "rmin": 0.9, "ntap": 33}
+    mpt_list, collectors, shunt_rows = [], [], []
+    next_bus = 3
+    for m in range(mpts):
+        if mpt_type == "3-WINDING":
+            mv, mv2 = next_bus, next_bus + 1
+            next_bus += 2
+            star = 9001 + m
+            buses.append({"number": mv, "name": f"MV COLLECTOR {m + 1}A", "base_kv": 33.0, "type": 1,
+                          "vm": 1.0, "va": 0.0})
+            buses.append({"number": mv2, "name": f"MV COLLECTOR {m + 1}B", "base_kv": 33.0, "type": 1,
+                          "vm": 1.0, "va": 0.0})
+            buses.append({"number": star, "name": f"MPT{m + 1} STAR", "base_kv": 220.0, "type": 1,
+                          "vm": 1.0, "va": 0.0, "hidden": True})
+            windings = [dict(mpt_taps, r=x_mpt / 80, x=x_mpt / 2, ratio=1.0) for _ in range(3)]
+            transformers3.append({"buses": [poi, mv, mv2], "ckt": "1", "star": star, "windings": windings,
+                                  "status": 1})
+            mpt_list.append({"mpt_type": "3-WINDING", "mpt_from": poi, "mpt_to": mv, "mpt_bus_3": mv2})
+            collectors += [mv, mv2]
+        else:
+            mv = next_bus
+            next_bus += 1
+            buses.append({"number": mv, "name": f"MV COLLECTOR {m + 1}", "base_kv": 33.0, "type": 1,
+                          "vm": 1.0, "va": 0.0})
+            transformers.append(dict(mpt_taps, **{"from": poi, "to": mv, "ckt": "1", "r": x_mpt / 40,
+                                                   "x": x_mpt, "ratio": 1.0, "status": 1}))
+            mpt_list.append({"mpt_type": "2-WINDING", "mpt_from": poi, "mpt_to": mv, "mpt_bus_3": 0})
+            collectors.append(mv)
+        # Station load and the cap bank sit on the MPT's first collector
+        buses[-3 if mpt_type == "3-WINDING" else -1].update(pl=0.2 * units / mpts, ql=0.1 * units / mpts)
+        if shunts:
+            shunt_rows.append({"bus": mv, "id": "1", "status": 1, "binit": 0.1 * units * unit_mw / mpts, "mode": 1})
+
+    if plant == "PV":
+        kinds = ["PV"] * units
+    elif plant == "BESS":
+        kinds = ["BESS"] * units
+    else:
+        kinds = ["PV" if i < (units + 1) // 2 else "BESS" for i in range(units)]
+
+    machines, plants = [], []
+    gen_meta = {"PV": {"buses": [], "ids": [], "reg_buses": []}, "BESS": {"buses": [], "ids": [], "reg_buses": []}}
+    unit_mva = unit_mw * 1.1
+    for i, kind in enumerate(kinds):
+        feeder_bus, term_bus = 200 + i, 100 + i
+        collector = collectors[i % len(collectors)]
+        buses.append({"number": feeder_bus, "name": f"FEEDER {i + 1}", "base_kv": 33.0, "type": 1, "vm": 1.0, "va": 0.0})
+        buses.append({"number": term_bus, "name": f"{kind} {i + 1}", "base_kv": 0.69, "type": 2, "vm": 1.0, "va": 0.0})
+        # Feeders further down the collector string are longer
+        length = i // len(collectors) + 1
+        branches.append({"from": collector, "to": feeder_bus, "ckt": "1", "r": 0.004 * length, "x": 0.008 * length,
+                         "b": 0.002, "status": 1})
+        transformers.append({"from": feeder_bus, "to": term_bus, "ckt": "1", "r": 0.005, "x": 0.06 * sbase / unit_mva,
+                             "ratio": 1.0, "rmax": 1.1, "rmin": 0.9, "ntap": 5, "status": 1})
+        machines.append({"bus": term_bus, "id": "1", "status": 1, "pg": 0.8 * unit_mw, "qg": 0.0,
+                         "qt": 0.44 * unit_mw, "qb": -0.44 * unit_mw, "pt": unit_mw,
+                         "pb": -unit_mw if kind == "BESS" else 0.0, "mbase": unit_mva})
+        plants.append({"bus": term_bus, "vs": 1.0, "ireg": 0, "rmpct": 100.0})
+        gen_meta[kind]["buses"].append(term_bus)
+        gen_meta[kind]["ids"].append("1")
+        gen_meta[kind]["reg_buses"].append(term_bus)
+
+    gen_buses = [m["bus"] for m in machines]
+    meta = {
+        "plant": plant,
+        "bus_from": poi,
+        "bus_to": grid,
+        "gen_buses": gen_buses,
+        "gen_ids": ["1"] * len(gen_buses),
+        "reg_bus": gen_buses,
+        "p_rated": units * unit_mw,
+        "pv_generators": gen_meta["PV"],
+        "bess_generators": gen_meta["BESS"],
+        "mpt_list": mpt_list,
+        "shunt_list": [{"BUS": s["bus"], "ID": s["id"]} for s in shunt_rows],
+        "report_points": [{"bess_id": "POI", "name": "POI", "bus_from": poi, "bus_to": grid}]
+        + [{"bess_id": f"MPT{m + 1}" if mpts > 1 else "MPT", "name": "MPT HV", "bus_from": poi,
+            "bus_to": mpt["mpt_to"]} for m, mpt in enumerate(mpt_list)]
+        + [{"bess_id": f"GEN {i + 1}", "name": "Unit at Gen Term", "bus_from": b, "bus_to": 0}
+             for i, b in enumerate(gen_buses)],
+    }
+    data = {
+        "format": CASE_FORMAT,
+        "sbase": sbase,
+        "buses": buses,
+        "branches": branches,
+        "transformers": transformers,
+        "transformers3": transformers3,
+        "machines": machines,
+        "plants": plants,
+        "shunts": shunt_rows,
+        "meta": meta,
+    }
+    network = FakeNetwork(data)
+    network.solve(flat_start=True)
+    network.save(path)
+    return meta
@@ -0,0 +1,384 @@
+# Stand-in for the subset of psspy the PSSE services use, backed by
+# fake_network's NumPy power flow. Selected with INS_PSSE_BACKEND=fake so
+# tuning, basic-model and reactive-check runs (and their benchmarks) work
+# without a PSSE licence. Cases are fake_network JSON files, e.g. written by
+# fake_network.build_plant_case.
+from typing import Any, Dict, List, Optional, Set
+from app.services.psse_worker_service.fake_network import FakeNetwork, NOT_ATTEMPTED
+
+# Default-value sentinels, as psspy exposes them
+_i = -100000000
+_f = -1.0e20
+_s = "\x00"
+
+_net: Optional[FakeNetwork] = None
+# Bus subsystems defined with bsys: sid -> set of bus numbers
+_subsystems: Dict[int, Set[int]] = {}
+
+
+def _given(value) -> bool:
+    return value is not None and value != _i and value != _f and value != _s
+
+
+def psseinit(buses: int = 0) -> int:
+    return 0
+
+
+def getdefaultint() -> int:
+    return _i
+
+
+def getdefaultreal() -> float:
+    return _f
+
+
+def getdefaultchar() -> str:
+    return _s
+
+
+# --- Case I/O ---
+
+def case(sfile: str) -> int:
+    global _net
+    try:
+        _net = FakeNetwork.load(sfile)
+    except OSError:
+        return 1
+    except (ValueError, KeyError):
+        return 2
+    return 0
+
+
+def save(sfile: str) -> int:
+    if _net is None:
+        return 1
+    try:
+        _net.save(sfile)
+    except OSError:
+        return 2
+    return 0
+
+
+# --- Solutions ---
+
+def _solve(options: List[int], decoupled: bool) -> int:
+    if _net is None:
+        return 1
+    options = list(options) + [0] * (8 - len(options))
+    _net.solve(flat_start=bool(options[5]), non_divergent=bool(options[7]),
+               apply_var_limits=options[6] != -1, decoupled=decoupled)
+    return 0
+
+
+def fnsl(options: List[int] = (1, 1, 0, 0, 1, 0, 0, 0)) -> int:
+    return _solve(options, decoupled=False)
+
+
+def fdns(options: List[int] = (1, 1, 0, 0, 1, 0, 0, 0)) -> int:
+    return _solve(options, decoupled=True)
+
+
+def solved() -> int:
+    return _net.status if _net is not None else NOT_ATTEMPTED
+
+
+def iterat() -> int:
+    return _net.iterations if _net is not None else 0
+
+
+def sysmsm() -> complex:
+    return _net.mismatch if _net is not None else 0j
+
+
+# --- Getters ---
+
+def _bus(ibus: int):
+    if _net is None or ibus not in _net.bus_pos:
+        return None
+    return _net.buses[_net.bus_pos[ibus]]
+
+
+def busdat(ibus: int, string: str):
+    bus = _bus(ibus)
+    if bus is None:
+        return 1, None
+    values = {"PU": bus["vm"], "KV": bus["vm"] * bus["base_kv"], "BASE": bus["base_kv"],
+              "ANGLED": bus["va"], "ANGLE": bus["va"] * 3.141592653589793 / 180.0}
+    if string not in values:
+        return 2, None
+    return 0, values[string]
+
+
+def macdat(ibus: int, id: str, string: str):
+    if _bus(ibus) is None:
+        return 1, None
+    machine = _net.machine_by_key.get((ibus, str(id).strip()))
+    if machine is None:
+        return 2, None
+    values = {"P": machine["pg"], "Q": machine["qg"], "PMAX": machine["pt"], "PMIN": machine["pb"],
+              "QMAX": machine["qt"], "QMIN": machine["qb"], "MBASE": machine["mbase"],
+              "MVA": abs(complex(machine["pg"], machine["qg"]))}
+    if string not in values:
+        return 3, None
+    return 0, values[string]
+
+
+def macint(ibus: int, id: str, string: str):
+    if _bus(ibus) is None:
+        return 1, None
+    machine = _net.machine_by_key.get((ibus, str(id).strip()))
+    if machine is None:
+        return 2, None
+    if string != "STATUS":
+        return 3, None
+    return 0, machine.get("status", 1)
+
+
+def brnflo(ibus: int, jbus: int, ckt: str):
+    if _bus(ibus) is None or _bus(jbus) is None:
+        return 1, None
+    item, from_end = _net.find_branch(ibus, jbus, ckt)
+    if item is None:
+        return 2, None
+    if not item.get("status", 1):
+        return 3, None
+    return 0, complex(_net.branch_flow(item, from_end))
+
+
+def xfrdat(ibus: int, jbus: int, ckt: str, string: str):
+    item, from_end = _net.find_branch(ibus, jbus, ckt) if _net is not None else (None, False)
+    if item is None or "ratio" not in item:
+        return 2, None
+    values = {"RATIO": item["ratio"], "RMAX": item["rmax"], "RMIN": item["rmin"]}
+    if string not in values:
+        return 7, None
+    return 0, values[string]
+
+
+def xfrint(ibus: int, jbus: int, ckt: str, string: str):
+    item, _ = _net.find_branch(ibus, jbus, ckt) if _net is not None else (None, False)
+    if item is None or "ratio" not in item:
+        return 2, None
+    values = {"NTPOSN": item["ntap"], "STATUS": item.get("status", 1)}
+    if string not in values:
+        return 7, None
+    return 0, values[string]
+
+
+def wnddat(ibus: int, jbus: int, kbus: int, ckt: str, string: str):
+    item, winding = _net.find_transformer3(ibus, jbus, kbus, ckt) if _net is not None else (None, -1)
+    if item is None:
+        return 2, None
+    w = item["windings"][winding]
+    values = {"RATIO": w["ratio"], "RMAX": w["rmax"], "RMIN": w["rmin"]}
+    if string not in values:
+        return 7, None
+    return 0, values[string]
+
+
+def wndint(ibus: int, jbus: int, kbus: int, ckt: str, string: str):
+    item, winding = _net.find_transformer3(ibus, jbus, kbus, ckt) if _net is not None else (None, -1)
+    if item is None:
+        return 2, None
+    values = {"NTPOSN": item["windings"][winding]["ntap"], "STATUS": item.get("status", 1)}
+    if string not in values:
+        return 7, None
+    return 0, values[string]
+
+
+def _in_subsystem(sid: int, bus: int) -> bool:
+    return sid < 0 or bus in _subsystems.get(sid, ())
+
+
+def _bus_array(sid: int, flag: int, string, getter):
+    """abus* shape: (ierr, [[values per string]]); flag 1 = in-service buses only"""
+    if _net is None:
+        return 1, [[None]]
+    if sid >= 0 and sid not in _subsystems:
+        return 1, [[None]]
+    strings = [string] if isinstance(string, str) else list(string)
+    buses = [b for b in _net.buses if not b.get("hidden") and (flag != 1 or b.get("type", 1) != 4)
+             and _in_subsystem(sid, b["number"])]
+    try:
+        return 0, [[getter(b, s) for b in buses] for s in strings]
+    except KeyError:
+        return 2, [[None]]
+
+
+def abusint(sid: int = -1, flag: int = 1, string="NUMBER"):
+    return _bus_array(sid, flag, string, lambda b, s: {"NUMBER": b["number"], "TYPE": b.get("type", 1)}[s])
+
+
+def abusreal(sid: int = -1, flag: int = 1, string="PU"):
+    return _bus_array(sid, flag, string, lambda b, s: {
+        "PU": b["vm"], "KV": b["vm"] * b["base_kv"], "BASE": b["base_kv"], "ANGLED": b["va"]}[s])
+
+
+def _plant_array(sid: int, flag: int, string, getter):
+    if _net is None or (sid >= 0 and sid not in _subsystems):
+        return 1, [[None]]
+    strings = [string] if isinstance(string, str) else list(string)
+    plants = [p for p in _net.plants if _in_subsystem(sid, p["bus"])]
+    try:
+        return 0, [[getter(p, s) for p in plants] for s in strings]
+    except KeyError:
+        return 2, [[None]]
+
+
+def aplantint(sid: int = -1, flag: int = 4, string="NUMBER"):
+    return _plant_array(sid, flag, string, lambda p, s: {
+        "NUMBER": p["bus"], "IREG": p.get("ireg", 0), "NREG": p.get("nreg", 0)}[s])
+
+
+def aplantreal(sid: int = -1, flag: int = 4, string="VSPU"):
+    return _plant_array(sid, flag, string, lambda p, s: {"VSPU": p["vs"], "RMPCT": p.get("rmpct", 100.0)}[s])
+
+
+def abrnint(sid: int = -1, owner: int = 1, ties: int = 1, flag: int = 1, entry: int = 1, string="FROMNUMBER"):
+    """
+    Branch arrays. flag 1/2 = lines only, 3/4 = lines and two-winding
+    transformers; odd flags skip out-of-service branches. With a subsystem,
+    only branches with both ends inside it (ties=1).
+    """
+    if _net is None or (sid >= 0 and sid not in _subsystems):
+        return 1, [[None]]
+    strings = [string] if isinstance(string, str) else list(string)
+    items = _net.branches + (_net.transformers if flag in (3, 4) else [])
+    items = [b for b in items if (flag % 2 == 0 or b.get("status", 1))
+             and _in_subsystem(sid, b["from"]) and _in_subsystem(sid, b["to"])]
+    try:
+        return 0, [[{"FROMNUMBER": b["from"], "TONUMBER": b["to"], "STATUS": b.get("status", 1)}[s]
+                     for b in items] for s in strings]
+    except KeyError:
+        return 2, [[None]]
+
+
+def atr3int(sid: int = -1, owner: int = 1, ties: int = 1, flag: int = 1, entry: int = 1, string="WIND1NUMBER"):
+    """Three-winding transformer arrays; flag 1 = in-service only"""
+    if _net is None or (sid >= 0 and sid not in _subsystems):
+        return 1, [[None]]
+    strings = [string] if isinstance(string, str) else list(string)
+    items = [t for t in _net.transformers3 if (flag != 1 or t.get("status", 1))
+             and all(_in_subsystem(sid, b) for b in t["buses"])]
+    try:
+        return 0, [[{"WIND1NUMBER": t["buses"][0], "WIND2NUMBER": t["buses"][1], "WIND3NUMBER": t["buses"][2],
+                      "STATUS": t.get("status", 1)}[s] for t in items] for s in strings]
+    except KeyError:
+        return 2, [[None]]
+
+
+# --- Subsystems ---
+
+def bsys(sid: int = 0, usekv: int = 0, basekv=(), numarea: int = 0, areas=(), numbus: int = 0, buses=(),
+         numowner: int = 0, owners=(), numzone: int = 0, zones=()) -> int:
+    """Bus subsystem by bus list only (the selection the services use)"""
+    if not 0 <= sid <= 11:
+        return 1
+    _subsystems[sid] = {int(b) for b in list(buses)[:numbus]}
+    return 0
+
+
+# --- Changes ---
+
+def machine_chng_4(ibus: int, id: str, intgar: List[int], realar: List[float], name: str = "") -> int:
+    if _bus(ibus) is None:
+        return 1
+    machine = _net.machine_by_key.get((ibus, str(id).strip()))
+    if machine is None:
+        return 2
+    if intgar and _given(intgar[0]):
+        machine["status"] = int(intgar[0])
+    for index, key in enumerate(("pg", "qg", "qt", "qb", "pt", "pb", "mbase")):
+        if index < len(realar) and _given(realar[index]):
+            machine[key] = float(realar[index])
+    return 0
+
+
+def plant_chng_4(ibus: int, inode: int, intgar: List[int], realar: List[float]) -> int:
+    if _bus(ibus) is None:
+        return 1
+    plant = _net.plant_by_bus.get(ibus)
+    if plant is None:
+        return 2
+    if intgar and _given(intgar[0]):
+        plant["ireg"] = int(intgar[0])
+    if len(intgar) > 1 and _given(intgar[1]):
+        plant["nreg"] = int(intgar[1])
+    if realar and _given(realar[0]):
+        plant["vs"] = float(realar[0])
+    if len(realar) > 1 and _given(realar[1]):
+        plant["rmpct"] = float(realar[1])
+    return 0
+
+
+def two_winding_data_6(ibus: int, jbus: int, ckt: str, intgar: List[int], realari: List[float],
+                       ratings: List[float] = (), namear: str = "", vgrpar: str = ""):
+    item, from_end = _net.find_branch(ibus, jbus, ckt) if _net is not None else (None, False)
+    if item is None or "ratio" not in item:
+        return 2, [0.0, 0.0]
+    if intgar and _given(intgar[0]):
+        item["status"] = int(intgar[0])
+    # R1-2, X1-2, SBASE1-2, WINDV1; only the fields the services change
+    for index, key in ((0, "r"), (1, "x"), (3, "ratio")):
+        if index < len(realari) and _given(realari[index]):
+            item[key] = float(realari[index])
+    return 0, [item["r"], item["x"]]
+
+
+def three_wnd_winding_data_5(ibus: int, jbus: int, kbus: int, ckt: str, warg: int, intgar: List[int],
+                             realari: List[float], ratings: List[float] = ()):
+    item, _ = _net.find_transformer3(ibus, jbus, kbus, ckt) if _net is not None else (None, -1)
+    if item is None or not 1 <= warg <= 3:
+        return 2, [0.0, 0.0]
+    # Winding `warg` counts from the bus order of the call, like PSSE
+    bus = (ibus, jbus, kbus)[warg - 1]
+    winding = item["windings"][item["buses"].index(bus)]
+    if realari and _given(realari[0]):
+        winding["ratio"] = float(realari[0])
+    return 0, [winding["r"], winding["x"]]
+
+
+# switched_shunt_chng_5 INTGAR positions (PSSE 35: N1..N8, MODSW, ADJM, STAT,
+# SWREG, NREG, S1..S8) the fake keeps -> (swsint string, shunt key, default)
+SHUNT_INTGAR = {8: ("MODSW", "mode", 1), 9: ("ADJM", "adjm", 0), 10: ("STAT", "status", 1),
+                11: ("SWREG", "swreg", 0), 12: ("NREG", "nreg", 0)}
+
+
+def swsint(ibus: int, id: str, string: str):
+    if _bus(ibus) is None:
+        return 1, None
+    shunt = _net.shunt_by_key.get((ibus, str(id).strip()))
+    if shunt is None:
+        return 2, None
+    for name, key, default in SHUNT_INTGAR.values():
+        if name == string:
+            return 0, shunt.get(key, default)
+    return 3, None
+
+
+def switched_shunt_data_5(ibus: int, id: str, intgar: Optional[List[int]] = None,
+                          realar: Optional[List[float]] = None, name: str = "") -> int:
+    """A modifier like in psspy (it only returns ierr); the fake cannot add shunts"""
+    return switched_shunt_chng_5(ibus, id, list(intgar or []), list(realar or []), name)
+
+
+def switched_shunt_chng_5(ibus: int, id: str, intgar: List[int], realar: List[float], name: str = "") -> int:
+    if _bus(ibus) is None:
+        return 1
+    shunt = _net.shunt_by_key.get((ibus, str(id).strip()))
+    if shunt is None:
+        return 2
+    for k, (_, key, _) in SHUNT_INTGAR.items():
+        if len(intgar) > k and _given(intgar[k]):
+            shunt[key] = int(intgar[k])
+    return 0
+
+
+# --- Diagram / misc no-ops ---
+
+def exportimagefile(image_type: int, path: str, quality: int = 100) -> int:
+    return 0
+
+
+def setfullviewscale(*args: Any) -> int:
+    return 0
@@ -0,0 +1,217 @@
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+from app.services.metrics_service.metrics import count, observe_stage
+from app.services.metrics_service.psspy_profiler import profile_stage
+
+# fnsl/fdns options: tap, area interchange, phase shift, dc tap, switched shunt,
+# flat start, var limits, non-divergent. BASE_OPTIONS is what every service
+# used before the ladder: a flat start on every solve.
+BASE_OPTIONS = [1, 1, 0, 0, 1, 1, 0, 0]
+WARM_OPTIONS = [1, 1, 0, 0, 1, 0, 0, 0]
+NON_DIVERGENT_OPTIONS = [1, 1, 0, 0, 1, 1, 0, 1]
+
+# Rungs, cheapest first; each is a list of (api, options) run in order
+LADDER = [
+    ("warm", [("fnsl", WARM_OPTIONS)]),
+    ("decoupled", [("fdns", WARM_OPTIONS), ("fnsl", WARM_OPTIONS)]),
+    ("flat", [("fnsl", BASE_OPTIONS)]),
+    ("non_divergent", [("fnsl", NON_DIVERGENT_OPTIONS)]),
+]
+
+# Largest acceptable system mismatch (MVA) for a rung to count as converged
+MISMATCH_TOL = float(os.getenv("INS_LOADFLOW_MISMATCH_TOL", "1.0"))
+# A converged solve needing more Newton iterations than this is "slow": the
+# ladder keeps starting at that rung instead of stepping back down
+SLOW_ITERATIONS = int(os.getenv("INS_LOADFLOW_SLOW_ITERATIONS", "8"))
+# Per-solve records kept for summaries
+HISTORY_LIMIT = 10000
+# INS_LOADFLOW_WARM=0 always starts at the flat-start rung (the old behaviour)
+WARM_ENABLED = os.getenv("INS_LOADFLOW_WARM", "1") != "0"
+
+# psspy.solved() codes
+SOLVED_STATUS = {
+    0: "converged",
+    1: "iteration_limit",
+    2: "blown_up",
+    3: "non_divergent_stop",
+    4: "interrupted",
+    5: "singular_jacobian",
+    6: "inertial_dispatch_error",
+    7: "opf_error",
+    8: "not_attempted",
+    9: "rsol_converged_phase_shift_locked",
+}
+
+
+class LoadFlowError(Exception):
+    """Every rung of the ladder failed; flows read now would be meaningless"""
+    def __init__(self, message: str, result: "SolveResult" = None):
+        super().__init__(message)
+        self.result = result
+
+
+class SolveResult:
+    def __init__(self, converged: bool, status: str, rung: str, iterations: int,
+                 mismatch: Optional[float], elapsed: float, attempts: List[Dict[str, Any]]):
+        self.converged = converged
+        self.status = status
+        self.rung = rung
+        self.iterations = iterations
+        self.mismatch = mismatch
+        self.elapsed = elapsed
+        self.attempts = attempts
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "converged": self.converged,
+            "status": self.status,
+            "rung": self.rung,
+            "iterations": self.iterations,
+            "mismatch": self.mismatch,
+            "elapsed": round(self.elapsed, 4),
+            "attempts": self.attempts,
+        }
+
+
+class LoadFlow:
+    """
+    Solves the loaded case with the cheapest configuration that works:
+    Newton from the previous solution, then a decoupled pass to get close
+    before Newton, then a flat start, then a flat start with the
+    non-divergent option. A rung passes when psspy.solved() reports
+    convergence and the system mismatch is within MISMATCH_TOL.
+
+    The ladder adapts: after a solve needed rung n, the next solve starts at
+    rung n; a fast success there steps the start back down one rung.
+    Per-solve iterations, mismatch and time are kept for summary().
+    """
+    def __init__(self, psspy, log_cb: Optional[Callable[[str], None]] = None):
+        self.psspy = psspy
+        self.log_cb = log_cb
+        self.start_rung = 0 if WARM_ENABLED else 2
+        self.history: List[Dict[str, Any]] = []
+        self.total_solves = 0
+
+    def _log(self, msg: str):
+        if self.log_cb:
+            self.log_cb(msg)
+
+    def _status(self):
+        try:
+            code = self.psspy.solved()
+        except Exception:
+            return None, "unknown"
+        return code, SOLVED_STATUS.get(code, f"code_{code}")
+
+    def _iterations(self) -> Optional[int]:
+        try:
+            return int(self.psspy.iterat())
+        except Exception:
+            return None
+
+    def _mismatch(self) -> Optional[float]:
+        try:
+            return abs(self.psspy.sysmsm())
+        except Exception:
+            return None
+
+    def solve(self, label: str = "", raise_on_failure: bool = False) -> SolveResult:
+        start = time.perf_counter()
+        attempts = []
+        result = None
+        first = min(self.start_rung, len(LADDER) - 1)
+        for index in range(first, len(LADDER)):
+            name, steps = LADDER[index]
+            ierr = 0
+            iterations = 0
+            with profile_stage("loadflow"):
+                for api, options in steps:
+                    ierr = getattr(self.psspy, api)(list(options))
+                    iterations += self._iterations() or 0
+                code, status = self._status()
+                mismatch = self._mismatch()
+            if code is None and not ierr:
+                status = "converged"    # no solved() to ask; trust the return code
+            if ierr:
+                status = f"ierr_{ierr}"
+            elif status == "converged" and mismatch is not None and mismatch > MISMATCH_TOL:
+                status = "mismatch"
+            ok = status == "converged"
+            attempts.append({"rung": name, "status": status, "iterations": iterations, "mismatch": mismatch})
+            count(f"loadflow.rung.{name}")
+            if ok:
+                result = SolveResult(True, status, name, iterations, mismatch, time.perf_counter() - start, attempts)
+                # Adapt where the next solve starts
+                if index > first or iterations > SLOW_ITERATIONS:
+                    self.start_rung = index
+                elif self.start_rung > (0 if WARM_ENABLED else 2):
+                    self.start_rung -= 1
+                break
+
+        if result is None:
+            last = attempts[-1]
+            result = SolveResult(False, last["status"], last["rung"], sum(a["iterations"] for a in attempts),
+                                 last["mismatch"], time.perf_counter() - start, attempts)
+            count("loadflow.failed")
+        elif len(attempts) > 1:
+            self._log(f"Load flow{' (' + label + ')' if label else ''} needed rung '{result.rung}' after "
+                      + ", ".join(f"{a['rung']}: {a['status']}" for a in attempts[:-1]))
+
+        observe_stage("loadflow.solve", result.elapsed)
+        count("loadflow.solves")
+        count("loadflow.iterations", result.iterations)
+        self.history.append(dict(result.as_dict(), label=label))
+        self.total_solves += 1
+        if len(self.history) > HISTORY_LIMIT:
+            del self.history[:len(self.history) - HISTORY_LIMIT]
+
+        if not result.converged:
+            self._log(f"⚠️ Load flow{' (' + label + ')' if label else ''} did not converge: "
+                      + ", ".join(f"{a['rung']}: {a['status']}" for a in attempts))
+            if raise_on_failure:
+                raise LoadFlowError(f"Load flow did not converge{' at ' + label if label else ''} "
+                                    f"({result.status}, mismatch {result.mismatch})", result)
+        return result
+
+    def reset(self):
+        """Forget the adapted start rung, e.g. before timing an unrelated case"""
+        self.start_rung = 0 if WARM_ENABLED else 2
+
+    def mark(self) -> int:
+        """Position in the history, for summary(since=...) over one run"""
+        return self.total_solves
+
+    def summary(self, since: int = 0) -> Dict[str, Any]:
+        recent = self.total_solves - since
+        history = self.history[-recent:] if recent > 0 else []
+        rungs: Dict[str, int] = {}
+        for h in history:
+            rungs[h["rung"]] = rungs.get(h["rung"], 0) + 1
+        return {
+            "solves": len(history),
+            "failed": sum(1 for h in history if not h["converged"]),
+            "iterations": sum(h["iterations"] for h in history),
+            "seconds": round(sum(h["elapsed"] for h in history), 4),
+            "escalations": sum(1 for h in history if len(h["attempts"]) > 1),
+            "rungs": rungs,
+        }
+
+
+_solvers: Dict[int, LoadFlow] = {}
+
+
+def get_load_flow(psspy, log_cb: Optional[Callable[[str], None]] = None) -> LoadFlow:
+    """
+    The LoadFlow for this psspy handle. It is shared by every caller in the
+    process (there is one case per process), so the ladder's start rung
+    carries over from one service call to the next. A CaseSnapshot's
+    journaling handle shares the solver of the psspy it wraps.
+    """
+    psspy = getattr(psspy, "journal_target", psspy)
+    solver = _solvers.get(id(psspy))
+    if solver is None or solver.psspy is not psspy:
+        solver = _solvers[id(psspy)] = LoadFlow(psspy)
+    if log_cb is not None:
+        solver.log_cb = log_cb
+    return solver
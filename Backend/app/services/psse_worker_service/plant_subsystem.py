@@ -0,0 +1,145 @@
+import os
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+
+# PSSE bus subsystem id reserved for the plant (sids 0-11 exist; solve_memo
+# uses 10, services none of the others)
+PLANT_SID = 11
+# A walk that finds more buses than this has leaked past the POI into the
+# interconnection; callers fall back to the whole case
+MAX_PLANT_BUSES = 5000
+# Plants whose bus sets are kept per process, keyed by SAV file and POI
+CACHE_SIZE = 16
+# Voltages within this of the limit (pu) do not count as violations
+VOLTAGE_TOL = 1e-6
+
+_cache: "OrderedDict[tuple, Optional[np.ndarray]]" = OrderedDict()
+
+
+def _ints(values) -> List[int]:
+    return [int(v) for v in values or [] if v]
+
+
+def _seed_buses(cfg: Dict[str, Any]) -> List[int]:
+    """Buses known to be inside the plant: generators, MPT LV windings, shunts"""
+    seeds = _ints(cfg.get("GEN_BUSES")) + _ints(cfg.get("REG_BUS"))
+    for mpt in cfg.get("MPT_LIST") or []:
+        if hasattr(mpt, "dict"): mpt = mpt.dict()
+        seeds += _ints([mpt.get("mpt_to"), mpt.get("mpt_bus_3")])
+    for shunt in cfg.get("SHUNT_LIST") or []:
+        if hasattr(shunt, "dict"): shunt = shunt.dict()
+        seeds += _ints([shunt.get("BUS")])
+    return seeds
+
+
+def _adjacency(psspy) -> Optional[Dict[int, List[int]]]:
+    """In-service branches, two- and three-winding transformers of the whole case"""
+    adjacency: Dict[int, List[int]] = {}
+
+    def link(a: int, b: int):
+        adjacency.setdefault(a, []).append(b)
+        adjacency.setdefault(b, []).append(a)
+
+    ierr, (from_buses, to_buses) = psspy.abrnint(-1, 1, 1, 3, 1, ["FROMNUMBER", "TONUMBER"])
+    if ierr != 0 or from_buses is None:
+        return None
+    for a, b in zip(from_buses, to_buses):
+        link(a, b)
+    ierr, windings = psspy.atr3int(-1, 1, 1, 1, 1, ["WIND1NUMBER", "WIND2NUMBER", "WIND3NUMBER"])
+    if ierr == 0 and windings[0] is not None:
+        for w1, w2, w3 in zip(*windings):
+            link(w1, w2)
+            link(w1, w3)
+            link(w2, w3)
+    return adjacency
+
+
+def find_plant_buses(psspy, cfg: Dict[str, Any]) -> Optional[np.ndarray]:
+    """
+    Breadth-first walk of the network from the plant's generators, MPTs and
+    shunts that includes the POI branch buses but does not cross them.
+    None when the topology cannot be read or the walk leaks into the grid.
+    """
+    seeds = _seed_buses(cfg)
+    boundary = set(_ints([cfg.get("BUS_FROM"), cfg.get("BUS_TO")]))
+    if not seeds or not boundary:
+        return None
+    adjacency = _adjacency(psspy)
+    if adjacency is None:
+        return None
+
+    seen = set(seeds) | boundary
+    queue = deque(b for b in seeds if b not in boundary)
+    while queue:
+        bus = queue.popleft()
+        for other in adjacency.get(bus, ()):
+            if other not in seen:
+                seen.add(other)
+                if len(seen) > MAX_PLANT_BUSES:
+                    return None
+                if other not in boundary:
+                    queue.append(other)
+    return np.array(sorted(seen), dtype=np.int64)
+
+
+def plant_buses(psspy, cfg: Dict[str, Any],
+                log_cb: Optional[Callable[[str], None]] = None) -> Optional[np.ndarray]:
+    """find_plant_buses(), cached for the SAV file (and its modification time)"""
+    sav_path = cfg.get("SAV_PATH") or ""
+    try:
+        mtime = os.path.getmtime(sav_path)
+    except OSError:
+        mtime = None
+    key = (os.path.abspath(sav_path), mtime, cfg.get("BUS_FROM"), cfg.get("BUS_TO"),
+           tuple(_seed_buses(cfg)))
+    if key in _cache:
+        _cache.move_to_end(key)
+        return _cache[key]
+    buses = find_plant_buses(psspy, cfg)
+    if log_cb:
+        log_cb(f"🔎 Voltage checks cover {len(buses)} plant buses" if buses is not None
+               else "⚠️ Plant buses could not be isolated; voltage checks cover every bus in the case")
+    _cache[key] = buses
+    while len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+    return buses
+
+
+def define_plant_subsystem(psspy, buses: np.ndarray, sid: int = PLANT_SID) -> bool:
+    """(Re)define bus subsystem `sid` as `buses`; a case load may drop it, so callers do this per check"""
+    return psspy.bsys(sid, numbus=len(buses), buses=buses.tolist()) == 0
+
+
+def voltage_violations(psspy, limit: float, mode: str = "lag",
+                       sid: int = -1) -> Tuple[int, List[Tuple[int, float]]]:
+    """
+    (ierr, [(bus, pu)]) of in-service buses in subsystem `sid` above `limit`
+    ("lag") or below it ("lead"), worst first.
+    """
+    ierr, [numbers] = psspy.abusint(sid, 1, "NUMBER")
+    if ierr != 0 or numbers is None:
+        return ierr or 1, []
+    ierr, [voltages] = psspy.abusreal(sid, 1, "PU")
+    if ierr != 0 or voltages is None:
+        return ierr or 1, []
+
+    numbers = np.asarray(numbers, dtype=np.int64)
+    voltages = np.asarray(voltages, dtype=float)
+    excess = voltages - limit if mode == "lag" else limit - voltages
+    mask = excess > VOLTAGE_TOL
+    numbers, voltages, excess = numbers[mask], voltages[mask], excess[mask]
+    order = np.lexsort((numbers, -excess))
+    return 0, [(int(numbers[i]), round(float(voltages[i]), 4)) for i in order]
+
+
+def check_plant_voltages(psspy, cfg: Optional[Dict[str, Any]], limit: float, mode: str = "lag",
+                         log_cb: Optional[Callable[[str], None]] = None) -> Tuple[int, List[Tuple[int, float]]]:
+    """
+    voltage_violations() over the plant's buses when they can be found from
+    `cfg`, otherwise over every bus of the case.
+    """
+    buses = plant_buses(psspy, cfg, log_cb) if cfg else None
+    if buses is not None and len(buses) and define_plant_subsystem(psspy, buses):
+        return voltage_violations(psspy, limit, mode, PLANT_SID)
+    return voltage_violations(psspy, limit, mode)
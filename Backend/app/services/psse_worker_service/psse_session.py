@@ -0,0 +1,53 @@
+import os
+import threading
+from app.services.metrics_service.metrics import instrument_psspy, stage_timer
+
+# psspy holds one case per process, so initialisation is done once and
+# in-process callers serialise on PSSE_LOCK.
+PSSE_LOCK = threading.RLock()
+
+# INS_PSSE_BACKEND=fake swaps PSSE for the NumPy stand-in (fake_psspy) everywhere
+BACKEND = os.getenv("INS_PSSE_BACKEND", "psse").lower()
+
+_psspy = None
+
+
+def init_psse(psspy=None, redirect=None):
+    """
+    Import and initialise PSSE once per process and return the psspy module,
+    wrapped so solves and case load/save show up in /api/metrics.
+    Callers that already imported psspy/redirect (e.g. from TOOLs.PSSPY39) can pass them in;
+    they are ignored when BACKEND is "fake".
+    """
+    global _psspy
+    with PSSE_LOCK:
+        if _psspy is not None:
+            return _psspy
+
+        if BACKEND == "fake":
+            from app.services.psse_worker_service import fake_psspy as psspy
+            redirect = None
+        elif psspy is None:
+            import psse35
+            import psspy
+            import redirect
+
+        with stage_timer("psse.init"):
+            if redirect is not None:
+                redirect.psse2py()
+            psspy.psseinit(10000)
+        _psspy = instrument_psspy(psspy)
+        return _psspy
+
+
+def use_fake_backend():
+    """Switch this process to fake_psspy (benchmarks, offline runs); must precede init_psse"""
+    global BACKEND
+    with PSSE_LOCK:
+        if _psspy is not None and BACKEND != "fake":
+            raise RuntimeError("PSSE is already initialised in this process")
+        BACKEND = "fake"
+
+
+def is_initialised() -> bool:
+    return _psspy is not None
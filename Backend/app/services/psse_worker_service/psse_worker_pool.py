@@ -0,0 +1,466 @@
+import os
+import queue
+import threading
+import time
+import traceback
+import importlib
+import itertools
+import multiprocessing
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+from app.services.job_service import job_manager as job_module
+from app.services.job_service.cancellation import CancellationToken, JobCancelled, StageTimeout
+from app.services.psse_worker_service import psse_session
+from app.services.metrics_service.metrics import REGISTRY
+from app.services.metrics_service import psspy_profiler
+
+# Pool configuration (0 workers = run tasks in-process, serialised on PSSE_LOCK)
+DEFAULT_WORKERS = int(os.getenv("INS_PSSE_WORKERS", "2"))
+DEFAULT_MAX_TASKS_PER_WORKER = int(os.getenv("INS_PSSE_MAX_TASKS_PER_WORKER", "50"))
+
+# Task modules imported by each worker before it reports ready
+PRELOAD_MODULES = (
+    "app.services.tuning_psse_service",
+    "app.services.basic_model_psse_service",
+    "app.services.check_reactive_psse_service",
+)
+
+SUPERVISE_INTERVAL = 0.5
+# How often a waiting caller checks its cancellation token
+CANCEL_POLL_INTERVAL = 0.2
+
+# Set in worker processes: tasks running there cannot hand work back to the pool
+_in_worker = False
+
+
+class PsseWorkerError(Exception):
+    """A task failed inside a PSSE worker process (or the worker died)"""
+    def __init__(self, message: str, traceback_text: str = ""):
+        super().__init__(message)
+        self.traceback = traceback_text
+
+
+def in_worker_process() -> bool:
+    """True inside a pool worker process"""
+    return _in_worker
+
+
+def _resolve_target(target: str) -> Callable:
+    """'package.module:function' -> function"""
+    module_name, func_name = target.split(":")
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+# --- Task context -------------------------------------------------------------
+# Task functions report through get_current_job(); these objects give them the
+# same log/emit/set_progress interface as a Job, wherever they run.
+
+class _RemoteTaskContext:
+    """Forwards task output from a worker process back to the supervisor"""
+    def __init__(self, task_id: int, outbox, cancel_token: CancellationToken):
+        self.task_id = task_id
+        self._outbox = outbox
+        self.cancel_token = cancel_token
+
+    def log(self, msg: str):
+        self._outbox.put(("log", self.task_id, msg))
+
+    def emit(self, kind: str, data: Any):
+        self._outbox.put(("event", self.task_id, kind, data))
+
+    def set_progress(self, fraction: float, message: str = None):
+        self._outbox.put(("progress", self.task_id, fraction, message))
+
+
+class _LocalTaskContext:
+    """Routes task output to a log callback and/or the submitting job"""
+    def __init__(self, log_cb: Optional[Callable[[str], None]], parent_job, cancel_token: CancellationToken):
+        self._log_cb = log_cb
+        self._parent = parent_job
+        self.cancel_token = cancel_token
+
+    def log(self, msg: str):
+        if self._log_cb:
+            self._log_cb(msg)
+        elif self._parent is not None:
+            self._parent.log(msg)
+        else:
+            print(msg)
+
+    def emit(self, kind: str, data: Any):
+        if self._parent is not None:
+            self._parent.emit(kind, data)
+
+    def set_progress(self, fraction: float, message: str = None):
+        if self._parent is not None:
+            self._parent.set_progress(fraction, message)
+
+
+def _run_with_context(context, target: str, args: tuple, kwargs: dict):
+    token = job_module._current_job.set(context)
+    try:
+        with psspy_profiler.profile(target.split(":")[-1]) as profiler:
+            try:
+                return _resolve_target(target)(*args, **kwargs)
+            finally:
+                if profiler is not None:
+                    _report_profile(context, profiler)
+    finally:
+        job_module._current_job.reset(token)
+
+
+def _report_profile(context, profiler):
+    try:
+        paths = profiler.dump()
+        summary = profiler.summary(top=10)
+        context.emit("psspy_profile", dict(summary, files=paths))
+        context.log(f"psspy profile: {summary['calls']} calls, {summary['psspy_seconds']:.2f}s in psspy "
+                    f"of {summary['wall_seconds']:.2f}s -> {paths['folded']}")
+    except Exception as e:
+        context.log(f"psspy profile could not be written: {e}")
+
+
+# --- Worker process -----------------------------------------------------------
+
+def _worker_main(worker_id: int, inbox, outbox, cancel_event, max_tasks: int):
+    global _in_worker
+    _in_worker = True
+    try:
+        psse_session.init_psse()
+    except Exception as e:
+        # Keep serving: tasks will report the PSSE error themselves
+        outbox.put(("log", None, f"PSSE worker {worker_id}: initialisation failed: {e}"))
+    for name in PRELOAD_MODULES:
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            outbox.put(("log", None, f"PSSE worker {worker_id}: could not preload {name}: {e}"))
+    outbox.put(("metrics", worker_id, REGISTRY.drain()))
+    outbox.put(("ready", worker_id, os.getpid()))
+
+    tasks_done = 0
+    while True:
+        msg = inbox.get()
+        if msg is None:
+            break
+        task_id, target, args, kwargs, budgets = msg
+        # The supervisor sets cancel_event to stop this task; it clears it before dispatch
+        context = _RemoteTaskContext(task_id, outbox, CancellationToken(cancel_event, budgets))
+        try:
+            result = _run_with_context(context, target, args, kwargs)
+            reply = ("done", worker_id, task_id, result)
+        except JobCancelled as e:
+            reply = ("cancelled", worker_id, task_id, str(e), e.partial, isinstance(e, StageTimeout))
+        except Exception as e:
+            reply = ("error", worker_id, task_id, str(e), traceback.format_exc())
+        # Metrics recorded in this process go to the parent's registry ahead of
+        # the reply, so they are visible once the caller returns
+        outbox.put(("metrics", worker_id, REGISTRY.drain()))
+        outbox.put(reply)
+
+        tasks_done += 1
+        if max_tasks and tasks_done >= max_tasks:
+            outbox.put(("retire", worker_id))
+            break
+
+
+# --- Supervisor ---------------------------------------------------------------
+
+class _WorkerHandle:
+    def __init__(self, worker_id: int, process, inbox, cancel_event):
+        self.id = worker_id
+        self.process = process
+        self.inbox = inbox
+        self.cancel_event = cancel_event
+        self.ready = False
+        self.retiring = False
+        self.task_id = None
+        self.tasks_done = 0
+
+
+class _PendingTask:
+    def __init__(self, task_id: int, target: str, args: tuple, kwargs: dict, log_cb, parent_job,
+                 cancel_token: CancellationToken):
+        self.id = task_id
+        self.target = target
+        self.args = args
+        self.kwargs = kwargs
+        self.context = _LocalTaskContext(log_cb, parent_job, cancel_token)
+        self.cancel_token = cancel_token
+        self.finished = threading.Event()
+        self.result = None
+        self.error = None
+        self.cancelled = None
+        self.worker_id = None
+
+
+class PsseWorkerPool:
+    """
+    Keeps N long-lived worker processes with PSSE already initialised.
+    Tasks are routed to idle workers; a worker is replaced when it crashes
+    or after max_tasks_per_worker tasks.
+    """
+    def __init__(self, size: int = DEFAULT_WORKERS, max_tasks_per_worker: int = DEFAULT_MAX_TASKS_PER_WORKER):
+        self.size = max(0, size)
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self._mp = multiprocessing.get_context("spawn")
+        self._outbox = None
+        self._workers: Dict[int, _WorkerHandle] = {}
+        self._tasks: Dict[int, _PendingTask] = {}
+        self._backlog = deque()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._worker_ids = itertools.count(1)
+        self._supervisor = None
+        self._started = False
+        self._stopping = False
+        self.restarts = 0
+
+    @property
+    def in_process(self) -> bool:
+        return self.size == 0
+
+    def start(self):
+        with self._lock:
+            if self._started or self.in_process:
+                self._started = True
+                return
+            self._outbox = self._mp.Queue()
+            for _ in range(self.size):
+                self._spawn_worker()
+            self._started = True
+        self._supervisor = threading.Thread(target=self._supervise, name="psse-pool-supervisor", daemon=True)
+        self._supervisor.start()
+
+    def run(self, target: str, args: tuple = (), kwargs: Optional[dict] = None,
+            log_cb: Optional[Callable[[str], None]] = None,
+            cancel_token: Optional[CancellationToken] = None) -> Any:
+        """
+        Run `target` ('module:function') on a PSSE worker and block until it returns.
+        Logs and events from the task go to log_cb and/or the calling job.
+        Cancelling `cancel_token` (default: the calling job's token) stops the task
+        at its next checkpoint and raises JobCancelled with its partial result.
+        """
+        kwargs = kwargs or {}
+        parent_job = job_module.get_current_job()
+        if cancel_token is None:
+            cancel_token = getattr(parent_job, "cancel_token", None) or CancellationToken()
+        if not self._started:
+            self.start()
+
+        if self.in_process:
+            with psse_session.PSSE_LOCK:
+                return _run_with_context(_LocalTaskContext(log_cb, parent_job, cancel_token), target, args, kwargs)
+
+        task = _PendingTask(next(self._ids), target, args, kwargs, log_cb, parent_job, cancel_token)
+        with self._lock:
+            self._tasks[task.id] = task
+            self._backlog.append(task)
+            self._dispatch()
+
+        cancel_sent = False
+        while not task.finished.wait(CANCEL_POLL_INTERVAL):
+            if not cancel_sent and cancel_token.cancelled:
+                self._cancel_task(task)
+                cancel_sent = True
+
+        if task.cancelled is not None:
+            message, partial, timed_out = task.cancelled
+            raise (StageTimeout if timed_out else JobCancelled)(message, partial)
+        if task.error is not None:
+            message, tb = task.error
+            raise PsseWorkerError(message, tb)
+        return task.result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": self.size,
+                "max_tasks_per_worker": self.max_tasks_per_worker,
+                "in_process": self.in_process,
+                "workers": [
+                    {
+                        "worker_id": w.id,
+                        "pid": w.process.pid,
+                        "ready": w.ready,
+                        "busy": w.task_id is not None,
+                        "tasks_done": w.tasks_done,
+                    }
+                    for w in self._workers.values()
+                ],
+                "queued_tasks": len(self._backlog),
+                "running_tasks": sum(1 for w in self._workers.values() if w.task_id is not None),
+                "restarts": self.restarts,
+            }
+
+    def shutdown(self):
+        with self._lock:
+            self._stopping = True
+            workers = list(self._workers.values())
+            for task in list(self._tasks.values()):
+                self._fail_task(task, "PSSE worker pool is shutting down")
+        for w in workers:
+            try:
+                w.inbox.put(None)
+            except Exception:
+                pass
+        for w in workers:
+            w.process.join(timeout=5)
+            if w.process.is_alive():
+                w.process.terminate()
+
+    # --- internals (call with self._lock held unless noted) ---
+
+    def _spawn_worker(self):
+        worker_id = next(self._worker_ids)
+        inbox = self._mp.Queue()
+        cancel_event = self._mp.Event()
+        process = self._mp.Process(
+            target=_worker_main,
+            args=(worker_id, inbox, self._outbox, cancel_event, self.max_tasks_per_worker),
+            name=f"psse-worker-{worker_id}",
+            daemon=True
+        )
+        process.start()
+        self._workers[worker_id] = _WorkerHandle(worker_id, process, inbox, cancel_event)
+
+    def _cancel_task(self, task: _PendingTask):
+        """Drop a queued task, or signal the worker running it (called without the lock)"""
+        with self._lock:
+            if task in self._backlog:
+                self._backlog.remove(task)
+                self._tasks.pop(task.id, None)
+                task.cancelled = ("Job cancelled before it started", None, False)
+                task.finished.set()
+                return
+            worker = self._workers.get(task.worker_id)
+            if worker is not None and worker.task_id == task.id:
+                worker.cancel_event.set()
+
+    def _dispatch(self):
+        for worker in self._workers.values():
+            if not self._backlog:
+                return
+            if worker.ready and not worker.retiring and worker.task_id is None and worker.process.is_alive():
+                task = self._backlog.popleft()
+                task.worker_id = worker.id
+                worker.task_id = task.id
+                worker.cancel_event.clear()
+                worker.inbox.put((task.id, task.target, task.args, task.kwargs, task.cancel_token.budgets))
+
+    def _fail_task(self, task: _PendingTask, message: str, tb: str = ""):
+        task.error = (message, tb)
+        self._tasks.pop(task.id, None)
+        try:
+            self._backlog.remove(task)
+        except ValueError:
+            pass
+        task.finished.set()
+
+    def _finish_worker_task(self, worker_id: int, task_id: int):
+        worker = self._workers.get(worker_id)
+        if worker is not None and worker.task_id == task_id:
+            worker.task_id = None
+            worker.tasks_done += 1
+            # The worker exits by itself after its last task; never hand it another
+            if self.max_tasks_per_worker and worker.tasks_done >= self.max_tasks_per_worker:
+                worker.retiring = True
+        return self._tasks.pop(task_id, None)
+
+    def _handle_message(self, msg):
+        kind = msg[0]
+        if kind in ("log", "event", "progress"):
+            # Forwarded outside the lock: it may call into a Job
+            task = self._tasks.get(msg[1])
+            if task is None:
+                if kind == "log":
+                    print(msg[2])
+                return
+            if kind == "log":
+                task.context.log(msg[2])
+            elif kind == "event":
+                task.context.emit(msg[2], msg[3])
+            else:
+                task.context.set_progress(msg[2], msg[3])
+            return
+        if kind == "metrics":
+            REGISTRY.merge(msg[2])
+            return
+
+        with self._lock:
+            if kind == "ready":
+                worker = self._workers.get(msg[1])
+                if worker is not None:
+                    worker.ready = True
+            elif kind == "done":
+                task = self._finish_worker_task(msg[1], msg[2])
+                if task is not None:
+                    task.result = msg[3]
+                    task.finished.set()
+            elif kind == "error":
+                task = self._finish_worker_task(msg[1], msg[2])
+                if task is not None:
+                    task.error = (msg[3], msg[4])
+                    task.finished.set()
+            elif kind == "cancelled":
+                task = self._finish_worker_task(msg[1], msg[2])
+                if task is not None:
+                    task.cancelled = (msg[3], msg[4], msg[5])
+                    task.finished.set()
+            elif kind == "retire":
+                worker = self._workers.get(msg[1])
+                if worker is not None:
+                    worker.retiring = True
+            self._dispatch()
+
+    def _check_workers(self):
+        with self._lock:
+            for worker in list(self._workers.values()):
+                if worker.process.is_alive():
+                    continue
+                del self._workers[worker.id]
+                if worker.task_id is not None:
+                    task = self._tasks.get(worker.task_id)
+                    if task is not None:
+                        self._fail_task(task, f"PSSE worker {worker.id} exited unexpectedly (exit code {worker.process.exitcode})")
+                if not self._stopping:
+                    if not worker.retiring:
+                        self.restarts += 1
+                    self._spawn_worker()
+            self._dispatch()
+
+    def _supervise(self):
+        last_check = time.monotonic()
+        while not self._stopping:
+            try:
+                msg = self._outbox.get(timeout=SUPERVISE_INTERVAL)
+                self._handle_message(msg)
+            except queue.Empty:
+                pass
+            except Exception:
+                traceback.print_exc()
+            if time.monotonic() - last_check >= SUPERVISE_INTERVAL:
+                self._check_workers()
+                last_check = time.monotonic()
+
+
+_pool: Optional[PsseWorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_psse_pool() -> PsseWorkerPool:
+    """Process-wide PSSE worker pool, created on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = PsseWorkerPool()
+        return _pool
+
+
+def shutdown_psse_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
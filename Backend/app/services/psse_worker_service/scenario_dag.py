@@ -0,0 +1,136 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+from app.services.job_service.cancellation import CancellationToken, current_cancel_token
+from app.services.psse_worker_service.case_snapshot import CaseSnapshot
+from app.services.psse_worker_service.load_flow import LoadFlowError
+
+
+class ScenarioStepFailed(Exception):
+    """A step returned False (it has logged why) or its load flow would not converge"""
+    def __init__(self, step: str):
+        super().__init__(f"Scenario step '{step}' failed")
+        self.step = step
+
+
+class ScenarioStep:
+    """
+    One step of a scenario DAG. It starts from the case as `parent` left it
+    (None: the base case) and gets the outputs of the `needs` steps:
+
+        run({need: output, ...}) -> output, or False on failure
+
+    A step with children is a shared prefix: it runs once and every child
+    starts from its state.
+    """
+    def __init__(self, name: str, run: Callable[[Dict[str, Any]], Any], parent: Optional[str] = None,
+                 needs: Sequence[str] = ()):
+        self.name = name
+        self.run = run
+        self.parent = parent
+        self.needs = tuple(needs)
+
+
+class ScenarioDag:
+    """
+    Scenario steps over one base case. Steps linked by a parent or a need
+    form a branch; branches share nothing but the base case, so each can run
+    in its own PSSE worker (see branches() and run()).
+    """
+    def __init__(self, steps: List[ScenarioStep]):
+        self.steps = {s.name: s for s in steps}
+        self.order = [s.name for s in steps]
+        for s in steps:
+            for other in ((s.parent,) if s.parent else ()) + s.needs:
+                if other not in self.steps:
+                    raise ValueError(f"Step '{s.name}' refers to unknown step '{other}'")
+
+    def _children(self, parent: Optional[str], names) -> List[str]:
+        return [n for n in self.order if n in names and self.steps[n].parent == parent]
+
+    def _subtree(self, name: str, names) -> List[str]:
+        found = [name]
+        for child in self._children(name, names):
+            found += self._subtree(child, names)
+        return found
+
+    def branches(self) -> List[List[str]]:
+        """Independent groups of steps, in declaration order"""
+        group = {n: n for n in self.order}
+
+        def root(n):
+            while group[n] != n:
+                n = group[n]
+            return n
+
+        for s in self.steps.values():
+            for other in ((s.parent,) if s.parent else ()) + s.needs:
+                group[root(s.name)] = root(other)
+        result: Dict[str, List[str]] = {}
+        for n in self.order:
+            result.setdefault(root(n), []).append(n)
+        return list(result.values())
+
+    def _ordered(self, siblings: List[str], names, done) -> List[str]:
+        """Siblings in an order where each runs after what its subtree needs from outside it"""
+        pending, ordered = list(siblings), []
+        available = set(done)
+        while pending:
+            for n in pending:
+                subtree = set(self._subtree(n, names))
+                if all(need in available or need in subtree
+                       for m in subtree for need in self.steps[m].needs):
+                    break
+            else:
+                raise ValueError(f"Steps {pending} need each other")
+            pending.remove(n)
+            ordered.append(n)
+            available |= subtree
+        return ordered
+
+    def run(self, snapshot: CaseSnapshot, names: Optional[Iterable[str]] = None,
+            log_cb: Optional[Callable[[str], None]] = None,
+            cancel_token: Optional[CancellationToken] = None) -> Dict[str, Any]:
+        """
+        Run `names` (default: every step) in this process on the captured
+        `snapshot`: depth first, each shared prefix once, reverting to its
+        checkpoint between its children. Returns the steps' outputs.
+        Raises ScenarioStepFailed when a step fails.
+        """
+        names = set(self.order if names is None else names)
+        cancel_token = cancel_token or current_cancel_token()
+        outputs: Dict[str, Any] = {}
+
+        def run_step(name: str):
+            cancel_token.check()
+            step = self.steps[name]
+            try:
+                output = step.run({need: outputs[need] for need in step.needs})
+            except LoadFlowError as e:
+                if log_cb:
+                    log_cb(f"Step {name}: {e}")
+                raise ScenarioStepFailed(name) from e
+            if output is False:
+                raise ScenarioStepFailed(name)
+            return output
+
+        def back_to(path: List[str]):
+            if snapshot.revert():
+                return
+            # The base case was reloaded: rebuild the prefixes on the way down
+            if log_cb and path:
+                log_cb(f"Replaying {' > '.join(path)} after reloading the base case")
+            for name in path:
+                run_step(name)
+                snapshot.checkpoint()
+
+        def run_children(parent: Optional[str], path: List[str]):
+            for index, name in enumerate(self._ordered(self._children(parent, names), names, outputs)):
+                if index:
+                    back_to(path)
+                outputs[name] = run_step(name)
+                if self._children(name, names):
+                    snapshot.checkpoint()
+                    run_children(name, path + [name])
+                    snapshot.release()
+
+        run_children(None, [])
+        return outputs
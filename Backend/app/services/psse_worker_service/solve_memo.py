@@ -0,0 +1,257 @@
+import os
+import contextvars
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+from app.services.metrics_service.metrics import count
+from app.services.psse_worker_service.case_snapshot import SHUNT_INTS
+from app.services.psse_worker_service.load_flow import get_load_flow
+from app.services.psse_worker_service.plant_subsystem import define_plant_subsystem
+
+# Reads whose results depend on the solution; a memo entry keeps them per
+# configuration. Anything else goes straight to psspy.
+SOLUTION_READS = frozenset(("macdat", "brnflo", "busdat", "abusint", "abusreal"))
+# Converged configurations kept per memo
+MEMO_SIZE = int(os.getenv("INS_SOLVE_MEMO_SIZE", "512"))
+# Memos kept per process for runs whose scenarios are split across pool tasks
+SHARED_MEMOS = 8
+# Bus subsystem the generator plants are read through (the plant
+# subsystem of plant_subsystem.py is 11)
+MEMO_SID = 10
+# Decimals that key a ratio or voltage schedule; closer values share an entry
+KEY_DECIMALS = 8
+
+_current = contextvars.ContextVar("ins_solve_memo", default=None)
+_shared: "OrderedDict[str, SolveMemo]" = OrderedDict()
+
+
+def _mpt_ratio(psspy, mpt) -> Optional[float]:
+    if hasattr(mpt, "dict"): mpt = mpt.dict()
+    if mpt.get("mpt_type", "2-WINDING") == "3-WINDING":
+        ierr, ratio = psspy.wnddat(mpt.get("mpt_from"), mpt.get("mpt_to"), mpt.get("mpt_bus_3", 0), "1", "RATIO")
+    else:
+        ierr, ratio = psspy.xfrdat(mpt.get("mpt_from"), mpt.get("mpt_to"), "1", "RATIO")
+    return None if ierr else round(ratio, KEY_DECIMALS)
+
+
+def _shunt_int(psspy, ibus: int, id: str, string: str) -> Optional[int]:
+    """swsint, or None if it fails or this psspy has no such getter"""
+    try:
+        result = psspy.swsint(ibus, id, string)
+    except Exception:
+        return None
+    if not isinstance(result, tuple) or len(result) != 2 or result[0] != 0:
+        return None
+    return result[1]
+
+
+def _plant_schedule(psspy, buses: List[int]) -> Optional[tuple]:
+    """(IREG, VS) of the plants at `buses`, read through subsystem MEMO_SID"""
+    if not buses:
+        return ()
+    if not define_plant_subsystem(psspy, np.asarray(sorted(set(buses)), dtype=np.int64), MEMO_SID):
+        return None
+    ierr_i, ints = psspy.aplantint(MEMO_SID, 4, ["NUMBER", "IREG"])
+    ierr_r, reals = psspy.aplantreal(MEMO_SID, 4, ["VSPU"])
+    if ierr_i or ierr_r or not ints or ints[0] is None:
+        return None
+    plants = {bus: (ireg, round(v, KEY_DECIMALS)) for bus, ireg, v in zip(ints[0], ints[1], reals[0])}
+    return tuple(plants.get(bus) for bus in buses)
+
+
+def case_state(psspy, cfg: Dict[str, Any]) -> Optional[tuple]:
+    """
+    What the reactive checks change on top of the base case: MPT ratios,
+    the generators' plant IREG / VS, and the switched shunts' fields in
+    case_snapshot.SHUNT_INTS (MODSW / STAT).
+    None if any of it cannot be read (nothing is memoised then).
+    """
+    ratios = tuple(_mpt_ratio(psspy, mpt) for mpt in cfg.get("MPT_LIST") or [])
+    if None in ratios:
+        return None
+    schedule = _plant_schedule(psspy, [int(b) for b in cfg.get("GEN_BUSES") or []])
+    if schedule is None:
+        return None
+    shunts = []
+    for shunt in cfg.get("SHUNT_LIST") or []:
+        if hasattr(shunt, "dict"): shunt = shunt.dict()
+        # Every field the checks write (anything else makes the journal reload the case)
+        state = tuple(_shunt_int(psspy, shunt["BUS"], shunt["ID"], string) for string in SHUNT_INTS.values())
+        if None in state:
+            return None
+        shunts.append(state)
+    return ratios, schedule, tuple(shunts)
+
+
+def base_fingerprint(cfg: Dict[str, Any]) -> tuple:
+    """The SAV file the scenarios start from"""
+    path = cfg.get("SAV_PATH") or ""
+    try:
+        stat = os.stat(path)
+        return os.path.abspath(path), stat.st_mtime, stat.st_size
+    except OSError:
+        return os.path.abspath(path), None, None
+
+
+class SolveMemo:
+    """
+    Converged load flows of one run, keyed by (base fingerprint, MPT ratios,
+    VS schedule, shunt states). A solve of a configuration that is already
+    in the table is skipped and its POI flow, generator Q and bus voltages
+    are served from the entry instead.
+
+    Skipping leaves the case solved at some other configuration, so a read
+    the entry does not hold yet, or ensure_solved() before the case is
+    measured or saved, solves it for real first.
+    """
+    def __init__(self, size: int = MEMO_SIZE):
+        self.size = size
+        self.entries: "OrderedDict[tuple, Dict[Tuple, Any]]" = OrderedDict()
+        self.live_key = None
+        self.hits = 0
+        self.misses = 0
+
+    def forget_solution(self):
+        """The case was (re)loaded or reverted: its solution matches no entry"""
+        self.live_key = None
+
+    def key(self, psspy, cfg: Dict[str, Any]) -> Optional[tuple]:
+        state = case_state(psspy, cfg)
+        return None if state is None else (base_fingerprint(cfg),) + state
+
+    def _solve(self, psspy, log_cb, key, label: str, raise_on_failure: bool):
+        result = get_load_flow(psspy, log_cb).solve(label, raise_on_failure=raise_on_failure)
+        self.misses += 1
+        count("solve_memo.misses")
+        if result.converged and key is not None:
+            self.live_key = key
+            entry = self.entries.pop(key, {})
+            self.entries[key] = entry
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+        else:
+            self.live_key = None
+        return result
+
+    def solve(self, psspy, log_cb, cfg: Dict[str, Any], label: str = "",
+              raise_on_failure: bool = False) -> "SolvedCase":
+        key = self.key(psspy, cfg)
+        if key is not None and key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            count("solve_memo.hits")
+            return SolvedCase(psspy, cfg, True, self, key, log_cb, label)
+        result = self._solve(psspy, log_cb, key, label, raise_on_failure)
+        return SolvedCase(psspy, cfg, result.converged, self, key if result.converged else None, log_cb, label)
+
+    def current(self, psspy, log_cb, cfg: Dict[str, Any], label: str = "") -> "SolvedCase":
+        """The case as the last solve left it, read from the table when its configuration is in there"""
+        key = self.key(psspy, cfg)
+        if key is None or key not in self.entries:
+            return SolvedCase(psspy, cfg, True, None, None, log_cb, label)
+        return SolvedCase(psspy, cfg, True, self, key, log_cb, label)
+
+    def read(self, psspy, log_cb, cfg: Dict[str, Any], key, label: str, api: str, args: tuple):
+        entry = self.entries.get(key)
+        if entry is None:
+            return getattr(psspy, api)(*args)
+        field = (api,) + tuple(tuple(a) if isinstance(a, list) else a for a in args)
+        if field in entry:
+            return entry[field]
+        if self.live_key != key:
+            if self.key(psspy, cfg) != key:
+                # The case has moved on since; read it as it is
+                return getattr(psspy, api)(*args)
+            # Served from the table so far; solve it now to read the rest
+            count("solve_memo.materialized")
+            self._solve(psspy, log_cb, key, label, False)
+            entry = self.entries.get(key)
+            if entry is None or self.live_key != key:
+                return getattr(psspy, api)(*args)
+        value = getattr(psspy, api)(*args)
+        entry[field] = value
+        return value
+
+    def ensure_solved(self, psspy, log_cb, cfg: Dict[str, Any], label: str = ""):
+        """Solve the case if its configuration was only served from the table"""
+        key = self.key(psspy, cfg)
+        if key is not None and key in self.entries and key != self.live_key:
+            count("solve_memo.materialized")
+            self._solve(psspy, log_cb, key, label, False)
+
+
+class SolvedCase:
+    """
+    psspy as one configuration's solution: SOLUTION_READS come from the
+    memo entry, anything else from psspy. `converged` is the solve's.
+    """
+    def __init__(self, psspy, cfg: Dict[str, Any], converged: bool, memo: Optional[SolveMemo], key, log_cb,
+                 label: str):
+        self._psspy = psspy
+        self._cfg = cfg
+        self.converged = converged
+        self._memo = memo
+        self._key = key
+        self._log_cb = log_cb
+        self._label = label
+
+    def __getattr__(self, name):
+        attr = getattr(self._psspy, name)
+        if self._memo is None or name not in SOLUTION_READS:
+            return attr
+
+        def read(*args):
+            return self._memo.read(self._psspy, self._log_cb, self._cfg, self._key, self._label, name, args)
+        return read
+
+
+def current_solve_memo() -> Optional[SolveMemo]:
+    return _current.get()
+
+
+@contextmanager
+def use_solve_memo(memo: Optional[SolveMemo]):
+    """Memoise the load flows of solve_case() inside the block"""
+    token = _current.set(memo)
+    try:
+        yield memo
+    finally:
+        _current.reset(token)
+
+
+def shared_solve_memo(run_key: str) -> SolveMemo:
+    """The memo of `run_key` in this process, so pool tasks of one run share it"""
+    memo = _shared.pop(run_key, None) or SolveMemo()
+    _shared[run_key] = memo
+    while len(_shared) > SHARED_MEMOS:
+        _shared.popitem(last=False)
+    return memo
+
+
+def solve_case(psspy, log_cb: Optional[Callable[[str], None]], cfg: Dict[str, Any], label: str = "",
+               raise_on_failure: bool = False) -> SolvedCase:
+    """
+    Solve the case (LoadFlow ladder), or skip it when the active memo has
+    the configuration. Read the results through the returned SolvedCase.
+    """
+    memo = current_solve_memo()
+    if memo is not None:
+        return memo.solve(psspy, log_cb, cfg, label, raise_on_failure)
+    result = get_load_flow(psspy, log_cb).solve(label, raise_on_failure=raise_on_failure)
+    return SolvedCase(psspy, cfg, result.converged, None, None, log_cb, label)
+
+
+def solved_case(psspy, log_cb: Optional[Callable[[str], None]], cfg: Dict[str, Any], label: str = "") -> SolvedCase:
+    """Reads of the case as the last solve_case() left it"""
+    memo = current_solve_memo()
+    if memo is not None:
+        return memo.current(psspy, log_cb, cfg, label)
+    return SolvedCase(psspy, cfg, True, None, None, log_cb, label)
+
+
+def ensure_solved(psspy, log_cb: Optional[Callable[[str], None]], cfg: Dict[str, Any], label: str = ""):
+    """Before measuring or saving: make the case's solution match its configuration"""
+    memo = current_solve_memo()
+    if memo is not None:
+        memo.ensure_solved(psspy, log_cb, cfg, label)
@@ -0,0 +1,204 @@
+import csv
+from typing import Any, Dict, List, Optional, Sequence
+import xlsxwriter
+from app.services.metrics_service.metrics import stage_timer
+
+# Sheets of Reactive_Report.xlsx, each with two scenarios side by side
+REACTIVE_SHEETS = [
+    ("Max Reactive", ("Max Lag", "Max Lead")),
+    ("095PF Reactive", ("0.95 Lagging", "0.95 Leading")),
+]
+# Layout of one BESS block: rows it takes, first column of each scenario,
+# and the quantity rows under the point names
+BLOCK_ROWS = 8
+BLOCK_COLUMNS = (1, 10)
+QUANTITIES = [("S (MVA)", "S"), ("P (MW)", "P"), ("Q (Mvar)", "Q"), ("pf", "pf")]
+
+# Long-table outputs (CSV / Parquet): one row per scenario and report point
+MEASUREMENT_FIELDS = ["scenario", "bess_id", "name", "S", "P", "Q", "pf"]
+# Parquet rows buffered before a row group is written
+PARQUET_ROW_GROUP = 10000
+
+
+def report_formats(workbook) -> Dict[str, Any]:
+    """The report cell formats, created once per workbook"""
+    return {
+        "header": workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'bg_color': '#FFD700'}),
+        "sub_header": workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'bg_color': '#FCE4D6'}),
+        "cell": workbook.add_format({'border': 1, 'align': 'center'}),
+        "num": workbook.add_format({'border': 1, 'align': 'center', 'num_format': '0.0000'}),
+    }
+
+
+def streaming_workbook(path: str):
+    """xlsxwriter workbook that flushes each row to disk once a later row is written"""
+    return xlsxwriter.Workbook(path, {"constant_memory": True})
+
+
+class TableWriter:
+    """
+    Append-only table streamed to CSV, Parquet and/or a worksheet as rows
+    arrive. Only the current Parquet row group is held in memory; worksheet
+    rows must come in order, which appending guarantees.
+    """
+    def __init__(self, fields: Sequence[str], numeric: Sequence[str] = (), csv_path: Optional[str] = None,
+                 parquet_path: Optional[str] = None, worksheet=None, formats: Optional[Dict[str, Any]] = None,
+                 headers: Optional[Sequence[str]] = None):
+        self.fields = list(fields)
+        self.numeric = set(numeric)
+        self.rows = 0
+        # Parquet first: it is the one that can fail (no pyarrow)
+        self._parquet = None
+        self._parquet_path = parquet_path
+        self._pending: List[Sequence[Any]] = []
+        if parquet_path:
+            self._open_parquet()
+        self._csv_file = self._csv = None
+        if csv_path:
+            self._csv_file = open(csv_path, "w", newline="", encoding="utf-8")
+            self._csv = csv.writer(self._csv_file)
+            self._csv.writerow(self.fields)
+        self._ws = worksheet
+        self._formats = formats
+        if worksheet is not None:
+            worksheet.write_row(0, 0, list(headers or self.fields), formats["header"])
+
+    def _open_parquet(self):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet output needs pyarrow (pip install pyarrow)")
+        self._pa = pa
+        self._schema = pa.schema([(f, pa.float64() if f in self.numeric else pa.string()) for f in self.fields])
+        self._parquet = pq.ParquetWriter(self._parquet_path, self._schema)
+
+    def _flush_parquet(self):
+        if self._parquet is None or not self._pending:
+            return
+        columns = list(zip(*self._pending))
+        self._parquet.write_table(self._pa.Table.from_arrays(
+            [self._pa.array(col, type=self._schema.field(i).type) for i, col in enumerate(columns)],
+            schema=self._schema))
+        self._pending = []
+
+    def append(self, row: Sequence[Any]):
+        """One row, in `fields` order; None leaves a cell empty"""
+        if self._csv is not None:
+            self._csv.writerow(["" if v is None else v for v in row])
+        if self._parquet is not None:
+            self._pending.append([v if v is None or self.fields[i] in self.numeric else str(v)
+                                  for i, v in enumerate(row)])
+            if len(self._pending) >= PARQUET_ROW_GROUP:
+                self._flush_parquet()
+        if self._ws is not None:
+            r = self.rows + 1
+            for c, value in enumerate(row):
+                if value is not None:
+                    self._ws.write(r, c, value, self._formats["num" if self.fields[c] in self.numeric else "cell"])
+        self.rows += 1
+
+    def close(self):
+        if self._csv_file is not None:
+            self._csv_file.close()
+            self._csv_file = self._csv = None
+        if self._parquet is not None:
+            self._flush_parquet()
+            self._parquet.close()
+            self._parquet = None
+
+
+class ReactiveReport:
+    """
+    Reactive_Report.xlsx written scenario by scenario with constant memory.
+    add_scenario() can be called as each scenario finishes: its rows go to
+    the CSV / Parquet outputs at once, and a sheet is written as soon as both
+    of its scenarios are in. close() writes any half-filled sheet (the
+    missing side blank), so a run stopped early still leaves a valid report.
+    """
+    def __init__(self, excel_path: Optional[str] = None, csv_path: Optional[str] = None,
+                 parquet_path: Optional[str] = None):
+        self.excel_path = excel_path
+        self.csv_path = csv_path
+        self.parquet_path = parquet_path
+        self._workbook = streaming_workbook(excel_path) if excel_path else None
+        self._formats = report_formats(self._workbook) if self._workbook else None
+        # Worksheets are added up front so their order does not depend on which scenario finishes first
+        self._sheets = {name: self._workbook.add_worksheet(name) for name, _ in REACTIVE_SHEETS} \
+            if self._workbook else {}
+        self._pending: Dict[str, List[Dict[str, Any]]] = {}
+        self._written = set()
+        self._table = None
+        if csv_path or parquet_path:
+            self._table = TableWriter(MEASUREMENT_FIELDS, numeric=("S", "P", "Q", "pf"),
+                                      csv_path=csv_path, parquet_path=parquet_path)
+
+    def add_scenario(self, scenario: str, measurements: List[Dict[str, Any]]):
+        if self._table is not None:
+            for m in measurements:
+                self._table.append([scenario] + [m.get(f) for f in MEASUREMENT_FIELDS[1:]])
+        if self._workbook is None:
+            return
+        self._pending[scenario] = measurements
+        for sheet, scenarios in REACTIVE_SHEETS:
+            if sheet not in self._written and all(s in self._pending for s in scenarios):
+                self._write_sheet(sheet, scenarios)
+
+    def _write_sheet(self, sheet: str, scenarios):
+        with stage_timer("excel.write"):
+            _write_pair_sheet(self._sheets[sheet], self._formats, scenarios,
+                              [self._pending.pop(s, None) for s in scenarios])
+        self._written.add(sheet)
+
+    def close(self):
+        if self._workbook is not None:
+            for sheet, scenarios in REACTIVE_SHEETS:
+                if sheet not in self._written:
+                    self._write_sheet(sheet, scenarios)
+            with stage_timer("excel.write"):
+                self._workbook.close()
+            self._workbook = None
+        if self._table is not None:
+            self._table.close()
+            self._table = None
+
+    def paths(self) -> Dict[str, str]:
+        return {k: v for k, v in (("excel", self.excel_path), ("csv", self.csv_path),
+                                  ("parquet", self.parquet_path)) if v}
+
+    def __enter__(self) -> "ReactiveReport":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _group_by_bess(measurements: Optional[List[Dict[str, Any]]]) -> Dict[str, List[Dict[str, Any]]]:
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for item in measurements or []:
+        groups.setdefault(item["bess_id"], []).append(item)
+    return groups
+
+
+def _write_pair_sheet(ws, formats, scenarios, cases):
+    """
+    One block of BLOCK_ROWS rows per BESS of the first scenario, the two
+    scenarios side by side. Written strictly row by row for constant memory.
+    """
+    if not cases[0]:
+        return
+    groups = [_group_by_bess(c) for c in cases]
+    start_row = 1
+    for idx in sorted(groups[0]):
+        blocks = [(col, scenario, g.get(idx, [])) for col, scenario, g in zip(BLOCK_COLUMNS, scenarios, groups)]
+        for col, scenario, _ in blocks:
+            ws.merge_range(start_row, col, start_row, col + 4, f"{scenario} {idx}", formats["header"])
+        r = start_row + 1
+        for col, _, items in blocks:
+            ws.write_blank(r, col - 1, None, formats["cell"])
+            ws.write_row(r, col, [i["name"] for i in items], formats["sub_header"])
+        for k, (label, key) in enumerate(QUANTITIES, start=r + 1):
+            for col, _, items in blocks:
+                ws.write(k, col - 1, label, formats["sub_header"])
+                ws.write_row(k, col, [i[key] for i in items], formats["num"])
+        start_row += BLOCK_ROWS
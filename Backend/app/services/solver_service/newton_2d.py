@@ -0,0 +1,206 @@
+import math
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from app.services.metrics_service.metrics import count
+from app.services.solver_service.root_finder import NoUsablePoint
+
+Vec = Tuple[float, float]
+
+
+class Newton2DResult:
+    """Outcome of solve_2d; `telemetry` is what callers log / return"""
+    def __init__(self, x: Vec, response: Vec, error: Vec, converged: bool, solves: int,
+                 reason: str, history: List[Dict[str, Any]], jacobian_refreshes: int,
+                 jacobian: Optional[List[List[float]]] = None):
+        self.x = x
+        self.response = response
+        self.error = error
+        self.converged = converged
+        self.solves = solves
+        self.reason = reason
+        self.history = history
+        self.jacobian_refreshes = jacobian_refreshes
+        # Latest Jacobian estimate, reusable as the next run's starting Jacobian
+        self.jacobian = jacobian
+
+    @property
+    def telemetry(self) -> Dict[str, Any]:
+        methods: Dict[str, int] = {}
+        for step in self.history:
+            methods[step["method"]] = methods.get(step["method"], 0) + 1
+        return {
+            "x": list(self.x),
+            "error": list(self.error),
+            "converged": self.converged,
+            "solves": self.solves,
+            "reason": self.reason,
+            "methods": methods,
+            "jacobian_refreshes": self.jacobian_refreshes,
+        }
+
+
+def _clamp(x: Vec, lo: Sequence[float], hi: Sequence[float]) -> Vec:
+    return (min(max(x[0], lo[0]), hi[0]), min(max(x[1], lo[1]), hi[1]))
+
+
+def _norm(err: Vec, tol: Vec) -> float:
+    # Scale by the tolerances so P (MW) and Q (Mvar) errors weigh the same at convergence
+    return math.hypot(err[0] / tol[0], err[1] / tol[1])
+
+
+def solve_2d(evaluate: Callable[[Vec], Vec], target: Vec, x0: Vec, lo: Sequence[float], hi: Sequence[float],
+             tol: Vec, max_solves: int, fd_step: Optional[Vec] = None,
+             on_step: Optional[Callable[[int, Vec, Vec, Vec, str], None]] = None,
+             cancel_token=None, max_backtracks: int = 4, restore_best: bool = True,
+             jacobian: Optional[List[List[float]]] = None) -> Newton2DResult:
+    """
+    Find x in the box [lo, hi] with evaluate(x) == target for a two-input,
+    two-output problem, where evaluate applies both inputs to the case, solves
+    it once and returns both responses.
+
+    The Jacobian starts from forward differences (two extra solves, step
+    `fd_step`, default 1% of each range) and is then kept current with
+    Broyden rank-one updates, one per solve; a known `jacobian` (e.g. from an
+    earlier run on the same case) skips the differences. Each Newton step is
+    clamped to the box and backtracked until the scaled residual decreases. If that
+    fails, or the Jacobian goes singular, it is rebuilt by differences once;
+    a second failure in a row stops the search.
+
+    evaluate returns NaN responses for a point it cannot evaluate (e.g. the
+    load flow did not converge). A failed Newton step is backtracked like one
+    that does not reduce the residual, a failed difference probe is retried
+    on the other side, and a failed start is retried at the centre of the
+    box. Raises NoUsablePoint if no point could be evaluated.
+
+    If the loop ends on a point other than the best one seen, the best point
+    is re-applied with one extra solve so the case is left there (restore_best).
+    """
+    if fd_step is None:
+        fd_step = (0.01 * (hi[0] - lo[0]), 0.01 * (hi[1] - lo[1]))
+    history: List[Dict[str, Any]] = []
+    state = {"solves": 0, "best": None, "last_x": None}
+    refreshes = 0
+
+    def solve(x: Vec, method: str) -> Optional[Vec]:
+        """The error at x, or None if it could not be evaluated"""
+        if cancel_token is not None:
+            cancel_token.check()
+        response = tuple(evaluate(x))
+        state["solves"] += 1
+        state["last_x"] = x
+        if not all(math.isfinite(r) for r in response):
+            history.append({"x": list(x), "response": list(response), "error": list(response), "method": "failed"})
+            if on_step:
+                on_step(state["solves"], x, response, response, "failed")
+            return None
+        err = (response[0] - target[0], response[1] - target[1])
+        history.append({"x": list(x), "response": list(response), "error": list(err), "method": method})
+        if on_step:
+            on_step(state["solves"], x, response, err, method)
+        if state["best"] is None or _norm(err, tol) < state["best"][0]:
+            state["best"] = (_norm(err, tol), x, response, err)
+        return err
+
+    def converged(err: Vec) -> bool:
+        return abs(err[0]) < tol[0] and abs(err[1]) < tol[1]
+
+    def difference_jacobian(x: Vec, err: Vec) -> Optional[List[List[float]]]:
+        """
+        Forward differences; steps away from the nearer bound so the probe
+        stays in the box. None if a probe hit the target or failed both ways.
+        """
+        cols = []
+        for j in range(2):
+            h = fd_step[j] if x[j] + fd_step[j] <= hi[j] else -fd_step[j]
+            e = None
+            for step in (h, -h):
+                if not lo[j] <= x[j] + step <= hi[j]:
+                    continue
+                h = step
+                e = solve((x[0] + h, x[1]) if j == 0 else (x[0], x[1] + h), "jacobian")
+                if e is not None:
+                    break
+            if e is None or converged(e):
+                return None
+            cols.append(((e[0] - err[0]) / h, (e[1] - err[1]) / h))
+        return [[cols[0][0], cols[1][0]], [cols[0][1], cols[1][1]]]
+
+    x = _clamp(x0, lo, hi)
+    err = solve(x, "initial")
+    centre = ((lo[0] + hi[0]) / 2, (lo[1] + hi[1]) / 2)
+    if err is None and x != centre:
+        x = centre
+        err = solve(x, "initial")
+    if err is None:
+        count("newton_2d.solves", state["solves"])
+        raise NoUsablePoint(state["solves"], history)
+    reason = "max_solves"
+    J = [list(row) for row in jacobian] if jacobian else None
+    fresh = False   # J was just rebuilt by differences, so another rebuild won't help
+
+    while not converged(err):
+        if state["solves"] >= max_solves:
+            break
+        if J is None:
+            J = difference_jacobian(x, err)
+            refreshes += 1
+            fresh = True
+            if J is None:
+                # A difference probe hit the target, or could not be solved
+                if history[-1]["method"] == "failed":
+                    reason = "probe_failed"
+                break
+
+        det = J[0][0] * J[1][1] - J[0][1] * J[1][0]
+        if det == 0 or not math.isfinite(det):
+            if fresh:
+                reason = "singular_jacobian"
+                break
+            J = None
+            continue
+        # Newton direction: J dx = -err
+        dx = ((-err[0] * J[1][1] + err[1] * J[0][1]) / det,
+              (-err[1] * J[0][0] + err[0] * J[1][0]) / det)
+
+        # Backtracking line search on the scaled residual
+        t, accepted = 1.0, False
+        base = _norm(err, tol)
+        for attempt in range(max_backtracks + 1):
+            if state["solves"] >= max_solves:
+                break
+            x_new = _clamp((x[0] + t * dx[0], x[1] + t * dx[1]), lo, hi)
+            if x_new == x:
+                break
+            err_new = solve(x_new, "newton" if attempt == 0 else "backtrack")
+            if err_new is None:
+                t /= 2
+                continue
+            # Broyden update from every solve, accepted or not
+            s = (x_new[0] - x[0], x_new[1] - x[1])
+            ss = s[0] * s[0] + s[1] * s[1]
+            y = (err_new[0] - err[0], err_new[1] - err[1])
+            r = (y[0] - (J[0][0] * s[0] + J[0][1] * s[1]), y[1] - (J[1][0] * s[0] + J[1][1] * s[1]))
+            J = [[J[0][0] + r[0] * s[0] / ss, J[0][1] + r[0] * s[1] / ss],
+                 [J[1][0] + r[1] * s[0] / ss, J[1][1] + r[1] * s[1] / ss]]
+            if converged(err_new) or _norm(err_new, tol) < (1 - 1e-4 * t) * base:
+                x, err, accepted = x_new, err_new, True
+                break
+            t /= 2
+
+        if accepted:
+            fresh = False
+            continue
+        if fresh or state["solves"] >= max_solves:
+            reason = "line_search_failed" if state["solves"] < max_solves else "max_solves"
+            break
+        J = None
+
+    best = state["best"]
+    if converged(best[3]):
+        reason = "converged"
+    if restore_best and best[1] != state["last_x"]:
+        # Leave the case at the best point seen (this can be a difference probe)
+        evaluate(best[1])
+        state["solves"] += 1
+
+    count("newton_2d.solves", state["solves"])
+    return Newton2DResult(best[1], best[2], best[3], reason == "converged", state["solves"], reason, history, refreshes, J)
@@ -0,0 +1,171 @@
+import math
+from typing import Any, Callable, Dict, List, Optional
+from app.services.metrics_service.metrics import count
+
+
+class NoUsablePoint(Exception):
+    """evaluate() failed (returned NaN) at every point the search tried"""
+    def __init__(self, solves: int, history: List[Dict[str, Any]]):
+        super().__init__(f"No usable point after {solves} solves")
+        self.solves = solves
+        self.history = history
+
+
+class RootResult:
+    """Outcome of find_root; `telemetry` is what callers log / return"""
+    def __init__(self, x: float, response: float, error: float, converged: bool, solves: int,
+                 reason: str, history: List[Dict[str, Any]], bracket: tuple):
+        self.x = x
+        self.response = response
+        self.error = error
+        self.converged = converged
+        self.solves = solves
+        self.reason = reason
+        self.history = history
+        self.bracket = bracket
+
+    @property
+    def slope(self) -> Optional[float]:
+        """d(response)/dx from the two evaluated points closest to the result"""
+        points = sorted((h for h in self.history if h["method"] != "failed"), key=lambda h: abs(h["x"] - self.x))
+        for other in points[1:]:
+            if other["x"] != points[0]["x"]:
+                return (other["response"] - points[0]["response"]) / (other["x"] - points[0]["x"])
+        return None
+
+    @property
+    def telemetry(self) -> Dict[str, Any]:
+        methods: Dict[str, int] = {}
+        for step in self.history:
+            methods[step["method"]] = methods.get(step["method"], 0) + 1
+        return {
+            "x": self.x,
+            "error": self.error,
+            "converged": self.converged,
+            "solves": self.solves,
+            "reason": self.reason,
+            "methods": methods,
+            "bracket": list(self.bracket),
+        }
+
+
+def find_root(evaluate: Callable[[float], float], target: float, lo: float, hi: float,
+              tol: float, max_solves: int, increasing: bool = True,
+              x0: Optional[float] = None, slope: Optional[float] = None,
+              on_step: Optional[Callable[[int, float, float, float, str], None]] = None,
+              cancel_token=None, restore_best: bool = True) -> RootResult:
+    """
+    Find x in [lo, hi] with evaluate(x) == target, where evaluate applies x to
+    the case, solves it and returns the measured response (one fnsl per call).
+
+    The response is assumed monotone (increasing unless `increasing` is False),
+    so every solve narrows the bracket without evaluating its ends. Candidates
+    come from Illinois regula falsi once both sides of the root have been seen,
+    from the secant through the last two points before that, or from a Newton
+    step on the `slope` hint for the second point. A candidate outside the
+    bracket, or two interpolation steps that fail to halve the error, fall
+    back to bisection, so the worst case matches plain bisection.
+
+    evaluate returns NaN for a point it cannot evaluate (e.g. the load flow
+    did not converge there). Such a point narrows nothing; once a usable
+    point is known the bracket is cut at the failed point on its far side and
+    the search bisects back towards the usable one, before that it bisects
+    towards the farther bracket end. Raises NoUsablePoint if every solve failed.
+
+    `x0` seeds the first solve (default: bracket midpoint). If the loop ends
+    on a point other than the best one seen, the best point is re-applied
+    with one extra solve so the case is left there (restore_best).
+    """
+    sign = 1.0 if increasing else -1.0
+    history: List[Dict[str, Any]] = []
+    lo_pt = hi_pt = None          # (x, signed error) at the bracket ends, once evaluated
+    last_side = None              # which end moved last, for the Illinois halving
+    prev = None                   # previous (x, error) for the secant
+    best = None                   # (abs error, x, response, error)
+    errors: List[float] = []     # |error| per solve, to detect stalled interpolation
+    reason = "max_solves"
+
+    x = x0 if x0 is not None and lo < x0 < hi else (lo + hi) / 2
+    method = "initial" if x0 is not None and lo < x0 < hi else "bisection"
+
+    solves = 0
+    while solves < max_solves:
+        if cancel_token is not None:
+            cancel_token.check()
+        response = evaluate(x)
+        solves += 1
+        last_x = x
+        if not math.isfinite(response):
+            history.append({"x": x, "response": response, "error": response, "method": "failed"})
+            if on_step:
+                on_step(solves, x, response, response, "failed")
+            if best is not None:
+                # Keep to the usable side of the failed point
+                if x > best[1]:
+                    hi = min(hi, x)
+                else:
+                    lo = max(lo, x)
+                x, method = (best[1] + x) / 2, "bisection"
+            else:
+                x, method = (x + (lo if x - lo >= hi - x else hi)) / 2, "bisection"
+            continue
+        err = response - target
+        history.append({"x": x, "response": response, "error": err, "method": method})
+        if on_step:
+            on_step(solves, x, response, err, method)
+        if best is None or abs(err) < best[0]:
+            best = (abs(err), x, response, err)
+
+        if abs(err) < tol:
+            reason = "converged"
+            break
+
+        # Narrow the bracket; s > 0 means x is above the root
+        s = sign * err
+        if s < 0:
+            lo = x
+            if last_side == "lo" and hi_pt is not None:
+                hi_pt = (hi_pt[0], hi_pt[1] / 2)   # Illinois: stale end loses weight
+            lo_pt = (x, s)
+            last_side = "lo"
+        else:
+            hi = x
+            if last_side == "hi" and lo_pt is not None:
+                lo_pt = (lo_pt[0], lo_pt[1] / 2)
+            hi_pt = (x, s)
+            last_side = "hi"
+
+        if hi - lo <= 0:
+            reason = "bracket_collapsed"
+            break
+
+        # Next candidate
+        candidate = None
+        if lo_pt is not None and hi_pt is not None and lo_pt[0] == lo and hi_pt[0] == hi:
+            denom = hi_pt[1] - lo_pt[1]
+            if denom != 0:
+                candidate, method = lo - lo_pt[1] * (hi - lo) / denom, "illinois"
+        elif prev is not None and err != prev[1]:
+            candidate, method = x - err * (x - prev[0]) / (err - prev[1]), "secant"
+        elif slope:
+            candidate, method = x - err / slope, "newton"
+
+        errors.append(abs(err))
+        stalled = (len(errors) >= 3 and errors[-1] > 0.5 * errors[-3]
+                   and all(h["method"] != "bisection" for h in history[-2:]))
+        if candidate is None or not (lo < candidate < hi) or stalled:
+            candidate, method = (lo + hi) / 2, "bisection"
+
+        prev = (x, err)
+        x = candidate
+
+    if best is None:
+        count("root_finder.solves", solves)
+        raise NoUsablePoint(solves, history)
+    if restore_best and best[1] != last_x and reason != "converged":
+        # Leave the case at the best point seen, as the original bisection did
+        evaluate(best[1])
+        solves += 1
+
+    count("root_finder.solves", solves)
+    return RootResult(best[1], best[2], best[3], reason == "converged", solves, reason, history, (lo, hi))
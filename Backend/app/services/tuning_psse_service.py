@@ -1,5 +1,12 @@
 import os
 import csv
+from app.services.job_service.job_manager import emit_event, get_current_job
+from app.services.job_service.cancellation import JobCancelled, current_cancel_token
+from app.services.psse_worker_service import psse_session
+from app.services.psse_worker_service.load_flow import LoadFlowError, get_load_flow
+from app.services.solver_service.root_finder import NoUsablePoint, find_root
+from app.services.solver_service.newton_2d import solve_2d
+from app.services.cache_service.warm_start import warm_start_store, selection_key, sav_digest, predict
 
 # Default constants
 DEFAULT_EPSILON = 0.0000005
@@ -8,28 +15,41 @@ DEFAULT_K_LOW = -1.0
 DEFAULT_K_HIGH = 1.5
 DEFAULT_V_LOW = 0.9
 DEFAULT_V_HIGH = 1.1
+# PQ-coupled mode: solve cap for the 2-D search before falling back to sequential tuning
+DEFAULT_MAX_SOLVES_2D = 30
+# Solves allowed inside a warm-start bracket before widening to the full range
+WARM_MAX_SOLVES = 6
+# Capability sweeps: P/Q tolerance (MW / Mvar) per point and the largest grid accepted
+DEFAULT_SWEEP_EPSILON = 0.001
+MAX_SWEEP_POINTS = 500
 
 
 class PSSETuningService:
-    def __init__(self, sav_path: str, log_path: str = None):
+    def __init__(self, sav_path: str, log_path: str = None, log_cb=None, warm_start: bool = True):
         self.sav_path = sav_path
         self.log_path = log_path
+        self.log_cb = log_cb
         self.logs = []
         self.psspy = None
         self._i = None
         self._f = None
+        # Last evaluated point, reported as the partial result if a run is cancelled
+        self.last_state = {}
+        # Root-finder telemetry per stage (solves, methods used, convergence)
+        self.solver_telemetry = {}
+        # Stored converged states for this SAV/selection, and the ones found in this run
+        self.warm_start = warm_start
+        self._warm = {}
+        self._converged = {}
 
     def _log(self, msg: str):
         self.logs.append(msg)
+        if self.log_cb:
+            self.log_cb(msg)
 
     def _init_psse(self):
         try:
-            import psse35
-            import psspy
-            import redirect
-            
-            redirect.psse2py()
-            psspy.psseinit(10000)
+            psspy = psse_session.init_psse()
             
             if not os.path.isfile(self.sav_path):
                 return {"success": False, "error": "Invalid or missing .sav file", "logs": self.logs}
@@ -45,71 +65,126 @@ class PSSETuningService:
         except Exception as e:
             return {"success": False, "error": str(e), "logs": self.logs}
 
-    def tune_p(self, bus_from: int, bus_to: int, gen_buses: list, gen_ids: list, 
-               p_target: float, epsilon: float = DEFAULT_EPSILON, 
-               max_iter: int = DEFAULT_MAX_ITER, k_low: float = DEFAULT_K_LOW, 
-               k_high: float = DEFAULT_K_HIGH):
-        """Tune P (active power) using bisection method"""
-        
-        psspy = self.psspy
-        _i, _f = self._i, self._f
-        
-        # Get MBASE for each generator
+    def _get_mbase(self, gen_buses: list, gen_ids: list):
         mbase_list = []
         for i, bus in enumerate(gen_buses):
-            ierr, mbase = psspy.macdat(bus, gen_ids[i], 'MBASE')
-            if ierr == 0:
-                mbase_list.append(mbase)
-            else:
+            ierr, mbase = self.psspy.macdat(bus, gen_ids[i], 'MBASE')
+            if ierr != 0:
                 self._log(f"Cannot get MBASE for bus {bus}")
-                return False
+                return None
+            mbase_list.append(mbase)
         self._log(f"MBASE: {mbase_list}")
+        return mbase_list
 
-        def set_pgen_by_ratio(k):
-            for i, bus in enumerate(gen_buses):
-                gen_id = gen_ids[i]
-                p_gen_i = k * mbase_list[i]
-                ierr = psspy.machine_chng_4(
-                    bus, gen_id,
-                    [_i, _i, _i, _i, _i, _i, _i],
-                    [p_gen_i, _f, _f, _f, _f, _f, _f, _f, _f, _f, _f, _f, _f, _f, _f, _f, _f],
-                    ""
-                )
-                if ierr != 0:
-                    self._log(f"Cannot change PG at bus {bus}, id={gen_id}")
-
-        def get_p_poi():
-            psspy.fnsl([1,1,0,0,1,1,0,0])
-            ierr, flow = psspy.brnflo(bus_from, bus_to, '1 ')
-            if ierr != 0 or flow is None:
-                return 0.0
-            if isinstance(flow, complex):
-                return flow.real
-            if isinstance(flow, (list, tuple)) and len(flow) > 0:
-                val = flow[0]
-                return val.real if isinstance(val, complex) else val
-            return 0.0
+    def _set_pgen_by_ratio(self, k: float, gen_buses: list, gen_ids: list, mbase_list: list):
+        _i, _f = self._i, self._f
+        for i, bus in enumerate(gen_buses):
+            gen_id = gen_ids[i]
+            p_gen_i = k * mbase_list[i]
+            ierr = self.psspy.machine_chng_4(
+                bus, gen_id,
+                [_i, _i, _i, _i, _i, _i, _i],
+                [p_gen_i, _f, _f, _f, _f, _f, _f, _f, _f, _f, _f, _f, _f, _f, _f, _f, _f],
+                ""
+            )
+            if ierr != 0:
+                self._log(f"Cannot change PG at bus {bus}, id={gen_id}")
 
-        log_rows = [("Iteration", "k_factor", "P_POI", "Error")]
-        K_LOW, K_HIGH = k_low, k_high
-        
-        for i in range(1, max_iter + 1):
-            k_mid = (K_LOW + K_HIGH) / 2
-            set_pgen_by_ratio(k_mid)
-            p_now = get_p_poi()
-            err = p_now - p_target
-            log_rows.append((i, k_mid, p_now, abs(err)))
-            self._log(f"Iter {i:02d}: k={k_mid:.4f} | P={p_now:.4f} MW | err={err:+.4f}")
-
-            if abs(err) < epsilon:
-                self._log(f"Converged after {i} iterations: P={p_now:.3f} MW, k={k_mid:.4f}")
-                break
-            if err < 0:
-                K_LOW = k_mid
+    def _set_vsched(self, vs: float, gen_buses: list, reg_bus: list):
+        NODE = 0
+        for i, bus in enumerate(gen_buses):
+            ierr = self.psspy.plant_chng_4(bus, NODE, [reg_bus[i], 0], [vs, 100.0])
+
+    def _solve_poi_flow(self, bus_from: int, bus_to: int) -> complex:
+        """
+        Solve the case and return the complex flow (MW + j Mvar) at the POI
+        branch; NaN if the load flow did not converge, which the root finders
+        step away from.
+        """
+        if not get_load_flow(self.psspy, self._log).solve("tuning").converged:
+            return complex("nan")
+        ierr, flow = self.psspy.brnflo(bus_from, bus_to, '1 ')
+        if ierr != 0 or flow is None:
+            return 0j
+        if isinstance(flow, (list, tuple)):
+            if len(flow) == 0:
+                return 0j
+            flow = flow[0]
+        return complex(flow)
+
+    def _find_root(self, stage: str, evaluate, target: float, lo: float, hi: float, epsilon: float,
+                   max_iter: int, on_step, cancel_token, x0: float = None):
+        """
+        find_root, first inside a tight bracket predicted from the warm-start
+        store when there is an entry for this stage, then over the full range
+        (from the best warm point) if the solution wasn't in there.
+        Raises LoadFlowError if the load flow converged at no point tried.
+        """
+        prediction = predict(self._warm[stage], target, lo, hi) if x0 is None and stage in self._warm else None
+        try:
+            if prediction is None:
+                result = find_root(evaluate, target, lo, hi, epsilon, max_iter, x0=x0,
+                                   on_step=on_step, cancel_token=cancel_token)
+                telemetry = dict(result.telemetry, warm_start=False)
             else:
-                K_HIGH = k_mid
+                w_x0, w_lo, w_hi, slope = prediction
+                self._log(f"Warm start: x0={w_x0:.5f} in [{w_lo:.5f}, {w_hi:.5f}]")
+                try:
+                    result = find_root(evaluate, target, w_lo, w_hi, epsilon, min(WARM_MAX_SOLVES, max_iter),
+                                       x0=w_x0, slope=slope, on_step=on_step, cancel_token=cancel_token,
+                                       restore_best=max_iter <= WARM_MAX_SOLVES)
+                    warm_solves, warm_x = result.solves, result.x
+                except NoUsablePoint as e:
+                    if max_iter <= e.solves:
+                        raise
+                    result, warm_solves, warm_x = None, e.solves, None
+                if (result is None or not result.converged) and max_iter > warm_solves:
+                    self._log(f"Warm bracket missed after {warm_solves} solves; widening to [{lo}, {hi}]")
+                    result = find_root(evaluate, target, lo, hi, epsilon, max_iter - warm_solves, x0=warm_x,
+                                       slope=slope, cancel_token=cancel_token,
+                                       on_step=lambda i, *a: on_step(warm_solves + i, *a))
+                    result.solves += warm_solves
+                telemetry = dict(result.telemetry, warm_start=True, warm_solves=warm_solves)
+        except NoUsablePoint as e:
+            raise LoadFlowError(f"Load flow did not converge at any {stage} point ({e.solves} solves)")
+
+        self.solver_telemetry[stage] = telemetry
+        if result.converged:
+            self._converged[stage] = {"x": result.x, "target": target, "response": result.response,
+                                      "slope": result.slope}
+        return result
+
+    def tune_p(self, bus_from: int, bus_to: int, gen_buses: list, gen_ids: list, 
+               p_target: float, epsilon: float = DEFAULT_EPSILON, 
+               max_iter: int = DEFAULT_MAX_ITER, k_low: float = DEFAULT_K_LOW, 
+               k_high: float = DEFAULT_K_HIGH, cancel_token=None, x0: float = None):
+        """Tune P (active power) with the shared root finder"""
+        
+        cancel_token = cancel_token or current_cancel_token()
+        mbase_list = self._get_mbase(gen_buses, gen_ids)
+        if mbase_list is None:
+            return False
+
+        log_rows = [("Iteration", "k_factor", "P_POI", "Error")]
+
+        def evaluate(k):
+            self._set_pgen_by_ratio(k, gen_buses, gen_ids, mbase_list)
+            return self._solve_poi_flow(bus_from, bus_to).real
+
+        def on_step(i, k, p_now, err, method):
+            log_rows.append((i, k, p_now, abs(err)))
+            self.last_state.update({"k_factor": k, "p_poi": p_now, "p_error": err})
+            emit_event("iteration", {"stage": "tune_p", "iteration": i, "k_factor": k, "p_poi": p_now, "error": err, "method": method})
+            self._log(f"Iter {i:02d}: k={k:.4f} | P={p_now:.4f} MW | err={err:+.4f} ({method})")
+
+        with cancel_token.stage("tune_p"):
+            result = self._find_root("tune_p", evaluate, p_target, k_low, k_high, epsilon, max_iter,
+                                     on_step, cancel_token, x0=x0)
+        if result.converged:
+            self._log(f"Converged after {result.solves} solves: P={result.response:.3f} MW, k={result.x:.4f}")
         else:
-            self._log(f"Did not converge after {max_iter} iterations.")
+            self._log(f"Did not converge after {result.solves} solves; kept best k={result.x:.4f} (err={result.error:+.4f})")
+        self.last_state.update({"k_factor": result.x, "p_poi": result.response, "p_error": result.error})
 
         # Write log to CSV
         if self.log_path:
@@ -122,48 +197,31 @@ class PSSETuningService:
     def tune_q(self, bus_from: int, bus_to: int, gen_buses: list, reg_bus: list,
                q_target: float, epsilon: float = DEFAULT_EPSILON,
                max_iter: int = DEFAULT_MAX_ITER, v_low: float = DEFAULT_V_LOW,
-               v_high: float = DEFAULT_V_HIGH):
-        """Tune Q (reactive power) using bisection method"""
+               v_high: float = DEFAULT_V_HIGH, cancel_token=None, x0: float = None):
+        """Tune Q (reactive power) with the shared root finder"""
         
-        psspy = self.psspy
-        NODE = 0
-        V_LOW, V_HIGH = v_low, v_high
-
-        def set_vsched(vs):
-            for i, bus in enumerate(gen_buses):
-                ierr = psspy.plant_chng_4(bus, NODE, [reg_bus[i], 0], [vs, 100.0])
-
-        def get_q_poi():
-            psspy.fnsl([1,1,0,0,1,1,0,0])
-            ierr, flow = psspy.brnflo(bus_from, bus_to, '1 ')
-            if ierr != 0 or flow is None:
-                return 0.0
-            if isinstance(flow, complex):
-                return flow.imag
-            if isinstance(flow, (list, tuple)) and len(flow) > 0:
-                val = flow[0]
-                return val.imag if isinstance(val, complex) else val
-            return 0.0
+        cancel_token = cancel_token or current_cancel_token()
 
         log_rows = [("Iteration", "VSched", "Q_POI")]
-        
-        for i in range(1, max_iter + 1):
-            v_mid = (V_LOW + V_HIGH) / 2
-            set_vsched(v_mid)
-            q_now = get_q_poi()
-            err = q_now - q_target
-            log_rows.append((i, v_mid, q_now))
-            self._log(f"Iter {i:02d}: VSched={v_mid:.5f} | Q={q_now:.4f} | err={err:+.4f}")
-
-            if abs(err) < epsilon:
-                self._log(f"Converged after {i} iterations: Q={q_now:.3f} Mvar, VSched={v_mid:.4f}")
-                break
-            if q_now > q_target:
-                V_HIGH = v_mid
-            else:
-                V_LOW = v_mid
+
+        def evaluate(vs):
+            self._set_vsched(vs, gen_buses, reg_bus)
+            return self._solve_poi_flow(bus_from, bus_to).imag
+
+        def on_step(i, vs, q_now, err, method):
+            log_rows.append((i, vs, q_now))
+            self.last_state.update({"vsched": vs, "q_poi": q_now, "q_error": err})
+            emit_event("iteration", {"stage": "tune_q", "iteration": i, "vsched": vs, "q_poi": q_now, "error": err, "method": method})
+            self._log(f"Iter {i:02d}: VSched={vs:.5f} | Q={q_now:.4f} | err={err:+.4f} ({method})")
+
+        with cancel_token.stage("tune_q"):
+            result = self._find_root("tune_q", evaluate, q_target, v_low, v_high, epsilon, max_iter,
+                                     on_step, cancel_token, x0=x0)
+        if result.converged:
+            self._log(f"Converged after {result.solves} solves: Q={result.response:.3f} Mvar, VSched={result.x:.4f}")
         else:
-            self._log(f"Did not converge after {max_iter} iterations.")
+            self._log(f"Did not converge after {result.solves} solves; kept best VSched={result.x:.5f} (err={result.error:+.4f})")
+        self.last_state.update({"vsched": result.x, "q_poi": result.response, "q_error": result.error})
 
         # Append log to CSV
         if self.log_path:
@@ -173,15 +231,210 @@ class PSSETuningService:
         
         return True
 
+    def tune_pq_coupled(self, bus_from: int, bus_to: int, gen_buses: list, gen_ids: list, reg_bus: list,
+                        p_target: float, q_target: float, epsilon: float = DEFAULT_EPSILON,
+                        max_solves: int = DEFAULT_MAX_SOLVES_2D, k_low: float = DEFAULT_K_LOW,
+                        k_high: float = DEFAULT_K_HIGH, v_low: float = DEFAULT_V_LOW,
+                        v_high: float = DEFAULT_V_HIGH, cancel_token=None):
+        """
+        Tune P and Q together: (k factor, VSched) -> (P_POI, Q_POI) as one 2-D
+        problem, one fnsl per point. Falls back to sequential P then Q tuning,
+        started from the best coupled point, if the 2-D search doesn't converge.
+        """
+        psspy = self.psspy
+        cancel_token = cancel_token or current_cancel_token()
+        mbase_list = self._get_mbase(gen_buses, gen_ids)
+        if mbase_list is None:
+            return False
+
+        # Start from the case as loaded: present dispatch ratio and regulated bus voltage
+        k0, v0 = (k_low + k_high) / 2, (v_low + v_high) / 2
+        ierr, p_now = psspy.macdat(gen_buses[0], gen_ids[0], 'P')
+        if ierr == 0 and mbase_list[0] and k_low < p_now / mbase_list[0] < k_high:
+            k0 = p_now / mbase_list[0]
+        ierr, v_now = psspy.busdat(reg_bus[0], 'PU')
+        if ierr == 0 and v_low < v_now < v_high:
+            v0 = v_now
+
+        # ...or from the stored solution, stepped to the new targets with its Jacobian
+        jacobian = None
+        warm = self._warm.get("tune_pq")
+        if warm and warm.get("jacobian"):
+            (a, b), (c, d) = jacobian = warm["jacobian"]
+            dp, dq = p_target - warm["target"][0], q_target - warm["target"][1]
+            det = a * d - b * c
+            if det:
+                k0 = min(max(warm["x"][0] + (d * dp - b * dq) / det, k_low), k_high)
+                v0 = min(max(warm["x"][1] + (a * dq - c * dp) / det, v_low), v_high)
+                self._log(f"Warm start: k0={k0:.5f}, VSched0={v0:.5f}")
+
+        log_rows = [("Iteration", "k_factor", "VSched", "P_POI", "Q_POI", "P_Error", "Q_Error")]
+
+        def evaluate(x):
+            self._set_pgen_by_ratio(x[0], gen_buses, gen_ids, mbase_list)
+            self._set_vsched(x[1], gen_buses, reg_bus)
+            flow = self._solve_poi_flow(bus_from, bus_to)
+            return flow.real, flow.imag
+
+        def on_step(i, x, response, err, method):
+            log_rows.append((i, x[0], x[1], response[0], response[1], abs(err[0]), abs(err[1])))
+            self.last_state.update({"k_factor": x[0], "vsched": x[1], "p_poi": response[0], "q_poi": response[1],
+                                    "p_error": err[0], "q_error": err[1]})
+            emit_event("iteration", {"stage": "tune_pq", "iteration": i, "k_factor": x[0], "vsched": x[1],
+                                     "p_poi": response[0], "q_poi": response[1], "p_error": err[0], "q_error": err[1],
+                                     "method": method})
+            self._log(f"Iter {i:02d}: k={x[0]:.4f} VSched={x[1]:.5f} | P={response[0]:.4f} MW Q={response[1]:.4f} Mvar "
+                      f"| err=({err[0]:+.4f}, {err[1]:+.4f}) ({method})")
+
+        with cancel_token.stage("tune_pq"):
+            try:
+                result = solve_2d(evaluate, (p_target, q_target), (k0, v0), (k_low, v_low), (k_high, v_high),
+                                  (epsilon, epsilon), max_solves, on_step=on_step, cancel_token=cancel_token,
+                                  jacobian=jacobian)
+            except NoUsablePoint as e:
+                self._log(f"Load flow did not converge at any coupled point ({e.solves} solves)")
+                self.solver_telemetry["tune_pq"] = {"solves": e.solves, "converged": False,
+                                                    "reason": "no_usable_point", "warm_start": jacobian is not None}
+                self._write_log(log_rows)
+                return self._tune_sequential(bus_from, bus_to, gen_buses, gen_ids, reg_bus, p_target, q_target,
+                                             k0, v0, k_low, k_high, v_low, v_high, cancel_token)
+        self.solver_telemetry["tune_pq"] = dict(result.telemetry, warm_start=jacobian is not None)
+        if result.converged and result.jacobian:
+            self._converged["tune_pq"] = {"x": list(result.x), "target": [p_target, q_target],
+                                          "response": list(result.response), "jacobian": result.jacobian}
+        k, vs = result.x
+        self.last_state.update({"k_factor": k, "vsched": vs, "p_poi": result.response[0], "q_poi": result.response[1],
+                                "p_error": result.error[0], "q_error": result.error[1]})
+
+        self._write_log(log_rows)
+
+        if result.converged:
+            self._log(f"Converged after {result.solves} solves: P={result.response[0]:.3f} MW, "
+                      f"Q={result.response[1]:.3f} Mvar, k={k:.4f}, VSched={vs:.5f}")
+            return True
+
+        self._log(f"Coupled search stopped ({result.reason}) after {result.solves} solves; "
+                  f"falling back to sequential P then Q tuning from k={k:.4f}, VSched={vs:.5f}")
+        return self._tune_sequential(bus_from, bus_to, gen_buses, gen_ids, reg_bus, p_target, q_target,
+                                     k, vs, k_low, k_high, v_low, v_high, cancel_token)
+
+    def _write_log(self, log_rows: list):
+        if self.log_path:
+            with open(self.log_path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerows(log_rows)
+
+    def _tune_sequential(self, bus_from, bus_to, gen_buses, gen_ids, reg_bus, p_target, q_target,
+                         k, vs, k_low, k_high, v_low, v_high, cancel_token):
+        """tune_pq_coupled's fallback: tune_p from k, then tune_q from vs"""
+        # The sequential stages write to the same CSV; keep the coupled rows above them
+        log_path, self.log_path = self.log_path, None
+        try:
+            self.tune_p(bus_from, bus_to, gen_buses, gen_ids, p_target, k_low=k_low, k_high=k_high,
+                        cancel_token=cancel_token, x0=k)
+            self.tune_q(bus_from, bus_to, gen_buses, reg_bus, q_target, v_low=v_low, v_high=v_high,
+                        cancel_token=cancel_token, x0=vs)
+        finally:
+            self.log_path = log_path
+        return True
+
+    def _read_poi_flow(self, bus_from: int, bus_to: int) -> complex:
+        """POI flow of the case as last solved (no new solve)"""
+        ierr, flow = self.psspy.brnflo(bus_from, bus_to, '1 ')
+        if ierr != 0 or flow is None:
+            return complex("nan")
+        return complex(flow[0] if isinstance(flow, (list, tuple)) else flow)
+
+    def sweep_capability(self, bus_from: int, bus_to: int, gen_buses: list, gen_ids: list, reg_bus: list,
+                         p_points: list, q_targets: list = None, epsilon: float = DEFAULT_SWEEP_EPSILON,
+                         v_low: float = DEFAULT_V_LOW, v_high: float = DEFAULT_V_HIGH, curve: list = None,
+                         cancel_token=None):
+        """
+        P-Q capability sweep in one session. Without q_targets, each P set-point
+        is tuned with VSched at v_high (Q_max) and at v_low (Q_min); with
+        q_targets, every (P, Q) pair is solved by the coupled search. Points are
+        visited in order along each branch and every search starts from the
+        previous converged point (its k/VSched and slope or Jacobian), so a
+        step along the curve costs a few solves instead of a cold search.
+        Converged points are appended to `curve` as they are found.
+        """
+        cancel_token = cancel_token or current_cancel_token()
+        load_flow = get_load_flow(self.psspy, self._log)
+        curve = curve if curve is not None else []
+        p_order = sorted(p_points)
+        # The per-point searches log to the sweep's CSV, not their own
+        log_path, self.log_path = self.log_path, None
+        try:
+            if q_targets:
+                self._warm = {}
+                for row, p_target in enumerate(p_order):
+                    # Snake through the Q targets so consecutive points stay close
+                    for q_target in (q_targets if row % 2 == 0 else list(reversed(q_targets))):
+                        cancel_token.check()
+                        mark = load_flow.mark()
+                        self.tune_pq_coupled(bus_from, bus_to, gen_buses, gen_ids, reg_bus, p_target, q_target,
+                                             epsilon=epsilon, v_low=v_low, v_high=v_high, cancel_token=cancel_token)
+                        flow = self._read_poi_flow(bus_from, bus_to)
+                        converged = abs(flow.real - p_target) <= epsilon and abs(flow.imag - q_target) <= epsilon
+                        if converged and "tune_pq" in self._converged:
+                            self._warm["tune_pq"] = self._converged.pop("tune_pq")
+                        point = {"p_target": p_target, "q_target": q_target, "p_poi": flow.real, "q_poi": flow.imag,
+                                 "k_factor": self.last_state.get("k_factor"), "vsched": self.last_state.get("vsched"),
+                                 "converged": converged, "solves": load_flow.summary(mark)["solves"]}
+                        curve.append(point)
+                        emit_event("sweep_point", point)
+                return curve
+
+            # Q_max branch upwards in P, then Q_min back down, each continued point to point
+            branches = [("q_max", v_high, p_order), ("q_min", v_low, list(reversed(p_order)))]
+            by_p = {}
+            for name, vsched, order in branches:
+                self._set_vsched(vsched, gen_buses, reg_bus)
+                self._log(f"Sweeping {name}: VSched={vsched}")
+                for p_target in order:
+                    cancel_token.check()
+                    mark = load_flow.mark()
+                    self.tune_p(bus_from, bus_to, gen_buses, gen_ids, p_target, epsilon=epsilon,
+                                cancel_token=cancel_token)
+                    flow = self._read_poi_flow(bus_from, bus_to)
+                    converged = abs(flow.real - p_target) <= epsilon
+                    if converged and "tune_p" in self._converged:
+                        self._warm["tune_p"] = self._converged.pop("tune_p")
+                    solves = load_flow.summary(mark)["solves"]
+                    if p_target not in by_p:
+                        by_p[p_target] = {"p_target": p_target}
+                        curve.append(by_p[p_target])
+                    by_p[p_target].update({name: flow.imag, f"p_poi_{name}": flow.real,
+                                           f"k_{name}": self.last_state.get("k_factor"),
+                                           f"converged_{name}": converged, f"solves_{name}": solves})
+                    emit_event("sweep_point", {"branch": name, "p_target": p_target, "p_poi": flow.real,
+                                               "q_poi": flow.imag, "converged": converged, "solves": solves})
+            for point in curve:
+                point["converged"] = bool(point.get("converged_q_max") and point.get("converged_q_min"))
+            return curve
+        finally:
+            self.log_path = log_path
+
     def run_tuning(self, mode: str, bus_from: int, bus_to: int, gen_buses: list, 
                    gen_ids: list, reg_bus: list, p_target: float, q_target: float):
         """
-        Run tuning based on mode: 'P', 'Q', or 'PQ'
+        Run tuning based on mode: 'P', 'Q', 'PQ' (P then Q) or 'PQ-coupled'
         """
         # Initialize PSSE
         init_result = self._init_psse()
         if not init_result["success"]:
             return init_result
+        load_flow = get_load_flow(self.psspy, self._log)
+        load_flow_mark = load_flow.mark()
+
+        warm_keys = []
+        if self.warm_start:
+            digest = sav_digest(self.sav_path)
+            if digest:
+                warm_keys.append(selection_key(digest, bus_from, bus_to, gen_buses, gen_ids, reg_bus))
+                self._warm = warm_start_store.lookup(warm_keys[0])
+                if self._warm:
+                    self._log(f"Warm-start entry found for stages: {', '.join(k for k in self._warm if k.startswith('tune_'))}")
 
         try:
             if mode == "P":
@@ -191,12 +444,20 @@ class PSSETuningService:
             elif mode == "PQ":
                 self.tune_p(bus_from, bus_to, gen_buses, gen_ids, p_target)
                 self.tune_q(bus_from, bus_to, gen_buses, reg_bus, q_target)
+            elif mode == "PQ-coupled":
+                self.tune_pq_coupled(bus_from, bus_to, gen_buses, gen_ids, reg_bus, p_target, q_target)
             else:
                 return {"success": False, "error": f"Invalid mode: {mode}", "logs": self.logs}
 
             # Save the modified case
             self.psspy.save(self.sav_path)
             self._log(f"Saved file: {self.sav_path}")
+            if warm_keys and self._converged:
+                # Also file it under the saved SAV, so re-tuning the result starts warm
+                digest = sav_digest(self.sav_path)
+                if digest:
+                    warm_keys.append(selection_key(digest, bus_from, bus_to, gen_buses, gen_ids, reg_bus))
+                warm_start_store.update(warm_keys, self._converged, os.path.basename(self.sav_path))
             if self.log_path:
                 self._log(f"Log CSV: {self.log_path}")
             self._log("Completed")
@@ -206,7 +467,86 @@ class PSSETuningService:
                 "message": f"Tuning {mode} completed successfully",
                 "sav_path": self.sav_path,
                 "log_path": self.log_path,
+                "final_state": dict(self.last_state),
+                "solver": dict(self.solver_telemetry),
+                "loadflow": load_flow.summary(load_flow_mark),
                 "logs": self.logs
             }
+        except JobCancelled as e:
+            # The SAV is left untouched; report where the search had got to
+            self._log(f"Stopped: {e}")
+            e.partial = {
+                "success": False,
+                "cancelled": True,
+                "error": str(e),
+                "mode": mode,
+                "last_state": dict(self.last_state),
+                "logs": self.logs
+            }
+            raise
         except Exception as e:
             return {"success": False, "error": str(e), "logs": self.logs}
+
+    def run_sweep(self, bus_from: int, bus_to: int, gen_buses: list, gen_ids: list, reg_bus: list,
+                  p_points: list, q_targets: list = None, epsilon: float = DEFAULT_SWEEP_EPSILON,
+                  v_low: float = DEFAULT_V_LOW, v_high: float = DEFAULT_V_HIGH):
+        """Capability sweep over p_points; the SAV itself is not modified"""
+        init_result = self._init_psse()
+        if not init_result["success"]:
+            return init_result
+        load_flow = get_load_flow(self.psspy, self._log)
+        load_flow_mark = load_flow.mark()
+        curve = []
+        try:
+            self.sweep_capability(bus_from, bus_to, gen_buses, gen_ids, reg_bus, p_points, q_targets,
+                                  epsilon=epsilon, v_low=v_low, v_high=v_high, curve=curve)
+        except JobCancelled as e:
+            self._log(f"Stopped: {e}")
+            e.partial = {"success": False, "cancelled": True, "error": str(e), "curve": curve, "logs": self.logs}
+            raise
+        except Exception as e:
+            return {"success": False, "error": str(e), "curve": curve, "logs": self.logs}
+
+        if self.log_path:
+            columns = list(dict.fromkeys(k for point in curve for k in point))
+            with open(self.log_path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=columns)
+                writer.writeheader()
+                writer.writerows(curve)
+            self._log(f"Curve CSV: {self.log_path}")
+
+        loadflow = load_flow.summary(load_flow_mark)
+        failed = sum(1 for point in curve if not point["converged"])
+        self._log(f"Sweep completed: {len(curve)} points, {loadflow['solves']} solves"
+                  + (f", {failed} point(s) not reached" if failed else ""))
+        return {
+            "success": True,
+            "message": f"Capability sweep completed ({len(curve)} points)",
+            "sav_path": self.sav_path,
+            "log_path": self.log_path,
+            "mode": "q_targets" if q_targets else "q_limits",
+            "curve": curve,
+            "failed_points": failed,
+            "solves": loadflow["solves"],
+            "loadflow": loadflow,
+            "logs": self.logs
+        }
+
+
+def run_tuning_task(sav_path: str, log_path: str, mode: str, bus_from: int, bus_to: int,
+                    gen_buses: list, gen_ids: list, reg_bus: list, p_target: float, q_target: float,
+                    warm_start: bool = True):
+    """Entry point for the PSSE worker pool"""
+    job = get_current_job()
+    service = PSSETuningService(sav_path, log_path, log_cb=job.log if job else None, warm_start=warm_start)
+    return service.run_tuning(mode, bus_from, bus_to, gen_buses, gen_ids, reg_bus, p_target, q_target)
+
+
+def run_sweep_task(sav_path: str, log_path: str, bus_from: int, bus_to: int, gen_buses: list, gen_ids: list,
+                   reg_bus: list, p_points: list, q_targets: list = None, epsilon: float = DEFAULT_SWEEP_EPSILON,
+                   v_low: float = DEFAULT_V_LOW, v_high: float = DEFAULT_V_HIGH):
+    """Entry point for the PSSE worker pool"""
+    job = get_current_job()
+    service = PSSETuningService(sav_path, log_path, log_cb=job.log if job else None, warm_start=False)
+    return service.run_sweep(bus_from, bus_to, gen_buses, gen_ids, reg_bus, p_points, q_targets,
+                             epsilon=epsilon, v_low=v_low, v_high=v_high)
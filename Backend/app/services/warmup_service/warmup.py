@@ -0,0 +1,135 @@
+import os
+import sys
+import time
+import threading
+import importlib
+import traceback
+from typing import Any, Dict, List, Optional
+from app.services.metrics_service.metrics import observe_stage
+
+# Third-party libraries first so each service module is charged only for its own code
+WARMUP_MODULES = [
+    "numpy",
+    "pandas",
+    "openpyxl",
+    "xlsxwriter",
+    "requests",
+    "app.services.psse_build_service",
+    "app.services.pscad_build_service",
+    "app.services.tuning_psse_service",
+    "app.services.basic_model_psse_service",
+    "app.services.check_reactive_psse_service",
+    "app.services.batch_psse_service",
+    "app.services.pscad_setup_case_service",
+    "app.services.build_model_etap_services.etap_bess_sld_service",
+    "app.services.build_model_etap_services.etap_pv_sld_service",
+    "app.services.build_model_etap_services.etap_wt_sld_service",
+    "app.services.auto_tuning_pscad_services.auto_tuning_service",
+]
+
+WARMUP_ENABLED = os.getenv("INS_WARMUP", "1") != "0"
+# Start the PSSE worker processes during warm-up instead of on the first PSSE request
+WARMUP_PSSE_POOL = os.getenv("INS_WARMUP_PSSE_POOL", "1") != "0"
+# Total import time (seconds) above which the warm-up report flags a regression
+IMPORT_BUDGET_SECONDS = float(os.getenv("INS_IMPORT_BUDGET_SECONDS", "15"))
+
+
+class WarmupState:
+    def __init__(self):
+        self.status = "pending"
+        self.started_at = None
+        self.finished_at = None
+        self.modules: List[Dict[str, Any]] = []
+        self.psse_pool: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            import_seconds = sum(m["seconds"] for m in self.modules)
+            return {
+                "status": self.status,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "import_seconds": round(import_seconds, 4),
+                "import_budget_seconds": IMPORT_BUDGET_SECONDS,
+                "within_budget": import_seconds <= IMPORT_BUDGET_SECONDS,
+                "modules": sorted(self.modules, key=lambda m: m["seconds"], reverse=True),
+                "psse_pool": self.psse_pool,
+            }
+
+
+_state = WarmupState()
+
+
+def _import_module(name: str) -> Dict[str, Any]:
+    entry = {"module": name, "seconds": 0.0, "status": "already_loaded", "error": None}
+    if name in sys.modules:
+        return entry
+    start = time.perf_counter()
+    try:
+        importlib.import_module(name)
+        entry["status"] = "imported"
+    except Exception as e:
+        # Optional dependencies (PSSE, PSCAD, langchain) may be missing on this machine
+        entry["status"] = "failed"
+        entry["error"] = f"{type(e).__name__}: {e}"
+    entry["seconds"] = round(time.perf_counter() - start, 4)
+    observe_stage(f"import:{name}", entry["seconds"])
+    return entry
+
+
+def _run(modules: List[str], warm_pool: bool):
+    with _state._lock:
+        _state.status = "running"
+        _state.started_at = time.time()
+    try:
+        for name in modules:
+            entry = _import_module(name)
+            with _state._lock:
+                _state.modules.append(entry)
+
+        if warm_pool:
+            from app.services.psse_worker_service.psse_worker_pool import get_psse_pool
+            pool = get_psse_pool()
+            pool.start()
+            with _state._lock:
+                _state.psse_pool = {"size": pool.size, "in_process": pool.in_process}
+
+        report = _state.report()
+        print(f"[Warmup] Imported {len(modules)} modules in {report['import_seconds']:.2f}s")
+        if not report["within_budget"]:
+            slowest = ", ".join(f"{m['module']} {m['seconds']:.2f}s" for m in report["modules"][:3])
+            print(f"[Warmup] ⚠️ Import time exceeds budget of {IMPORT_BUDGET_SECONDS}s (slowest: {slowest})")
+        with _state._lock:
+            _state.status = "done"
+    except Exception:
+        traceback.print_exc()
+        with _state._lock:
+            _state.status = "failed"
+    finally:
+        with _state._lock:
+            _state.finished_at = time.time()
+
+
+def start_warmup(modules: Optional[List[str]] = None, warm_pool: bool = WARMUP_PSSE_POOL) -> bool:
+    """
+    Import the heavy service modules on a background thread so the first
+    request doesn't pay for them. Returns immediately; safe to call twice.
+    """
+    if not WARMUP_ENABLED:
+        _state.status = "disabled"
+        return False
+    with _state._lock:
+        if _state._thread is not None:
+            return False
+        _state._thread = threading.Thread(
+            target=_run, args=(list(modules or WARMUP_MODULES), warm_pool),
+            name="ins-warmup", daemon=True
+        )
+    _state._thread.start()
+    return True
+
+
+def warmup_report() -> Dict[str, Any]:
+    return _state.report()
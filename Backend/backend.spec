@@ -6,7 +6,7 @@ a = Analysis(
     pathex=['.', 'TOOLs'],
     binaries=[],
     datas=[('templates', 'templates'), ('app/services/build_model_libs', 'app/services/build_model_libs'), ('TOOLs', 'TOOLs')],
-    hiddenimports=['uvicorn.logging', 'uvicorn.loops', 'uvicorn.loops.auto', 'uvicorn.protocols', 'uvicorn.protocols.http', 'uvicorn.protocols.http.auto', 'uvicorn.lifespan', 'uvicorn.lifespan.on', 'uvicorn.lifespan.off', 'PSSE_Model', 'PSSE_Model_Detail', 'PSCAD_Model', 'Data', 'component', 'mhi', 'mhi.pscad'],
+    hiddenimports=['uvicorn.logging', 'uvicorn.loops', 'uvicorn.loops.auto', 'uvicorn.protocols', 'uvicorn.protocols.http', 'uvicorn.protocols.http.auto', 'uvicorn.lifespan', 'uvicorn.lifespan.on', 'uvicorn.lifespan.off', 'PSSE_Model', 'PSSE_Model_Detail', 'PSCAD_Model', 'Data', 'component', 'mhi', 'mhi.pscad', 'app.services.tuning_psse_service', 'app.services.basic_model_psse_service', 'app.services.check_reactive_psse_service', 'app.services.batch_psse_service'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -0,0 +1,43 @@
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.psse_worker_service import psse_session
+from app.services.psse_worker_service.fake_network import build_plant_case
+from app.services.benchmark_service.suite import _check_cfg
+
+
+@pytest.fixture(scope="session")
+def psspy():
+    """The NumPy stand-in for PSSE (no PSSE install needed)"""
+    psse_session.use_fake_backend()
+    return psse_session.init_psse()
+
+
+@pytest.fixture
+def plant_case(psspy, tmp_path):
+    """build_plant_case() in tmp_path, loaded: returns (meta, cfg) as the checks and tuning take them"""
+    def build(units: int = 4, mpts: int = 1, shunts: bool = True, mpt_type: str = "2-WINDING"):
+        path = str(tmp_path / f"u{units}_m{mpts}_{'sh' if shunts else 'nosh'}.sav")
+        meta = build_plant_case(path, units=units, mpts=mpts, shunts=shunts, mpt_type=mpt_type)
+        psspy.case(path)
+        return meta, _check_cfg(meta, path)
+    return build
+
+
+@pytest.fixture
+def diverges_when(monkeypatch):
+    """diverges_when(condition): every solve of a fake network for which condition(network) holds fails"""
+    from app.services.psse_worker_service.fake_network import FakeNetwork
+    solve = FakeNetwork.solve
+
+    def patch(condition):
+        def failing(network, *args, **kwargs):
+            status = solve(network, *args, **kwargs)
+            if condition(network):
+                network.status = status = 1     # iteration limit exceeded
+            return status
+        monkeypatch.setattr(FakeNetwork, "solve", failing)
+    return patch
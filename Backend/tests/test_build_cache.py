@@ -0,0 +1,84 @@
+import os
+import threading
+from app.services.cache_service.build_cache import BuildCache, build_in, build_key
+
+TIMEOUT = 5.0
+
+
+class Builder:
+    """Stands in for a model build: writes <stem>.sav and <stem>.log next to the workbook it is given"""
+    def __init__(self, barrier: threading.Barrier = None, success: bool = True):
+        self.barrier = barrier
+        self.success = success
+        self.calls = 0
+
+    def __call__(self, workbook):
+        self.calls += 1
+        stem = os.path.splitext(workbook)[0]
+        with open(stem + ".sav", "w") as f:
+            f.write(f"{os.path.basename(stem)} built")
+        if self.barrier is not None:
+            # Both builds are half done: each has written a file the other could pick up
+            self.barrier.wait(TIMEOUT)
+        with open(stem + ".log", "w") as f:
+            f.write("ok")
+        return {"success": self.success, "message": "built"}
+
+
+def _workbook(folder, name):
+    path = folder / name
+    path.write_text(f"workbook {name}")
+    return str(path)
+
+
+def _build(cache, path, builder):
+    # What the build services do, minus the subprocess
+    return cache.run("psse.equivalent", path, lambda output_dir: build_in(output_dir, builder, path))
+
+
+def _read(path):
+    with open(path) as f:
+        return f.read()
+
+
+def test_concurrent_builds_in_one_folder_keep_their_own_outputs(tmp_path):
+    folder = tmp_path / "project"
+    folder.mkdir()
+    cache = BuildCache(str(tmp_path / "cache"))
+    paths = [_workbook(folder, "a.xlsx"), _workbook(folder, "b.xlsx")]
+    barrier = threading.Barrier(2)
+    results = {}
+
+    def run(path):
+        results[path] = _build(cache, path, Builder(barrier))
+    threads = [threading.Thread(target=run, args=(path,)) for path in paths]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(TIMEOUT)
+
+    assert all(result["success"] and not result["cached"] for result in results.values())
+    assert sorted(os.listdir(folder)) == ["a.log", "a.sav", "a.xlsx", "b.log", "b.sav", "b.xlsx"]
+    for path, stem in zip(paths, "ab"):
+        manifest = cache.lookup(results[path]["cache_key"])
+        assert manifest["files"] == [f"{stem}.log", f"{stem}.sav"]
+        assert results[path]["outputs"] == manifest["files"]
+
+    # b has been rebuilt since; a hit on a restores a's files only
+    (folder / "b.sav").write_text("b rebuilt")
+    builder = Builder()
+    hit = _build(cache, paths[0], builder)
+    assert hit["cached"] and builder.calls == 0
+    assert _read(folder / "a.sav") == "a built"
+    assert _read(folder / "b.sav") == "b rebuilt"
+
+
+def test_failed_build_leaves_nothing_behind(tmp_path):
+    folder = tmp_path / "project"
+    folder.mkdir()
+    cache = BuildCache(str(tmp_path / "cache"))
+    path = _workbook(folder, "a.xlsx")
+    result = _build(cache, path, Builder(success=False))
+    assert not result["success"]
+    assert os.listdir(folder) == ["a.xlsx"]
+    assert cache.lookup(build_key("psse.equivalent", path)) is None
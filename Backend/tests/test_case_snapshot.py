@@ -0,0 +1,105 @@
+import pytest
+from app.services import check_reactive_psse_service as checks
+from app.services.psse_worker_service.case_snapshot import CaseSnapshot
+
+
+def case_state(psspy, meta):
+    """Every field the checks change, read straight from psspy"""
+    state = {}
+    for bus, gid in zip(meta["gen_buses"], meta["gen_ids"]):
+        state[("status", bus)] = psspy.macint(bus, gid, "STATUS")[1]
+        for field in ("P", "QMAX", "QMIN"):
+            state[(field, bus)] = psspy.macdat(bus, gid, field)[1]
+    _, (numbers, iregs) = psspy.aplantint(-1, 4, ["NUMBER", "IREG"])
+    _, (vs,) = psspy.aplantreal(-1, 4, ["VSPU"])
+    state["plants"] = sorted(zip(numbers, iregs, vs))
+    for mpt in meta["mpt_list"]:
+        if mpt["mpt_type"] == "3-WINDING":
+            ratio = psspy.wnddat(mpt["mpt_from"], mpt["mpt_to"], mpt["mpt_bus_3"], "1", "RATIO")[1]
+        else:
+            ratio = psspy.xfrdat(mpt["mpt_from"], mpt["mpt_to"], "1", "RATIO")[1]
+        state[("ratio", mpt["mpt_from"])] = ratio
+    for shunt in meta["shunt_list"]:
+        for field in ("MODSW", "STAT", "SWREG"):
+            state[(field, shunt["BUS"])] = psspy.swsint(shunt["BUS"], shunt["ID"], field)[1]
+    return state
+
+
+def change_everything(api, meta, cfg, ratio=1.05, vs=1.04):
+    """What the checks do to a case: dispatch, Q limits, VS, MPT taps, shunts out"""
+    _i, _f = api.getdefaultint(), api.getdefaultreal()
+    bus, gid = meta["gen_buses"][0], meta["gen_ids"][0]
+    assert api.machine_chng_4(bus, gid, [_i] * 7, [1.0, _f, 5.0] + [_f] * 14, "") == 0
+    assert api.machine_chng_4(meta["gen_buses"][-1], meta["gen_ids"][-1], [0] + [_i] * 6, [_f] * 17, "") == 0
+    for gen_bus, reg_bus in zip(meta["gen_buses"], meta["reg_bus"]):
+        assert api.plant_chng_4(gen_bus, 0, [reg_bus, 0], [vs, 100.0]) == 0
+    for mpt in meta["mpt_list"]:
+        assert checks.set_mpt_ratio(api, mpt, ratio, _i, _f) == 0
+    checks.disconnect_shunts(api, cfg["SHUNT_LIST"], lambda msg: None, _i, _f)
+
+
+@pytest.mark.parametrize("mpt_type", ["2-WINDING", "3-WINDING"])
+def test_revert_restores_the_base_values(psspy, plant_case, mpt_type):
+    meta, cfg = plant_case(units=4, mpts=2, shunts=True, mpt_type=mpt_type)
+    with CaseSnapshot(psspy, cfg["SAV_PATH"]) as snapshot:
+        base = case_state(psspy, meta)
+        change_everything(snapshot.api, meta, cfg)
+        changed = case_state(psspy, meta)
+        first, last = meta["gen_buses"][0], meta["gen_buses"][-1]
+        touched = [("P", first), ("QMAX", first), ("status", last), "plants"]
+        touched += [("ratio", mpt["mpt_from"]) for mpt in meta["mpt_list"]]
+        touched += [("STAT", shunt["BUS"]) for shunt in meta["shunt_list"]]
+        assert [key for key in touched if changed[key] == base[key]] == []
+
+        assert snapshot.revert()
+        assert snapshot.restores == 0 and snapshot.reverts == 1
+        assert case_state(psspy, meta) == base
+
+
+def test_checkpoint_reverts_to_the_checkpoint(psspy, plant_case):
+    meta, cfg = plant_case(units=4, mpts=1, shunts=True)
+    with CaseSnapshot(psspy, cfg["SAV_PATH"]) as snapshot:
+        base = case_state(psspy, meta)
+        _i, _f = psspy.getdefaultint(), psspy.getdefaultreal()
+        mpt = meta["mpt_list"][0]
+        assert checks.set_mpt_ratio(snapshot.api, mpt, 1.05, _i, _f) == 0
+        snapshot.checkpoint()
+        prefix = case_state(psspy, meta)
+        change_everything(snapshot.api, meta, cfg, ratio=0.95)
+
+        assert snapshot.revert()
+        assert case_state(psspy, meta) == prefix
+        change_everything(snapshot.api, meta, cfg, ratio=0.9)
+        assert snapshot.revert()
+        assert case_state(psspy, meta) == prefix
+
+        # After release() the prefix's own changes are undone too
+        change_everything(snapshot.api, meta, cfg, ratio=0.95)
+        snapshot.release()
+        assert snapshot.revert()
+        assert case_state(psspy, meta) == base
+        assert snapshot.restores == 0
+
+
+def test_unrevertable_change_reloads_the_base_case(psspy, plant_case):
+    meta, cfg = plant_case(units=4, mpts=1, shunts=True)
+    logs = []
+    with CaseSnapshot(psspy, cfg["SAV_PATH"], logs.append) as snapshot:
+        base = case_state(psspy, meta)
+        _i, _f = psspy.getdefaultint(), psspy.getdefaultreal()
+        change_everything(snapshot.api, meta, cfg)
+        snapshot.checkpoint()
+        # SWREG has no undo in the journal
+        shunt = cfg["SHUNT_LIST"][0]
+        ints = [_i] * 21
+        ints[11] = meta["gen_buses"][0]
+        assert snapshot.api.switched_shunt_chng_5(shunt["BUS"], shunt["ID"], ints, [_f] * 12, "") == 0
+
+        assert not snapshot.revert()
+        assert snapshot.restores == 1
+        assert case_state(psspy, meta) == base
+        assert any("reloading the base case" in line for line in logs)
+        # The reload dropped the checkpoint: the journal starts again from the base case
+        change_everything(snapshot.api, meta, cfg)
+        assert snapshot.revert()
+        assert case_state(psspy, meta) == base
@@ -0,0 +1,193 @@
+import threading
+import time
+import pytest
+from app.services.job_service import coalescing
+from app.services.job_service.coalescing import Coalescer, request_key
+from app.services.job_service.job_manager import FAILED, SUCCEEDED, JobManager
+
+TIMEOUT = 5.0
+WAITERS = 4
+
+
+def wait_for(condition, timeout: float = TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.005)
+
+
+class Blocking:
+    """fn for the coalescer / job manager: runs until released, then returns or raises `outcome`"""
+    def __init__(self, outcome):
+        self.outcome = outcome
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, *args):
+        self.calls += 1
+        self.started.set()
+        assert self.release.wait(TIMEOUT)
+        if isinstance(self.outcome, BaseException):
+            raise self.outcome
+        return self.outcome
+
+
+@pytest.fixture
+def coalesced(monkeypatch):
+    """Number of calls that attached to an in-flight one so far"""
+    attached = []
+
+    def count(op, amount=1.0):
+        if op == "coalesced_requests":
+            attached.append(op)
+    monkeypatch.setattr(coalescing, "count", count)
+    return attached
+
+
+def _call_concurrently(coalescer, key, fn, coalesced, callers: int = 1 + WAITERS):
+    """`callers` threads calling coalescer.run(key, fn); returns each one's result or exception once fn is released"""
+    outcomes = [None] * callers
+
+    def call(i):
+        try:
+            outcomes[i] = ("result", coalescer.run(key, fn))
+        except Exception as e:
+            outcomes[i] = ("error", e)
+
+    threads = [threading.Thread(target=call, args=(0,))]
+    threads[0].start()
+    assert fn.started.wait(TIMEOUT)
+    threads += [threading.Thread(target=call, args=(i,)) for i in range(1, callers)]
+    for t in threads[1:]:
+        t.start()
+    wait_for(lambda: len(coalesced) == callers - 1)
+    assert coalescer.in_flight() == 1
+    fn.release.set()
+    for t in threads:
+        t.join(TIMEOUT)
+    return outcomes
+
+
+def test_identical_calls_share_one_run(coalesced):
+    coalescer, result = Coalescer(), object()
+    fn = Blocking(result)
+    outcomes = _call_concurrently(coalescer, "key", fn, coalesced)
+    assert fn.calls == 1
+    assert all(kind == "result" and value is result for kind, value in outcomes)
+    assert coalescer.in_flight() == 0
+
+
+def test_exception_reaches_every_waiter(coalesced):
+    coalescer, error = Coalescer(), ValueError("solve failed")
+    fn = Blocking(error)
+    outcomes = _call_concurrently(coalescer, "key", fn, coalesced)
+    assert fn.calls == 1
+    assert all(kind == "error" and value is error for kind, value in outcomes)
+    assert coalescer.in_flight() == 0
+
+
+@pytest.mark.parametrize("outcome", ["done", ValueError("solve failed")])
+def test_key_is_released_after_the_call(outcome):
+    coalescer = Coalescer()
+    fn = Blocking(outcome)
+    fn.release.set()
+    for _ in range(2):
+        if isinstance(outcome, BaseException):
+            with pytest.raises(ValueError):
+                coalescer.run("key", fn)
+        else:
+            assert coalescer.run("key", fn) == "done"
+        assert coalescer.in_flight() == 0
+    # Nothing was in flight for the second call, so it ran again
+    assert fn.calls == 2
+
+
+def test_different_keys_run_separately(coalesced):
+    coalescer = Coalescer()
+    first, second = Blocking(1), Blocking(2)
+    threads = [threading.Thread(target=coalescer.run, args=("a", first)),
+               threading.Thread(target=coalescer.run, args=("b", second))]
+    for t in threads:
+        t.start()
+    assert first.started.wait(TIMEOUT) and second.started.wait(TIMEOUT)
+    assert coalescer.in_flight() == 2 and not coalesced
+    first.release.set()
+    second.release.set()
+    for t in threads:
+        t.join(TIMEOUT)
+    assert coalescer.in_flight() == 0
+
+
+class Payload:
+    """Stands in for a pydantic request model"""
+    def __init__(self, **fields):
+        self.fields = fields
+
+    def dict(self):
+        return dict(self.fields)
+
+
+def test_request_key_is_canonical(tmp_path):
+    sav = tmp_path / "case.sav"
+    sav.write_bytes(b"case")
+    key = request_key("psse.tune.P", {"p_target": 90.0, "sav_path": str(sav)}, [str(sav)])
+    # Field order and model vs dict do not matter
+    assert request_key("psse.tune.P", {"sav_path": str(sav), "p_target": 90.0}, [str(sav)]) == key
+    assert request_key("psse.tune.P", Payload(p_target=90.0, sav_path=str(sav)), [str(sav)]) == key
+    # Empty input paths are skipped
+    assert request_key("psse.tune.P", {"p_target": 90.0, "sav_path": str(sav)}, [str(sav), None, ""]) == key
+    # The operation, the body and the input file all count
+    assert request_key("psse.tune.Q", {"p_target": 90.0, "sav_path": str(sav)}, [str(sav)]) != key
+    assert request_key("psse.tune.P", {"p_target": 91.0, "sav_path": str(sav)}, [str(sav)]) != key
+    sav.write_bytes(b"case, tuned")
+    assert request_key("psse.tune.P", {"p_target": 90.0, "sav_path": str(sav)}, [str(sav)]) != key
+
+
+def test_request_key_of_a_missing_file(tmp_path):
+    missing = str(tmp_path / "missing.sav")
+    assert request_key("psse.basic-model", {}, [missing]) == request_key("psse.basic-model", {}, [missing])
+    assert request_key("psse.basic-model", {}, [missing]) != request_key("psse.basic-model", {})
+
+
+@pytest.fixture
+def manager():
+    manager = JobManager(max_workers=2)
+    yield manager
+    manager._executor.shutdown(wait=True)
+
+
+def test_job_dedupe_attaches_to_the_running_job(manager):
+    fn = Blocking("done")
+    job = manager.submit("tune", fn, dedupe_key="key")
+    assert fn.started.wait(TIMEOUT)
+    again = [manager.submit("tune", fn, dedupe_key="key") for _ in range(WAITERS)]
+    assert all(other is job for other in again)
+    assert job.attached == WAITERS
+    assert manager._active_by_key == {"key": job}
+    # Other keys and undeduplicated jobs get jobs of their own
+    assert manager.submit("tune", lambda job: None, dedupe_key="other") is not job
+    assert manager.submit("tune", lambda job: None) is not job
+
+    fn.release.set()
+    wait_for(lambda: job.done)
+    assert job.status == SUCCEEDED and job.result == "done"
+    assert fn.calls == 1
+    wait_for(lambda: "key" not in manager._active_by_key)
+
+
+@pytest.mark.parametrize("outcome, status", [("done", SUCCEEDED), (ValueError("solve failed"), FAILED)])
+def test_job_key_is_released_when_the_job_finishes(manager, outcome, status):
+    fn = Blocking(outcome)
+    fn.release.set()
+    job = manager.submit("tune", fn, dedupe_key="key")
+    wait_for(lambda: job.done)
+    assert job.status == status
+    wait_for(lambda: not manager._active_by_key)
+
+    rerun = manager.submit("tune", fn, dedupe_key="key")
+    assert rerun is not job and rerun.attached == 0
+    wait_for(lambda: rerun.done)
+    assert fn.calls == 2
+    wait_for(lambda: not manager._active_by_key)
@@ -0,0 +1,178 @@
+import math
+import pytest
+from app.services.solver_service.newton_2d import solve_2d
+from app.services.solver_service.root_finder import NoUsablePoint
+
+TOL = (1e-8, 1e-8)
+
+
+class Counted:
+    """evaluate() for solve_2d that records every point it is asked for"""
+    def __init__(self, fn):
+        self.fn = fn
+        self.calls = []
+
+    def __call__(self, x):
+        self.calls.append(tuple(x))
+        return self.fn(x)
+
+
+def coupled(x):
+    # Like (k, VSched) -> (P, Q): both outputs depend on both inputs, mildly nonlinear
+    return 100.0 * x[0] + 5.0 * x[1] + 2.0 * x[0] ** 2, -20.0 * x[0] + 300.0 * x[1] - 10.0 * x[1] ** 2
+
+
+def test_converges_on_a_coupled_problem():
+    target = coupled((0.6, 1.02))
+    evaluate = Counted(coupled)
+    result = solve_2d(evaluate, target, (0.0, 1.0), (-1.0, 0.9), (1.5, 1.1), TOL, 30)
+    assert result.converged and result.reason == "converged"
+    assert result.x == pytest.approx((0.6, 1.02), abs=1e-6)
+    assert result.solves == len(evaluate.calls) < 15
+    assert result.jacobian_refreshes == 1
+    # The case is left at the answer
+    assert evaluate.calls[-1] == result.x
+
+
+def test_known_jacobian_skips_the_differences():
+    target = coupled((0.6, 1.02))
+    cold = solve_2d(coupled, target, (0.0, 1.0), (-1.0, 0.9), (1.5, 1.1), TOL, 30)
+    warm = solve_2d(coupled, target, (0.55, 1.01), (-1.0, 0.9), (1.5, 1.1), TOL, 30, jacobian=cold.jacobian)
+    assert warm.converged
+    assert warm.jacobian_refreshes == 0
+    assert "jacobian" not in warm.telemetry["methods"]
+    assert warm.solves < cold.solves
+
+
+def test_target_outside_the_box_stops_at_best_point():
+    evaluate = Counted(coupled)
+    result = solve_2d(evaluate, (1000.0, 1000.0), (0.0, 1.0), (-1.0, 0.9), (1.5, 1.1), TOL, 20)
+    assert not result.converged
+    assert result.reason in ("line_search_failed", "max_solves")
+    assert all(-1.0 <= x[0] <= 1.5 and 0.9 <= x[1] <= 1.1 for x in evaluate.calls)
+    assert result.x == pytest.approx((1.5, 1.1))
+    assert evaluate.calls[-1] == result.x
+
+
+def test_singular_jacobian_stops_the_search():
+    # Both outputs see only x0 + x1, so no step can fix their difference
+    result = solve_2d(lambda x: (x[0] + x[1], x[0] + x[1]), (1.0, 2.0), (0.5, 0.5), (0.0, 0.0), (2.0, 2.0),
+                      TOL, 30)
+    assert not result.converged
+    assert result.reason == "singular_jacobian"
+    assert result.solves <= 4
+
+
+def test_max_solves_caps_the_search():
+    evaluate = Counted(coupled)
+    steps = []
+    result = solve_2d(evaluate, coupled((0.6, 1.02)), (0.0, 1.0), (-1.0, 0.9), (1.5, 1.1), TOL, 3,
+                      on_step=lambda *args: steps.append(args))
+    assert not result.converged and result.reason == "max_solves"
+    assert len(result.history) == len(steps) == 3
+    # Three solves, plus one to go back to the best if the last wasn't it
+    assert result.solves == len(evaluate.calls) <= 4
+
+
+def failing(region):
+    """coupled(), but NaN wherever region(x) holds (the load flow diverges there)"""
+    return lambda x: (math.nan, math.nan) if region(x) else coupled(x)
+
+
+def test_failed_start_is_retried_at_the_centre():
+    evaluate = Counted(failing(lambda x: x[0] < -0.5))
+    result = solve_2d(evaluate, coupled((0.6, 1.02)), (-1.0, 0.9), (-1.0, 0.9), (1.5, 1.1), TOL, 30)
+    assert evaluate.calls[:2] == [(-1.0, 0.9), (0.25, 1.0)]
+    assert result.converged
+    assert result.x == pytest.approx((0.6, 1.02), abs=1e-6)
+
+
+def test_failed_probe_steps_the_other_way():
+    # The forward k probe from the start diverges; the backward one doesn't
+    evaluate = Counted(failing(lambda x: 0.0 < x[0] < 0.03))
+    result = solve_2d(evaluate, coupled((0.6, 1.02)), (0.0, 1.0), (-1.0, 0.9), (1.5, 1.1), TOL, 30)
+    assert result.converged
+    assert [h["method"] for h in result.history][:3] == ["initial", "failed", "jacobian"]
+    assert evaluate.calls[2][0] < 0.0
+
+
+def test_failed_newton_step_is_backtracked():
+    # The full Newton step from the start diverges (once; nearer points solve)
+    failed = []
+
+    def first_far_point(x):
+        if x[0] > 0.5 and not failed:
+            failed.append(x)
+            return True
+        return False
+    evaluate = Counted(failing(first_far_point))
+    result = solve_2d(evaluate, coupled((0.6, 1.02)), (0.0, 1.0), (-1.0, 0.9), (1.5, 1.1), TOL, 30)
+    assert result.converged
+    assert result.x == pytest.approx((0.6, 1.02), abs=1e-6)
+    methods = [h["method"] for h in result.history]
+    assert methods[3:5] == ["failed", "backtrack"]
+    # Half the step
+    assert evaluate.calls[4][0] == pytest.approx(failed[0][0] / 2)
+
+
+def test_no_usable_point_raises():
+    evaluate = Counted(failing(lambda x: True))
+    with pytest.raises(NoUsablePoint) as failed:
+        solve_2d(evaluate, (1.0, 1.0), (0.0, 1.0), (-1.0, 0.9), (1.5, 1.1), TOL, 30)
+    # The start, then the centre of the box
+    assert failed.value.solves == len(evaluate.calls) == 2
+
+
+def _tuning_service(plant_case):
+    from app.services.tuning_psse_service import PSSETuningService
+    meta, cfg = plant_case(units=4, mpts=1)
+    service = PSSETuningService(cfg["SAV_PATH"], warm_start=False)
+    assert service._init_psse()["success"]
+    return service, meta, cfg
+
+
+def _pq(meta, cfg):
+    return (meta["bus_from"], meta["bus_to"], meta["gen_buses"], meta["gen_ids"], meta["reg_bus"],
+            cfg["P_TARGET"], cfg["Q_TARGET"])
+
+
+def test_coupled_tuning_on_the_fake_case(plant_case):
+    service, meta, cfg = _tuning_service(plant_case)
+    assert service.tune_pq_coupled(*_pq(meta, cfg))
+    assert service.solver_telemetry["tune_pq"]["converged"]
+    assert "tune_p" not in service.solver_telemetry and "tune_q" not in service.solver_telemetry
+    flow = service._read_poi_flow(meta["bus_from"], meta["bus_to"])
+    assert flow.real == pytest.approx(cfg["P_TARGET"], abs=1e-5)
+    assert flow.imag == pytest.approx(cfg["Q_TARGET"], abs=1e-5)
+
+
+def test_coupled_tuning_falls_back_to_sequential(plant_case):
+    service, meta, cfg = _tuning_service(plant_case)
+    # Two solves cannot get the coupled search past its initial point and Jacobian
+    assert service.tune_pq_coupled(*_pq(meta, cfg), max_solves=2)
+    telemetry = service.solver_telemetry
+    assert not telemetry["tune_pq"]["converged"]
+    # (the difference probes come as a pair, then the best point is re-applied)
+    assert telemetry["tune_pq"]["solves"] <= 4
+    assert telemetry["tune_p"]["converged"] and telemetry["tune_q"]["converged"]
+    assert any("falling back to sequential" in line for line in service.logs)
+    # Q is tuned last; P moves little with VSched
+    flow = service._read_poi_flow(meta["bus_from"], meta["bus_to"])
+    assert flow.imag == pytest.approx(cfg["Q_TARGET"], abs=1e-5)
+    assert flow.real == pytest.approx(cfg["P_TARGET"], rel=1e-2)
+
+
+def test_coupled_tuning_with_no_usable_point_tunes_sequentially(plant_case, diverges_when):
+    service, meta, cfg = _tuning_service(plant_case)
+
+    def k(network):
+        machine = next(m for m in network.machines if m["bus"] == meta["gen_buses"][0])
+        return machine["pg"] / machine["mbase"]
+    # Both coupled starts (the case's own dispatch and the box centre) sit in diverging bands
+    diverges_when(lambda network: 0.7 < k(network) < 0.75 or 0.2 < k(network) < 0.3)
+    assert service.tune_pq_coupled(*_pq(meta, cfg))
+    telemetry = service.solver_telemetry
+    assert telemetry["tune_pq"]["reason"] == "no_usable_point"
+    assert telemetry["tune_p"]["converged"] and telemetry["tune_q"]["converged"]
+    flow = service._read_poi_flow(meta["bus_from"], meta["bus_to"])
+    assert flow.imag == pytest.approx(cfg["Q_TARGET"], abs=1e-5)
@@ -0,0 +1,171 @@
+import math
+import pytest
+from app.services.job_service.cancellation import CancellationToken, JobCancelled
+from app.services.solver_service.root_finder import NoUsablePoint, find_root
+
+
+class Counted:
+    """evaluate() for find_root that records every x it is asked for"""
+    def __init__(self, fn):
+        self.fn = fn
+        self.calls = []
+
+    def __call__(self, x):
+        self.calls.append(x)
+        return self.fn(x)
+
+
+def test_bracketed_root_converges_faster_than_bisection():
+    evaluate = Counted(lambda x: x ** 3 + x)
+    result = find_root(evaluate, 2.0, -2.0, 3.0, 1e-9, 60)
+    assert result.converged and result.reason == "converged"
+    assert result.x == pytest.approx(1.0, abs=1e-6)
+    assert abs(result.error) < 1e-9
+    # Bisection needs ~log2(5 / 1e-9) = 33 solves for the same tolerance
+    assert result.solves == len(evaluate.calls) < 15
+    assert result.bracket[0] <= result.x <= result.bracket[1]
+
+
+def test_decreasing_response():
+    result = find_root(lambda x: 10.0 - 4.0 * x, 2.0, 0.0, 5.0, 1e-9, 30, increasing=False)
+    assert result.converged
+    assert result.x == pytest.approx(2.0)
+
+
+def test_target_above_range_stops_at_best_end():
+    evaluate = Counted(lambda x: x)
+    result = find_root(evaluate, 10.0, 0.0, 1.0, 1e-9, 30)
+    assert not result.converged
+    assert result.reason in ("max_solves", "bracket_collapsed")
+    assert result.x == pytest.approx(1.0, abs=1e-6)
+    # The case is left at the best point seen
+    assert evaluate.calls[-1] == result.x
+
+
+def test_target_below_range_stops_at_best_end():
+    result = find_root(lambda x: x, -10.0, 0.0, 1.0, 1e-9, 30)
+    assert not result.converged
+    assert result.x == pytest.approx(0.0, abs=1e-6)
+
+
+def test_flat_response_falls_back_to_bisection():
+    evaluate = Counted(lambda x: 5.0)
+    result = find_root(evaluate, 1.0, 0.0, 1.0, 1e-9, 8)
+    assert not result.converged
+    assert result.error == 4.0
+    assert all(math.isfinite(x) and 0.0 <= x <= 1.0 for x in evaluate.calls)
+    assert {step["method"] for step in result.history} == {"bisection"}
+    # No point is better than the first, so it is re-applied at the end
+    assert evaluate.calls[-1] == evaluate.calls[0] == result.x
+    assert result.solves == 9
+
+
+def test_max_solves_caps_the_search():
+    evaluate = Counted(lambda x: math.exp(x))
+    steps = []
+    result = find_root(evaluate, 2.0, -5.0, 5.0, 0.0, 3, on_step=lambda *args: steps.append(args))
+    assert not result.converged and result.reason == "max_solves"
+    assert len(result.history) == len(steps) == 3
+    assert [s[0] for s in steps] == [1, 2, 3]
+    # Three solves, plus one to go back to the best if the last wasn't it
+    assert result.solves == len(evaluate.calls) <= 4
+    assert evaluate.calls[-1] == result.x
+    assert result.telemetry["solves"] == result.solves
+
+
+def test_restore_best_off_leaves_the_last_point():
+    evaluate = Counted(lambda x: 5.0)
+    result = find_root(evaluate, 1.0, 0.0, 1.0, 1e-9, 4, restore_best=False)
+    assert result.solves == len(evaluate.calls) == 4
+    assert evaluate.calls[-1] != result.x
+
+
+def test_x0_seeds_the_first_solve():
+    evaluate = Counted(lambda x: 2.0 * x)
+    result = find_root(evaluate, 1.0, 0.0, 10.0, 1e-9, 30, x0=0.5)
+    assert evaluate.calls[0] == 0.5
+    assert result.converged and result.solves == 1
+    assert result.history[0]["method"] == "initial"
+
+
+def test_slope_hint_gives_a_newton_step():
+    result = find_root(lambda x: 3.0 * x, 1.5, 0.0, 10.0, 1e-9, 30, x0=2.0, slope=3.0)
+    assert result.converged and result.solves == 2
+    assert [step["method"] for step in result.history] == ["initial", "newton"]
+
+
+def test_cancelled_before_the_first_solve():
+    token = CancellationToken()
+    token.cancel()
+    evaluate = Counted(lambda x: x)
+    with pytest.raises(JobCancelled):
+        find_root(evaluate, 0.5, 0.0, 1.0, 1e-9, 30, cancel_token=token)
+    assert evaluate.calls == []
+
+
+def test_tuning_p_on_the_fake_case(plant_case):
+    from app.services.tuning_psse_service import PSSETuningService
+    meta, cfg = plant_case(units=4, mpts=1)
+    service = PSSETuningService(cfg["SAV_PATH"], warm_start=False)
+    assert service._init_psse()["success"]
+    service.tune_p(meta["bus_from"], meta["bus_to"], meta["gen_buses"], meta["gen_ids"], cfg["P_TARGET"])
+    telemetry = service.solver_telemetry["tune_p"]
+    assert telemetry["converged"]
+    assert service._read_poi_flow(meta["bus_from"], meta["bus_to"]).real == pytest.approx(cfg["P_TARGET"], abs=1e-5)
+
+
+def test_failed_points_are_avoided():
+    # Like a load flow that diverges above x = 2: NaN there
+    evaluate = Counted(lambda x: x ** 3 + x if x < 2.0 else math.nan)
+    result = find_root(evaluate, 2.0, -2.0, 3.0, 1e-9, 60, x0=2.5)
+    assert result.converged
+    assert result.x == pytest.approx(1.0, abs=1e-6)
+    assert result.history[0]["method"] == "failed"
+    assert result.bracket[1] <= 2.5
+
+
+def test_failed_first_point_bisects_towards_the_far_end():
+    evaluate = Counted(lambda x: math.nan if 0.4 < x < 0.6 else 2.0 * x)
+    result = find_root(evaluate, 0.3, 0.0, 1.0, 1e-9, 30)
+    assert evaluate.calls[:2] == [0.5, 0.25]
+    assert result.converged
+    assert result.x == pytest.approx(0.15)
+    assert [h["method"] for h in result.history][:2] == ["failed", "bisection"]
+
+
+def test_no_usable_point_raises():
+    evaluate = Counted(lambda x: math.nan)
+    with pytest.raises(NoUsablePoint) as failed:
+        find_root(evaluate, 1.0, 0.0, 1.0, 1e-9, 5)
+    assert failed.value.solves == len(evaluate.calls) == 5
+    assert [h["method"] for h in failed.value.history] == ["failed"] * 5
+
+
+def _k(network, meta):
+    machine = next(m for m in network.machines if m["bus"] == meta["gen_buses"][0])
+    return machine["pg"] / machine["mbase"]
+
+
+def test_tuning_p_steps_away_from_a_non_convergent_point(plant_case, diverges_when):
+    from app.services.tuning_psse_service import PSSETuningService
+    meta, cfg = plant_case(units=4, mpts=1)
+    # The first probe (the middle of [k_low, k_high]) and everything above 1.2 diverge
+    diverges_when(lambda network: 0.2 < _k(network, meta) < 0.3 or _k(network, meta) > 1.2)
+    service = PSSETuningService(cfg["SAV_PATH"], warm_start=False)
+    assert service._init_psse()["success"]
+    assert service.tune_p(meta["bus_from"], meta["bus_to"], meta["gen_buses"], meta["gen_ids"], cfg["P_TARGET"])
+    telemetry = service.solver_telemetry["tune_p"]
+    assert telemetry["converged"] and telemetry["methods"]["failed"] >= 1
+    assert service._read_poi_flow(meta["bus_from"], meta["bus_to"]).real == pytest.approx(cfg["P_TARGET"], abs=1e-5)
+
+
+def test_tuning_raises_when_nothing_converges(plant_case, diverges_when):
+    from app.services.psse_worker_service.load_flow import LoadFlowError
+    from app.services.tuning_psse_service import PSSETuningService
+    meta, cfg = plant_case(units=4, mpts=1)
+    diverges_when(lambda network: True)
+    service = PSSETuningService(cfg["SAV_PATH"], warm_start=False)
+    assert service._init_psse()["success"]
+    with pytest.raises(LoadFlowError):
+        service.tune_p(meta["bus_from"], meta["bus_to"], meta["gen_buses"], meta["gen_ids"], cfg["P_TARGET"],
+                       max_iter=6)
@@ -0,0 +1,170 @@
+import json
+import os
+import shutil
+import pytest
+from app.services.basic_model_psse_service import BasicModelService
+from app.services.psse_worker_service.case_snapshot import CaseSnapshot
+from app.services.psse_worker_service.load_flow import LoadFlowError
+from app.services.psse_worker_service.scenario_dag import ScenarioDag, ScenarioStep, ScenarioStepFailed
+
+
+class Snapshot:
+    """Records what ScenarioDag.run asks of the snapshot; revert() reloads while `reloads` says so"""
+    def __init__(self, reloads: bool = False):
+        self.reloads = reloads
+        self.events = []
+
+    def revert(self):
+        self.events.append("revert")
+        return not self.reloads
+
+    def checkpoint(self):
+        self.events.append("checkpoint")
+
+    def release(self):
+        self.events.append("release")
+
+
+def _dag(ran, fail=()):
+    def step(name, output=None):
+        def run(inputs):
+            ran.append((name, inputs))
+            return False if name in fail else (output if output is not None else name)
+        return run
+
+    return ScenarioDag([
+        ScenarioStep("tuning", step("tuning", {"vs": 1.02})),
+        ScenarioStep("discharge", step("discharge"), needs=["tuning"]),
+        ScenarioStep("charge", step("charge"), needs=["tuning"]),
+        ScenarioStep("disabled", step("disabled")),
+        ScenarioStep("only_tuning", step("only_tuning"), parent="disabled"),
+        ScenarioStep("only_case", step("only_case"), parent="disabled", needs=["only_tuning"]),
+        ScenarioStep("alone", step("alone")),
+    ])
+
+
+def test_branches_group_steps_linked_by_parent_or_need():
+    assert _dag([]).branches() == [["tuning", "discharge", "charge"], ["disabled", "only_tuning", "only_case"],
+                                   ["alone"]]
+
+
+def test_unknown_step_is_rejected():
+    with pytest.raises(ValueError):
+        ScenarioDag([ScenarioStep("a", lambda inputs: True, needs=["missing"])])
+
+
+def test_run_shares_prefixes_and_passes_outputs():
+    ran, snapshot = [], Snapshot()
+    outputs = _dag(ran).run(snapshot)
+    assert [name for name, _ in ran] == ["tuning", "discharge", "charge", "disabled", "only_tuning", "only_case",
+                                         "alone"]
+    assert dict(ran)["discharge"] == {"tuning": {"vs": 1.02}}
+    assert dict(ran)["only_case"] == {"only_tuning": "only_tuning"}
+    assert outputs["only_case"] == "only_case"
+    # The shared prefix runs once, its children revert to its checkpoint
+    assert snapshot.events.count("checkpoint") == 1 and snapshot.events.count("release") == 1
+
+
+def test_run_one_branch():
+    ran = []
+    _dag(ran).run(Snapshot(), ["disabled", "only_tuning", "only_case"])
+    assert [name for name, _ in ran] == ["disabled", "only_tuning", "only_case"]
+
+
+def test_prefix_is_replayed_after_a_reload():
+    ran, logs = [], []
+    _dag(ran).run(Snapshot(reloads=True), ["disabled", "only_tuning", "only_case"], logs.append)
+    # only_case starts from `disabled` again after the reload dropped its checkpoint
+    assert [name for name, _ in ran] == ["disabled", "only_tuning", "disabled", "only_case"]
+    assert any("Replaying disabled" in line for line in logs)
+
+
+def test_failed_step_stops_the_run():
+    ran = []
+    with pytest.raises(ScenarioStepFailed) as failed:
+        _dag(ran, fail=("charge",)).run(Snapshot())
+    assert failed.value.step == "charge"
+    assert "disabled" not in [name for name, _ in ran]
+
+
+def test_load_flow_error_fails_the_step():
+    def diverges(inputs):
+        raise LoadFlowError("Load flow did not converge at any tune_q point (30 solves)")
+
+    logs = []
+    dag = ScenarioDag([ScenarioStep("tuning", diverges), ScenarioStep("after", lambda inputs: True, needs=["tuning"])])
+    with pytest.raises(ScenarioStepFailed) as failed:
+        dag.run(Snapshot(), log_cb=logs.append)
+    assert failed.value.step == "tuning"
+    assert isinstance(failed.value.__cause__, LoadFlowError)
+    assert any("did not converge" in line for line in logs)
+
+
+# --- HYBRID on the fake backend ---
+
+def _saved_cases(folder):
+    """The HYBRID cases saved in `folder`: file name -> (machines, plants) as written"""
+    cases = {}
+    for name in sorted(os.listdir(folder)):
+        if "_HYBRID_" in name:
+            with open(os.path.join(folder, name)) as f:
+                data = json.load(f)
+            cases[name] = ([(m["bus"], m["status"], m["pg"], m["qt"], m["qb"], m["pt"], m["pb"])
+                            for m in data["machines"]],
+                           [(p["bus"], p["vs"]) for p in data["plants"]])
+    return cases
+
+
+def _assert_same_cases(cases, expected):
+    assert sorted(cases) == sorted(expected) and len(expected) == 5
+    for name, (machines, plants) in expected.items():
+        for got, want in zip(cases[name][0] + cases[name][1], machines + plants):
+            assert got == pytest.approx(want, abs=1e-6), name
+
+
+@pytest.fixture
+def hybrid(psspy, plant_case, tmp_path):
+    """cfg for HYBRID on a fake plant, and a function copying its SAV to a new folder"""
+    meta, check_cfg = plant_case(units=4, mpts=2, shunts=True)
+    cfg = {"sav_path": check_cfg["SAV_PATH"], "project_type": "HYBRID",
+           "bus_from": meta["bus_from"], "bus_to": meta["bus_to"], "p_net": 0.9 * meta["p_rated"],
+           "pv_generators": meta["pv_generators"], "bess_generators": meta["bess_generators"]}
+
+    def copy_to(name):
+        folder = tmp_path / name
+        folder.mkdir()
+        path = str(folder / "case.sav")
+        shutil.copyfile(cfg["sav_path"], path)
+        return dict(cfg, sav_path=path), str(folder)
+    return cfg, copy_to
+
+
+def test_hybrid_branches_save_the_sequential_cases(hybrid):
+    cfg, copy_to = hybrid
+    sequential_cfg, sequential = copy_to("sequential")
+    assert BasicModelService(lambda msg: None).run_hybrid(sequential_cfg)
+
+    branches_cfg, branches = copy_to("branches")
+    dag = BasicModelService(lambda msg: None).hybrid_dag(branches_cfg)
+    assert len(dag.branches()) == 3
+    for branch in dag.branches():
+        # What run_hybrid_branch_task does in each pool worker
+        assert BasicModelService(lambda msg: None).run_hybrid(branches_cfg, branch)
+
+    _assert_same_cases(_saved_cases(branches), _saved_cases(sequential))
+
+
+def test_hybrid_replays_prefixes_after_a_reload(hybrid, monkeypatch):
+    cfg, copy_to = hybrid
+    expected_cfg, expected = copy_to("expected")
+    assert BasicModelService(lambda msg: None).run_hybrid(expected_cfg)
+
+    def reload(snapshot):
+        snapshot.restore()
+        return False
+    monkeypatch.setattr(CaseSnapshot, "revert", reload)
+    replayed_cfg, replayed = copy_to("replayed")
+    logs = []
+    assert BasicModelService(logs.append).run_hybrid(replayed_cfg)
+    assert any("Replaying pv_disabled" in line for line in logs)
+    _assert_same_cases(_saved_cases(replayed), _saved_cases(expected))
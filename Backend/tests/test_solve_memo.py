@@ -0,0 +1,79 @@
+import pytest
+from app.services import check_reactive_psse_service as checks
+from app.services.psse_worker_service.load_flow import get_load_flow
+from app.services.psse_worker_service.solve_memo import SolveMemo, ensure_solved, solve_case, use_solve_memo
+
+
+def test_disconnecting_shunts_changes_the_key(psspy, plant_case):
+    meta, cfg = plant_case(units=4, mpts=1, shunts=True)
+    memo = SolveMemo()
+    connected = memo.key(psspy, cfg)
+    assert connected is not None
+
+    checks.disconnect_shunts(psspy, cfg["SHUNT_LIST"], lambda msg: None, psspy.getdefaultint(),
+                             psspy.getdefaultreal())
+    for shunt in cfg["SHUNT_LIST"]:
+        assert psspy.swsint(shunt["BUS"], shunt["ID"], "STAT") == (0, 0)
+    # Max Lag leaves the shunts in, Max Lead takes them out: different networks, different entries
+    assert memo.key(psspy, cfg) != connected
+
+
+def _measure(case, meta):
+    """POI flow and generator Q, read through `case` (psspy or a SolvedCase)"""
+    flow = case.brnflo(meta["bus_from"], meta["bus_to"], "1")[1]
+    q = [case.macdat(bus, gid, "Q")[1] for bus, gid in zip(meta["gen_buses"], meta["gen_ids"])]
+    return flow, q
+
+
+def test_hit_serves_what_a_real_solve_reads(psspy, plant_case):
+    meta, cfg = plant_case(units=4, mpts=1, shunts=True)
+    _i, _f = psspy.getdefaultint(), psspy.getdefaultreal()
+    mpt = meta["mpt_list"][0]
+    solver = get_load_flow(psspy)
+    memo = SolveMemo()
+    with use_solve_memo(memo):
+        assert checks.set_mpt_ratio(psspy, mpt, 1.0, _i, _f) == 0
+        first = _measure(solve_case(psspy, None, cfg), meta)
+        assert checks.set_mpt_ratio(psspy, mpt, 1.05, _i, _f) == 0
+        other = _measure(solve_case(psspy, None, cfg), meta)
+        assert other != first
+
+        # Back to the first configuration: no load flow, the reads come from the entry
+        assert checks.set_mpt_ratio(psspy, mpt, 1.0, _i, _f) == 0
+        mark = solver.mark()
+        solved = solve_case(psspy, None, cfg)
+        assert solved.converged
+        assert memo.hits == 1 and memo.misses == 2
+        assert solver.mark() == mark
+        assert _measure(solved, meta) == first
+        # The case itself still holds the 1.05 solution until something needs it solved
+        assert _measure(psspy, meta) == other
+        ensure_solved(psspy, None, cfg)
+        assert solver.mark() == mark + 1
+
+    # ...and a real solve of the same configuration agrees with the entry
+    assert solver.solve("check").converged
+    flow, q = _measure(psspy, meta)
+    assert flow == pytest.approx(first[0], abs=1e-9)
+    assert q == pytest.approx(first[1], abs=1e-9)
+
+
+def test_read_outside_the_entry_solves_first(psspy, plant_case):
+    meta, cfg = plant_case(units=4, mpts=1, shunts=False)
+    _i, _f = psspy.getdefaultint(), psspy.getdefaultreal()
+    mpt = meta["mpt_list"][0]
+    memo = SolveMemo()
+    with use_solve_memo(memo):
+        solve_case(psspy, None, cfg)
+        assert checks.set_mpt_ratio(psspy, mpt, 1.05, _i, _f) == 0
+        solve_case(psspy, None, cfg)
+        assert checks.set_mpt_ratio(psspy, mpt, 1.0, _i, _f) == 0
+        solved = solve_case(psspy, None, cfg)
+        assert memo.hits == 1
+        # Bus voltages were not read at the first solve, so the case is solved for them
+        bus = meta["reg_bus"][0]
+        served = solved.busdat(bus, "PU")[1]
+        assert memo.misses == 3
+
+    assert get_load_flow(psspy).solve("check").converged
+    assert psspy.busdat(bus, "PU")[1] == pytest.approx(served, abs=1e-9)
@@ -0,0 +1,95 @@
+import pytest
+from app.services import check_reactive_psse_service as checks
+from app.services.job_service.cancellation import CancellationToken
+
+
+def linear_stepping(psspy, log_cb, mpt_list, mpt_data_list, direction, passes, _i, _f, cancel_token):
+    """The checks' original tap loop: every MPT one step at a time, a solve per step, stop at the first pass"""
+    limit = [d["rmax"] if direction > 0 else d["rmin"] for d in mpt_data_list]
+    n, ratios = 0, [d["ratio"] for d in mpt_data_list]
+    while any(abs(r - l) > 1e-9 for r, l in zip(ratios, limit)):
+        n += 1
+        ratios = checks._tap_ratios(mpt_data_list, direction, n)
+        for mpt, ratio in zip(mpt_list, ratios):
+            assert checks.set_mpt_ratio(psspy, mpt, ratio, _i, _f) == 0
+        result = passes(ratios)
+        if result is None:
+            return {"position": n, "ratios": ratios, "passed": False, "solves": n, "max_position": None}
+        if result:
+            return {"position": n, "ratios": ratios, "passed": True, "solves": n, "max_position": None}
+    return {"position": n, "ratios": ratios, "passed": False, "solves": n, "max_position": n}
+
+
+def _run_check(psspy, plant_case, monkeypatch, search, check: str, units: int, mpts: int, shunts: bool):
+    """Run `check` with `search` as its tap search; returns the searches' results and the final MPT ratios / POI flow"""
+    meta, cfg = plant_case(units=units, mpts=mpts, shunts=shunts)
+    searches = []
+
+    def recorded(*args):
+        searches.append(search(*args))
+        return searches[-1]
+
+    monkeypatch.setattr(checks, "search_tap_position", recorded)
+    getattr(checks, check)(psspy, lambda msg: None, cfg, psspy.getdefaultint(), psspy.getdefaultreal())
+    ratios = [psspy.xfrdat(m["mpt_from"], m["mpt_to"], "1", "RATIO")[1] for m in meta["mpt_list"]]
+    _, flow = psspy.brnflo(meta["bus_from"], meta["bus_to"], "1")
+    return searches, ratios, flow
+
+
+@pytest.mark.parametrize("check, units, mpts, shunts", [
+    ("check_max_lag", 12, 1, True),
+    ("check_max_lag", 12, 2, False),
+    ("check_max_lead", 4, 1, False),
+    ("check_max_lead", 12, 2, True),
+])
+def test_search_matches_linear_stepping(psspy, plant_case, monkeypatch, check, units, mpts, shunts):
+    run = (psspy, plant_case, monkeypatch)
+    searches, ratios, flow = _run_check(*run, checks.search_tap_position, check, units, mpts, shunts)
+    assert len(searches) == 1 and searches[0]["passed"]
+
+    baseline, baseline_ratios, baseline_flow = _run_check(*run, linear_stepping, check, units, mpts, shunts)
+    assert baseline[0]["passed"]
+
+    assert searches[0]["position"] == baseline[0]["position"]
+    assert ratios == pytest.approx(baseline_ratios, abs=1e-9)
+    assert flow == pytest.approx(baseline_flow, abs=1e-6)
+    # Gallop and bisection cost O(log n) solves, so long searches beat stepping
+    if baseline[0]["position"] >= 8:
+        assert searches[0]["solves"] < baseline[0]["solves"]
+
+
+@pytest.mark.parametrize("first_pass, diverges", [
+    (10, 11),   # the gallop passes at 15, bisection hits the non-convergent 11
+    (12, 13),   # ...and 13, after 11 failed
+    (5, 6),     # never reached
+    (10, 7),    # the gallop hits it before any pass
+])
+def test_search_stops_below_a_non_convergent_tap(psspy, plant_case, first_pass, diverges):
+    meta, cfg = plant_case(units=4, mpts=2, shunts=False)
+    _i, _f = psspy.getdefaultint(), psspy.getdefaultreal()
+    mpt_data_list = [checks.get_mpt_data(psspy, mpt, lambda msg: None) for mpt in meta["mpt_list"]]
+    positions = {tuple(round(r, 9) for r in checks._tap_ratios(mpt_data_list, +1, n)): n for n in range(17)}
+
+    def passes(ratios):
+        n = positions[tuple(round(r, 9) for r in ratios)]
+        return None if n == diverges else n >= first_pass
+
+    def run(search):
+        for mpt in meta["mpt_list"]:
+            assert checks.set_mpt_ratio(psspy, mpt, 1.0, _i, _f) == 0
+        result = search(psspy, lambda msg: None, meta["mpt_list"], mpt_data_list, +1, passes, _i, _f,
+                        CancellationToken())
+        ratios = [psspy.xfrdat(m["mpt_from"], m["mpt_to"], "1", "RATIO")[1] for m in meta["mpt_list"]]
+        return result, ratios
+
+    searched, ratios = run(checks.search_tap_position)
+    stepped, stepped_ratios = run(linear_stepping)
+    assert searched["passed"] == stepped["passed"] == (first_pass < diverges)
+    if stepped["passed"]:
+        assert searched["position"] == stepped["position"] == first_pass
+        assert ratios == pytest.approx(stepped_ratios, abs=1e-9)
+    else:
+        # Stepping stops on the non-convergent tap; the search leaves the case at the last one that converged
+        assert stepped["position"] == diverges
+        assert searched["position"] == diverges - 1
+    assert ratios == pytest.approx(checks._tap_ratios(mpt_data_list, +1, searched["position"]), abs=1e-9)